@@ -7,11 +7,19 @@ import os
 import paho.mqtt.client as mqtt
 import json
 import base64
+import struct
 import time
 import sys
 from PIL import Image
 import io
 
+# バイナリフレーム形式 (services/perception/src/frame_codec.py と同一)
+# magic "SOMF", version, flags, header_len, width, height (big-endian) + JPEG
+FRAME_HEADER = struct.Struct(">4sBBHHH")
+FRAME_MAGIC = b"SOMF"
+FRAME_VERSION = 1
+
+
 class CameraNodeSimulator:
     def __init__(self, device_id="camera_node_01", broker="localhost", port=1883):
         self.device_id = device_id
@@ -43,12 +51,16 @@ class CameraNodeSimulator:
             req_id = request.get("id", "unknown")
             resolution = request.get("resolution", "VGA")
             quality = request.get("quality", 10)
+            transport = request.get("transport", "json")
             
             # ダミー画像生成
             image = self.generate_dummy_image(resolution)
             
-            # レスポンス送信
-            self.send_response(req_id, image, resolution)
+            # レスポンス送信 (要求されればバイナリ形式)
+            if transport == "binary":
+                self.send_binary_response(req_id, image)
+            else:
+                self.send_response(req_id, image, resolution)
             
         except Exception as e:
             print(f"Error handling request: {e}")
@@ -100,6 +112,18 @@ class CameraNodeSimulator:
         print(f"[RESPONSE] Sent to: {response_topic}")
         print(f"Image size: {len(image_bytes)} bytes, Base64: {len(image_b64)} chars")
     
+    def send_binary_response(self, req_id, image_bytes):
+        """画像レスポンスをバイナリ形式 (ヘッダ + JPEG) で送信"""
+        img = Image.open(io.BytesIO(image_bytes))
+        header = FRAME_HEADER.pack(
+            FRAME_MAGIC, FRAME_VERSION, 0, FRAME_HEADER.size, img.width, img.height
+        )
+        
+        frame_topic = f"mcp/{self.device_id}/frame/{req_id}"
+        self.client.publish(frame_topic, header + image_bytes)
+        print(f"[RESPONSE] Sent binary frame to: {frame_topic}")
+        print(f"Image size: {len(image_bytes)} bytes (+{FRAME_HEADER.size} header)")
+    
     def publish_status(self):
         """ステータス送信"""
         status = {
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Perception posture stasis and person tracking
+(activity_analyzer.py, person_tracker.py) on synthetic skeletons.
+
+Usage:
+  python3 infra/scripts/test_activity_analyzer.py
+"""
+import sys
+import os
+import unittest
+
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+from activity_analyzer import (  # noqa: E402
+    ActivityAnalyzer, PostureStasisTracker, normalise_posture,
+)
+from person_tracker import PersonTracker  # noqa: E402
+
+# Seated skeleton, hip midpoint at the origin, shoulder width 40px
+_BASE = np.zeros((17, 2))
+_BASE[0] = (0, -90)                  # nose
+_BASE[1:5] = [(-5, -95), (5, -95), (-10, -92), (10, -92)]
+_BASE[5], _BASE[6] = (-20, -60), (20, -60)    # shoulders
+_BASE[7], _BASE[8] = (-25, -30), (25, -30)    # elbows
+_BASE[9], _BASE[10] = (-15, -10), (15, -10)   # wrists
+_BASE[11], _BASE[12] = (-15, 0), (15, 0)      # hips
+_BASE[13], _BASE[14] = (-15, 40), (15, 40)    # knees
+_BASE[15], _BASE[16] = (-15, 80), (15, 80)    # ankles
+
+
+def _person(x=200.0, y=300.0, scale=1.0, arms_up=False, occluded=False):
+    kpts = _BASE * scale + (x, y)
+    if arms_up:
+        kpts[9] = kpts[5] + (0, -60 * scale)
+        kpts[10] = kpts[6] + (0, -60 * scale)
+    conf = np.full(17, 0.9)
+    if occluded:
+        conf[[5, 6, 11, 12]] = 0.1
+    return {"keypoints": kpts, "keypoint_conf": conf}
+
+
+def _sig(**kwargs):
+    p = _person(**kwargs)
+    return normalise_posture(p["keypoints"], p["keypoint_conf"])
+
+
+def _box(x, y, w=60, h=180):
+    return np.array([x, y, x + w, y + h], dtype=np.float64)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: PostureStasisTracker
+# ────────────────────────────────────────────────────────
+class TestPostureStasisTracker(unittest.TestCase):
+
+    def test_same_posture_accumulates(self):
+        tracker = PostureStasisTracker()
+        for ts in range(0, 601, 3):
+            tracker.update(_sig(), float(ts))
+        self.assertEqual(tracker.duration(), 600.0)
+
+    def test_signature_is_position_and_scale_invariant(self):
+        tracker = PostureStasisTracker()
+        tracker.update(_sig(x=100, y=200), 0.0)
+        tracker.update(_sig(x=300, y=250, scale=1.5), 30.0)
+        self.assertEqual(tracker.duration(), 30.0)
+
+    def test_posture_change_starts_new_run(self):
+        tracker = PostureStasisTracker()
+        for ts in (0.0, 10.0, 20.0):
+            tracker.update(_sig(), ts)
+        tracker.update(_sig(arms_up=True), 30.0)
+        self.assertEqual(tracker.since, 30.0)
+        self.assertEqual(tracker.duration(), 0.0)
+
+    def test_single_occluded_frame_keeps_run(self):
+        tracker = PostureStasisTracker()
+        for ts in range(0, 1800, 3):
+            tracker.update(_sig(), float(ts))
+        tracker.update(None, 1800.0)
+        self.assertEqual(tracker.since, 0.0)
+        tracker.update(_sig(), 1803.0)
+        self.assertEqual(tracker.duration(), 1803.0)
+
+    def test_long_occlusion_resets(self):
+        tracker = PostureStasisTracker()
+        tracker.update(_sig(), 0.0)
+        tracker.update(_sig(), 300.0)
+        tracker.update(None, 330.0)
+        self.assertIsNotNone(tracker.since)
+        tracker.update(None, 361.0)   # > 60s since the last signature
+        self.assertIsNone(tracker.since)
+        self.assertEqual(tracker.duration(), 0.0)
+        tracker.update(_sig(), 364.0)
+        self.assertEqual(tracker.since, 364.0)
+
+    def test_duration_capped_at_four_hours(self):
+        tracker = PostureStasisTracker()
+        tracker.update(_sig(), 0.0)
+        tracker.update(_sig(), 5 * 3600.0)
+        self.assertEqual(tracker.duration(), 4 * 3600.0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: PersonTracker
+# ────────────────────────────────────────────────────────
+class TestPersonTracker(unittest.TestCase):
+
+    def test_ids_stable_across_reordering(self):
+        tracker = PersonTracker()
+        a, b, c = _box(50, 100), _box(300, 100), _box(550, 100)
+        ids = tracker.assign([a, b, c], 0.0)
+        self.assertEqual(len(set(ids)), 3)
+
+        # Same people, detector returns them in a different order and
+        # slightly moved
+        shifted = [_box(555, 104), _box(48, 98), _box(305, 101)]
+        again = tracker.assign(shifted, 3.0)
+        self.assertEqual(again, [ids[2], ids[0], ids[1]])
+
+    def test_centroid_fallback_for_fast_movement(self):
+        tracker = PersonTracker()
+        [tid] = tracker.assign([_box(100, 100)], 0.0)
+        # Moved ~70px: no IoU overlap left, but within 0.75 × box diagonal
+        moved = _box(165, 130)
+        self.assertEqual(tracker.assign([moved], 3.0), [tid])
+
+    def test_far_detection_opens_new_track(self):
+        tracker = PersonTracker()
+        [tid] = tracker.assign([_box(100, 100)], 0.0)
+        [other] = tracker.assign([_box(600, 100)], 3.0)
+        self.assertNotEqual(other, tid)
+        self.assertEqual(len(tracker.tracks), 2)
+
+    def test_expiry(self):
+        tracker = PersonTracker(max_missed_sec=90)
+        [tid] = tracker.assign([_box(100, 100)], 0.0)
+        tracker.assign([], 60.0)
+        self.assertIn(tid, tracker.tracks)
+        [same] = tracker.assign([_box(100, 100)], 80.0)
+        self.assertEqual(same, tid)
+        tracker.assign([], 171.0)
+        self.assertNotIn(tid, tracker.tracks)
+        [new] = tracker.assign([_box(100, 100)], 172.0)
+        self.assertNotEqual(new, tid)
+
+    def test_detection_without_box_gets_one_off_id(self):
+        tracker = PersonTracker()
+        first = tracker.assign([None], 0.0)
+        second = tracker.assign([None], 3.0)
+        self.assertNotEqual(first, second)
+        self.assertEqual(tracker.tracks, {})
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: ActivityAnalyzer
+# ────────────────────────────────────────────────────────
+class TestActivityAnalyzer(unittest.TestCase):
+
+    def test_occluded_frame_does_not_wipe_stasis(self):
+        analyzer = ActivityAnalyzer()
+        for ts in range(0, 1500, 3):
+            occluded = ts == 1200
+            analyzer.push([_person(occluded=occluded)], timestamp=1000.0 + ts)
+        result = analyzer.analyze()
+        self.assertEqual(result["posture_status"], "static")
+        self.assertGreaterEqual(result["posture_duration_sec"], 1497.0)
+
+    def test_per_person_stasis_survives_reordering(self):
+        analyzer = ActivityAnalyzer()
+        still = lambda: _person(x=150)                               # noqa: E731
+        fidget = lambda ts: _person(x=600, arms_up=(ts // 3) % 2 == 1)  # noqa: E731
+        for ts in range(0, 900, 3):
+            persons = [still(), fidget(ts)]
+            if ts % 2:
+                persons.reverse()
+            analyzer.push(persons, timestamp=1000.0 + ts)
+        result = analyzer.analyze()
+        tracks = sorted(result["tracks"], key=lambda t: t["posture_duration_sec"])
+        self.assertEqual(len(tracks), 2)
+        self.assertLess(tracks[0]["posture_duration_sec"], 10.0)
+        self.assertGreaterEqual(tracks[1]["posture_duration_sec"], 890.0)
+        self.assertEqual(result["posture_status"], "mostly_static")
+
+    def test_buffer_depth_reports_raw_ring(self):
+        analyzer = ActivityAnalyzer(raw_capacity=16)
+        for ts in range(0, 300, 3):
+            analyzer.push([_person()], timestamp=1000.0 + ts)
+        depth = analyzer.analyze()["buffer_depth"]
+        self.assertEqual(depth, {"raw": 16, "capacity": 16})
+
+        analyzer = ActivityAnalyzer()
+        for ts in range(0, 300, 3):
+            analyzer.push([_person()], timestamp=1000.0 + ts)
+        # Only the last 60s are kept
+        self.assertEqual(analyzer.analyze()["buffer_depth"]["raw"], 21)
+
+    def test_activity_level_from_displacement(self):
+        analyzer = ActivityAnalyzer()
+        for ts in range(0, 30, 3):
+            analyzer.push([_person()], timestamp=1000.0 + ts)
+        self.assertEqual(analyzer.analyze()["activity_class"], "idle")
+
+        analyzer = ActivityAnalyzer()
+        for i, ts in enumerate(range(0, 30, 3)):
+            analyzer.push([_person(x=200 + (i % 2) * 25, arms_up=i % 2 == 1)], timestamp=1000.0 + ts)
+        self.assertIn(analyzer.analyze()["activity_class"], ("moderate", "high"))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Perception per-monitor cycle controls: FrameChangeGate
+thresholds on synthetic frames (identical, sensor noise, real change,
+drift) and AdaptiveInterval backoff/reset, standalone and through a
+monitor's run_once()/process_results().
+
+Usage:
+  python3 infra/scripts/test_change_gate.py
+"""
+import sys
+import os
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+from monitors.adaptive_interval import AdaptiveInterval  # noqa: E402
+from monitors.base import MonitorBase  # noqa: E402
+from monitors.change_gate import FrameChangeGate  # noqa: E402
+
+_H, _W = 480, 640
+
+
+def _scene(seed=0):
+    """Textured office-like VGA frame (gradients + a few blocks)."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:_H, 0:_W]
+    base = (60 + 80 * x / _W + 40 * y / _H).astype(np.float32)
+    frame = np.repeat(base[:, :, None], 3, axis=2)
+    for _ in range(12):
+        x0, y0 = rng.integers(0, _W - 80), rng.integers(0, _H - 60)
+        frame[y0:y0 + 60, x0:x0 + 80] = rng.integers(20, 230, size=3)
+    return frame.clip(0, 255).astype(np.uint8)
+
+
+def _noisy(frame, sigma, seed):
+    """Per-pixel sensor noise (JPEG/ISO), no scene change."""
+    rng = np.random.default_rng(seed)
+    noise = rng.normal(0.0, sigma, frame.shape)
+    return (frame.astype(np.float32) + noise).clip(0, 255).astype(np.uint8)
+
+
+def _with_person(frame, x=300, y=150, w=90, h=250):
+    """Dark person-sized block (~7% of the frame)."""
+    out = frame.copy()
+    out[y:y + h, x:x + w] = (30, 30, 40)
+    return out
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: FrameChangeGate
+# ────────────────────────────────────────────────────────
+class TestFrameChangeGate(unittest.TestCase):
+
+    def setUp(self):
+        self.scene = _scene()
+
+    def test_first_frame_always_analysed(self):
+        gate = FrameChangeGate()
+        self.assertFalse(gate.should_skip(self.scene))
+        self.assertEqual(gate.last_score, 1.0)
+
+    def test_identical_frame_skipped(self):
+        gate = FrameChangeGate()
+        gate.should_skip(self.scene)
+        self.assertTrue(gate.should_skip(self.scene.copy()))
+        self.assertEqual(gate.last_score, 0.0)
+
+    def test_sensor_noise_skipped(self):
+        gate = FrameChangeGate()
+        gate.should_skip(_noisy(self.scene, 4.0, seed=1))
+        for seed in range(2, 8):
+            self.assertTrue(gate.should_skip(_noisy(self.scene, 4.0, seed=seed)), f"seed {seed}")
+            self.assertLess(gate.last_score, gate.threshold)
+
+    def test_heavy_noise_still_below_threshold_after_downscale(self):
+        # INTER_AREA averages ~100 pixels per thumbnail pixel
+        gate = FrameChangeGate()
+        gate.should_skip(self.scene)
+        self.assertTrue(gate.should_skip(_noisy(self.scene, 12.0, seed=3)))
+
+    def test_person_entering_analysed(self):
+        gate = FrameChangeGate()
+        gate.should_skip(_noisy(self.scene, 4.0, seed=1))
+        changed = _noisy(_with_person(self.scene), 4.0, seed=2)
+        self.assertFalse(gate.should_skip(changed))
+        self.assertGreater(gate.last_score, 0.05)
+        # The changed frame is the new reference
+        self.assertTrue(gate.should_skip(_noisy(_with_person(self.scene), 4.0, seed=3)))
+
+    def test_small_object_below_threshold(self):
+        gate = FrameChangeGate(threshold=0.01)
+        gate.should_skip(self.scene)
+        # ~0.1% of the frame: a cup moved on a desk
+        self.assertTrue(gate.should_skip(_with_person(self.scene, w=16, h=16)))
+        self.assertLess(gate.last_score, 0.01)
+        # Same change passes a stricter gate
+        strict = FrameChangeGate(threshold=0.0001)
+        strict.should_skip(self.scene)
+        self.assertFalse(strict.should_skip(_with_person(self.scene, w=16, h=16)))
+
+    def test_threshold_boundary(self):
+        frame = np.full((_H, _W), 100, dtype=np.uint8)
+        changed = frame.copy()
+        changed[:, :_W // 4] = 200           # 25% of the thumbnail
+        below = FrameChangeGate(threshold=0.26)
+        below.should_skip(frame)
+        self.assertTrue(below.should_skip(changed))
+        self.assertAlmostEqual(below.last_score, 0.25)
+        at = FrameChangeGate(threshold=0.25)
+        at.should_skip(frame)
+        self.assertFalse(at.should_skip(changed))
+
+    def test_pixel_delta(self):
+        frame = np.full((_H, _W), 100, dtype=np.uint8)
+        gate = FrameChangeGate(pixel_delta=12)
+        gate.should_skip(frame)
+        self.assertTrue(gate.should_skip(frame + 12))    # not > delta
+        self.assertFalse(gate.should_skip(frame + 13))
+
+    def test_slow_drift_accumulates_against_reference(self):
+        """Lighting ramps +4/frame: each step is small, the total is not."""
+        gate = FrameChangeGate()
+        frame = np.full((_H, _W, 3), 100, dtype=np.uint8)
+        decisions = [gate.should_skip(frame + 4 * i) for i in range(6)]
+        # Reference stays at frame 0 until the drift exceeds pixel_delta
+        self.assertEqual(decisions, [False, True, True, True, False, True])
+
+    def test_force_refresh(self):
+        gate = FrameChangeGate(force_refresh_every=3)
+        decisions = [gate.should_skip(self.scene) for _ in range(9)]
+        self.assertEqual(decisions, [False, True, True, True, False, True, True, True, False])
+        self.assertEqual(gate.skipped_frames, 6)
+        self.assertAlmostEqual(gate.skip_ratio, 6 / 9)
+
+    def test_disabled_never_skips(self):
+        gate = FrameChangeGate(enabled=False)
+        self.assertFalse(any(gate.should_skip(self.scene) for _ in range(5)))
+        self.assertEqual(gate.skip_ratio, 0.0)
+
+    def test_reset_forces_analysis(self):
+        gate = FrameChangeGate()
+        gate.should_skip(self.scene)
+        gate.reset()
+        self.assertFalse(gate.should_skip(self.scene))
+
+    def test_grayscale_and_resolution_independent(self):
+        gate = FrameChangeGate()
+        gate.should_skip(self.scene)
+        gray_qvga = self.scene[::2, ::2, 0]
+        # Different resolution/channels compare on the same 64x48 thumbnail
+        gate.should_skip(gray_qvga)
+        self.assertLess(gate.last_score, 1.0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: AdaptiveInterval
+# ────────────────────────────────────────────────────────
+class TestAdaptiveInterval(unittest.TestCase):
+
+    def test_backoff_until_ceiling(self):
+        interval = AdaptiveInterval(base_sec=2.0, min_sec=1.0, max_sec=10.0, backoff=1.5)
+        seen = []
+        for _ in range(8):
+            interval.on_idle()
+            seen.append(round(interval.current_sec, 4))
+        self.assertEqual(seen, [3.0, 4.5, 6.75, 10.0, 10.0, 10.0, 10.0, 10.0])
+
+    def test_activity_resets_to_floor(self):
+        interval = AdaptiveInterval(base_sec=5.0, min_sec=1.0, max_sec=30.0, backoff=2.0)
+        for _ in range(10):
+            interval.on_idle()
+        self.assertEqual(interval.current_sec, 30.0)
+        interval.on_activity()
+        self.assertEqual(interval.current_sec, 1.0)
+        interval.on_idle()
+        self.assertEqual(interval.current_sec, 2.0)
+
+    def test_base_clamped(self):
+        self.assertEqual(AdaptiveInterval(base_sec=0.1, min_sec=1.0).current_sec, 1.0)
+        self.assertEqual(AdaptiveInterval(base_sec=99.0, max_sec=30.0).current_sec, 30.0)
+
+    def test_backoff_of_one_holds(self):
+        interval = AdaptiveInterval(base_sec=5.0, backoff=1.0)
+        interval.on_idle()
+        self.assertEqual(interval.current_sec, 5.0)
+
+    def test_invalid_config(self):
+        with self.assertRaises(ValueError):
+            AdaptiveInterval(base_sec=5.0, min_sec=0.0)
+        with self.assertRaises(ValueError):
+            AdaptiveInterval(base_sec=5.0, min_sec=10.0, max_sec=5.0)
+        with self.assertRaises(ValueError):
+            AdaptiveInterval(base_sec=5.0, backoff=0.9)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: monitor wiring
+# ────────────────────────────────────────────────────────
+class FrameMonitor(MonitorBase):
+    """Serves queued frames; reports activity when the detection count changes."""
+
+    supports_adaptive_interval = True
+
+    def __init__(self, frames):
+        super().__init__("frames", camera_id="cam", interval_sec=5.0, resolution="VGA")
+        self.frames = list(frames)
+        self.analyzed = 0
+        self._last_count = 0
+
+    async def request_image(self):
+        return self.frames.pop(0)
+
+    async def analyze(self, image):
+        self.analyzed += 1
+        return [1] * int(image.mean() < 100)   # "person" when dark
+
+    async def process_results(self, detections):
+        self.report_activity(len(detections) != self._last_count)
+        self._last_count = len(detections)
+
+
+class TestMonitorCycle(unittest.TestCase):
+
+    def test_gate_and_interval_over_cycles(self):
+        empty = np.full((_H, _W, 3), 150, dtype=np.uint8)
+        person = np.full((_H, _W, 3), 40, dtype=np.uint8)
+        monitor = FrameMonitor([empty, empty, empty, person, person, empty])
+        monitor.adaptive_interval = AdaptiveInterval(
+            base_sec=monitor.interval_sec, min_sec=1.0, max_sec=30.0, backoff=2.0
+        )
+
+        async def run():
+            return [await monitor.run_once() for _ in range(6)]
+
+        delays = asyncio.run(run())
+        # Analysed: first frame, the person entering and leaving
+        self.assertEqual(monitor.analyzed, 3)
+        # idle ×3 → 10, 20, 30 (cap); enter → 1; idle → 2; leave → 1
+        self.assertEqual(delays, [10.0, 20.0, 30.0, 1.0, 2.0, 1.0])
+
+    def test_fixed_interval_without_adaptive(self):
+        monitor = FrameMonitor([np.zeros((_H, _W, 3), dtype=np.uint8)])
+        monitor.report_activity(True)
+        self.assertEqual(asyncio.run(monitor.run_once()), 5.0)
+
+    def test_occupancy_reports_count_changes(self):
+        with patch("monitors.occupancy.InferencePool") as pool, \
+                patch("monitors.occupancy.StatePublisher") as publisher:
+            publisher.get_instance.return_value = MagicMock(publish=AsyncMock())
+            from monitors.occupancy import OccupancyMonitor
+            monitor = OccupancyMonitor("cam", "main")
+        monitor.adaptive_interval = AdaptiveInterval(base_sec=5.0, min_sec=1.0, max_sec=30.0)
+
+        async def run(counts):
+            for count in counts:
+                await monitor.process_results([{}] * count)
+                yield monitor.effective_interval_sec
+
+        async def collect(counts):
+            return [s async for s in run(counts)]
+
+        seen = asyncio.run(collect([0, 0, 2, 2, 1]))
+        self.assertEqual(seen, [7.5, 11.25, 1.0, 1.5, 1.0])
+        pool.get_instance.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
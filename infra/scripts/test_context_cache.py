@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-zone LLM context cache (WorldModel.get_llm_context):
+a zone's rendered section is reused while its values move less than
+CONTEXT_CHANGE_THRESHOLDS, re-rendered once they cross a threshold or an
+alert band, when a displayed event leaves the 10-minute window, and when a
+new event arrives.
+
+Usage:
+  python3 infra/scripts/test_context_cache.py
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from world_model import WorldModel  # noqa: E402
+from world_model.world_model import CONTEXT_CHANGE_THRESHOLDS  # noqa: E402
+
+NOW = 1_700_000_000.0
+OCCUPANCY_KEYS = ("avg_motion_level", "posture_duration_sec")
+
+
+def _wm():
+    wm = WorldModel()
+    with patch("time.time", return_value=NOW):
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+    return wm
+
+
+def _set(wm, key, value, zone_id="main"):
+    """Write a value straight into the zone record (bypasses sensor fusion)."""
+    record = wm._zones[zone_id]
+    target = record.occupancy if key in OCCUPANCY_KEYS else record.environment
+    setattr(target, key, value)
+    record.version += 1   # as update_from_mqtt does
+
+
+def _context(wm, at=NOW):
+    with patch("time.time", return_value=at):
+        return wm.get_llm_context()
+
+
+def _stats(wm):
+    stats = wm.context_cache_stats()
+    return stats["hits"], stats["misses"]
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: change thresholds
+# ────────────────────────────────────────────────────────
+class TestThresholds(unittest.TestCase):
+
+    def test_below_threshold_reuses_fragment(self):
+        wm = _wm()
+        first = _context(wm)
+        fragment = wm._zones["main"].context_fragment
+        _set(wm, "temperature", 22.04)
+        self.assertEqual(_context(wm), first)
+        self.assertIs(wm._zones["main"].context_fragment, fragment)
+        self.assertEqual(_stats(wm), (1, 1))
+
+    def test_at_threshold_rerenders(self):
+        wm = _wm()
+        _context(wm)
+        _set(wm, "temperature", 22.1)
+        self.assertIn("22.1℃", _context(wm))
+        self.assertEqual(_stats(wm), (0, 2))
+
+    def test_every_threshold_boundary(self):
+        bases = {"co2": 600, "posture_duration_sec": 120.0}
+        for key, threshold in CONTEXT_CHANGE_THRESHOLDS.items():
+            with self.subTest(key=key):
+                base = bases.get(key, 10.0 if key != "avg_motion_level" else 0.5)
+                wm = _wm()
+                _set(wm, key, base)
+                _context(wm)
+                _set(wm, key, base + threshold * 0.9)
+                _context(wm)
+                self.assertEqual(_stats(wm), (1, 1))
+                _set(wm, key, base + threshold * 1.01)
+                _context(wm)
+                self.assertEqual(_stats(wm), (1, 2))
+
+    def test_drift_measured_from_rendered_value(self):
+        """Small steps accumulate: the comparison is against the last render."""
+        wm = _wm()
+        _context(wm)
+        _set(wm, "temperature", 22.06)
+        _context(wm)
+        _set(wm, "temperature", 22.12)
+        self.assertIn("22.1℃", _context(wm))
+        self.assertEqual(_stats(wm), (1, 2))
+
+    def test_alert_band_crossing_under_threshold(self):
+        wm = _wm()
+        _set(wm, "temperature", 25.98)
+        self.assertNotIn("高温", _context(wm))
+        _set(wm, "temperature", 26.02)
+        self.assertIn("高温", _context(wm))
+
+        _set(wm, "co2", 1000)
+        _context(wm)
+        _set(wm, "co2", 1001)
+        self.assertIn("CO2高濃度", _context(wm))
+        self.assertEqual(_stats(wm), (0, 4))
+
+    def test_new_value_rerenders(self):
+        wm = _wm()
+        self.assertNotIn("湿度", _context(wm))
+        _set(wm, "humidity", 45.0)
+        self.assertIn("湿度: 45%", _context(wm))
+
+    def test_discrete_changes_rerender(self):
+        wm = _wm()
+        _context(wm)
+        with patch("time.time", return_value=NOW):
+            wm.update_from_mqtt("office/main/light/light_01/state", {"power_state": "on"})
+        self.assertIn("light (light_01): on", _context(wm))
+        with patch("time.time", return_value=NOW):
+            wm.update_from_mqtt("office/main/activity/cam_01/status", {"posture_status": "static"})
+        _context(wm)
+        self.assertEqual(_stats(wm), (0, 3))
+
+    def test_zones_cached_independently(self):
+        wm = _wm()
+        with patch("time.time", return_value=NOW):
+            wm.update_from_mqtt("office/kitchen/sensor/env_02/temperature", {"value": 24.0})
+        _context(wm)
+        _set(wm, "temperature", 25.0, zone_id="kitchen")
+        _context(wm)
+        self.assertEqual(_stats(wm), (1, 3))
+
+    def test_invalidate_forces_rerender(self):
+        wm = _wm()
+        _context(wm)
+        wm.invalidate_context_cache()
+        _context(wm)
+        self.assertEqual(_stats(wm), (0, 2))
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: events
+# ────────────────────────────────────────────────────────
+class TestEvents(unittest.TestCase):
+
+    def _report(self, wm, task_id, at):
+        with patch("time.time", return_value=at):
+            wm.update_from_mqtt(f"office/main/task_report/task_{task_id}",
+                                {"task_id": task_id, "title": f"タスク{task_id}",
+                                 "report_status": "resolved"})
+
+    def test_new_event_rerenders(self):
+        wm = _wm()
+        _context(wm)
+        self._report(wm, 1, NOW + 5)
+        context = _context(wm, NOW + 10)
+        self.assertIn("「タスク1」→ 対応済み", context)
+        self.assertEqual(_stats(wm), (0, 2))
+        _context(wm, NOW + 20)
+        self.assertEqual(_stats(wm), (1, 2))
+
+    def test_event_expiry_rerenders(self):
+        wm = _wm()
+        self._report(wm, 1, NOW)
+        self.assertIn("タスク1", _context(wm, NOW + 10))
+        self.assertEqual(wm._zones["main"].context_expires, NOW + 600)
+        self.assertIn("タスク1", _context(wm, NOW + 599))
+        self.assertEqual(_stats(wm), (1, 1))
+        context = _context(wm, NOW + 600)
+        self.assertNotIn("タスク1", context)
+        self.assertNotIn("最近のイベント", context)
+        self.assertEqual(_stats(wm), (1, 2))
+        self.assertEqual(wm._zones["main"].context_expires, float("inf"))
+
+    def test_expiry_follows_oldest_shown_event(self):
+        wm = _wm()
+        for i, offset in enumerate((0, 100, 200, 300)):
+            self._report(wm, i, NOW + offset)
+        _context(wm, NOW + 310)
+        # Only the last 3 are shown; the oldest of those decides expiry
+        self.assertEqual(wm._zones["main"].context_expires, NOW + 100 + 600)
+        context = _context(wm, NOW + 700)
+        self.assertNotIn("タスク1", context)
+        self.assertIn("タスク3", context)
+
+    def test_no_events_never_expires(self):
+        wm = _wm()
+        _context(wm)
+        _context(wm, NOW + 86400)
+        self.assertEqual(_stats(wm), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
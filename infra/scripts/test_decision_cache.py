@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain no-action decision cache (decision_cache.py) and
+the state fingerprint it is keyed on (WorldModel.state_fingerprint plus the
+event/task/action parts added by Brain.cognitive_cycle): quantization at
+FINGERPRINT_QUANTA boundaries, TTL expiry, and which changes make the next
+cycle call the LLM again.
+
+Usage:
+  python3 infra/scripts/test_decision_cache.py
+"""
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add brain src and shared modules to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
+sys.path.insert(0, BRAIN_SRC)
+sys.path.insert(0, SHARED_SRC)
+
+import decision_cache  # noqa: E402
+from decision_cache import NoActionCache, fingerprint  # noqa: E402
+from llm_client import LLMResponse  # noqa: E402
+from world_model import WorldModel  # noqa: E402
+from world_model.world_model import FINGERPRINT_QUANTA  # noqa: E402
+
+SENSOR = "office/main/sensor/env_01/{}"
+
+
+def _wm(**values):
+    wm = WorldModel()
+    for channel, value in values.items():
+        wm.update_from_mqtt(SENSOR.format(channel), {"value": value})
+    return wm
+
+
+def _fp(**values):
+    return _wm(**values).state_fingerprint()
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: NoActionCache
+# ────────────────────────────────────────────────────────
+class TestNoActionCache(unittest.TestCase):
+
+    def test_miss_then_hit(self):
+        cache = NoActionCache(ttl_sec=300)
+        self.assertFalse(cache.check("a", 1000.0))
+        cache.record("a", llm_sec=2.5, now=1000.0)
+        self.assertTrue(cache.check("a", 1100.0))
+        self.assertFalse(cache.check("b", 1100.0))
+        stats = cache.stats()
+        self.assertEqual((stats["checks"], stats["hits"], stats["entries"]), (3, 1, 1))
+        self.assertEqual(stats["llm_sec_saved"], 2.5)
+
+    def test_ttl_boundary_and_expiry(self):
+        cache = NoActionCache(ttl_sec=300)
+        cache.record("a", 1.0, now=1000.0)
+        self.assertTrue(cache.check("a", 1299.9))
+        self.assertFalse(cache.check("a", 1300.0))
+        # The expired verdict is gone, not just skipped
+        self.assertEqual(cache.stats()["entries"], 0)
+        self.assertFalse(cache.check("a", 1000.0))
+
+    def test_record_refreshes_verdict(self):
+        cache = NoActionCache(ttl_sec=300)
+        cache.record("a", 1.0, now=1000.0)
+        cache.record("a", 1.0, now=1250.0)
+        self.assertTrue(cache.check("a", 1500.0))
+
+    def test_disabled(self):
+        cache = NoActionCache(ttl_sec=0)
+        self.assertFalse(cache.enabled)
+        cache.record("a", 1.0, now=1000.0)
+        self.assertFalse(cache.check("a", 1000.0))
+        self.assertEqual(cache.stats()["checks"], 0)
+
+    def test_prune_drops_expired_then_oldest(self):
+        cache = NoActionCache(ttl_sec=300)
+        limit = decision_cache._MAX_ENTRIES
+        for i in range(limit):
+            cache.record(f"old{i}", 1.0, now=1000.0 + i * 0.001 if i < 10 else 1200.0 + i)
+        # At 1400 the first 10 are expired; the cache has room again
+        cache.record("new", 1.0, now=1400.0)
+        self.assertEqual(cache.stats()["entries"], limit - 10 + 1)
+        self.assertFalse(cache.check("old0", 1400.0))
+
+        full = NoActionCache(ttl_sec=10_000)
+        for i in range(limit):
+            full.record(f"k{i}", 1.0, now=float(i))
+        full.record("new", 1.0, now=float(limit))
+        # Nothing expired: the oldest quarter made room
+        self.assertEqual(full.stats()["entries"], limit - limit // 4 + 1)
+        self.assertFalse(full.check("k0", float(limit)))
+        self.assertTrue(full.check(f"k{limit // 4}", float(limit)))
+
+    def test_fingerprint_is_stable(self):
+        self.assertEqual(fingerprint((("main", (1, 2)),), (3,)), fingerprint((("main", (1, 2)),), (3,)))
+        self.assertNotEqual(fingerprint((1,), (2,)), fingerprint((1, 2)))
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: state fingerprint quantization
+# ────────────────────────────────────────────────────────
+class TestStateFingerprint(unittest.TestCase):
+
+    def test_same_bucket_same_fingerprint(self):
+        q = FINGERPRINT_QUANTA["temperature"]
+        self.assertEqual(_fp(temperature=22.0), _fp(temperature=22.0 + q * 0.98))
+
+    def test_bucket_boundaries(self):
+        for channel, low, base in (
+            ("temperature", 0.5, 22.0),
+            ("humidity", 2.0, 44.0),
+            ("co2", 50, 600),
+            ("illuminance", 50.0, 400.0),
+            ("sound_level", 3.0, 42.0),
+        ):
+            self.assertEqual(FINGERPRINT_QUANTA[channel], low)
+            below = _fp(**{channel: base + low - low / 100})
+            self.assertEqual(_fp(**{channel: base}), below, channel)
+            self.assertNotEqual(below, _fp(**{channel: base + low}), channel)
+
+    def test_noise_across_boundary_changes_fingerprint(self):
+        """Bucketing, not rounding: 22.49 and 22.51 straddle a boundary."""
+        self.assertNotEqual(_fp(temperature=22.49), _fp(temperature=22.51))
+
+    def test_alert_band_inside_one_bucket(self):
+        # 1000 and 1001 share the 50-ppm bucket but 1001 is over the CO2 band
+        self.assertEqual(1000 // 50, 1001 // 50)
+        self.assertNotEqual(_fp(co2=1000), _fp(co2=1001))
+        self.assertEqual(_fp(co2=1001), _fp(co2=1049))
+
+    def test_occupancy_and_devices_exact(self):
+        a = _wm(temperature=22.0)
+        b = _wm(temperature=22.0)
+        a.update_from_mqtt("office/main/camera/cam_01/status", {"person_count": 1})
+        b.update_from_mqtt("office/main/camera/cam_01/status", {"person_count": 2})
+        self.assertNotEqual(a.state_fingerprint(), b.state_fingerprint())
+
+    def test_events_not_included(self):
+        wm = _wm(temperature=22.0)
+        before = wm.state_fingerprint()
+        wm.update_from_mqtt("office/main/task_report/task_7", {"task_id": 7, "report_status": "done"})
+        self.assertEqual(before, wm.state_fingerprint())
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: cognitive cycle
+# ────────────────────────────────────────────────────────
+def _make_brain(world_model, turns=None, active_tasks=None):
+    """Brain whose LLM answers scripted turns (default: no action)."""
+    from main import Brain
+    from tool_executor import ToolExecutor
+
+    brain = Brain.__new__(Brain)
+    brain.task_queue = None
+    brain.world_model = world_model
+    brain.dashboard = MagicMock()
+    brain.dashboard.get_active_tasks = AsyncMock(return_value=active_tasks or [])
+    brain.rules = None
+    brain._action_history = []
+    brain._sent_sections = {}
+    brain._context_cycle = 0
+    brain.no_action_cache = NoActionCache(ttl_sec=300)
+    brain.prefill_stats = {"cycles": 0, "prompt_tokens": 0, "cached_tokens": 0, "diff_saved_tokens": 0}
+
+    executor = ToolExecutor(sanitizer=None, mcp_bridge=None, dashboard_client=None,
+                            world_model=None, task_queue=None)
+    executor._execute = AsyncMock(return_value={"success": True, "result": "ok"})
+    brain.tool_executor = executor
+
+    turns = list(turns or [])
+
+    async def chat(messages, tools, on_tool_call=None):
+        brain.llm_calls += 1
+        tool_calls = turns.pop(0) if turns else []
+        return LLMResponse(content="問題ありません。", tool_calls=tool_calls)
+
+    brain.llm_calls = 0
+    brain.llm = MagicMock()
+    brain.llm.chat = chat
+    brain.llm.router.backends = ["http://llm/v1"]
+    return brain
+
+
+def _cycle(brain, now=None):
+    if now is None:
+        asyncio.run(brain.cognitive_cycle())
+        return
+    with patch("time.time", return_value=now):
+        asyncio.run(brain.cognitive_cycle())
+
+
+class TestCycleCache(unittest.TestCase):
+
+    def test_hit_skips_llm(self):
+        brain = _make_brain(_wm(temperature=22.0, co2=600))
+        _cycle(brain)
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 1)
+        self.assertEqual(brain.no_action_cache.hits, 1)
+
+    def test_noise_within_bucket_still_hits(self):
+        wm = _wm(temperature=22.0, co2=600)
+        brain = _make_brain(wm)
+        _cycle(brain)
+        wm.update_from_mqtt(SENSOR.format("temperature"), {"value": 22.2})
+        wm.update_from_mqtt(SENSOR.format("co2"), {"value": 640})
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 1)
+
+    def test_bucket_change_calls_llm(self):
+        wm = _wm(temperature=22.0)
+        brain = _make_brain(wm)
+        _cycle(brain)
+        # Fused with the earlier reading: ~22.75, the next 0.5 bucket
+        wm.update_from_mqtt(SENSOR.format("temperature"), {"value": 23.5})
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+
+    def test_ttl_expiry_calls_llm(self):
+        brain = _make_brain(_wm(temperature=22.0))
+        now = time.time()
+        _cycle(brain, now)
+        _cycle(brain, now + 299)
+        self.assertEqual(brain.llm_calls, 1)
+        _cycle(brain, now + 300)
+        self.assertEqual(brain.llm_calls, 2)
+
+    def test_new_event_invalidates(self):
+        wm = _wm(temperature=22.0)
+        brain = _make_brain(wm)
+        _cycle(brain)
+        # An event with no state change: only its seq differs
+        wm.update_from_mqtt("office/main/task_report/task_7", {"task_id": 7, "report_status": "done"})
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+
+    def test_event_leaving_window_invalidates(self):
+        wm = _wm(temperature=22.0)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            wm.update_from_mqtt("office/main/task_report/task_7", {"task_id": 7, "report_status": "done"})
+        brain = _make_brain(wm)
+        _cycle(brain, now + 10)
+        _cycle(brain, now + 301)   # event older than the 5-minute window
+        self.assertEqual(brain.llm_calls, 2)
+
+    def test_task_change_invalidates(self):
+        brain = _make_brain(_wm(temperature=22.0))
+        _cycle(brain)
+        brain.dashboard.get_active_tasks.return_value = [{"id": 12, "title": "換気", "zone": "main"}]
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+        brain.dashboard.get_active_tasks.return_value = [{"id": 13, "title": "換気", "zone": "main"}]
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 3)
+        # Back to no tasks: the first verdict still applies
+        brain.dashboard.get_active_tasks.return_value = []
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 3)
+
+    def test_cycle_with_actions_not_cached(self):
+        turns = [[{"id": "c0", "function": {"name": "get_zone_status", "arguments": {"zone_id": "main"}}}], []]
+        brain = _make_brain(_wm(temperature=22.0), turns=turns)
+        _cycle(brain)
+        # Iteration 2 answered "no action", but the cycle acted
+        self.assertEqual(brain.llm_calls, 2)
+        self.assertEqual(brain.no_action_cache.stats()["entries"], 0)
+
+    def test_llm_error_not_cached(self):
+        brain = _make_brain(_wm(temperature=22.0))
+
+        async def failing(messages, tools, on_tool_call=None):
+            brain.llm_calls += 1
+            return LLMResponse(error="Request timed out")
+
+        brain.llm.chat = failing
+        _cycle(brain)
+        _cycle(brain)
+        self.assertEqual(brain.llm_calls, 2)
+        self.assertEqual(brain.no_action_cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
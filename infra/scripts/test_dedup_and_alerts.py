@@ -20,9 +20,11 @@ import json
 import unittest
 from unittest.mock import AsyncMock, MagicMock, patch
 
-# Add brain src to path for imports
+# Add brain src and shared modules to path for imports
 BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
 sys.path.insert(0, BRAIN_SRC)
+sys.path.insert(0, SHARED_SRC)
 
 
 # ────────────────────────────────────────────────────────
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain per-zone event log (world_model/event_log.py):
+time-range queries, the per-type last-fired index used for cooldowns, and
+spilling evicted events to a rotated JSON Lines file off the event loop.
+
+Usage:
+  python3 infra/scripts/test_event_log.py
+"""
+import sys
+import os
+import asyncio
+import json
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from world_model import Event, WorldModel  # noqa: E402
+from world_model.event_log import EventLog, EventSpill  # noqa: E402
+
+
+def _event(event_type, ts, **data):
+    return Event(timestamp=ts, event_type=event_type, severity="info", data=data)
+
+
+def _read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class _TmpDirCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, "events.jsonl")
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: deque and last-fired index
+# ────────────────────────────────────────────────────────
+class TestLastFired(unittest.TestCase):
+
+    def test_never_fired(self):
+        log = EventLog("main")
+        self.assertIsNone(log.last_fired("co2_threshold_exceeded"))
+        self.assertFalse(log.fired_within("co2_threshold_exceeded", 600, 1000.0))
+
+    def test_tracks_newest_per_type(self):
+        log = EventLog("main")
+        log.append(_event("person_entered", 100.0))
+        log.append(_event("co2_threshold_exceeded", 110.0))
+        log.append(_event("person_entered", 120.0))
+        self.assertEqual(log.last_fired("person_entered"), 120.0)
+        self.assertEqual(log.last_fired("co2_threshold_exceeded"), 110.0)
+
+    def test_window_is_exclusive(self):
+        log = EventLog("main")
+        log.append(_event("sensor_tamper", 1000.0))
+        self.assertTrue(log.fired_within("sensor_tamper", 300, 1299.9))
+        self.assertFalse(log.fired_within("sensor_tamper", 300, 1300.0))
+
+    def test_survives_eviction(self):
+        log = EventLog("main", capacity=3)
+        log.append(_event("sedentary_alert", 100.0))
+        for i in range(10):
+            log.append(_event("person_entered", 200.0 + i))
+        self.assertEqual(len(log), 3)
+        self.assertNotIn("sedentary_alert", [e.event_type for e in log])
+        self.assertEqual(log.last_fired("sedentary_alert"), 100.0)
+        self.assertTrue(log.fired_within("sedentary_alert", 3600, 300.0))
+        self.assertEqual(log.total, 11)
+
+    def test_since_walks_back_from_newest(self):
+        log = EventLog("main")
+        for ts in (100.0, 200.0, 300.0, 400.0):
+            log.append(_event("person_entered", ts))
+        self.assertEqual([e.timestamp for e in log.since(200.0)], [300.0, 400.0])
+        self.assertEqual(log.since(400.0), [])
+        self.assertEqual(len(log.since(0.0)), 4)
+
+    def test_co2_cooldown_holds_after_eviction(self):
+        """WorldModel dedups CO2 alerts via the index, not the deque."""
+        wm = WorldModel(event_capacity=2)
+        now = time.time()
+        with patch("time.time", return_value=now):
+            wm.update_from_mqtt("office/main/sensor/env_01/co2", {"value": 1300})
+        # Push the alert out of the deque
+        for i in range(5):
+            with patch("time.time", return_value=now + 10 + i):
+                wm.update_from_mqtt("office/main/occupancy", {"person_count": i % 2 + 1})
+        events = wm._zones["main"].events
+        self.assertNotIn("co2_threshold_exceeded", [e.event_type for e in events])
+
+        with patch("time.time", return_value=now + 300):
+            wm.update_from_mqtt("office/main/sensor/env_01/co2", {"value": 1400})
+        self.assertEqual(events.last_fired("co2_threshold_exceeded"), now)
+
+        with patch("time.time", return_value=now + 601):
+            wm.update_from_mqtt("office/main/sensor/env_01/co2", {"value": 1400})
+        self.assertEqual(events.last_fired("co2_threshold_exceeded"), now + 601)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: spill
+# ────────────────────────────────────────────────────────
+class TestSpill(_TmpDirCase):
+
+    def test_evicted_events_spilled_in_order(self):
+        spill = EventSpill(self.path)
+        log = EventLog("kitchen", capacity=2, spill=spill)
+        for i in range(5):
+            log.append(_event("person_entered", 100.0 + i, count=i))
+        spill.close()
+        records = _read_jsonl(self.path)
+        self.assertEqual([r["timestamp"] for r in records], [100.0, 101.0, 102.0])
+        self.assertEqual(records[0]["zone"], "kitchen")
+        self.assertEqual(records[2]["data"], {"count": 2})
+        self.assertEqual(spill.written, 3)
+
+    def test_no_spill_without_path(self):
+        log = EventLog("main", capacity=1)
+        for i in range(3):
+            log.append(_event("person_entered", float(i)))
+        self.assertEqual(len(log), 1)
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_append_does_no_file_io_on_caller(self):
+        spill = EventSpill(self.path)
+        log = EventLog("main", capacity=1, spill=spill)
+        caller = threading.get_ident()
+        writers = set()
+        real_open = open
+
+        def tracking_open(*args, **kwargs):
+            writers.add(threading.get_ident())
+            return real_open(*args, **kwargs)
+
+        with patch("builtins.open", tracking_open):
+            for i in range(50):
+                log.append(_event("person_entered", float(i)))
+            spill.flush()
+        spill.close()
+
+        self.assertEqual(len(writers), 1)
+        self.assertNotIn(caller, writers)
+        # One handle for the whole run, not one open() per event
+        self.assertEqual(len(_read_jsonl(self.path)), 49)
+
+    def test_append_does_not_block_loop(self):
+        spill = EventSpill(self.path)
+        log = EventLog("main", capacity=1, spill=spill)
+        gate = threading.Event()
+        real_open = open
+
+        def slow_open(*args, **kwargs):
+            gate.wait(2.0)   # disk stalled
+            return real_open(*args, **kwargs)
+
+        async def run():
+            start = time.monotonic()
+            for i in range(20):
+                log.append(_event("person_entered", float(i)))
+                await asyncio.sleep(0)
+            return time.monotonic() - start
+
+        with patch("builtins.open", slow_open):
+            elapsed = asyncio.run(run())
+            gate.set()
+            spill.close()
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(len(_read_jsonl(self.path)), 19)
+
+    def test_zones_share_one_writer(self):
+        wm = WorldModel(event_capacity=1, event_spill_path=self.path)
+        for zone in ("main", "kitchen"):
+            for count in (1, 2, 1):
+                wm.update_from_mqtt(f"office/{zone}/occupancy", {"person_count": count})
+        self.assertIs(wm._zones["main"].events.spill, wm._zones["kitchen"].events.spill)
+        wm.close()
+        zones = [r["zone"] for r in _read_jsonl(self.path)]
+        self.assertEqual(sorted(set(zones)), ["kitchen", "main"])
+
+    def test_write_error_drops_batch_and_recovers(self):
+        spill = EventSpill(os.path.join(self.tmp, "missing", "events.jsonl"))
+        spill.write({"n": 1})
+        spill.flush()
+        self.assertEqual(spill.written, 0)
+        os.mkdir(os.path.join(self.tmp, "missing"))
+        spill.write({"n": 2})
+        spill.close()
+        self.assertEqual(_read_jsonl(spill.path), [{"n": 2}])
+
+    def test_close_is_idempotent(self):
+        spill = EventSpill(self.path)
+        spill.close()
+        spill.write({"n": 1})
+        spill.close()
+        spill.close()
+        self.assertEqual(_read_jsonl(self.path), [{"n": 1}])
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: rotation
+# ────────────────────────────────────────────────────────
+class TestRotation(_TmpDirCase):
+
+    def _write(self, spill, n, start=0):
+        for i in range(start, start + n):
+            spill.write({"n": i, "pad": "x" * 80})
+            spill.flush()   # one record per batch: rotation point is deterministic
+
+    def test_rotates_past_max_bytes(self):
+        spill = EventSpill(self.path, max_bytes=1000)
+        self._write(spill, 25)
+        spill.close()
+
+        backup = _read_jsonl(self.path + ".1")
+        current = _read_jsonl(self.path)
+        self.assertGreaterEqual(spill.rotations, 2)
+        self.assertGreaterEqual(os.path.getsize(self.path + ".1"), 1000)
+        self.assertLess(os.path.getsize(self.path), 1000 + 100)
+        # Newest records kept, contiguous across the rotation boundary
+        numbers = [r["n"] for r in backup + current]
+        self.assertEqual(numbers, list(range(numbers[0], 25)))
+
+    def test_no_rotation_when_unlimited(self):
+        spill = EventSpill(self.path)
+        self._write(spill, 25)
+        spill.close()
+        self.assertEqual(spill.rotations, 0)
+        self.assertFalse(os.path.exists(self.path + ".1"))
+        self.assertEqual(len(_read_jsonl(self.path)), 25)
+
+    def test_appends_to_existing_file(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"n": -1}) + "\n")
+        spill = EventSpill(self.path, max_bytes=10_000)
+        self._write(spill, 2)
+        spill.close()
+        self.assertEqual([r["n"] for r in _read_jsonl(self.path)], [-1, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Unit tests for event-driven cycle triggering: WorldModel stamps each new
+event with the next Event.seq and delivers it to subscribers, and
+Brain._watch_events turns that into a cognitive-cycle trigger.  MQTT
+updates that only change state (no event) must neither advance the seq nor
+trigger a cycle.
+
+Usage:
+  python3 infra/scripts/test_event_trigger.py
+"""
+import sys
+import os
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+# Add brain src and shared modules to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
+sys.path.insert(0, BRAIN_SRC)
+sys.path.insert(0, SHARED_SRC)
+
+from ingest_queue import IngestQueue  # noqa: E402
+from world_model import WorldModel  # noqa: E402
+
+TEMPERATURE = "office/main/sensor/env_01/temperature"
+CAMERA = "office/main/camera/cam_01/status"
+
+
+def _make_brain(world_model, rules=None):
+    from main import Brain
+
+    brain = Brain.__new__(Brain)
+    brain.world_model = world_model
+    brain.rules = rules
+    brain._rule_tasks = set()
+    brain._action_history = []
+    brain._cycle_triggered = asyncio.Event()
+    return brain
+
+
+async def _settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: Event.seq and subscriptions
+# ────────────────────────────────────────────────────────
+class TestEventSeq(unittest.TestCase):
+
+    def test_seq_monotonic_across_zones(self):
+        wm = WorldModel()
+        wm.update_from_mqtt(CAMERA, {"person_count": 1})
+        wm.update_from_mqtt("office/kitchen/task_report/task_1", {"task_id": 1})
+        wm.update_from_mqtt(CAMERA, {"person_count": 0})
+        seqs = [e.seq for _, e in sorted(wm.recent_events(60), key=lambda ze: ze[1].seq)]
+        self.assertEqual(seqs, [1, 2, 3])
+        self.assertEqual(wm.event_seq, 3)
+
+    def test_state_only_update_keeps_seq(self):
+        wm = WorldModel()
+        wm.update_from_mqtt(TEMPERATURE, {"value": 22.0})
+        wm.update_from_mqtt(TEMPERATURE, {"value": 22.3})
+        wm.update_from_mqtt("office/main/hvac/ac_01/state", {"power_state": "on"})
+        self.assertEqual(wm.event_seq, 0)
+
+    def test_subscriber_receives_new_events_only(self):
+        async def run():
+            wm = WorldModel()
+            wm.update_from_mqtt(CAMERA, {"person_count": 1})
+            sub = wm.subscribe()
+            wm.update_from_mqtt(TEMPERATURE, {"value": 22.0})
+            wm.update_from_mqtt(CAMERA, {"person_count": 2})
+            seq, zone_id, event = await asyncio.wait_for(sub.__anext__(), 1)
+            self.assertEqual((seq, zone_id, event.event_type), (2, "main", "person_entered"))
+            self.assertEqual(event.seq, seq)
+            self.assertTrue(sub._queue.empty())
+            sub.close()
+        asyncio.run(run())
+
+    def test_slow_subscriber_drops_oldest(self):
+        async def run():
+            wm = WorldModel()
+            sub = wm.subscribe(maxsize=2)
+            for i in range(1, 5):
+                wm.update_from_mqtt(f"office/main/task_report/task_{i}", {"task_id": i})
+            self.assertEqual(sub.dropped, 2)
+            sub.close()
+            self.assertEqual([seq async for seq, _, _ in sub], [3, 4])
+            self.assertEqual(wm._subscribers, [])
+        asyncio.run(run())
+
+    def test_close_wakes_blocked_consumer(self):
+        async def run():
+            wm = WorldModel()
+            sub = wm.subscribe()
+            consumer = asyncio.create_task(sub.__anext__())
+            await _settle()
+            sub.close()
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(consumer, 1)
+        asyncio.run(run())
+
+    def test_seq_advances_when_zone_log_full(self):
+        wm = WorldModel(event_capacity=2)
+        for i in range(5):
+            wm.update_from_mqtt(f"office/main/task_report/task_{i}", {"task_id": i})
+        events = wm.recent_events_for("main", 60)
+        self.assertEqual(len(events), 2)
+        self.assertEqual([e.seq for e in events], [4, 5])
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: Brain cycle trigger
+# ────────────────────────────────────────────────────────
+class TestCycleTrigger(unittest.TestCase):
+
+    def _run(self, brain, body):
+        async def run():
+            watcher = asyncio.create_task(brain._watch_events())
+            await _settle()
+            try:
+                await body()
+            finally:
+                watcher.cancel()
+        asyncio.run(run())
+
+    def test_event_triggers_cycle(self):
+        brain = _make_brain(WorldModel())
+
+        async def body():
+            brain._process_mqtt_message(CAMERA, {"person_count": 1})
+            await _settle()
+            self.assertEqual(brain.world_model.event_seq, 1)
+            self.assertTrue(brain._cycle_triggered.is_set())
+
+        self._run(brain, body)
+
+    def test_state_only_update_does_not_trigger(self):
+        brain = _make_brain(WorldModel())
+
+        async def body():
+            brain._process_mqtt_message(TEMPERATURE, {"value": 22.0})
+            brain._process_mqtt_message(TEMPERATURE, {"value": 22.4})
+            brain._process_mqtt_message("office/main/light/light_01/state", {"power_state": "on"})
+            await _settle()
+            self.assertEqual(brain.world_model.event_seq, 0)
+            self.assertFalse(brain._cycle_triggered.is_set())
+
+        self._run(brain, body)
+
+    def test_triggers_through_ingest_queue(self):
+        brain = _make_brain(WorldModel())
+        queue = IngestQueue()
+
+        async def body():
+            queue.put(TEMPERATURE, json.dumps({"value": 22.0}).encode())
+            queue._drain_batch(brain._process_mqtt_message)
+            await _settle()
+            self.assertFalse(brain._cycle_triggered.is_set())
+            queue.put("office/main/task_report/task_9", json.dumps({"task_id": 9}).encode())
+            queue._drain_batch(brain._process_mqtt_message)
+            await _settle()
+            self.assertTrue(brain._cycle_triggered.is_set())
+
+        self._run(brain, body)
+
+    def test_trigger_when_zone_log_full(self):
+        brain = _make_brain(WorldModel(event_capacity=1))
+
+        async def body():
+            brain._process_mqtt_message("office/main/task_report/task_1", {"task_id": 1})
+            await _settle()
+            brain._cycle_triggered.clear()
+            # Log stays at capacity 1; the new event must still trigger
+            brain._process_mqtt_message("office/main/task_report/task_2", {"task_id": 2})
+            await _settle()
+            self.assertTrue(brain._cycle_triggered.is_set())
+
+        self._run(brain, body)
+
+    def test_rule_handled_event_skips_cycle(self):
+        rules = MagicMock()
+        rules.handles.side_effect = lambda event_type: event_type == "task_report"
+        rules.handle = AsyncMock(return_value=[])
+        brain = _make_brain(WorldModel(), rules=rules)
+
+        async def body():
+            brain._process_mqtt_message("office/main/task_report/task_1", {"task_id": 1})
+            await _settle()
+            rules.handle.assert_awaited_once()
+            self.assertFalse(brain._cycle_triggered.is_set())
+            brain._process_mqtt_message(CAMERA, {"person_count": 1})
+            await _settle()
+            self.assertTrue(brain._cycle_triggered.is_set())
+
+        self._run(brain, body)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Perception binary frame format (frame_codec.py): SOMF
+header round-trip, malformed payloads (bad magic, truncated, header_len
+mismatch), the JPEG decode in ImageRequester (including reduced decode for
+JSON responses without a width), and the header the camera simulator
+(edge/test-edge/camera-node/simulator.py) packs.
+
+Usage:
+  python3 infra/scripts/test_frame_codec.py
+"""
+import sys
+import os
+import ast
+import asyncio
+import base64
+import json
+import struct
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+import frame_codec  # noqa: E402
+from frame_codec import FRAME_MAGIC, FRAME_VERSION, HEADER_SIZE, decode_header, encode_frame  # noqa: E402
+from image_requester import ImageRequester  # noqa: E402
+
+SIMULATOR = os.path.join(
+    os.path.dirname(__file__), "../../edge/test-edge/camera-node/simulator.py"
+)
+
+
+def _jpeg(width=64, height=48):
+    image = np.zeros((height, width, 3), dtype=np.uint8)
+    image[:, : width // 2] = (0, 0, 255)
+    ok, buf = cv2.imencode(".jpg", image)
+    assert ok
+    return buf.tobytes()
+
+
+def _header(magic=FRAME_MAGIC, version=FRAME_VERSION, flags=0,
+            header_len=HEADER_SIZE, width=64, height=48):
+    return struct.pack(">4sBBHHH", magic, version, flags, header_len, width, height)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: round-trip
+# ────────────────────────────────────────────────────────
+class TestRoundTrip(unittest.TestCase):
+
+    def test_header_is_twelve_bytes(self):
+        self.assertEqual(HEADER_SIZE, 12)
+
+    def test_encode_decode(self):
+        jpeg = _jpeg()
+        frame = encode_frame(jpeg, 64, 48)
+        self.assertEqual(frame[:4], b"SOMF")
+        self.assertEqual(len(frame), HEADER_SIZE + len(jpeg))
+        width, height, offset = decode_header(frame)
+        self.assertEqual((width, height, offset), (64, 48, HEADER_SIZE))
+        self.assertEqual(frame[offset:], jpeg)
+
+    def test_big_endian_dimensions(self):
+        frame = encode_frame(_jpeg(), 1600, 1200)
+        self.assertEqual(frame[8:12], b"\x06\x40\x04\xb0")
+        self.assertEqual(decode_header(frame)[:2], (1600, 1200))
+
+    def test_longer_header_from_later_version_skipped(self):
+        """header_len covers fields appended after the 12-byte header."""
+        jpeg = _jpeg()
+        frame = _header(header_len=HEADER_SIZE + 4) + b"\x00\x01\x02\x03" + jpeg
+        _, _, offset = decode_header(frame)
+        self.assertEqual(frame[offset:], jpeg)
+
+    def test_flags_ignored(self):
+        frame = _header(flags=0x80) + _jpeg()
+        self.assertEqual(decode_header(frame), (64, 48, HEADER_SIZE))
+
+    def test_decodes_to_image(self):
+        frame = encode_frame(_jpeg(64, 48), 64, 48)
+        image = ImageRequester._decode_sync("frame", frame, None)
+        self.assertEqual(image.shape, (48, 64, 3))
+        # Left half red (BGR), right half black
+        self.assertGreater(image[24, 8, 2], 200)
+        self.assertLess(image[24, 56].max(), 30)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: malformed input
+# ────────────────────────────────────────────────────────
+class TestMalformed(unittest.TestCase):
+
+    def assertRejected(self, payload, message):
+        with self.assertRaisesRegex(ValueError, message):
+            decode_header(payload)
+
+    def test_bad_magic(self):
+        self.assertRejected(_header(magic=b"SOMG") + _jpeg(), "Bad frame magic")
+        # A legacy JSON response on the wrong topic
+        self.assertRejected(b'{"id": "req-1", "image": "/9j/4AAQ"}', "Bad frame magic")
+
+    def test_unsupported_version(self):
+        self.assertRejected(_header(version=2) + _jpeg(), "Unsupported frame version")
+
+    def test_truncated_header(self):
+        frame = encode_frame(_jpeg(), 64, 48)
+        for size in (0, 1, 4, HEADER_SIZE - 1):
+            self.assertRejected(frame[:size], "too short")
+
+    def test_truncated_payload(self):
+        self.assertRejected(_header(), "no JPEG payload")
+        self.assertRejected(_header(header_len=HEADER_SIZE + 4) + b"\x00" * 4, "no JPEG payload")
+
+    def test_header_len_shorter_than_header(self):
+        self.assertRejected(_header(header_len=HEADER_SIZE - 1) + _jpeg(), "header length")
+        self.assertRejected(_header(header_len=0) + _jpeg(), "header length")
+
+    def test_header_len_past_end(self):
+        jpeg = _jpeg()
+        self.assertRejected(
+            _header(header_len=HEADER_SIZE + len(jpeg) + 1) + jpeg, "header length"
+        )
+
+    def test_header_len_mismatch(self):
+        """header_len that does not land on the JPEG start."""
+        jpeg = _jpeg()
+        self.assertRejected(_header(header_len=HEADER_SIZE + 2) + jpeg, "No JPEG at frame offset 14")
+        self.assertRejected(
+            _header(header_len=HEADER_SIZE) + b"\x00\x00" + jpeg, "No JPEG at frame offset 12"
+        )
+
+    def test_requester_surfaces_codec_error(self):
+        with self.assertRaisesRegex(ValueError, "Bad frame magic"):
+            ImageRequester._decode_sync("frame", b"JUNK" + encode_frame(_jpeg(), 64, 48)[4:], None)
+
+    def test_corrupt_jpeg_fails_decode(self):
+        jpeg = _jpeg()
+        frame = encode_frame(jpeg[:2] + b"\x00" * (len(jpeg) - 2), 64, 48)
+        decode_header(frame)   # the header itself is fine
+        with self.assertRaisesRegex(ValueError, "Image decode failed"):
+            ImageRequester._decode_sync("frame", frame, None)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: simulator compatibility
+# ────────────────────────────────────────────────────────
+class TestSimulatorHeader(unittest.TestCase):
+    """The simulator keeps its own copy of the constants (separate image)."""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(SIMULATOR, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+        cls.constants = {}
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1:
+                name = getattr(node.targets[0], "id", None)
+                if name in ("FRAME_MAGIC", "FRAME_VERSION"):
+                    cls.constants[name] = ast.literal_eval(node.value)
+                elif name == "FRAME_HEADER":
+                    cls.constants[name] = ast.literal_eval(node.value.args[0])
+
+    def test_constants_match_codec(self):
+        self.assertEqual(self.constants["FRAME_MAGIC"], FRAME_MAGIC)
+        self.assertEqual(self.constants["FRAME_VERSION"], FRAME_VERSION)
+        self.assertEqual(self.constants["FRAME_HEADER"], frame_codec._HEADER.format)
+
+    def test_simulator_frame_decodes(self):
+        """Same pack call as CameraNodeSimulator.send_binary_response."""
+        header = struct.Struct(self.constants["FRAME_HEADER"])
+        jpeg = _jpeg(64, 48)
+        frame = header.pack(
+            self.constants["FRAME_MAGIC"], self.constants["FRAME_VERSION"], 0, header.size, 64, 48
+        ) + jpeg
+        self.assertEqual(frame, encode_frame(jpeg, 64, 48))
+        self.assertEqual(ImageRequester._decode_sync("frame", frame, None).shape, (48, 64, 3))
+
+
+# ────────────────────────────────────────────────────────
+# Test 4: reduced decode
+# ────────────────────────────────────────────────────────
+def _json_response(jpeg, width=None):
+    response = {"id": "req-1", "image": base64.b64encode(jpeg).decode()}
+    if width is not None:
+        response["width"] = width
+    return json.dumps(response).encode()
+
+
+class TestReducedDecode(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.vga = _jpeg(640, 480)
+
+    def test_binary_uses_header_width(self):
+        frame = encode_frame(self.vga, 640, 480)
+        self.assertEqual(ImageRequester._decode_sync("frame", frame, 160).shape, (120, 160, 3))
+
+    def test_json_uses_response_width(self):
+        image = ImageRequester._decode_sync("json", _json_response(self.vga, 640), 160)
+        self.assertEqual(image.shape, (120, 160, 3))
+
+    def test_json_without_width_uses_requested_width(self):
+        payload = _json_response(self.vga)
+        self.assertEqual(ImageRequester._decode_sync("json", payload, 160, 640).shape, (120, 160, 3))
+        self.assertEqual(ImageRequester._decode_sync("json", payload, 320, 640).shape, (240, 320, 3))
+        # Neither known: full decode
+        self.assertEqual(ImageRequester._decode_sync("json", payload, 160).shape, (480, 640, 3))
+
+    def test_no_target_width_decodes_full(self):
+        payload = _json_response(self.vga, 640)
+        self.assertEqual(ImageRequester._decode_sync("json", payload, None, 640).shape, (480, 640, 3))
+
+    def test_requested_resolution_reaches_decoder(self):
+        requester = ImageRequester.__new__(ImageRequester)
+        requester.binary = False
+        requester.pending_requests = {}
+        requester._decode_widths = {}
+        requester._decoder = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(requester._decoder.shutdown)
+        requester.client = type("Client", (), {})()
+
+        async def publish(topic, request):
+            requester._dispatch_response(
+                f"mcp/cam_01/response/{request['id']}", _json_response(self.vga)
+            )
+            return True
+
+        requester.client.publish = publish
+        image = asyncio.run(requester.request("cam_01", resolution="VGA", target_width=160))
+        self.assertEqual(image.shape, (120, 160, 3))
+        self.assertEqual(requester._decode_widths, {})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Perception stream sources (image_sources/frame_grabber.py):
+FrameGrabber decode modes and reconnect backoff, GrabberSource capture and
+the decode option plumbed through ImageSourceFactory.  cv2.VideoCapture is
+replaced by a fake stream (no cameras needed).
+
+Usage:
+  python3 infra/scripts/test_frame_grabber.py
+"""
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+from image_sources import (  # noqa: E402
+    CameraInfo, FrameGrabber, GrabberSource, HttpStreamSource, ImageSourceFactory,
+    MqttImageSource, RtspSource,
+)
+from image_sources import frame_grabber  # noqa: E402
+
+
+class FakeCapture:
+    """cv2.VideoCapture stand-in: frame N is filled with N; counts decodes."""
+
+    opened = True      # class-level switches shared by all instances
+    fail_after = None  # grab() fails after this many frames
+    opens = 0
+
+    def __init__(self, address):
+        type(self).opens += 1
+        self.grabbed = 0
+        self.retrieved = 0
+        self.released = False
+
+    def isOpened(self):
+        return type(self).opened
+
+    def grab(self):
+        time.sleep(0.002)  # ~500 fps
+        if self.fail_after is not None and self.grabbed >= self.fail_after:
+            return False
+        self.grabbed += 1
+        return True
+
+    def retrieve(self):
+        self.retrieved += 1
+        return True, np.full((4, 4, 3), self.grabbed % 256, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class _FakeStreamCase(unittest.TestCase):
+
+    def setUp(self):
+        FakeCapture.opened = True
+        FakeCapture.fail_after = None
+        FakeCapture.opens = 0
+        self.captures = []
+
+        def make(address):
+            cap = FakeCapture(address)
+            self.captures.append(cap)
+            return cap
+
+        patcher = patch.object(frame_grabber.cv2, "VideoCapture", side_effect=make)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: FrameGrabber
+# ────────────────────────────────────────────────────────
+class TestFrameGrabber(_FakeStreamCase):
+
+    def test_rejects_unknown_decode_mode(self):
+        with self.assertRaises(ValueError):
+            FrameGrabber("rtsp://x", "x", decode="every")
+
+    def test_latest_keeps_newest_frame(self):
+        grabber = FrameGrabber("rtsp://x", "x")
+        grabber.start()
+        try:
+            first, age = grabber.latest(wait_sec=1.0)
+            self.assertIsNotNone(first)
+            self.assertLess(age, 1.0)
+            time.sleep(0.05)
+            second, _ = grabber.latest()
+            self.assertNotEqual(int(first[0, 0, 0]), int(second[0, 0, 0]))
+        finally:
+            grabber.stop()
+        cap = self.captures[0]
+        self.assertEqual(cap.retrieved, cap.grabbed)
+        self.assertTrue(cap.released)
+
+    def test_on_demand_decodes_only_when_asked(self):
+        grabber = FrameGrabber("rtsp://x", "x", decode="on_demand")
+        grabber.start()
+        try:
+            time.sleep(0.1)
+            cap = self.captures[0]
+            self.assertGreater(cap.grabbed, 10)
+            self.assertEqual(cap.retrieved, 0)
+            frame, _ = grabber.latest(wait_sec=1.0)
+            self.assertIsNotNone(frame)
+            time.sleep(0.05)
+            self.assertEqual(cap.retrieved, 1)
+        finally:
+            grabber.stop()
+
+    def test_no_frame_returns_none(self):
+        FakeCapture.opened = False
+        grabber = FrameGrabber("rtsp://x", "x")
+        self.assertEqual(grabber.latest(), (None, float("inf")))
+
+    def test_open_failure_backs_off(self):
+        FakeCapture.opened = False
+        waits = []
+        grabber = FrameGrabber("rtsp://x", "x")
+
+        def wait(timeout):
+            waits.append(timeout)
+            if len(waits) >= 7:
+                grabber._stop.set()
+            return grabber._stop.is_set()
+
+        grabber._stop.wait = wait
+        grabber._run()
+        self.assertEqual(waits, [1.0, 2.0, 4.0, 8.0, 16.0, 30.0, 30.0])
+        self.assertTrue(all(cap.released for cap in self.captures))
+
+    def test_read_failure_reconnects_and_backoff_resets(self):
+        FakeCapture.fail_after = 3
+        grabber = FrameGrabber("rtsp://x", "x")
+        grabber._backoff = 16.0
+        waits = []
+
+        def wait(timeout):
+            waits.append(timeout)
+            if len(waits) >= 2:
+                grabber._stop.set()
+            return grabber._stop.is_set()
+
+        grabber._stop.wait = wait
+        grabber._run()
+        # A good frame resets the backoff before each read failure
+        self.assertEqual(waits, [1.0, 1.0])
+        self.assertEqual(FakeCapture.opens, 2)
+        self.assertTrue(all(cap.released for cap in self.captures))
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: GrabberSource capture
+# ────────────────────────────────────────────────────────
+class TestGrabberSource(_FakeStreamCase):
+
+    def _camera(self, protocol="rtsp"):
+        return CameraInfo(camera_id="cam_1", protocol=protocol, address="rtsp://x")
+
+    def test_capture_waits_for_first_frame(self):
+        for decode in ("latest", "on_demand"):
+            source = RtspSource(self._camera(), decode=decode)
+
+            async def run():
+                try:
+                    return await source.capture()
+                finally:
+                    await source.close()
+
+            frame = asyncio.run(run())
+            self.assertIsNotNone(frame, decode)
+            self.assertLess(source.frame_age_sec, 1.0)
+
+    def test_stale_frame_rejected(self):
+        source = HttpStreamSource(self._camera("http_stream"))
+        grabber = source._grabber
+        grabber.start = lambda: None
+        grabber._frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        grabber._frame_ts = time.time() - 10.0
+        self.assertIsNone(asyncio.run(source.capture()))
+        self.assertGreater(source.frame_age_sec, 5.0)
+
+    def test_capture_does_not_block_loop(self):
+        FakeCapture.opened = False
+        source = RtspSource(self._camera())
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        async def run():
+            task = asyncio.create_task(ticker())
+            with patch.object(frame_grabber, "_FRAME_WAIT_SEC", 0.2):
+                frame = await source.capture()
+            task.cancel()
+            await source.close()
+            return frame
+
+        self.assertIsNone(asyncio.run(run()))
+        self.assertGreater(ticks, 10)
+
+    def test_sources_share_grabber_implementation(self):
+        self.assertTrue(issubclass(RtspSource, GrabberSource))
+        self.assertTrue(issubclass(HttpStreamSource, GrabberSource))
+        self.assertEqual(RtspSource(self._camera())._grabber.name, "RTSP:cam_1")
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: ImageSourceFactory decode option
+# ────────────────────────────────────────────────────────
+class TestFactoryDecode(unittest.TestCase):
+
+    def test_decode_passed_to_stream_sources(self):
+        for protocol, cls in (("rtsp", RtspSource), ("http_stream", HttpStreamSource)):
+            cam = CameraInfo(camera_id="cam_1", protocol=protocol, address="x")
+            self.assertEqual(ImageSourceFactory.create(cam)._grabber.decode, "latest")
+            source = ImageSourceFactory.create(cam, decode="on_demand")
+            self.assertIsInstance(source, cls)
+            self.assertEqual(source._grabber.decode, "on_demand")
+
+    def test_decode_ignored_for_mqtt(self):
+        cam = CameraInfo(camera_id="cam_1", protocol="mqtt", address="")
+        source = ImageSourceFactory.create(cam, decode="on_demand")
+        self.assertIsInstance(source, MqttImageSource)
+
+    def test_invalid_decode_rejected(self):
+        cam = CameraInfo(camera_id="cam_1", protocol="rtsp", address="x")
+        with self.assertRaises(ValueError):
+            ImageSourceFactory.create(cam, decode="sometimes")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Perception InferenceBatcher (inference_batcher.py):
+batched results with mixed per-caller confidence thresholds against
+unbatched single-frame calls, using a fake detector with a greedy-NMS
+post-process (no YOLO / GPU needed), and the InferencePool frame bound
+(max_queue) with batching on.
+
+Usage:
+  python3 infra/scripts/test_inference_batcher.py
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+from inference_batcher import InferenceBatcher  # noqa: E402
+from inference_pool import InferencePool  # noqa: E402
+
+IOU = 0.7
+
+
+def _iou(a, b):
+    x1, y1 = max(a[0], b[0]), max(a[1], b[1])
+    x2, y2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FakeDetector:
+    """
+    Per-frame candidate boxes derived from the frame's seed pixel, then the
+    YOLO post-process: conf filter → greedy NMS → max_det cap.
+    """
+
+    def __init__(self, max_det=300):
+        self.max_det = max_det
+        self.batches = []   # (batch size, conf) per call
+
+    @staticmethod
+    def candidates(image):
+        rng = np.random.default_rng(int(image[0, 0, 0]))
+        boxes = []
+        for _ in range(40):
+            # Clusters of overlapping boxes so NMS has work to do
+            cx, cy = rng.uniform(50, 590), rng.uniform(50, 430)
+            for _ in range(rng.integers(1, 4)):
+                x, y = cx + rng.normal(0, 6), cy + rng.normal(0, 6)
+                boxes.append({
+                    "bbox": [x - 30, y - 60, x + 30, y + 60],
+                    "confidence": round(float(rng.uniform(0.05, 0.95)), 4),
+                    "class": "person",
+                })
+        return boxes
+
+    def detect(self, image, conf):
+        kept = []
+        for box in sorted(
+            (b for b in self.candidates(image) if b["confidence"] >= conf),
+            key=lambda b: -b["confidence"],
+        ):
+            if all(_iou(box["bbox"], k["bbox"]) < IOU for k in kept):
+                kept.append(box)
+        return kept[:self.max_det]
+
+    async def run_batch(self, images, conf):
+        self.batches.append((len(images), conf))
+        await asyncio.sleep(0)
+        return [self.detect(image, conf) for image in images]
+
+
+def _frame(seed):
+    return np.full((480, 640, 3), seed, dtype=np.uint8)
+
+
+def _key(result):
+    return sorted((tuple(r["bbox"]), r["confidence"]) for r in result)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: batched vs unbatched with mixed thresholds
+# ────────────────────────────────────────────────────────
+class TestMixedConfidence(unittest.TestCase):
+
+    REQUESTS = [(_frame(seed), conf) for seed, conf in (
+        (1, 0.5), (2, 0.4), (3, 0.25), (4, 0.5), (5, 0.7), (6, 0.4), (7, 0.1), (8, 0.5),
+    )]
+
+    def _batched(self, detector, requests, max_batch_size=4):
+        async def run():
+            batcher = InferenceBatcher("detect", detector.run_batch,
+                                       max_batch_size=max_batch_size, max_wait_sec=0.05)
+            try:
+                return await asyncio.gather(*(batcher.submit(img, conf) for img, conf in requests))
+            finally:
+                await batcher.close()
+
+        return asyncio.run(run())
+
+    def test_matches_unbatched_per_caller(self):
+        detector = FakeDetector()
+        batched = self._batched(detector, self.REQUESTS)
+        # The batch really ran at the lowest threshold of its members
+        self.assertEqual(detector.batches, [(4, 0.25), (4, 0.1)])
+
+        for (image, conf), result in zip(self.REQUESTS, batched):
+            unbatched = detector.detect(image, conf)
+            self.assertEqual(_key(result), _key(unbatched), f"conf={conf}")
+            self.assertTrue(all(r["confidence"] >= conf for r in result))
+
+    def test_low_threshold_neighbour_does_not_change_result(self):
+        """A 0.05 caller in the batch only adds boxes it alone receives."""
+        detector = FakeDetector()
+        image = _frame(11)
+        alone = self._batched(detector, [(image, 0.5)], max_batch_size=1)[0]
+        with_low, low = self._batched(detector, [(image, 0.5), (image, 0.05)])
+        self.assertEqual(_key(with_low), _key(alone))
+        self.assertGreater(len(low), len(alone))
+
+    def test_results_routed_to_their_caller(self):
+        detector = FakeDetector()
+        requests = [(_frame(seed), 0.3) for seed in (21, 22, 23, 24)]
+        batched = self._batched(detector, requests)
+        for (image, conf), result in zip(requests, batched):
+            self.assertEqual(_key(result), _key(detector.detect(image, conf)))
+        self.assertEqual(len({tuple(map(tuple, _key(r))) for r in batched}), 4)
+
+    def test_max_det_cap_keeps_callers_top_boxes(self):
+        """The cap truncates the score-ordered NMS output, so the boxes a
+        0.05 neighbour adds all rank below the stricter caller's."""
+        detector = FakeDetector(max_det=10)
+        image = _frame(31)
+        alone = detector.detect(image, 0.5)
+        self.assertEqual(len(alone), 10)   # the cap binds at 0.5 already
+        strict, low = self._batched(detector, [(image, 0.5), (image, 0.05)])
+        self.assertEqual(_key(strict), _key(alone))
+        self.assertEqual(len(low), 10)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: collection window and failures
+# ────────────────────────────────────────────────────────
+class TestCollection(unittest.TestCase):
+
+    def test_batch_size_and_stats(self):
+        detector = FakeDetector()
+
+        async def run():
+            batcher = InferenceBatcher("detect", detector.run_batch, max_batch_size=3, max_wait_sec=0.05)
+            await asyncio.gather(*(batcher.submit(_frame(s), 0.5) for s in range(7)))
+            stats = batcher.stats()
+            await batcher.close()
+            return stats
+
+        stats = asyncio.run(run())
+        self.assertEqual([size for size, _ in detector.batches], [3, 3, 1])
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["frames"], 7)
+
+    def test_failure_propagates_to_every_caller(self):
+        async def failing(images, conf):
+            raise RuntimeError("CUDA OOM")
+
+        async def run():
+            batcher = InferenceBatcher("detect", failing, max_batch_size=2, max_wait_sec=0.05)
+            results = await asyncio.gather(
+                batcher.submit(_frame(1), 0.5), batcher.submit(_frame(2), 0.4),
+                return_exceptions=True,
+            )
+            await batcher.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+    def test_close_after_failed_batch_with_queued_frames(self):
+        """A caller giving up after one failed batch must not hang close()."""
+        async def failing(images, conf):
+            await asyncio.sleep(0)
+            raise RuntimeError("CUDA OOM")
+
+        async def run():
+            batcher = InferenceBatcher("detect", failing, max_batch_size=4, max_wait_sec=0.05)
+            try:
+                with self.assertRaises(RuntimeError):
+                    await asyncio.gather(*(batcher.submit(_frame(s), 0.5) for s in range(8)))
+            finally:
+                start = time.monotonic()
+                await asyncio.wait_for(batcher.close(), 2.0)
+                return time.monotonic() - start
+
+        self.assertLess(asyncio.run(run()), 1.0)
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            InferenceBatcher("detect", FakeDetector().run_batch, max_batch_size=0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: InferencePool max_queue with batching
+# ────────────────────────────────────────────────────────
+class TestPoolBound(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(InferencePool, "_init_worker", lambda self: None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _pool(self, **kwargs):
+        pool = InferencePool(**kwargs)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_max_queue_counts_frames_not_batches(self):
+        release = threading.Event()
+        batches = []
+        running = []   # frames inside a forward pass
+
+        def infer_batch(images, conf_threshold):
+            batches.append(len(images))
+            running.append(len(images))
+            release.wait(5)
+            running.remove(len(images))
+            return [[] for _ in images]
+
+        pool = self._pool(workers=2, max_queue=3, batch_size=2, max_wait_ms=5)
+        pool._infer_batch_sync = infer_batch
+
+        async def run():
+            tasks = [asyncio.create_task(pool.infer(_frame(s))) for s in range(10)]
+            peak = 0
+            for _ in range(20):
+                await asyncio.sleep(0.01)
+                peak = max(peak, pool.pending)
+                # Two workers could run 2 batches of 2; only 3 frames may enter
+                self.assertLessEqual(pool._detect_batcher._queue.qsize() + sum(running), 3)
+            release.set()
+            results = await asyncio.gather(*tasks)
+            await pool._detect_batcher.close()
+            return peak, results
+
+        peak, results = asyncio.run(run())
+        self.assertEqual(peak, 3)
+        self.assertEqual(results, [[]] * 10)
+        self.assertEqual(sum(batches), 10)
+        self.assertEqual(pool.pending, 0)
+
+    def test_failed_batch_releases_slots(self):
+        def infer_batch(images, conf_threshold):
+            raise RuntimeError("CUDA OOM")
+
+        pool = self._pool(workers=1, max_queue=2, batch_size=2, max_wait_ms=5)
+        pool._infer_batch_sync = infer_batch
+
+        async def run():
+            results = await asyncio.gather(
+                *(pool.infer(_frame(s)) for s in range(5)), return_exceptions=True
+            )
+            await pool._detect_batcher.close()
+            return results
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(pool.pending, 0)
+
+    def test_unbatched_bound(self):
+        release = threading.Event()
+        pool = self._pool(workers=1, max_queue=2)
+        pool._infer_sync = lambda image, conf_threshold: release.wait(5) and []
+
+        async def run():
+            tasks = [asyncio.create_task(pool.infer(_frame(s))) for s in range(4)]
+            await asyncio.sleep(0.05)
+            pending = pool.pending
+            release.set()
+            await asyncio.gather(*tasks)
+            return pending
+
+        self.assertEqual(asyncio.run(run()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
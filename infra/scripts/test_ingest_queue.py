@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain MQTT ingest queue (ingest_queue.py): batch limits,
+high-water pause / low-water resume, drop-oldest accounting and invalid
+JSON handling.
+
+Usage:
+  python3 infra/scripts/test_ingest_queue.py
+"""
+import sys
+import os
+import asyncio
+import json
+import unittest
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from ingest_queue import IngestQueue  # noqa: E402
+
+
+def _msg(i):
+    return "office/main/sensor/env_01/temperature", json.dumps({"value": i}).encode()
+
+
+class Recorder:
+    """Handler recording applied values, plus pause/resume callbacks."""
+
+    def __init__(self):
+        self.values = []
+        self.events = []
+
+    def __call__(self, topic, payload):
+        self.values.append(payload["value"])
+
+    def pause(self):
+        self.events.append("pause")
+
+    def resume(self):
+        self.events.append("resume")
+
+
+def _queue(recorder, **kwargs):
+    return IngestQueue(on_high_water=recorder.pause, on_low_water=recorder.resume, **kwargs)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: batching
+# ────────────────────────────────────────────────────────
+class TestBatching(unittest.TestCase):
+
+    def test_batches_capped_at_max_batch(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=1000, max_batch=40)
+        for i in range(100):
+            q.put(*_msg(i))
+        sizes = []
+        while q.stats()["queue_depth"]:
+            before = q.messages
+            q._drain_batch(rec)
+            sizes.append(q.messages - before)
+        self.assertEqual(sizes, [40, 40, 20])
+        self.assertEqual(rec.values, list(range(100)))
+        stats = q.stats()
+        self.assertEqual((stats["batches"], stats["messages"], stats["max_batch"]), (3, 100, 40))
+        self.assertAlmostEqual(stats["mean_batch"], 33.3)
+
+    def test_run_drains_burst_in_order(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=1000, max_batch=50, tick_sec=0.01)
+
+        async def run():
+            task = asyncio.create_task(q.run(rec))
+            for i in range(120):
+                q.put(*_msg(i))
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if len(rec.values) == 120:
+                    break
+            task.cancel()
+
+        asyncio.run(run())
+        self.assertEqual(rec.values, list(range(120)))
+        self.assertEqual(q.batches, 3)
+
+    def test_handler_error_does_not_stop_batch(self):
+        q = IngestQueue(max_batch=10)
+        seen = []
+
+        def handler(topic, payload):
+            if payload["value"] == 1:
+                raise KeyError("zone")
+            seen.append(payload["value"])
+
+        for i in range(3):
+            q.put(*_msg(i))
+        q._drain_batch(handler)
+        self.assertEqual(seen, [0, 2])
+        self.assertEqual(q.messages, 3)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: backpressure
+# ────────────────────────────────────────────────────────
+class TestBackpressure(unittest.TestCase):
+
+    def test_high_water_pauses_once_and_drops_oldest(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=10, max_batch=100)
+        for i in range(10):
+            q.put(*_msg(i))
+        self.assertEqual(rec.events, [])          # full, nothing dropped yet
+        for i in range(10, 25):
+            q.put(*_msg(i))
+        self.assertEqual(rec.events, ["pause"])   # once, not per message
+        self.assertEqual(q.dropped, 15)
+        self.assertEqual(q.stats()["queue_depth"], 10)
+
+        q._drain_batch(rec)
+        # The newest max_queue messages survive
+        self.assertEqual(rec.values, list(range(15, 25)))
+        self.assertEqual(q.stats()["dropped"], 15)
+
+    def test_low_water_resumes_below_half(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=10, max_batch=3)
+        for i in range(11):
+            q.put(*_msg(i))
+        self.assertEqual(rec.events, ["pause"])
+
+        q._drain_batch(rec)   # 7 left: still >= half
+        self.assertEqual(rec.events, ["pause"])
+        q._drain_batch(rec)   # 4 left: < 5
+        self.assertEqual(rec.events, ["pause", "resume"])
+        q._drain_batch(rec)
+        q._drain_batch(rec)
+        self.assertEqual(rec.events, ["pause", "resume"])
+
+    def test_pause_again_after_resume(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=4, max_batch=4)
+        for i in range(5):
+            q.put(*_msg(i))
+        q._drain_batch(rec)
+        for i in range(5, 10):
+            q.put(*_msg(i))
+        self.assertEqual(rec.events, ["pause", "resume", "pause"])
+        self.assertEqual(q.dropped, 2)
+
+    def test_without_callbacks(self):
+        q = IngestQueue(max_queue=2)
+        for i in range(5):
+            q.put(*_msg(i))
+        self.assertEqual(q.dropped, 3)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: invalid payloads
+# ────────────────────────────────────────────────────────
+class TestInvalid(unittest.TestCase):
+
+    def test_invalid_json_counted_and_skipped(self):
+        rec = Recorder()
+        q = _queue(rec, max_batch=100)
+        q.put(*_msg(1))
+        q.put("office/main/sensor/env_01/co2", b"{not json")
+        q.put("office/main/sensor/env_01/co2", b"\xff\xfe\x00")   # not UTF-8
+        q.put("office/main/sensor/env_01/co2", b"")
+        q.put(*_msg(2))
+        q._drain_batch(rec)
+        self.assertEqual(rec.values, [1, 2])
+        stats = q.stats()
+        self.assertEqual(stats["invalid"], 3)
+        # Invalid messages were still dequeued as part of the batch
+        self.assertEqual(stats["messages"], 5)
+        self.assertEqual(stats["dropped"], 0)
+
+    def test_invalid_and_dropped_are_separate(self):
+        rec = Recorder()
+        q = _queue(rec, max_queue=2, max_batch=10)
+        q.put("t", b"garbage")
+        q.put(*_msg(1))
+        q.put(*_msg(2))        # drops "garbage" before it is parsed
+        q._drain_batch(rec)
+        self.assertEqual((q.dropped, q.invalid), (1, 0))
+        self.assertEqual(rec.values, [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the LLM backend router (services/shared/llm_router.py, used
+by Brain and Voice): circuit breakers, hedging, failover and backend selection, driven
+by fake in-process backends.
+
+Usage:
+  python3 infra/scripts/test_llm_router.py
+"""
+import sys
+import os
+import asyncio
+import time
+import unittest
+
+# Add shared service modules to path for imports
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
+sys.path.insert(0, SHARED_SRC)
+
+from llm_router import (  # noqa: E402
+    CircuitBreaker, LLMHTTPError, LLMRouter, LLMUnavailableError,
+)
+
+A = "http://llm-a/v1"
+B = "http://llm-b/v1"
+C = "http://llm-c/v1"
+
+
+class FakeBackends:
+    """send(base_url) with per-URL behaviour: a delay and/or an exception."""
+
+    def __init__(self, **behaviour):
+        # url -> (delay_sec, exception or None)
+        self.behaviour = behaviour
+        self.calls = []
+        self.cancelled = []
+
+    def set(self, url, delay=0.0, error=None):
+        self.behaviour[url] = (delay, error)
+
+    async def send(self, base_url):
+        self.calls.append(base_url)
+        delay, error = self.behaviour.get(base_url, (0.0, None))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(base_url)
+            raise
+        if error is not None:
+            raise error
+        return base_url
+
+
+def _backend(router, url):
+    return next(b for b in router.backends if b.url == url)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: CircuitBreaker state machine
+# ────────────────────────────────────────────────────────
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=3, open_sec=10)
+        self.assertFalse(breaker.on_failure(100.0))
+        self.assertFalse(breaker.on_failure(100.0))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertTrue(breaker.on_failure(100.0))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertFalse(breaker.allows(105.0))
+        self.assertAlmostEqual(breaker.reopens_in(105.0), 5.0)
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, open_sec=10)
+        breaker.on_failure(0.0)
+        breaker.on_success()
+        self.assertFalse(breaker.on_failure(0.0))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_allows_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_sec=10)
+        breaker.on_failure(0.0)
+        self.assertTrue(breaker.allows(10.0))
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.on_attempt()
+        self.assertFalse(breaker.allows(10.0))
+        # An abandoned probe (lost hedge race) frees the slot
+        breaker.on_abandon()
+        self.assertTrue(breaker.allows(10.0))
+
+    def test_half_open_success_closes(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_sec=10)
+        breaker.on_failure(0.0)
+        breaker.allows(10.0)
+        breaker.on_attempt()
+        breaker.on_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.open_sec, 10)
+
+    def test_half_open_failure_doubles_open_time(self):
+        breaker = CircuitBreaker(failure_threshold=1, open_sec=10, max_open_sec=25)
+        breaker.on_failure(0.0)
+        breaker.allows(10.0)
+        breaker.on_attempt()
+        self.assertTrue(breaker.on_failure(10.0))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.open_sec, 20)
+        self.assertFalse(breaker.allows(29.0))
+        self.assertTrue(breaker.allows(30.0))
+        breaker.on_attempt()
+        breaker.on_failure(30.0)
+        self.assertEqual(breaker.open_sec, 25)  # capped
+        # Recovery restores the base open time
+        breaker.allows(55.0)
+        breaker.on_success()
+        self.assertEqual(breaker.open_sec, 10)
+
+    def test_router_opens_and_recloses_backend(self):
+        router = LLMRouter([A, B], failure_threshold=2, open_sec=0.05)
+        fake = FakeBackends()
+        fake.set(A, error=LLMHTTPError(503, "down"))
+        a = _backend(router, A)
+
+        async def run():
+            # A fails twice (each request fails over to B)
+            for _ in range(4):
+                if a.breaker.state == CircuitBreaker.OPEN:
+                    break
+                self.assertEqual(await router.request(fake.send), B)
+            self.assertEqual(a.breaker.state, CircuitBreaker.OPEN)
+            fake.calls.clear()
+            self.assertEqual(await router.request(fake.send), B)
+            self.assertNotIn(A, fake.calls)
+
+            # After open_sec, A is probed once and closes on success
+            await asyncio.sleep(0.06)
+            fake.set(A)
+            b = _backend(router, B)
+            b.ewma_sec = 1.0  # make A the preferred backend
+            self.assertEqual(await router.request(fake.send), A)
+            self.assertEqual(a.breaker.state, CircuitBreaker.CLOSED)
+
+        asyncio.run(run())
+
+    def test_client_errors_do_not_open_breaker(self):
+        router = LLMRouter([A], failure_threshold=1)
+        fake = FakeBackends()
+        fake.set(A, error=LLMHTTPError(400, "bad request"))
+
+        async def run():
+            with self.assertRaises(LLMHTTPError):
+                await router.request(fake.send)
+
+        asyncio.run(run())
+        self.assertEqual(_backend(router, A).breaker.state, CircuitBreaker.CLOSED)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: backend selection
+# ────────────────────────────────────────────────────────
+class TestPick(unittest.TestCase):
+
+    def test_orders_by_outstanding_then_ewma(self):
+        router = LLMRouter([A, B, C])
+        a, b, c = router.backends
+        a.outstanding, b.outstanding, c.outstanding = 2, 1, 1
+        b.ewma_sec, c.ewma_sec = 3.0, 0.5
+        self.assertIs(router.pick(), c)
+        c.outstanding = 3
+        self.assertIs(router.pick(), b)
+        b.outstanding = 5
+        self.assertIs(router.pick(), a)
+
+    def test_unmeasured_backend_preferred_on_ties(self):
+        router = LLMRouter([A, B])
+        a, b = router.backends
+        a.ewma_sec = 0.8
+        self.assertIs(router.pick(), b)
+
+    def test_round_robin_breaks_full_ties(self):
+        router = LLMRouter([A, B, C])
+        picked = [router.pick().url for _ in range(6)]
+        self.assertEqual(set(picked), {A, B, C})
+        self.assertNotEqual(picked[0], picked[1])
+
+    def test_exclude_and_open_backends_are_skipped(self):
+        router = LLMRouter([A, B], failure_threshold=1, open_sec=60)
+        a, b = router.backends
+        self.assertIs(router.pick(exclude=(a,)), b)
+        b.breaker.on_failure(time.monotonic())
+        self.assertIs(router.pick(), a)
+        self.assertIsNone(router.pick(exclude=(a,)))
+
+    def test_concurrent_requests_spread(self):
+        """Outstanding counts are taken before the attempt is scheduled."""
+        router = LLMRouter([A, B, C])
+        fake = FakeBackends()
+        for url in (A, B, C):
+            fake.set(url, delay=0.02)
+
+        async def run():
+            return await asyncio.gather(*(router.request(fake.send) for _ in range(6)))
+
+        results = asyncio.run(run())
+        self.assertEqual(sorted(results), sorted([A, B, C] * 2))
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: hedging and failover
+# ────────────────────────────────────────────────────────
+class TestHedgeAndFailover(unittest.TestCase):
+
+    def _hedging_router(self):
+        router = LLMRouter([A, B], hedge_percentile=0.9, hedge_min_samples=5)
+        a, b = router.backends
+        for _ in range(5):
+            a.observe(0.02)
+            b.observe(0.03)
+        return router, a, b
+
+    def test_hedge_fires_after_delay_and_cancels_loser(self):
+        router, a, b = self._hedging_router()
+        fake = FakeBackends()
+        fake.set(A, delay=2.0)   # primary (lower EWMA) is stuck
+        fake.set(B, delay=0.01)
+
+        async def run():
+            start = time.monotonic()
+            result = await router.request(fake.send)
+            await asyncio.sleep(0)  # let the cancellation land
+            return result, time.monotonic() - start
+
+        result, elapsed = asyncio.run(run())
+        self.assertEqual(result, B)
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(fake.calls, [A, B])
+        self.assertEqual(fake.cancelled, [A])
+        self.assertEqual((a.hedges, b.hedge_wins), (1, 1))
+        self.assertEqual((a.outstanding, b.outstanding), (0, 0))
+        self.assertEqual(a.errors, 0)
+
+    def test_no_hedge_when_primary_is_fast(self):
+        router, a, _ = self._hedging_router()
+        fake = FakeBackends()
+        fake.set(A, delay=0.0)
+        self.assertEqual(asyncio.run(router.request(fake.send)), A)
+        self.assertEqual(fake.calls, [A])
+        self.assertEqual(a.hedges, 0)
+
+    def test_no_hedge_when_disabled_per_request(self):
+        router, a, _ = self._hedging_router()
+        fake = FakeBackends()
+        fake.set(A, delay=0.1)
+        self.assertEqual(asyncio.run(router.request(fake.send, hedge=False)), A)
+        self.assertEqual(fake.calls, [A])
+
+    def test_no_hedge_before_min_samples(self):
+        router = LLMRouter([A, B], hedge_percentile=0.9, hedge_min_samples=5)
+        fake = FakeBackends()
+        fake.set(A, delay=0.1)
+        fake.set(B, delay=0.1)
+        asyncio.run(router.request(fake.send))
+        self.assertEqual(len(fake.calls), 1)
+
+    def test_failover_once_on_backend_failure(self):
+        router = LLMRouter([A, B, C])
+        fake = FakeBackends()
+        for url in (A, B, C):
+            fake.set(url, error=ConnectionError(url))
+
+        async def run():
+            with self.assertRaises(ConnectionError):
+                await router.request(fake.send)
+
+        asyncio.run(run())
+        self.assertEqual(len(fake.calls), 2)
+
+    def test_no_failover_for_client_errors_or_non_retryable(self):
+        router = LLMRouter([A, B])
+        fake = FakeBackends()
+        fake.set(A, error=LLMHTTPError(422, "bad"))
+        fake.set(B, error=LLMHTTPError(422, "bad"))
+
+        async def run():
+            with self.assertRaises(LLMHTTPError):
+                await router.request(fake.send)
+
+        asyncio.run(run())
+        self.assertEqual(len(fake.calls), 1)
+
+        error = ConnectionError("stream broke after a tool call")
+        error.retryable = False
+        fake = FakeBackends()
+        fake.set(A, error=error)
+        fake.set(B, error=error)
+
+        async def run_stream():
+            with self.assertRaises(ConnectionError):
+                await router.request(fake.send, hedge=False)
+
+        asyncio.run(run_stream())
+        self.assertEqual(len(fake.calls), 1)
+
+
+# ────────────────────────────────────────────────────────
+# Test 4: every backend open
+# ────────────────────────────────────────────────────────
+class TestAllBackendsOpen(unittest.TestCase):
+
+    def test_raises_without_calling_backends(self):
+        router = LLMRouter([A, B], failure_threshold=1, open_sec=30)
+        for backend in router.backends:
+            backend.breaker.on_failure(time.monotonic())
+        fake = FakeBackends()
+
+        async def run():
+            with self.assertRaises(LLMUnavailableError) as cm:
+                await asyncio.wait_for(router.request(fake.send), timeout=1.0)
+            return cm.exception
+
+        error = asyncio.run(run())
+        self.assertEqual(fake.calls, [])
+        self.assertIn("retry in 30s", str(error))
+
+    def test_pool_that_fails_open_then_raises(self):
+        router = LLMRouter([A, B], failure_threshold=1, open_sec=30)
+        fake = FakeBackends()
+        fake.set(A, error=LLMHTTPError(502, "bad gateway"))
+        fake.set(B, error=LLMHTTPError(502, "bad gateway"))
+
+        async def run():
+            with self.assertRaises(LLMHTTPError):
+                await router.request(fake.send)
+            with self.assertRaises(LLMUnavailableError):
+                await asyncio.wait_for(router.request(fake.send), timeout=1.0)
+
+        asyncio.run(run())
+        self.assertEqual(len(fake.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Brain LLM streaming (llm_client.py) and early tool dispatch
+(main.py): tool calls assembled from SSE deltas (fragmented arguments,
+parallel calls, streams failing mid-call) with a fake aiohttp session, and
+what happens to early-dispatched calls when the stream fails or a cycle
+aborts.
+
+Usage:
+  python3 infra/scripts/test_llm_stream.py
+"""
+import sys
+import os
+import asyncio
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+# Add brain src and shared modules to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
+sys.path.insert(0, BRAIN_SRC)
+sys.path.insert(0, SHARED_SRC)
+
+from decision_cache import NoActionCache  # noqa: E402
+from llm_client import LLMClient, LLMResponse, _ToolCallAccumulator  # noqa: E402
+from llm_router import LLMRouter  # noqa: E402
+from tool_executor import CONCURRENT_TOOLS, EARLY_DISPATCH_TOOLS, ToolExecutor  # noqa: E402
+
+A = "http://llm-a/v1"
+B = "http://llm-b/v1"
+
+
+def _sse(chunk):
+    return b"data: " + json.dumps(chunk).encode() + b"\n"
+
+
+def _tool_delta(index, call_id=None, name=None, arguments=None):
+    delta = {"index": index, "function": {}}
+    if call_id:
+        delta["id"] = call_id
+        delta["type"] = "function"
+    if name:
+        delta["function"]["name"] = name
+    if arguments is not None:
+        delta["function"]["arguments"] = arguments
+    return _sse({"choices": [{"index": 0, "delta": {"tool_calls": [delta]}}]})
+
+
+def _content(text):
+    return _sse({"choices": [{"index": 0, "delta": {"content": text}}]})
+
+
+_FINISH = _sse({"choices": [{"index": 0, "delta": {}, "finish_reason": "tool_calls"}]})
+_DONE = b"data: [DONE]\n"
+
+
+class FakeResponse:
+    """aiohttp response whose body yields SSE lines, optionally failing."""
+
+    def __init__(self, session, lines, error=None, status=200):
+        self.session = session
+        self.lines = lines
+        self.error = error
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return "server error"
+
+    @property
+    def content(self):
+        return self._iter()
+
+    async def _iter(self):
+        for line in self.lines:
+            self.session.consumed += 1
+            await asyncio.sleep(0)
+            yield line
+        if self.error is not None:
+            raise self.error
+
+
+class FakeSession:
+    """Per-URL scripted streams: url -> (lines, error)."""
+
+    def __init__(self, **streams):
+        self.streams = streams
+        self.posted = []
+        self.consumed = 0
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        base = url.rsplit("/chat/completions", 1)[0]
+        self.posted.append(base)
+        lines, error = self.streams[base]
+        return FakeResponse(self, lines, error)
+
+
+def _client(session, urls=(A,)):
+    router = LLMRouter(list(urls))
+    # The first URL is the primary: every other backend looks slower
+    for backend in router.backends[1:]:
+        backend.ewma_sec = 1.0
+    return LLMClient(api_url=urls[0], session=session, stream=True, router=router)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: _ToolCallAccumulator
+# ────────────────────────────────────────────────────────
+class TestToolCallAccumulator(unittest.TestCase):
+
+    def test_fragmented_arguments_parse_once_closed(self):
+        acc = _ToolCallAccumulator()
+        acc.add({"id": "call_1", "function": {"name": "get_zone_", "arguments": ""}})
+        acc.add({"function": {"name": "status"}})
+        for fragment in ('{"zone', '_id": ', '"ma', 'in"'):
+            acc.add({"function": {"arguments": fragment}})
+            self.assertIsNone(acc.parsed_arguments())
+        acc.add({"function": {"arguments": "}"}})
+        self.assertEqual(acc.parsed_arguments(), {"zone_id": "main"})
+        self.assertEqual(acc.to_tool_call(), {
+            "id": "call_1",
+            "function": {"name": "get_zone_status", "arguments": {"zone_id": "main"}},
+        })
+
+    def test_brace_inside_string_is_not_the_end(self):
+        acc = _ToolCallAccumulator()
+        acc.add({"function": {"arguments": '{"message": "}'}})
+        self.assertIsNone(acc.parsed_arguments())
+        acc.add({"function": {"arguments": '"}'}})
+        self.assertEqual(acc.parsed_arguments(), {"message": "}"})
+
+    def test_whole_object_arguments(self):
+        """Ollama sends the arguments as an object in one delta."""
+        acc = _ToolCallAccumulator()
+        acc.add({"id": "c", "function": {"name": "speak", "arguments": {"zone": "main"}}})
+        self.assertEqual(acc.parsed_arguments(), {"zone": "main"})
+
+    def test_non_object_or_broken_arguments(self):
+        acc = _ToolCallAccumulator()
+        acc.add({"function": {"arguments": "[1, 2]"}})
+        self.assertIsNone(acc.parsed_arguments())
+        broken = _ToolCallAccumulator()
+        broken.add({"function": {"name": "speak", "arguments": '{"zone": '}})
+        self.assertEqual(broken.to_tool_call()["function"]["arguments"], {})
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: _chat_stream
+# ────────────────────────────────────────────────────────
+class TestChatStream(unittest.TestCase):
+
+    def _chat(self, session, urls=(A,)):
+        emitted = []
+
+        def on_tool_call(tc):
+            emitted.append((session.consumed, tc))
+
+        response = asyncio.run(_client(session, urls).chat([], [], on_tool_call=on_tool_call))
+        return response, emitted
+
+    def test_fragmented_arguments_emitted_when_json_closes(self):
+        lines = [
+            _tool_delta(0, "call_0", "get_zone_status", ""),
+            _tool_delta(0, arguments='{"zone_id"'),
+            _tool_delta(0, arguments=': "main"'),
+            _tool_delta(0, arguments="}"),          # line 4: JSON closes
+            _content(""),
+            _FINISH,
+            _DONE,
+        ]
+        response, emitted = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertIsNone(response.error)
+        self.assertEqual(len(emitted), 1)
+        consumed, tc = emitted[0]
+        self.assertEqual(consumed, 4)
+        self.assertEqual(tc["function"], {"name": "get_zone_status", "arguments": {"zone_id": "main"}})
+        self.assertEqual(response.tool_calls, [tc])
+        self.assertEqual(response.finish_reason, "tool_calls")
+
+    def test_parallel_tool_calls_in_order(self):
+        lines = [
+            _tool_delta(0, "call_0", "get_zone_status", '{"zone_id": "main"'),
+            _tool_delta(0, arguments="}"),
+            _tool_delta(1, "call_1", "get_zone_status", '{"zone_id": '),
+            _tool_delta(1, arguments='"kitchen"}'),
+            _tool_delta(2, "call_2", "get_active_tasks", "{}"),
+            _DONE,
+        ]
+        response, emitted = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertEqual([tc["id"] for _, tc in emitted], ["call_0", "call_1", "call_2"])
+        self.assertEqual([c for c, _ in emitted], [2, 4, 5])
+        self.assertEqual([tc["id"] for tc in response.tool_calls], ["call_0", "call_1", "call_2"])
+        self.assertEqual(response.tool_calls[1]["function"]["arguments"], {"zone_id": "kitchen"})
+
+    def test_next_index_completes_previous_call(self):
+        """A call whose arguments never parse is emitted once the next starts."""
+        lines = [
+            _tool_delta(0, "call_0", "get_active_tasks", ""),
+            _tool_delta(1, "call_1", "get_zone_status", '{"zone_id": "main"}'),
+            _DONE,
+        ]
+        response, emitted = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertEqual([(c, tc["id"]) for c, tc in emitted], [(2, "call_0"), (2, "call_1")])
+        self.assertEqual(emitted[0][1]["function"]["arguments"], {})
+
+    def test_each_call_emitted_once(self):
+        lines = [
+            _tool_delta(0, "call_0", "get_zone_status", '{"zone_id": "main"}'),
+            _tool_delta(0, arguments=""),
+            _tool_delta(1, "call_1", "get_active_tasks", "{}"),
+            _DONE,
+        ]
+        _, emitted = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertEqual([tc["id"] for _, tc in emitted], ["call_0", "call_1"])
+
+    def test_error_mid_call_after_emit_does_not_fail_over(self):
+        """Calls already handed out must not be replayed by another backend."""
+        lines = [
+            _tool_delta(0, "call_0", "get_zone_status", '{"zone_id": "main"}'),
+            _tool_delta(1, "call_1", "send_device_command", '{"agent_id": "hub'),
+        ]
+        session = FakeSession(**{
+            A: (lines, ConnectionResetError("connection reset")),
+            B: ([_DONE], None),
+        })
+        response, emitted = self._chat(session, urls=(A, B))
+        self.assertIn("connection reset", response.error)
+        # Only the complete call was emitted; the half-streamed one never is
+        self.assertEqual([tc["id"] for _, tc in emitted], ["call_0"])
+        self.assertEqual(session.posted, [A])
+
+    def test_error_before_any_emit_fails_over(self):
+        session = FakeSession(**{
+            A: ([_tool_delta(0, "call_0", "get_zone_status", '{"zone_')], ConnectionResetError("reset")),
+            B: ([_tool_delta(0, "call_9", "get_active_tasks", "{}"), _DONE], None),
+        })
+        response, emitted = self._chat(session, urls=(A, B))
+        self.assertIsNone(response.error)
+        self.assertEqual(session.posted, [A, B])
+        self.assertEqual([tc["id"] for _, tc in emitted], ["call_9"])
+
+    def test_error_chunk(self):
+        lines = [_content("考え中"), _sse({"error": {"message": "context length exceeded"}})]
+        response, emitted = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertIn("context length exceeded", response.error)
+        self.assertEqual(emitted, [])
+
+    def test_content_and_usage(self):
+        lines = [
+            _content("問題"),
+            _content("ありません"),
+            _sse({"choices": [], "usage": {
+                "prompt_tokens": 900, "completion_tokens": 5,
+                "prompt_tokens_details": {"cached_tokens": 800},
+            }}),
+            _DONE,
+        ]
+        response, _ = self._chat(FakeSession(**{A: (lines, None)}))
+        self.assertEqual(response.content, "問題ありません")
+        self.assertEqual(response.tool_calls, [])
+        self.assertEqual((response.prompt_tokens, response.cached_tokens), (900, 800))
+        self.assertEqual(response.completion_tokens, 5)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: early dispatch in the cognitive cycle
+# ────────────────────────────────────────────────────────
+def _call(call_id, name, **arguments):
+    return {"id": call_id, "function": {"name": name, "arguments": arguments}}
+
+
+class RecordingExecutor(ToolExecutor):
+    """Real batching/serialization; handlers replaced by recorders."""
+
+    def __init__(self, delays=None, failing=()):
+        super().__init__(sanitizer=None, mcp_bridge=None, dashboard_client=None,
+                         world_model=None, task_queue=None)
+        self.delays = delays or {}
+        self.failing = set(failing)
+        self.started = []
+        self.cancelled = []
+        self.chat_done = False
+        self.started_during_stream = []
+
+    async def _execute(self, tool_name, arguments):
+        self.started.append(tool_name)
+        if not self.chat_done:
+            self.started_during_stream.append(tool_name)
+        try:
+            await asyncio.sleep(self.delays.get(tool_name, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(tool_name)
+            raise
+        if tool_name in self.failing:
+            return {"success": False, "error": f"{tool_name} failed"}
+        return {"success": True, "result": f"{tool_name} ok"}
+
+
+def _make_brain(turns, executor):
+    """Brain running cognitive_cycle against scripted streaming turns."""
+    from main import Brain
+    from world_model import WorldModel
+
+    brain = Brain.__new__(Brain)
+    brain.task_queue = None
+    brain.world_model = WorldModel()
+    brain.world_model.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+    brain.dashboard = MagicMock()
+    brain.dashboard.get_active_tasks = AsyncMock(return_value=[])
+    brain.tool_executor = executor
+    brain.rules = None
+    brain._action_history = []
+    brain._sent_sections = {}
+    brain._context_cycle = 0
+    brain.no_action_cache = NoActionCache(ttl_sec=0)
+    brain.prefill_stats = {"cycles": 0, "prompt_tokens": 0, "cached_tokens": 0, "diff_saved_tokens": 0}
+    brain.chat_messages = []
+
+    turns = list(turns)
+
+    async def chat(messages, tools, on_tool_call=None):
+        brain.chat_messages.append(list(messages))
+        tool_calls, error = turns.pop(0) if turns else ([], None)
+        executor.chat_done = False
+        for tc in tool_calls:
+            on_tool_call(tc)
+            await asyncio.sleep(0.01)   # rest of the response still streaming
+        executor.chat_done = True
+        if error:
+            return LLMResponse(error=error)
+        return LLMResponse(tool_calls=tool_calls, finish_reason="tool_calls" if tool_calls else "stop")
+
+    brain.llm = MagicMock()
+    brain.llm.chat = chat
+    brain.llm.router.backends = [A]
+    return brain
+
+
+class TestEarlyDispatch(unittest.TestCase):
+
+    def test_only_read_only_tools_dispatch_early(self):
+        self.assertEqual(EARLY_DISPATCH_TOOLS, {"get_zone_status", "get_active_tasks"})
+        self.assertLessEqual(EARLY_DISPATCH_TOOLS, CONCURRENT_TOOLS)
+        self.assertNotIn("send_device_command", EARLY_DISPATCH_TOOLS)
+
+    def test_complete_turn_reuses_early_calls(self):
+        executor = RecordingExecutor()
+        brain = _make_brain([([
+            _call("c0", "get_zone_status", zone_id="main"),
+            _call("c1", "send_device_command", agent_id="hub", tool_name="light_on", arguments="{}"),
+        ], None)], executor)
+        asyncio.run(brain.cognitive_cycle())
+
+        self.assertEqual(executor.started_during_stream, ["get_zone_status"])
+        # Each call ran exactly once; the device command after the turn closed
+        self.assertEqual(sorted(executor.started), ["get_zone_status", "send_device_command"])
+        self.assertEqual(
+            [a["tool"] for a in brain._action_history], ["get_zone_status", "send_device_command"]
+        )
+        tool_msgs = [m for m in brain.chat_messages[1] if m["role"] == "tool"]
+        self.assertEqual([m["tool_call_id"] for m in tool_msgs], ["c0", "c1"])
+
+    def test_stream_error_cancels_only_read_only_calls(self):
+        executor = RecordingExecutor(delays={"get_zone_status": 5.0})
+        brain = _make_brain([([
+            _call("c0", "send_device_command", agent_id="hub", tool_name="light_on", arguments="{}"),
+            _call("c1", "get_zone_status", zone_id="main"),
+        ], "connection reset")], executor)
+        asyncio.run(asyncio.wait_for(brain.cognitive_cycle(), 2.0))
+
+        # The device never got a command the Brain has no record of
+        self.assertNotIn("send_device_command", executor.started)
+        self.assertEqual(executor.cancelled, ["get_zone_status"])
+        self.assertEqual(brain._action_history, [])
+
+    def test_guard3_abort_leaves_no_unrecorded_device_command(self):
+        executor = RecordingExecutor(delays={"get_zone_status": 5.0}, failing={"speak"})
+        brain = _make_brain([([
+            _call("c0", "speak", zone="main", message="換気してください"),
+            _call("c1", "send_device_command", agent_id="hub", tool_name="fan_on", arguments="{}"),
+            _call("c2", "get_zone_status", zone_id="main"),
+        ], None)], executor)
+        asyncio.run(asyncio.wait_for(brain.cognitive_cycle(), 2.0))
+
+        # speak failed → cycle aborted before the device/zone group
+        self.assertEqual(executor.started, ["get_zone_status", "speak"])
+        self.assertEqual(executor.cancelled, ["get_zone_status"])
+        self.assertEqual([(a["tool"], a["success"]) for a in brain._action_history], [("speak", False)])
+
+    def test_duplicate_early_call_dispatched_once(self):
+        executor = RecordingExecutor()
+        brain = _make_brain([([
+            _call("c0", "get_active_tasks"),
+            _call("c1", "get_active_tasks"),
+        ], None)], executor)
+        asyncio.run(brain.cognitive_cycle())
+        # Guard 1 filters the duplicate; it was never started early either
+        self.assertEqual(executor.started, ["get_active_tasks"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
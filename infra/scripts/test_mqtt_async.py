@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the event-loop-driven MQTT client (mqtt_async.py): the
+add_reader/add_writer socket hooks, publish/subscribe, backpressure and
+reconnect, against a minimal in-process MQTT 3.1.1 broker (no mosquitto
+needed).
+
+Usage:
+  python3 infra/scripts/test_mqtt_async.py
+"""
+import sys
+import os
+import asyncio
+import socket
+import struct
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, BRAIN_SRC)
+
+import mqtt_async  # noqa: E402
+from mqtt_async import AsyncMQTTClient  # noqa: E402
+
+
+def _encode_length(n):
+    out = bytearray()
+    while True:
+        byte, n = n % 128, n // 128
+        out.append(byte | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+def _packet(first_byte, body):
+    return bytes([first_byte]) + _encode_length(len(body)) + body
+
+
+def _str(s):
+    data = s.encode()
+    return struct.pack("!H", len(data)) + data
+
+
+class FakeBroker:
+    """CONNECT/SUBSCRIBE/PUBLISH(QoS 0/1)/PINGREQ, one session at a time."""
+
+    def __init__(self):
+        self.connects = 0
+        self.subscriptions = []   # topic filters, in SUBSCRIBE order
+        self.published = []       # (topic, payload)
+        self._writer = None
+        self._server = None
+        self.port = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.drop()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def drop(self):
+        """Close the current client connection (broker restart / network loss)."""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def send(self, topic, payload):
+        self._writer.write(_packet(0x30, _str(topic) + payload))
+
+    async def _session(self, reader, writer):
+        self._writer = writer
+        try:
+            while True:
+                header = await reader.readexactly(1)
+                length, mult = 0, 1
+                while True:
+                    byte = (await reader.readexactly(1))[0]
+                    length += (byte & 0x7F) * mult
+                    mult *= 128
+                    if not byte & 0x80:
+                        break
+                body = await reader.readexactly(length)
+                self._handle(header[0], body, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _handle(self, first_byte, body, writer):
+        kind = first_byte & 0xF0
+        if kind == 0x10:     # CONNECT
+            self.connects += 1
+            writer.write(_packet(0x20, b"\x00\x00"))
+        elif kind == 0x80:   # SUBSCRIBE
+            mid, pos, granted = body[:2], 2, bytearray()
+            while pos < len(body):
+                (n,) = struct.unpack_from("!H", body, pos)
+                self.subscriptions.append(body[pos + 2:pos + 2 + n].decode())
+                granted.append(body[pos + 2 + n])
+                pos += 3 + n
+            writer.write(_packet(0x90, mid + bytes(granted)))
+        elif kind == 0x30:   # PUBLISH
+            qos = (first_byte >> 1) & 0x03
+            (n,) = struct.unpack_from("!H", body, 0)
+            topic = body[2:2 + n].decode()
+            pos = 2 + n
+            if qos:
+                writer.write(_packet(0x40, body[pos:pos + 2]))   # PUBACK
+                pos += 2
+            self.published.append((topic, body[pos:]))
+        elif kind == 0xC0:   # PINGREQ
+            writer.write(b"\xd0\x00")
+
+
+async def _until(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class _BrokerCase(unittest.TestCase):
+
+    def run_with_client(self, body):
+        """Run body(broker, client) against a fresh broker and connected client."""
+        async def run():
+            broker = FakeBroker()
+            await broker.start()
+            client = AsyncMQTTClient("127.0.0.1", broker.port)
+            await client.connect(timeout=3.0)
+            try:
+                return await body(broker, client)
+            finally:
+                await client.disconnect()
+                await broker.stop()
+
+        return asyncio.run(run())
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: socket hooks drive publish / subscribe
+# ────────────────────────────────────────────────────────
+class TestSocketHooks(_BrokerCase):
+
+    def test_connect_registers_reader(self):
+        async def body(broker, client):
+            self.assertTrue(client.connected)
+            self.assertIsNotNone(client._sock_fd)
+            self.assertIn(client._sock_fd, client._loop._selector.get_map())
+            self.assertEqual(broker.connects, 1)
+
+        self.run_with_client(body)
+
+    def test_publish_goes_through_writer_hook(self):
+        async def body(broker, client):
+            self.assertTrue(await client.publish("office/a", {"v": 1}))
+            self.assertTrue(await client.publish("office/b", b"raw", qos=1, timeout=3.0))
+            await _until(lambda: len(broker.published) == 2)
+            self.assertEqual(broker.published, [("office/a", b'{"v": 1}'), ("office/b", b"raw")])
+
+        self.run_with_client(body)
+
+    def test_messages_dispatched_on_loop_thread(self):
+        async def body(broker, client):
+            received = []
+            loop_thread = threading.get_ident()
+            client.add_handler(
+                "office/+/sensor",
+                lambda topic, payload: received.append((topic, payload, threading.get_ident())),
+            )
+            stream = client.subscribe("office/#")
+            await _until(lambda: len(broker.subscriptions) == 2)
+
+            broker.send("office/main/sensor", b"42")
+            topic, payload = await asyncio.wait_for(stream.__anext__(), 3.0)
+            self.assertEqual((topic, payload), ("office/main/sensor", b"42"))
+            self.assertEqual(received, [("office/main/sensor", b"42", loop_thread)])
+
+        self.run_with_client(body)
+
+    def test_pause_reading_removes_reader(self):
+        async def body(broker, client):
+            received = []
+            client.add_handler("office/x", lambda t, p: received.append(p))
+            await _until(lambda: broker.subscriptions == ["office/x"])
+
+            client.pause_reading()
+            self.assertNotIn(client._sock_fd, client._loop._selector.get_map())
+            broker.send("office/x", b"1")
+            await asyncio.sleep(0.1)
+            self.assertEqual(received, [])
+
+            client.resume_reading()
+            await _until(lambda: received == [b"1"])
+
+        self.run_with_client(body)
+
+    def test_hooks_from_other_thread_run_on_loop(self):
+        async def run():
+            client = AsyncMQTTClient("127.0.0.1", 1)
+            client._loop = asyncio.get_running_loop()
+            a, b = socket.socketpair()
+            try:
+                t = threading.Thread(
+                    target=client._on_socket_open, args=(client._client, None, a)
+                )
+                t.start()
+                t.join()
+                # Handed off, not applied on the calling thread
+                self.assertIsNone(client._sock_fd)
+                await asyncio.sleep(0)
+                self.assertEqual(client._sock_fd, a.fileno())
+                self.assertIn(a.fileno(), client._loop._selector.get_map())
+
+                t = threading.Thread(
+                    target=client._on_socket_close, args=(client._client, None, a)
+                )
+                t.start()
+                t.join()
+                await asyncio.sleep(0)
+                self.assertIsNone(client._sock_fd)
+                self.assertNotIn(a.fileno(), client._loop._selector.get_map())
+            finally:
+                client._closing = True
+                if client._misc_task is not None:
+                    client._misc_task.cancel()
+                a.close()
+                b.close()
+
+        asyncio.run(run())
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: reconnect
+# ────────────────────────────────────────────────────────
+class TestReconnect(_BrokerCase):
+
+    def setUp(self):
+        patcher = patch.object(mqtt_async, "_BACKOFF_MIN_SEC", 0.05)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reconnects_and_resubscribes(self):
+        async def body(broker, client):
+            received = []
+            client.add_handler("office/x", lambda t, p: received.append(p))
+            await _until(lambda: broker.subscriptions == ["office/x"])
+
+            broker.drop()
+            await _until(lambda: not client.connected)
+            await _until(lambda: client.connected and len(broker.subscriptions) == 2)
+            self.assertEqual(broker.connects, 2)
+            self.assertEqual(broker.subscriptions, ["office/x", "office/x"])
+
+            broker.send("office/x", b"after")
+            await _until(lambda: received == [b"after"])
+
+        self.run_with_client(body)
+
+    def test_reconnect_does_not_block_loop(self):
+        async def body(broker, client):
+            reconnect = client._client.reconnect
+            threads = []
+
+            def slow_reconnect():
+                threads.append(threading.get_ident())
+                time.sleep(0.3)   # DNS lookup / TCP connect
+                return reconnect()
+
+            client._client.reconnect = slow_reconnect
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            broker.drop()
+            await _until(lambda: not client.connected)
+            await _until(lambda: client.connected)
+            task.cancel()
+
+            self.assertEqual(len(threads), 1)
+            self.assertNotEqual(threads[0], threading.get_ident())
+            self.assertGreater(ticks, 15)
+            # Socket hooks fired on the executor thread landed on the loop
+            self.assertIn(client._sock_fd, client._loop._selector.get_map())
+
+        self.run_with_client(body)
+
+    def test_backoff_while_broker_down(self):
+        async def run():
+            broker = FakeBroker()
+            await broker.start()
+            port = broker.port
+            client = AsyncMQTTClient("127.0.0.1", port)
+            await client.connect(timeout=3.0)
+
+            await broker.stop()
+            await _until(lambda: not client.connected)
+            await asyncio.sleep(0.4)   # 0.05 + 0.1 + 0.2 ... refused
+
+            broker = FakeBroker()
+            broker._server = await asyncio.start_server(broker._session, "127.0.0.1", port)
+            try:
+                await _until(lambda: client.connected, timeout=5.0)
+                self.assertEqual(broker.connects, 1)
+            finally:
+                await client.disconnect()
+                await broker.stop()
+
+        asyncio.run(run())
+
+    def test_no_reconnect_after_disconnect(self):
+        async def body(broker, client):
+            await client.disconnect()
+            await asyncio.sleep(0.2)
+            self.assertFalse(client.connected)
+            self.assertEqual(broker.connects, 1)
+
+        self.run_with_client(body)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: per-image copies
+# ────────────────────────────────────────────────────────
+class TestCopies(unittest.TestCase):
+
+    def test_perception_copy_matches_brain(self):
+        """Identical apart from the logger (loguru in brain, logging in perception)."""
+        def body(path):
+            with open(os.path.join(path, "mqtt_async.py"), encoding="utf-8") as f:
+                return [
+                    line for line in f.read().splitlines()
+                    if line not in (
+                        "import logging", "from loguru import logger",
+                        "logger = logging.getLogger(__name__)", "",
+                    )
+                ]
+
+        self.assertEqual(body(BRAIN_SRC), body(PERCEPTION_SRC))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain prompt layout (prefix caching).
+
+Consecutive cognitive cycles over an unchanged office must produce user
+messages that share a byte-identical prefix through the office state, so
+the LLM server can reuse its KV cache; only the trailing clock may differ.
+
+Usage:
+  python3 infra/scripts/test_prompt_prefix.py
+"""
+import sys
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+# Add brain src and shared modules to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+SHARED_SRC = os.path.join(os.path.dirname(__file__), "../../services/shared")
+sys.path.insert(0, BRAIN_SRC)
+sys.path.insert(0, SHARED_SRC)
+
+
+def _make_wm():
+    from world_model import WorldModel
+    wm = WorldModel()
+    wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+    wm.update_from_mqtt("office/main/sensor/env_01/co2", {"value": 650})
+    wm.update_from_mqtt("office/kitchen/sensor/env_02/humidity", {"value": 45.0})
+    return wm
+
+
+class TestPromptPrefix(unittest.TestCase):
+
+    ACTIVE_TASKS = [{"title": "コーヒー豆補充", "zone": "kitchen", "task_type": ["supply"]}]
+
+    def _user_content(self, wm, now, recent_actions=()):
+        from main import _build_user_content
+        return _build_user_content(
+            self.ACTIVE_TASKS, list(recent_actions), wm.get_llm_context(), [], [], now
+        )
+
+    def test_consecutive_cycles_share_prefix(self):
+        """Two cycles a few minutes apart with unchanged state."""
+        wm = _make_wm()
+        now = time.time()
+        actions = [{"time": now - 600, "tool": "speak", "summary": "main: 休憩", "success": True}]
+
+        first = self._user_content(wm, now, actions)
+        # Sensor noise below the context change thresholds
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.1})
+        with patch("time.time", return_value=now + 180):
+            second = self._user_content(wm, now + 180, actions)
+
+        clock = first.index("## 現在時刻")
+        self.assertEqual(first[:clock], second[:clock])
+        self.assertEqual(clock, second.index("## 現在時刻"))
+        # The office state is inside the shared prefix
+        self.assertLess(first.index("## 現在のオフィス状態"), clock)
+        self.assertIn("22.0", first[:clock])
+
+    def test_clock_is_last_section(self):
+        wm = _make_wm()
+        content = self._user_content(wm, time.time())
+        last_header = content.rindex("\n## ")
+        self.assertEqual(content.index("## 現在時刻"), last_header + 1)
+        self.assertNotIn("時点", content)
+
+    def test_state_change_changes_office_section(self):
+        wm = _make_wm()
+        now = time.time()
+        first = self._user_content(wm, now)
+        wm.update_from_mqtt("office/main/sensor/env_01/co2", {"value": 1400})
+        second = self._user_content(wm, now)
+        office = first.index("## 現在のオフィス状態")
+        self.assertEqual(first[:office], second[:office])
+        self.assertNotEqual(first[office:], second[office:])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
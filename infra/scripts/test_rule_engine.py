@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain rule fast path (rule_engine.py) and the
+serialization of side-effecting tool calls in ToolExecutor.
+
+Usage:
+  python3 infra/scripts/test_rule_engine.py
+"""
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from rule_engine import (  # noqa: E402
+    Co2Rule, RuleContext, RuleEngine, SedentaryRule, SensorTamperRule, TempSpikeRule,
+)
+from sanitizer import Sanitizer  # noqa: E402
+from tool_executor import ToolExecutor  # noqa: E402
+from world_model import Event, ZoneState  # noqa: E402
+
+
+def _event(event_type, severity="warning", seq=1, **data):
+    return Event(timestamp=time.time(), event_type=event_type, severity=severity, data=data, seq=seq)
+
+
+def _ctx(event, person_count=1, active_tasks=(), recent_events=()):
+    zone = ZoneState(zone_id="main")
+    zone.occupancy.person_count = person_count
+    return RuleContext(
+        zone_id="main",
+        event=event,
+        zone=zone,
+        active_tasks=list(active_tasks),
+        recent_events=list(recent_events),
+    )
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: individual rules
+# ────────────────────────────────────────────────────────
+class TestRules(unittest.TestCase):
+
+    def test_co2_creates_ventilation_task(self):
+        decision = Co2Rule().evaluate(_ctx(_event("co2_threshold_exceeded", value=1200)))
+        self.assertEqual(len(decision.actions), 1)
+        tool, args = decision.actions[0]
+        self.assertEqual(tool, "create_task")
+        self.assertEqual(args["title"], "mainの換気")
+        self.assertEqual(args["urgency"], 2)
+        self.assertEqual(args["zone"], "main")
+
+    def test_co2_very_high_is_more_urgent(self):
+        decision = Co2Rule().evaluate(_ctx(_event("co2_threshold_exceeded", value=1800)))
+        self.assertEqual(decision.actions[0][1]["urgency"], 3)
+
+    def test_co2_suppressed_by_active_task(self):
+        ctx = _ctx(
+            _event("co2_threshold_exceeded", value=1200),
+            active_tasks=[{"title": "mainの換気", "zone": "main"}],
+        )
+        decision = Co2Rule().evaluate(ctx)
+        self.assertIsNotNone(decision)
+        self.assertEqual(decision.actions, [])
+
+    def test_co2_task_in_other_zone_does_not_suppress(self):
+        ctx = _ctx(
+            _event("co2_threshold_exceeded", value=1200),
+            active_tasks=[{"title": "mainの換気", "zone": "kitchen"}],
+        )
+        self.assertEqual(len(Co2Rule().evaluate(ctx).actions), 1)
+
+    def test_temp_spike_outside_comfort_range(self):
+        decision = TempSpikeRule().evaluate(_ctx(_event("temp_spike", value=31.0)))
+        tool, args = decision.actions[0]
+        self.assertEqual(tool, "create_task")
+        self.assertIn("高温", args["title"])
+        self.assertEqual(args["urgency"], 3)
+
+        decision = TempSpikeRule().evaluate(_ctx(_event("temp_spike", value=16.0)))
+        self.assertIn("低温", decision.actions[0][1]["title"])
+        self.assertEqual(decision.actions[0][1]["urgency"], 2)
+
+    def test_temp_spike_within_comfort_range_defers(self):
+        self.assertIsNone(TempSpikeRule().evaluate(_ctx(_event("temp_spike", value=24.0))))
+        self.assertIsNone(TempSpikeRule().evaluate(_ctx(_event("temp_spike"))))
+
+    def test_temp_spike_suppressed_by_active_task(self):
+        ctx = _ctx(
+            _event("temp_spike", value=29.0),
+            active_tasks=[{"title": "mainの空調確認（高温）", "zone": "main"}],
+        )
+        self.assertEqual(TempSpikeRule().evaluate(ctx).actions, [])
+
+    def test_sedentary_speaks_and_rotates_messages(self):
+        rule = SedentaryRule()
+        ctx = _ctx(_event("sedentary_alert", severity="info", duration_sec=3000))
+        first = rule.evaluate(ctx).actions[0]
+        second = rule.evaluate(ctx).actions[0]
+        self.assertEqual(first[0], "speak")
+        self.assertEqual(first[1]["tone"], "caring")
+        self.assertIn("50分", first[1]["message"])
+        self.assertNotEqual(first[1]["message"], second[1]["message"])
+
+    def test_sensor_tamper_speaks_when_occupied(self):
+        decision = SensorTamperRule().evaluate(_ctx(_event("sensor_tamper", channel="humidity")))
+        tool, args = decision.actions[0]
+        self.assertEqual(tool, "speak")
+        self.assertEqual(args["tone"], "humorous")
+
+    def test_sensor_tamper_defers_when_empty_or_unknown(self):
+        rule = SensorTamperRule()
+        self.assertIsNone(rule.evaluate(_ctx(_event("sensor_tamper", channel="temperature"), person_count=0)))
+        self.assertIsNone(rule.evaluate(_ctx(_event("sensor_tamper", channel="co2"))))
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: RuleEngine dispatch
+# ────────────────────────────────────────────────────────
+class TestRuleEngine(unittest.TestCase):
+
+    def _make_engine(self, recent_events=(), active_tasks=()):
+        executor = MagicMock()
+        executor.execute = AsyncMock(return_value={"success": True, "result": "ok"})
+        dashboard = MagicMock()
+        dashboard.get_active_tasks = AsyncMock(return_value=list(active_tasks))
+        world_model = MagicMock()
+        world_model.recent_events_for.return_value = list(recent_events)
+        world_model.get_zone.return_value = ZoneState(zone_id="main")
+        return RuleEngine(executor, dashboard, world_model), executor
+
+    def test_handles_registered_event_types(self):
+        engine, _ = self._make_engine()
+        for event_type in ("co2_threshold_exceeded", "temp_spike", "sedentary_alert", "sensor_tamper"):
+            self.assertTrue(engine.handles(event_type))
+        self.assertFalse(engine.handles("person_entered"))
+
+    def test_executes_actions_through_tool_executor(self):
+        engine, executor = self._make_engine()
+        outcomes = asyncio.run(engine.handle("main", _event("co2_threshold_exceeded", value=1300)))
+        self.assertEqual([name for name, _, _ in outcomes], ["create_task"])
+        executor.execute.assert_awaited_once()
+        self.assertEqual(engine.stats(), {"handled": 1, "deferred": 0, "actions": 1})
+
+    def test_compound_situation_defers(self):
+        other = _event("temp_spike", value=30.0, seq=7)
+        engine, executor = self._make_engine(recent_events=[other])
+        outcome = asyncio.run(engine.handle("main", _event("co2_threshold_exceeded", value=1300, seq=8)))
+        self.assertIsNone(outcome)
+        executor.execute.assert_not_awaited()
+        self.assertEqual(engine.stats()["deferred"], 1)
+
+    def test_same_type_and_info_events_are_not_compound(self):
+        recent = [
+            _event("co2_threshold_exceeded", value=1100, seq=3),
+            _event("person_entered", severity="info", seq=4, count=1),
+        ]
+        engine, _ = self._make_engine(recent_events=recent)
+        outcomes = asyncio.run(engine.handle("main", _event("co2_threshold_exceeded", value=1300, seq=8)))
+        self.assertEqual(len(outcomes), 1)
+
+    def test_unregistered_event_returns_none(self):
+        engine, _ = self._make_engine()
+        self.assertIsNone(asyncio.run(engine.handle("main", _event("person_entered", severity="info"))))
+
+    def test_concurrent_events_create_one_task(self):
+        """Two CO2 alerts for one zone: the second sees the first's task."""
+        engine, executor = self._make_engine()
+        created = []
+
+        async def execute(tool_name, arguments):
+            await asyncio.sleep(0.05)  # dashboard POST
+            created.append({"title": arguments["title"], "zone": arguments["zone"]})
+            return {"success": True, "result": "ok"}
+
+        async def get_active_tasks():
+            return list(created)
+
+        executor.execute = execute
+        engine.dashboard.get_active_tasks = get_active_tasks
+
+        async def run():
+            return await asyncio.gather(
+                engine.handle("main", _event("co2_threshold_exceeded", value=1200, seq=1)),
+                engine.handle("main", _event("co2_threshold_exceeded", value=1250, seq=2)),
+            )
+
+        first, second = asyncio.run(run())
+        self.assertEqual(len(created), 1)
+        self.assertEqual(len(first) + len(second), 1)
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: rule actions interleaved with the ReAct cycle
+# ────────────────────────────────────────────────────────
+class TestToolSerialization(unittest.TestCase):
+    """Sanitizer validates before and records after the handler; concurrent
+    create_task/speak calls must not both pass the same check."""
+
+    def _make_executor(self, sanitizer):
+        dashboard = MagicMock()
+        dashboard.create_task_calls = []
+
+        async def create_task(**kwargs):
+            dashboard.create_task_calls.append(kwargs)
+            await asyncio.sleep(0.05)  # dashboard POST
+            return {"id": len(dashboard.create_task_calls)}
+
+        dashboard.create_task = create_task
+        executor = ToolExecutor(
+            sanitizer=sanitizer,
+            mcp_bridge=MagicMock(),
+            dashboard_client=dashboard,
+            world_model=MagicMock(),
+            task_queue=None,
+        )
+
+        async def slow_speak(args):
+            await asyncio.sleep(0.05)  # voice synthesis
+            sanitizer.record_speak(zone=args.get("zone") or "general")
+            return {"success": True, "result": "spoken"}
+
+        executor._handle_speak = slow_speak
+        return executor, dashboard
+
+    def test_concurrent_speak_respects_cooldown(self):
+        executor, _ = self._make_executor(Sanitizer())
+        args = {"message": "休憩しましょう", "zone": "main"}
+
+        async def run():
+            # One from a rule task, one from the cognitive cycle
+            return await asyncio.gather(
+                executor.execute("speak", dict(args)),
+                executor.execute("speak", dict(args)),
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(sorted(r["success"] for r in results), [False, True])
+        self.assertIn("cooldown", next(r for r in results if not r["success"])["error"])
+
+    def test_concurrent_create_task_respects_rate_limit(self):
+        sanitizer = Sanitizer()
+        sanitizer._max_tasks_per_hour = 1
+        executor, dashboard = self._make_executor(sanitizer)
+        args = {"title": "mainの換気", "bounty": 800, "urgency": 2, "zone": "main"}
+
+        async def run():
+            return await asyncio.gather(
+                executor.execute("create_task", dict(args)),
+                executor.execute("create_task", dict(args)),
+            )
+
+        results = asyncio.run(run())
+        self.assertEqual(len(dashboard.create_task_calls), 1)
+        self.assertEqual(sorted(r["success"] for r in results), [False, True])
+
+    def test_concurrent_tools_are_not_serialized(self):
+        executor, _ = self._make_executor(Sanitizer())
+        running = 0
+        peak = 0
+
+        async def slow_query():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return {"success": True, "result": "ok"}
+
+        executor._handle_get_active_tasks = slow_query
+
+        async def run():
+            await asyncio.gather(*(executor.execute("get_active_tasks", {}) for _ in range(3)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Perception TaskScheduler (scheduler.py): per-inference
+token bucket, priority/deadline slot assignment and load shedding, driven
+by fake monitors (no cameras or YOLO needed).
+
+Usage:
+  python3 infra/scripts/test_scheduler.py
+"""
+import sys
+import os
+import asyncio
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add perception src to path for imports
+PERCEPTION_SRC = os.path.join(os.path.dirname(__file__), "../../services/perception/src")
+sys.path.insert(0, PERCEPTION_SRC)
+
+from monitors.base import MonitorBase  # noqa: E402
+from monitors.change_gate import FrameChangeGate  # noqa: E402
+from scheduler import TaskScheduler  # noqa: E402
+
+_FRAME = np.zeros((48, 64, 3), dtype=np.uint8)
+
+
+class FakeMonitor(MonitorBase):
+    """Counts inferences; ``used`` inferences per analysed cycle (default: all)."""
+
+    def __init__(self, name, interval_sec=0.01, priority=1, cost=1, used=None):
+        super().__init__(name, camera_id=name, interval_sec=interval_sec,
+                         resolution="QVGA", priority=priority)
+        self.inference_cost = cost
+        self.used = used
+        self.change_gate = FrameChangeGate(enabled=False)
+        self.cycles = 0
+        self.inferences = 0
+
+    async def request_image(self):
+        return _FRAME
+
+    async def analyze(self, image):
+        self.cycles += 1
+        if self.used is not None:
+            self.last_cycle_inferences = self.used
+        self.inferences += self.last_cycle_inferences
+        return {}
+
+    async def process_results(self, detections):
+        pass
+
+
+def _run_for(scheduler, seconds):
+    async def run():
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(seconds)
+        for monitor in scheduler.monitors.values():
+            monitor.stop()
+        await asyncio.wait_for(task, 2.0)
+
+    asyncio.run(run())
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: token bucket
+# ────────────────────────────────────────────────────────
+class TestTokenBucket(unittest.TestCase):
+
+    def _scheduler(self, rate, *monitors):
+        scheduler = TaskScheduler(inferences_per_sec=rate)
+        for m in monitors:
+            scheduler.register_monitor(m.name, m)
+        return scheduler
+
+    def test_refill_over_time(self):
+        scheduler = self._scheduler(2.0, FakeMonitor("a"))
+        with patch("scheduler.time.monotonic", return_value=100.0):
+            scheduler._tokens, scheduler._tokens_at = 0.0, 100.0
+            self.assertFalse(scheduler._take_tokens(1))
+        with patch("scheduler.time.monotonic", return_value=100.5):
+            self.assertTrue(scheduler._take_tokens(1))
+            self.assertFalse(scheduler._take_tokens(1))
+        with patch("scheduler.time.monotonic", return_value=110.0):
+            scheduler._refill()
+            self.assertEqual(scheduler._tokens, 2.0)  # capped at capacity
+
+    def test_charges_inference_cost(self):
+        scheduler = self._scheduler(4.0, FakeMonitor("a", cost=2))
+        with patch("scheduler.time.monotonic", return_value=100.0):
+            scheduler._tokens, scheduler._tokens_at = 3.0, 100.0
+            self.assertTrue(scheduler._take_tokens(2))
+            self.assertFalse(scheduler._take_tokens(2))
+            self.assertAlmostEqual(scheduler._token_wait_sec(2), 0.25)
+            self.assertTrue(scheduler._take_tokens(0))
+
+    def test_capacity_fits_most_expensive_monitor(self):
+        scheduler = self._scheduler(1.0, FakeMonitor("a", cost=2))
+        self.assertEqual(scheduler._capacity, 2.0)
+
+    def test_unlimited_budget(self):
+        scheduler = self._scheduler(0.0, FakeMonitor("a", cost=2))
+        self.assertTrue(all(scheduler._take_tokens(2) for _ in range(100)))
+
+    def test_budget_bounds_inferences(self):
+        a = FakeMonitor("activity", cost=2, priority=2)
+        b = FakeMonitor("occupancy", cost=1, priority=1)
+        scheduler = self._scheduler(10.0, a, b)
+        start = time.monotonic()
+        _run_for(scheduler, 0.6)
+        elapsed = time.monotonic() - start
+        total = a.inferences + b.inferences
+        # Initial full bucket + refill over the run
+        self.assertLessEqual(total, scheduler._capacity + 10.0 * elapsed + 1)
+        self.assertGreater(total, 4)
+
+    def test_non_inference_monitor_not_throttled(self):
+        whiteboard = FakeMonitor("whiteboard", cost=0, priority=0, interval_sec=0.02)
+        activity = FakeMonitor("activity", cost=2, priority=2)
+        scheduler = self._scheduler(2.0, whiteboard, activity)
+        _run_for(scheduler, 0.5)
+        self.assertEqual(whiteboard.inferences, 0)
+        # Runs at its own interval while the GPU budget is exhausted
+        self.assertGreaterEqual(whiteboard.cycles, 10)
+        self.assertLessEqual(activity.inferences, 2 + 2.0 * 0.6)
+
+    def _run_one_cycle(self, scheduler, monitor):
+        async def run():
+            scheduler._wake = asyncio.Event()
+            self.assertTrue(scheduler._take_tokens(monitor.inference_cost))
+            await scheduler._run_monitor(monitor.name, monitor)
+
+        asyncio.run(run())
+
+    def test_unused_inferences_refunded(self):
+        for used, expected in ((None, 3.0), (1, 4.0), (0, 5.0)):
+            monitor = FakeMonitor("activity", cost=2, used=used)
+            scheduler = self._scheduler(10.0, monitor)
+            scheduler._tokens = 5.0
+            scheduler._refill = lambda: None   # no refill during the cycle
+            self._run_one_cycle(scheduler, monitor)
+            self.assertEqual(scheduler._tokens, expected, f"used={used}")
+
+    def test_skipped_cycle_refunds_everything(self):
+        monitor = FakeMonitor("activity", cost=2)
+        monitor.change_gate = FrameChangeGate(threshold=0.5)
+        monitor._last_analysis = {}
+        scheduler = self._scheduler(10.0, monitor)
+        # First frame always analyses (gate has no reference yet)
+        monitor.change_gate.should_skip(_FRAME)
+        scheduler._tokens = 5.0
+        scheduler._refill = lambda: None
+        self._run_one_cycle(scheduler, monitor)
+        self.assertEqual(monitor.cycles, 0)
+        self.assertEqual(scheduler._tokens, 5.0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: slot assignment
+# ────────────────────────────────────────────────────────
+class TestSlotAssignment(unittest.TestCase):
+
+    def test_priority_then_deadline(self):
+        scheduler = TaskScheduler()
+        low = FakeMonitor("low", priority=0)
+        high_late = FakeMonitor("high_late", priority=2)
+        high_early = FakeMonitor("high_early", priority=2)
+        for m in (low, high_late, high_early):
+            scheduler.register_monitor(m.name, m)
+        scheduler._next_due = {"low": 1.0, "high_late": 5.0, "high_early": 3.0}
+
+        self.assertEqual(scheduler._pick_due(10.0), "high_early")
+        scheduler._running.add("high_early")
+        self.assertEqual(scheduler._pick_due(10.0), "high_late")
+        scheduler._running.add("high_late")
+        self.assertEqual(scheduler._pick_due(10.0), "low")
+        # Not yet due
+        scheduler._running.clear()
+        self.assertEqual(scheduler._pick_due(4.0), "high_early")
+        self.assertEqual(scheduler._pick_due(2.0), "low")
+        self.assertIsNone(scheduler._pick_due(0.5))
+
+    def test_disabled_monitor_skipped(self):
+        scheduler = TaskScheduler()
+        m = FakeMonitor("m")
+        scheduler.register_monitor("m", m)
+        scheduler._next_due = {"m": 0.0}
+        m.stop()
+        self.assertIsNone(scheduler._pick_due(1.0))
+
+    def test_phases_spread_over_interval(self):
+        scheduler = TaskScheduler()
+        for i in range(4):
+            scheduler.register_monitor(f"m{i}", FakeMonitor(f"m{i}", interval_sec=8.0))
+        with patch("scheduler.time.monotonic", return_value=100.0):
+            scheduler._spread_phases()
+        self.assertEqual(sorted(scheduler._next_due.values()), [100.0, 102.0, 104.0, 106.0])
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: load shedding
+# ────────────────────────────────────────────────────────
+class TestLoadShedding(unittest.TestCase):
+
+    def _scheduler(self, rate, *monitors):
+        scheduler = TaskScheduler(inferences_per_sec=rate)
+        for m in monitors:
+            scheduler.register_monitor(m.name, m)
+        return scheduler
+
+    def test_within_budget_no_stretch(self):
+        scheduler = self._scheduler(
+            4.0,
+            FakeMonitor("activity", interval_sec=1.0, priority=2, cost=2),
+            FakeMonitor("occupancy", interval_sec=1.0, priority=1, cost=1),
+        )
+        scheduler._update_stretch()
+        self.assertEqual(scheduler._stretch, {})
+        self.assertEqual(scheduler.stats()["demand_per_sec"], 3.0)
+
+    def test_lowest_priority_stretched_first(self):
+        scheduler = self._scheduler(
+            2.5,
+            FakeMonitor("activity", interval_sec=1.0, priority=2, cost=2),
+            FakeMonitor("occupancy", interval_sec=1.0, priority=1, cost=1),
+        )
+        scheduler._update_stretch()
+        # 0.5 inf/s excess absorbed by priority 1 alone: 1 / (1 - 0.5) = 2x
+        self.assertEqual(set(scheduler._stretch), {1})
+        self.assertAlmostEqual(scheduler._stretch[1], 2.0)
+
+    def test_stretch_capped_then_next_priority(self):
+        scheduler = self._scheduler(
+            1.0,
+            FakeMonitor("activity", interval_sec=1.0, priority=2, cost=2),
+            FakeMonitor("occupancy", interval_sec=1.0, priority=1, cost=1),
+        )
+        scheduler._update_stretch()
+        self.assertAlmostEqual(scheduler._stretch[1], 8.0)
+        self.assertIn(2, scheduler._stretch)
+        # Remaining demand matches the budget
+        demand = 2.0 / scheduler._stretch[2] + 1.0 / scheduler._stretch[1]
+        self.assertAlmostEqual(demand, 1.0)
+
+    def test_non_inference_monitors_never_stretched(self):
+        scheduler = self._scheduler(
+            1.0,
+            FakeMonitor("whiteboard", interval_sec=0.1, priority=0, cost=0),
+            FakeMonitor("activity", interval_sec=1.0, priority=2, cost=2),
+        )
+        scheduler._update_stretch()
+        self.assertNotIn(0, scheduler._stretch)
+        self.assertIn(2, scheduler._stretch)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Brain streaming sensor fusion (world_model/sensor_fusion.py):
+SensorRing's incremental decayed sums against a brute-force weighted mean
+over the same readings, across ring wraparound, out-of-order readings,
+long idle gaps and max-age eviction.
+
+Usage:
+  python3 infra/scripts/test_sensor_fusion.py
+"""
+import sys
+import os
+import math
+import random
+import unittest
+from unittest.mock import patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from world_model.sensor_fusion import SensorFusion, SensorRing  # noqa: E402
+
+CAPACITY = 128
+T0 = 1.7e9  # realistic epoch timestamps (large absolute values)
+RTOL = 1e-9
+
+
+def brute_force(readings, now, half_life):
+    """Σ r·v·exp(-(now - t)/hl) / Σ r·exp(-(now - t)/hl), or None."""
+    vsum = wsum = 0.0
+    for value, timestamp, reliability in readings:
+        weight = reliability * math.exp(-(now - timestamp) / half_life)
+        vsum += value * weight
+        wsum += weight
+    return vsum / wsum if wsum > 0 else None
+
+
+def ring_mean(ring, now):
+    vsum, wsum = ring.totals(now)
+    return vsum / wsum if wsum > 0 else None
+
+
+class _CompareCase(unittest.TestCase):
+
+    def assertMatches(self, ring, now, msg=None):
+        expected = brute_force(ring.readings, now, ring.half_life)
+        got = ring_mean(ring, now)
+        if expected is None:
+            self.assertIsNone(got, msg)
+            return
+        self.assertIsNotNone(got, msg)
+        self.assertLessEqual(abs(got - expected), RTOL * max(1.0, abs(expected)), msg)
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: SensorRing vs brute force
+# ────────────────────────────────────────────────────────
+class TestSensorRing(_CompareCase):
+
+    def test_matches_before_wraparound(self):
+        rng = random.Random(1)
+        ring = SensorRing(half_life=120.0, capacity=CAPACITY)
+        t = T0
+        for i in range(CAPACITY):
+            t += rng.uniform(1.0, 10.0)
+            ring.add(rng.gauss(22.0, 2.0), t, rng.choice((0.5, 0.8)))
+            self.assertMatches(ring, t + rng.uniform(0, 30), f"reading {i}")
+        self.assertEqual(len(ring.readings), CAPACITY)
+
+    def test_matches_across_wraparound(self):
+        rng = random.Random(2)
+        ring = SensorRing(half_life=60.0, capacity=CAPACITY)
+        t = T0
+        for i in range(CAPACITY * 20 + 7):
+            t += rng.uniform(0.5, 5.0)
+            ring.add(rng.gauss(800.0, 300.0), t, rng.choice((0.3, 0.5, 0.9)))
+            self.assertEqual(len(ring.readings), min(i + 1, CAPACITY))
+            self.assertMatches(ring, t, f"reading {i}")
+
+    def test_out_of_order_readings(self):
+        rng = random.Random(3)
+        ring = SensorRing(half_life=30.0, capacity=CAPACITY)
+        t = T0
+        for i in range(CAPACITY * 5):
+            t += rng.uniform(0.5, 5.0)
+            # Network jitter: up to 8s late
+            ring.add(rng.gauss(50.0, 10.0), t - rng.uniform(0, 8.0), 0.5)
+            self.assertMatches(ring, t, f"reading {i}")
+
+    def test_long_idle_gaps(self):
+        """Gaps of hours/days: decay factors underflow towards 0."""
+        rng = random.Random(4)
+        ring = SensorRing(half_life=10.0, capacity=CAPACITY)
+        t = T0
+        for i in range(CAPACITY * 10):
+            if i % 50 == 0:
+                t += rng.choice((3600.0, 7100.0, 36000.0, 3 * 86400.0))
+            t += rng.uniform(0.5, 5.0)
+            ring.add(rng.gauss(400.0, 50.0), t, rng.choice((0.3, 0.9)))
+            self.assertMatches(ring, t + rng.uniform(0, 20), f"reading {i}")
+
+    def test_gap_then_few_readings(self):
+        """After a gap only the fresh readings carry weight."""
+        ring = SensorRing(half_life=10.0, capacity=CAPACITY)
+        for i in range(CAPACITY):
+            ring.add(100.0, T0 + i, 0.5)
+        t = T0 + CAPACITY + 86400.0
+        ring.add(20.0, t, 0.5)
+        ring.add(30.0, t + 1.0, 0.5)
+        self.assertMatches(ring, t + 1.0)
+        self.assertAlmostEqual(ring_mean(ring, t + 1.0), brute_force(
+            [(20.0, t, 0.5), (30.0, t + 1.0, 0.5)], t + 1.0, 10.0
+        ), places=9)
+
+    def test_no_drift_after_large_readings_leave(self):
+        """Subtracting huge evicted contributions must not leave a residue.
+
+        Without the periodic rebase the cancellation error of the 1e12
+        readings stays in the sums (~3e-4 relative here).
+        """
+        rng = random.Random(5)
+        ring = SensorRing(half_life=1e7, capacity=CAPACITY)
+        t = T0
+        for _ in range(CAPACITY):
+            t += 1.0
+            ring.add(1e12 * rng.uniform(0.5, 1.5), t, rng.uniform(0.1, 1.0))
+        for i in range(CAPACITY * 20):
+            t += 1.0
+            ring.add(rng.gauss(20.0, 1.0), t, rng.uniform(0.1, 1.0))
+            if i >= CAPACITY:   # every 1e12 reading has been evicted
+                self.assertMatches(ring, t, f"reading {i}")
+
+    def test_evict_before(self):
+        rng = random.Random(6)
+        ring = SensorRing(half_life=60.0, capacity=CAPACITY)
+        t = T0
+        for _ in range(CAPACITY + 40):
+            t += 2.0
+            ring.add(rng.gauss(22.0, 1.0), t, 0.5)
+        for cutoff in (t - 200.0, t - 100.0, t - 10.0):
+            ring.evict_before(cutoff)
+            self.assertTrue(all(ts > cutoff for _, ts, _ in ring.readings))
+            self.assertMatches(ring, t)
+        ring.evict_before(t)
+        self.assertEqual(len(ring.readings), 0)
+        self.assertEqual((ring.vsum, ring.wsum), (0.0, 0.0))
+        self.assertIsNone(ring_mean(ring, t))
+        # Reusable after being emptied
+        ring.add(5.0, t + 1.0, 0.5)
+        self.assertAlmostEqual(ring_mean(ring, t + 1.0), 5.0)
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: SensorFusion streaming vs fuse_generic
+# ────────────────────────────────────────────────────────
+class TestStreamingFusion(unittest.TestCase):
+
+    def test_add_reading_matches_fuse_generic(self):
+        """Multiple devices, max-age window and ring capacity, with idle gaps."""
+        rng = random.Random(7)
+        fusion = SensorFusion(ring_capacity=CAPACITY, max_age_sec=600)
+        fusion.set_reliability("env_01", 0.9)
+        fusion.set_reliability("env_02", 0.4)
+        devices = ("env_01", "env_02", "env_03")   # env_03: default reliability
+        history = {d: [] for d in devices}
+        t = T0
+        for i in range(3000):
+            if i % 400 == 0:
+                t += rng.choice((700.0, 7200.0))     # everything ages out
+            t += rng.uniform(0.2, 3.0)
+            device = rng.choice(devices)
+            value = rng.gauss(900.0, 200.0)
+            history[device].append((value, t))
+            fused = fusion.add_reading("main", "co2", device, value, timestamp=t)
+
+            window = [
+                (d, v, ts)
+                for d in devices
+                for v, ts in history[d][-CAPACITY:]
+                if ts > t - 600
+            ]
+            with patch("world_model.sensor_fusion.time.time", return_value=t):
+                expected = fusion.fuse_generic(window, "co2")
+            self.assertAlmostEqual(fused, expected, delta=RTOL * abs(expected), msg=f"reading {i}")
+
+    def test_fused_value_after_idle(self):
+        fusion = SensorFusion()
+        fusion.add_reading("main", "temperature", "env_01", 22.0, timestamp=T0)
+        fusion.add_reading("main", "temperature", "env_02", 24.0, timestamp=T0 + 10)
+        expected = brute_force([(22.0, T0, 0.5), (24.0, T0 + 10, 0.5)], T0 + 500, 120.0)
+        self.assertAlmostEqual(fusion.fused_value("main", "temperature", T0 + 500), expected)
+        # Past max_age every ring is empty
+        self.assertIsNone(fusion.fused_value("main", "temperature", T0 + 700))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Unit tests for Brain tool batching (ToolExecutor.group_calls /
+execute_batch) and device commands over MCPBridge: call grouping, result
+order, per-call timeouts and fail-fast publishing, with a fake MQTT client.
+
+Usage:
+  python3 infra/scripts/test_tool_batch.py
+"""
+import sys
+import os
+import asyncio
+import json
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+import tool_executor  # noqa: E402
+from mcp_bridge import MCPBridge  # noqa: E402
+from sanitizer import Sanitizer  # noqa: E402
+from tool_executor import ToolExecutor  # noqa: E402
+
+DEVICE = "swarm_hub_01"
+
+
+class FakeMQTT:
+    """Records publishes; ``reply_after`` answers call_tool requests."""
+
+    def __init__(self, connected=True, reply_after=None):
+        self.connected = connected
+        self.reply_after = reply_after
+        self.published = []
+        self._handlers = []
+
+    def add_handler(self, topic_filter, handler, qos=0):
+        self._handlers.append(handler)
+
+    async def publish(self, topic, payload, qos=0, retain=False, timeout=10.0):
+        if not self.connected:
+            return False
+        self.published.append((topic, payload))
+        if self.reply_after is not None:
+            request = json.loads(payload)
+            agent_id = topic.split("/")[1]
+            response = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": {"ok": True}})
+            asyncio.get_running_loop().call_later(
+                self.reply_after,
+                lambda: [h(f"mcp/{agent_id}/response/{request['id']}", response.encode())
+                         for h in self._handlers],
+            )
+        return True
+
+
+def _make_executor(mqtt=None):
+    bridge = MCPBridge(mqtt or FakeMQTT(reply_after=0.0))
+    executor = ToolExecutor(
+        sanitizer=Sanitizer(),
+        mcp_bridge=bridge,
+        dashboard_client=MagicMock(),
+        world_model=MagicMock(),
+        task_queue=None,
+    )
+    return executor, bridge
+
+
+def _device_call(tool_name="toggle_light"):
+    return ("send_device_command", {"agent_id": DEVICE, "tool_name": tool_name, "arguments": "{}"})
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: group_calls
+# ────────────────────────────────────────────────────────
+class TestGroupCalls(unittest.TestCase):
+
+    def test_consecutive_concurrent_tools_share_group(self):
+        names = ["get_zone_status", "get_active_tasks", "send_device_command"]
+        self.assertEqual(ToolExecutor.group_calls(names), [[0, 1, 2]])
+
+    def test_side_effecting_tools_run_alone_in_order(self):
+        names = [
+            "get_zone_status", "get_zone_status", "create_task",
+            "send_device_command", "speak", "speak", "get_active_tasks",
+        ]
+        self.assertEqual(
+            ToolExecutor.group_calls(names),
+            [[0, 1], [2], [3], [4], [5], [6]],
+        )
+
+    def test_empty_and_unknown(self):
+        self.assertEqual(ToolExecutor.group_calls([]), [])
+        self.assertEqual(
+            ToolExecutor.group_calls(["bogus", "get_zone_status", "bogus"]),
+            [[0], [1], [2]],
+        )
+
+    def test_groups_cover_every_call_once(self):
+        names = ["speak", "get_zone_status", "get_active_tasks", "create_task", "get_zone_status"]
+        flat = [i for group in ToolExecutor.group_calls(names) for i in group]
+        self.assertEqual(flat, list(range(len(names))))
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: execute_batch
+# ────────────────────────────────────────────────────────
+class TestExecuteBatch(unittest.TestCase):
+
+    def _slow_zone_status(self, executor, delays):
+        """get_zone_status handler sleeping delays[zone_id]."""
+        async def handler(args):
+            await asyncio.sleep(delays[args["zone_id"]])
+            return {"success": True, "result": args["zone_id"]}
+
+        executor._handle_get_zone_status = handler
+
+    def test_results_in_call_order_and_concurrent(self):
+        executor, _ = _make_executor()
+        self._slow_zone_status(executor, {"a": 0.15, "b": 0.05, "c": 0.10})
+        calls = [("get_zone_status", {"zone_id": z}) for z in "abc"]
+
+        start = time.monotonic()
+        results = asyncio.run(executor.execute_batch(calls))
+        elapsed = time.monotonic() - start
+
+        self.assertEqual([r["result"] for r in results], ["a", "b", "c"])
+        self.assertLess(elapsed, 0.25)   # not 0.30 sequential
+
+    def test_timeout_is_per_call(self):
+        executor, _ = _make_executor()
+        self._slow_zone_status(executor, {"fast": 0.01, "stuck": 10.0})
+        calls = [("get_zone_status", {"zone_id": z}) for z in ("fast", "stuck", "fast")]
+
+        with patch.dict(tool_executor.TOOL_TIMEOUTS, {"get_zone_status": 0.1}):
+            start = time.monotonic()
+            results = asyncio.run(executor.execute_batch(calls))
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([r["success"] for r in results], [True, False, True])
+        self.assertIn("timed out after 0.1s", results[1]["error"])
+        self.assertLess(elapsed, 1.0)
+
+    def test_timeout_raised_by_handler_is_not_the_tool_timeout(self):
+        executor, _ = _make_executor()
+
+        async def handler(args):
+            # e.g. an aiohttp ClientTimeout or an inner wait_for
+            raise asyncio.TimeoutError(f"Zone service timed out: {args['zone_id']}")
+
+        executor._handle_get_zone_status = handler
+        start = time.monotonic()
+        result = asyncio.run(executor.execute("get_zone_status", {"zone_id": "a"}))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Zone service timed out: a")
+
+        async def bare(args):
+            raise TimeoutError
+
+        executor._handle_get_zone_status = bare
+        result = asyncio.run(executor.execute("get_zone_status", {"zone_id": "a"}))
+        self.assertEqual(result["error"], "Timeout inside get_zone_status")
+
+    def test_started_calls_are_awaited_not_rerun(self):
+        executor, _ = _make_executor()
+        runs = []
+
+        async def handler(args):
+            runs.append(args["zone_id"])
+            return {"success": True, "result": args["zone_id"]}
+
+        executor._handle_get_zone_status = handler
+        calls = [("get_zone_status", {"zone_id": z}) for z in "ab"]
+
+        async def run():
+            early = asyncio.ensure_future(executor.execute(*calls[0]))
+            return await executor.execute_batch(calls, [early, None])
+
+        results = asyncio.run(run())
+        self.assertEqual([r["result"] for r in results], ["a", "b"])
+        self.assertEqual(sorted(runs), ["a", "b"])
+
+    def test_cancelling_batch_drops_pending_requests(self):
+        executor, bridge = _make_executor(FakeMQTT())   # device never answers
+
+        async def run():
+            batch = asyncio.ensure_future(
+                executor.execute_batch([_device_call("a"), _device_call("b")])
+            )
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(bridge.pending_requests), 2)
+            batch.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await batch
+
+        asyncio.run(run())
+        self.assertEqual(bridge.pending_requests, {})
+
+
+# ────────────────────────────────────────────────────────
+# Test 3: device commands over MCPBridge
+# ────────────────────────────────────────────────────────
+class TestDeviceCommand(unittest.TestCase):
+
+    def test_reply_returns_result(self):
+        executor, bridge = _make_executor(FakeMQTT(reply_after=0.01))
+        result = asyncio.run(executor.execute(*_device_call()))
+        self.assertTrue(result["success"], result)
+        self.assertIn('"ok": true', result["result"])
+        self.assertEqual(bridge.pending_requests, {})
+
+    def test_inner_timeout_fires_before_outer(self):
+        self.assertGreater(tool_executor.DEVICE_REPLY_MARGIN_SEC, 0)
+        executor, bridge = _make_executor(FakeMQTT())   # device never answers
+
+        with patch.dict(tool_executor.TOOL_TIMEOUTS, {"send_device_command": 0.3}), \
+                patch.object(tool_executor, "DEVICE_REPLY_MARGIN_SEC", 0.1):
+            start = time.monotonic()
+            result = asyncio.run(executor.execute(*_device_call()))
+            elapsed = time.monotonic() - start
+
+        self.assertFalse(result["success"])
+        # MCPBridge's own error, not the generic outer tool timeout
+        self.assertIn(f"Tool execution timed out: toggle_light on {DEVICE}", result["error"])
+        self.assertLess(elapsed, 0.3)
+        self.assertEqual(bridge.pending_requests, {})
+
+    def test_publish_failure_fails_fast(self):
+        executor, bridge = _make_executor(FakeMQTT(connected=False))
+        start = time.monotonic()
+        result = asyncio.run(executor.execute(*_device_call()))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertFalse(result["success"])
+        self.assertIn("Failed to publish", result["error"])
+        self.assertEqual(bridge.pending_requests, {})
+
+    def test_call_tool_raises_on_publish_failure(self):
+        bridge = MCPBridge(FakeMQTT(connected=False))
+        with self.assertRaises(ConnectionError):
+            asyncio.run(bridge.call_tool(DEVICE, "toggle_light", {}, timeout=5.0))
+
+    def test_error_reply_raises(self):
+        mqtt = FakeMQTT()
+        bridge = MCPBridge(mqtt)
+
+        async def run():
+            call = asyncio.ensure_future(bridge.call_tool(DEVICE, "toggle_light", {}))
+            await asyncio.sleep(0.01)
+            request = json.loads(mqtt.published[0][1])
+            bridge.handle_response(
+                f"mcp/{DEVICE}/response/{request['id']}",
+                {"id": request["id"], "error": "relay fault"},
+            )
+            return await call
+
+        with self.assertRaisesRegex(Exception, "relay fault"):
+            asyncio.run(run())
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the WorldModel topic router (world_model/topic_router.py):
+every topic shape the former if/elif chain in update_from_mqtt handled
+resolves to the same fields and handler, unknown and malformed topics
+behave as before, and the per-topic LRU cache evicts and clears correctly.
+
+Usage:
+  python3 infra/scripts/test_topic_router.py
+"""
+import sys
+import os
+import unittest
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from world_model import WorldModel  # noqa: E402
+from world_model.topic_router import TopicRoute, TopicRouter  # noqa: E402
+
+
+def _legacy_parse(topic):
+    """WorldModel._parse_topic as it was before the router."""
+    parts = topic.split('/')
+    if len(parts) < 3 or parts[0] != "office":
+        return None
+    return {
+        "zone": parts[1],
+        "device_type": parts[2],
+        "device_id": parts[3] if len(parts) > 3 else None,
+        "channel": parts[4] if len(parts) > 4 else None,
+    }
+
+
+# device_type -> WorldModel handler of the former if/elif chain
+LEGACY_HANDLERS = {
+    "sensor": "_update_environment",
+    "camera": "_update_occupancy",
+    "occupancy": "_update_occupancy",
+    "activity": "_update_activity",
+    "task_report": "_handle_task_report",
+    "hvac": "_update_device",
+    "light": "_update_device",
+    "coffee_machine": "_update_device",
+}
+
+TOPICS = [
+    "office/main/sensor/env_01/temperature",
+    "office/meeting_room_a/sensor/pir_01/motion",
+    "office/main/sensor/door_01/door",
+    "office/main/camera/cam_01/status",
+    "office/main/occupancy/occ_01/status",
+    "office/main/activity/cam_01/status",
+    "office/main/task_report/task_42",
+    "office/main/hvac/ac_01/state",
+    "office/main/light/light_01/state",
+    "office/main/coffee_machine/cm_01/state",
+    # short / long / odd shapes
+    "office/main/sensor",
+    "office/main/sensor/env_01",
+    "office/main/sensor/env_01/temperature/extra",
+    "office//sensor/env_01/temperature",
+    "office/main/camera",
+    "office/main/unknown_type/dev_01/value",
+    # not routed
+    "office/main",
+    "office",
+    "",
+    "home/main/sensor/env_01/temperature",
+    "Office/main/sensor/env_01/temperature",
+    "/office/main/sensor/env_01/temperature",
+]
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: parity with the former parser and dispatch
+# ────────────────────────────────────────────────────────
+class TestRouting(unittest.TestCase):
+
+    def test_fields_match_legacy_parser(self):
+        router = WorldModel()._router
+        for topic in TOPICS:
+            with self.subTest(topic=topic):
+                resolved = router.route(topic)
+                expected = _legacy_parse(topic)
+                if expected is None:
+                    self.assertIsNone(resolved)
+                else:
+                    self.assertEqual(resolved[0]._asdict(), expected)
+
+    def test_handlers_match_legacy_dispatch(self):
+        router = WorldModel()._router
+        for topic in TOPICS:
+            resolved = router.route(topic)
+            if resolved is None:
+                continue
+            route, handler = resolved
+            with self.subTest(topic=topic):
+                expected = LEGACY_HANDLERS.get(route.device_type)
+                if expected is None:
+                    self.assertIsNone(handler)
+                else:
+                    self.assertEqual(handler.__name__, expected)
+
+    def test_unknown_device_type_creates_zone_only(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/unknown_type/dev_01/value", {"value": 1})
+        zone = wm.get_zone("main")
+        self.assertIsNotNone(zone)
+        self.assertEqual(zone.devices, {})
+        self.assertIsNone(zone.environment.temperature)
+
+    def test_non_office_topics_ignored(self):
+        wm = WorldModel()
+        for topic in ("office/main", "", "home/main/sensor/env_01/temperature"):
+            wm.update_from_mqtt(topic, {"value": 22.0})
+        self.assertEqual(wm.get_all_zones(), {})
+
+    def test_malformed_topics_do_not_raise(self):
+        wm = WorldModel()
+        for topic in TOPICS:
+            with self.subTest(topic=topic):
+                wm.update_from_mqtt(topic, {"value": 22.0, "person_count": 1})
+        self.assertAlmostEqual(wm.get_zone("main").environment.temperature, 22.0)
+        self.assertIn("", wm.get_all_zones())   # empty zone segment, as before
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: registration and cache
+# ────────────────────────────────────────────────────────
+class TestRouterCache(unittest.TestCase):
+
+    def test_register_many_and_replace(self):
+        router = TopicRouter()
+        a, b = object(), object()
+        router.register(("x", "y"), a)
+        self.assertIs(router.route("office/z/x/d/c")[1], a)
+        self.assertIs(router.route("office/z/y/d/c")[1], a)
+        router.register("x", b)
+        # The cached resolution for x is dropped by register()
+        self.assertIs(router.route("office/z/x/d/c")[1], b)
+        self.assertIs(router.route("office/z/y/d/c")[1], a)
+
+    def test_repeated_topic_hits_cache(self):
+        router = TopicRouter()
+        first = router.route("office/main/sensor/env_01/temperature")
+        self.assertIs(router.route("office/main/sensor/env_01/temperature"), first)
+        info = router.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        self.assertEqual(first[0], TopicRoute("main", "sensor", "env_01", "temperature"))
+
+    def test_lru_eviction(self):
+        router = TopicRouter(cache_size=2)
+        a, b, c = ("office/main/sensor/env_01/" + ch for ch in ("temperature", "humidity", "co2"))
+        router.route(a)
+        router.route(b)
+        router.route(a)          # a is now most recent
+        router.route(c)          # evicts b
+        self.assertEqual(router.cache_info().currsize, 2)
+        misses = router.cache_info().misses
+        router.route(a)
+        self.assertEqual(router.cache_info().misses, misses)
+        router.route(b)
+        self.assertEqual(router.cache_info().misses, misses + 1)
+        # Evicted topics still resolve correctly
+        self.assertEqual(router.route(b)[0].channel, "humidity")
+
+    def test_unrouted_topics_cached_too(self):
+        router = TopicRouter(cache_size=4)
+        self.assertIsNone(router.route("home/x/y"))
+        self.assertIsNone(router.route("home/x/y"))
+        self.assertEqual(router.cache_info().hits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the WorldModel zone store (world_model/zone_store.py): the
+cached pydantic ZoneState views are rebuilt after every mutation path of
+update_from_mqtt (version bump), reused while nothing changed, detached
+from the store, and equal to a validated ZoneState built from the same
+values (the output of the pre-record WorldModel).
+
+Usage:
+  python3 infra/scripts/test_zone_store.py
+"""
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+# Add brain src to path for imports
+BRAIN_SRC = os.path.join(os.path.dirname(__file__), "../../services/brain/src")
+sys.path.insert(0, BRAIN_SRC)
+
+from world_model import WorldModel  # noqa: E402
+from world_model.data_classes import (  # noqa: E402
+    DeviceState, EnvironmentData, Event, OccupancyData, ZoneState,
+)
+from world_model.zone_store import ENV_CHANNELS  # noqa: E402
+
+NOW = 1_700_000_000.0
+
+# (topic, payload, check(view)) for every shape update_from_mqtt routes
+MUTATIONS = [
+    ("office/main/sensor/env_01/temperature", {"value": 23.0},
+     lambda z: 22.0 < z.environment.temperature < 23.0),   # fused with 22.0
+    ("office/main/sensor/env_01/co2", {"co2": 700},
+     lambda z: z.environment.co2 == 700),
+    ("office/main/sensor/env_01/water_level", {"value": 40.0},
+     lambda z: z.environment.water_level == 40.0),
+    ("office/main/sensor/pir_01/motion", {"value": 1},
+     lambda z: z.occupancy.pir_detected and z.occupancy.person_count == 1),
+    ("office/main/sensor/door_01/door", {"value": 1},
+     lambda z: "door" in z.environment.timestamps),
+    ("office/main/camera/cam_01/status", {"person_count": 3},
+     lambda z: z.occupancy.vision_count == 3 and z.occupancy.person_count == 3),
+    ("office/main/occupancy/occ_01/status", {"count": 2, "avg_motion_level": 0.4},
+     lambda z: z.occupancy.person_count == 2 and z.occupancy.avg_motion_level == 0.4),
+    ("office/main/activity/cam_01/status", {"activity_class": "high", "posture_status": "changing"},
+     lambda z: z.occupancy.activity_class == "high" and z.occupancy.posture_status == "changing"),
+    ("office/main/task_report/task_5", {"task_id": 5, "report_status": "resolved"},
+     lambda z: z.events[-1].event_type == "task_report"),
+    ("office/main/hvac/ac_01/state", {"power_state": "on", "mode": "cool"},
+     lambda z: z.devices["ac_01"].specific_state["mode"] == "cool"),
+    ("office/main/light/light_01/state", {"state": "on"},
+     lambda z: z.devices["light_01"].power_state == "on"),
+    ("office/main/coffee_machine/cm_01/state", {"power_state": "standby"},
+     lambda z: z.devices["cm_01"].device_type == "coffee_machine"),
+]
+
+
+# ────────────────────────────────────────────────────────
+# Test 1: view cache invalidation
+# ────────────────────────────────────────────────────────
+class TestViewCache(unittest.TestCase):
+
+    def test_view_reused_until_update(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+        view = wm.get_zone("main")
+        self.assertIs(wm.get_zone("main"), view)
+        self.assertIs(wm.get_all_zones()["main"], view)
+        self.assertIs(wm.zones["main"], view)
+
+    def test_every_mutation_path_invalidates(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+        for topic, payload, check in MUTATIONS:
+            with self.subTest(topic=topic, payload=payload):
+                record = wm._zones["main"]
+                before_version = record.version
+                before = wm.get_zone("main")
+                wm.update_from_mqtt(topic, payload)
+                self.assertEqual(record.version, before_version + 1)
+                after = wm.get_zone("main")
+                self.assertIsNot(after, before)
+                self.assertTrue(check(after))
+                self.assertIs(wm.get_zone("main"), after)
+
+    def test_old_view_is_a_snapshot(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/camera/cam_01/status", {"person_count": 1})
+        old = wm.get_zone("main")
+        wm.update_from_mqtt("office/main/camera/cam_01/status", {"person_count": 4})
+        wm.update_from_mqtt("office/main/hvac/ac_01/state", {"mode": "heat"})
+        self.assertEqual(old.occupancy.person_count, 1)
+        self.assertEqual(len(old.events), 1)
+        self.assertEqual(old.devices, {})
+
+    def test_view_mutation_does_not_write_back(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+        wm.update_from_mqtt("office/main/hvac/ac_01/state", {"power_state": "on", "mode": "cool"})
+        wm.update_from_mqtt("office/main/camera/cam_01/status", {"person_count": 1})
+        view = wm.get_zone("main")
+        view.environment.temperature = 30.0
+        view.environment.timestamps.clear()
+        view.occupancy.activity_distribution["active"] = 9
+        view.devices["ac_01"].specific_state["mode"] = "heat"
+        view.devices.clear()
+        view.events.clear()
+
+        record = wm._zones["main"]
+        self.assertEqual(record.environment.temperature, 22.0)
+        self.assertIn("temperature", record.environment.timestamps)
+        self.assertEqual(record.occupancy.activity_distribution, {})
+        self.assertEqual(record.devices["ac_01"].specific_state["mode"], "cool")
+        self.assertEqual(len(record.events), 1)
+
+    def test_zones_tracked_independently(self):
+        wm = WorldModel()
+        wm.update_from_mqtt("office/main/sensor/env_01/temperature", {"value": 22.0})
+        wm.update_from_mqtt("office/kitchen/sensor/env_02/temperature", {"value": 25.0})
+        main = wm.get_zone("main")
+        wm.update_from_mqtt("office/kitchen/sensor/env_02/co2", {"value": 800})
+        self.assertIs(wm.get_zone("main"), main)
+        self.assertEqual(wm.get_zone("kitchen").environment.co2, 800)
+
+    def test_unknown_zone_and_ignored_topic(self):
+        wm = WorldModel()
+        self.assertIsNone(wm.get_zone("main"))
+        wm.update_from_mqtt("home/main/sensor/env_01/temperature", {"value": 22.0})
+        self.assertEqual(wm.get_all_zones(), {})
+
+
+# ────────────────────────────────────────────────────────
+# Test 2: parity with a validated ZoneState
+# ────────────────────────────────────────────────────────
+class TestZoneStateParity(unittest.TestCase):
+
+    def _populated(self):
+        wm = WorldModel()
+        with patch("time.time", return_value=NOW):
+            for channel, value in (("temperature", 22.5), ("humidity", 48.0), ("co2", 612),
+                                   ("illuminance", 350.0), ("pressure", 1013.2),
+                                   ("gas_resistance", 52000), ("sound_level", 41.5),
+                                   ("water_level", 70.0)):
+                wm.update_from_mqtt(f"office/main/sensor/env_01/{channel}", {"value": value})
+            wm.update_from_mqtt("office/main/camera/cam_01/status", {
+                "person_count": 2, "activity_distribution": {"active": 1, "focused": 1},
+            })
+            wm.update_from_mqtt("office/main/activity/cam_01/status", {
+                "activity_level": 0.3, "activity_class": "low",
+                "posture_duration_sec": 120.0, "posture_status": "mostly_static",
+            })
+            wm.update_from_mqtt("office/main/hvac/ac_01/state",
+                                {"power_state": "on", "mode": "cool", "target_temp": 24})
+        return wm
+
+    def _expected(self):
+        return ZoneState(
+            zone_id="main",
+            environment=EnvironmentData(
+                temperature=22.5, humidity=48.0, co2=612, illuminance=350.0,
+                pressure=1013.2, gas_resistance=52000, sound_level=41.5, water_level=70.0,
+                timestamps={channel: NOW for channel in ENV_CHANNELS},
+            ),
+            occupancy=OccupancyData(
+                person_count=2, vision_count=2,
+                activity_distribution={"active": 1, "focused": 1},
+                activity_level=0.3, activity_class="low",
+                posture_duration_sec=120.0, posture_status="mostly_static",
+                last_entry_time=NOW,
+            ),
+            devices={"ac_01": DeviceState(
+                device_id="ac_01", device_type="hvac", power_state="on",
+                specific_state={"power_state": "on", "mode": "cool", "target_temp": 24},
+            )},
+            events=[Event(timestamp=NOW, event_type="person_entered", severity="info",
+                          data={"count": 2}, seq=1)],
+            last_update=NOW,
+        )
+
+    def test_matches_validated_zone_state(self):
+        view = self._populated().get_zone("main")
+        expected = self._expected()
+        self.assertEqual(view.model_dump(), expected.model_dump())
+        self.assertEqual(view.model_dump_json(), expected.model_dump_json())
+
+    def test_types_survive_revalidation(self):
+        view = self._populated().get_zone("main")
+        self.assertIsInstance(view.environment, EnvironmentData)
+        self.assertIsInstance(view.occupancy, OccupancyData)
+        self.assertIsInstance(view.devices["ac_01"], DeviceState)
+        self.assertIsInstance(view.environment.co2, int)
+        self.assertIsInstance(view.environment.temperature, float)
+        revalidated = ZoneState.model_validate(view.model_dump())
+        self.assertEqual(revalidated.model_dump(), view.model_dump())
+
+    def test_properties_match(self):
+        view = self._populated().get_zone("main")
+        expected = self._expected()
+        self.assertEqual(view.environment.thermal_comfort, expected.environment.thermal_comfort)
+        self.assertEqual(view.environment.is_stuffy, expected.environment.is_stuffy)
+        self.assertEqual(view.occupancy.is_occupied, expected.occupancy.is_occupied)
+        self.assertEqual(view.occupancy.activity_summary, expected.occupancy.activity_summary)
+        self.assertEqual(view.events[0].description, "2人が入室しました")
+
+    def test_empty_zone_matches_defaults(self):
+        wm = WorldModel()
+        with patch("time.time", return_value=NOW):
+            wm.update_from_mqtt("office/main/task_report/task_1", {})
+        view = wm.get_zone("main").model_dump()
+        expected = ZoneState(zone_id="main", last_update=NOW).model_dump()
+        self.assertEqual(len(view.pop("events")), 1)
+        expected.pop("events")
+        self.assertEqual(view, expected)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
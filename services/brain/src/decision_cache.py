@@ -0,0 +1,89 @@
+"""
+No-action decision cache: lets the Brain skip the LLM when nothing changed.
+
+Most periodic cognitive cycles end with the LLM deciding that no action is
+needed.  The Brain hashes what the LLM would see (quantized zone state,
+alert bands, recent events, active task IDs, recent actions) into a
+fingerprint; when the LLM judged that exact fingerprint as "no action"
+within ``ttl_sec``, the cycle returns without calling it.
+"""
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+from loguru import logger
+
+_MAX_ENTRIES = 256
+
+
+def fingerprint(*parts) -> str:
+    """Stable digest of hashable/reprable parts."""
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class NoActionCache:
+    def __init__(self, ttl_sec: float = 300.0):
+        self.ttl_sec = ttl_sec
+        # fingerprint -> (judged_at, LLM seconds spent reaching the verdict)
+        self._verdicts: Dict[str, Tuple[float, float]] = {}
+
+        # Metrics
+        self.checks = 0
+        self.hits = 0
+        self.llm_sec_saved = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0
+
+    def check(self, fp: str, now: Optional[float] = None) -> bool:
+        """True if the LLM judged this fingerprint as no-action within the TTL."""
+        if not self.enabled:
+            return False
+        now = time.time() if now is None else now
+        self.checks += 1
+        verdict = self._verdicts.get(fp)
+        if verdict is None:
+            return False
+        judged_at, llm_sec = verdict
+        if now - judged_at >= self.ttl_sec:
+            del self._verdicts[fp]
+            return False
+        self.hits += 1
+        self.llm_sec_saved += llm_sec
+        logger.info(
+            f"State unchanged since no-action verdict {int(now - judged_at)}s ago, skipping LLM "
+            f"(hit rate {self.hit_rate:.0%}, ~{self.llm_sec_saved:.1f}s LLM saved)"
+        )
+        return True
+
+    def record(self, fp: str, llm_sec: float, now: Optional[float] = None):
+        """Remember that the LLM decided no action is needed for this state."""
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        if len(self._verdicts) >= _MAX_ENTRIES:
+            self._prune(now)
+        self._verdicts[fp] = (now, llm_sec)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.checks if self.checks else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "checks": self.checks,
+            "hits": self.hits,
+            "hit_rate": round(self.hit_rate, 3),
+            "llm_sec_saved": round(self.llm_sec_saved, 1),
+            "entries": len(self._verdicts),
+        }
+
+    def _prune(self, now: float):
+        expired = [fp for fp, (ts, _) in self._verdicts.items() if now - ts >= self.ttl_sec]
+        for fp in expired:
+            del self._verdicts[fp]
+        # Still full: drop the oldest verdicts
+        if len(self._verdicts) >= _MAX_ENTRIES:
+            for fp in sorted(self._verdicts, key=lambda k: self._verdicts[k][0])[: _MAX_ENTRIES // 4]:
+                del self._verdicts[fp]
@@ -0,0 +1,121 @@
+"""
+Ingest Queue: batches raw MQTT messages before they are applied to the WorldModel.
+
+The MQTT message callback only appends (enqueue_time, topic, payload bytes)
+to a deque; a single asyncio task drains it every ``tick_sec`` in batches of
+up to ``max_batch``, parsing JSON and applying the handler.  A sensor burst
+is therefore processed in a few large batches instead of one scheduled
+callback per message.
+
+Backpressure: when the queue reaches ``max_queue`` ``on_high_water`` is
+called (AsyncMQTTClient.pause_reading, so the broker buffers) and
+``on_low_water`` once the drainer has brought it back under half; messages
+that still arrive while full drop the oldest queued one and are counted.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Tuple
+
+from loguru import logger
+
+_LOG_EVERY_BATCHES = 500
+_LATENCY_WINDOW = 1000
+
+
+class IngestQueue:
+    def __init__(
+        self,
+        max_queue: int = 5000,
+        max_batch: int = 500,
+        tick_sec: float = 0.05,
+        on_high_water: Optional[Callable[[], None]] = None,
+        on_low_water: Optional[Callable[[], None]] = None,
+    ):
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.tick_sec = tick_sec
+        self.on_high_water = on_high_water
+        self.on_low_water = on_low_water
+
+        self._queue: Deque[Tuple[float, str, bytes]] = deque()
+        self._throttled = False
+
+        # Metrics
+        self.batches = 0
+        self.messages = 0
+        self.dropped = 0
+        self.invalid = 0
+        self.max_batch_seen = 0
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+
+    def put(self, topic: str, payload: bytes):
+        """Enqueue a raw message (MQTT message callback)."""
+        if len(self._queue) >= self.max_queue:
+            if not self._throttled:
+                self._throttled = True
+                if self.on_high_water:
+                    self.on_high_water()
+            self._queue.popleft()
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                logger.warning(f"Ingest queue full ({self.max_queue}), dropped {self.dropped} message(s)")
+        self._queue.append((time.monotonic(), topic, payload))
+
+    async def run(self, handler: Callable[[str, dict], None]):
+        """Drain the queue forever, calling handler(topic, payload) per message."""
+        while True:
+            if not self._queue:
+                await asyncio.sleep(self.tick_sec)
+                continue
+            self._drain_batch(handler)
+            # Let other tasks run between batches during a backlog
+            await asyncio.sleep(0)
+
+    def _drain_batch(self, handler: Callable[[str, dict], None]):
+        queue = self._queue
+        batch: List[Tuple[float, str, bytes]] = []
+        while queue and len(batch) < self.max_batch:
+            batch.append(queue.popleft())
+        if self._throttled and len(queue) < self.max_queue // 2:
+            self._throttled = False
+            if self.on_low_water:
+                self.on_low_water()
+
+        for enqueued, topic, raw in batch:
+            try:
+                payload = json.loads(raw)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self.invalid += 1
+                continue
+            try:
+                handler(topic, payload)
+            except Exception as e:
+                logger.error(f"Ingest handler error ({topic}): {e}")
+
+        now = time.monotonic()
+        # Latency of the oldest message in the batch (enqueue → applied)
+        self._latencies.append(now - batch[0][0])
+        self.batches += 1
+        self.messages += len(batch)
+        self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+        if self.batches % _LOG_EVERY_BATCHES == 0:
+            logger.info(f"Ingest stats: {self.stats()}")
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        mean = sum(latencies) / len(latencies) if latencies else 0.0
+        return {
+            "batches": self.batches,
+            "messages": self.messages,
+            "mean_batch": round(self.messages / self.batches, 1) if self.batches else 0.0,
+            "max_batch": self.max_batch_seen,
+            "latency_ms_mean": round(mean * 1000, 1),
+            "latency_ms_p95": round(p95 * 1000, 1),
+            "queue_depth": len(self._queue),
+            "dropped": self.dropped,
+            "invalid": self.invalid,
+        }
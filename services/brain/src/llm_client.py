@@ -2,11 +2,18 @@
 import asyncio
 import os
 import json
+import time
 import aiohttp
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from loguru import logger
 
+from llm_router import LLMHTTPError, LLMRouter
+
+# Called with a normalized tool call ({"id", "function": {"name", "arguments"}})
+# as soon as its arguments are complete while the response is still streaming
+ToolCallCallback = Callable[[Dict[str, Any]], None]
+
 
 @dataclass
 class LLMResponse:
@@ -16,23 +23,113 @@ class LLMResponse:
     finish_reason: str = "stop"
     raw: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    # Streaming metrics (None for non-streaming calls)
+    ttft_sec: Optional[float] = None
+    completion_tokens: Optional[int] = None
+    tokens_per_sec: Optional[float] = None
+    # Prefill accounting as reported by the server (None if not reported)
+    prompt_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+
+
+class _ToolCallAccumulator:
+    """Assembles one streamed tool call from its deltas."""
+
+    __slots__ = ("id", "name", "arguments", "emitted")
+
+    def __init__(self):
+        self.id = ""
+        self.name = ""
+        self.arguments = ""
+        self.emitted = False
+
+    def add(self, delta: Dict[str, Any]):
+        if delta.get("id"):
+            self.id = delta["id"]
+        func = delta.get("function") or {}
+        if func.get("name"):
+            self.name += func["name"]
+        args = func.get("arguments")
+        if isinstance(args, dict):
+            # Some servers (Ollama) send the complete arguments object at once
+            self.arguments = json.dumps(args)
+        elif args:
+            self.arguments += args
+
+    def parsed_arguments(self) -> Optional[Dict[str, Any]]:
+        """Arguments dict once the JSON object has closed, else None."""
+        text = self.arguments.strip()
+        if not text.endswith("}"):
+            return None
+        try:
+            args = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return args if isinstance(args, dict) else None
+
+    def to_tool_call(self, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if arguments is None:
+            arguments = _loads_or_empty(self.arguments)
+        return {
+            "id": self.id,
+            "function": {
+                "name": self.name,
+                "arguments": arguments,
+            }
+        }
+
+
+def _prompt_usage(raw: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (prompt_tokens, cached_tokens) from a response or final stream chunk.
+
+    cached_tokens is the prefix-cache hit: OpenAI / vLLM report
+    usage.prompt_tokens_details.cached_tokens, llama.cpp timings.cache_n.
+    """
+    usage = raw.get("usage") or {}
+    prompt = usage.get("prompt_tokens")
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens")
+    if cached is None:
+        cached = (raw.get("timings") or {}).get("cache_n")
+    return prompt, cached
+
+
+def _loads_or_empty(text: str) -> Dict[str, Any]:
+    try:
+        value = json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    return value if isinstance(value, dict) else {}
 
 
 class LLMClient:
-    def __init__(self, api_url: str = "http://localhost:8000/v1", session: aiohttp.ClientSession = None):
+    def __init__(self, api_url: str = "http://localhost:8000/v1", session: aiohttp.ClientSession = None,
+                 stream: Optional[bool] = None, router: Optional[LLMRouter] = None):
         self.api_url = api_url
+        # Backend pool (LLM_API_URLS); a single-backend pool for api_url by default
+        self.router = router or LLMRouter([api_url])
         self.api_key = os.getenv("OPENAI_API_KEY", "EMPTY")
         self.model = os.getenv("LLM_MODEL", "qwen2.5:14b")
         self._session = session
+        if stream is None:
+            stream = os.getenv("LLM_STREAM", "0").lower() in ("1", "true", "yes")
+        self.stream = stream
 
     async def chat(
         self,
         messages: List[Dict[str, Any]],
         tools: Optional[List[Dict[str, Any]]] = None,
+        on_tool_call: Optional[ToolCallCallback] = None,
     ) -> LLMResponse:
         """
         Send messages to LLM with tool definitions and parse the response.
+
+        In streaming mode on_tool_call receives each tool call as soon as its
+        arguments JSON closes, before the rest of the response has arrived.
         """
+        if self.stream:
+            return await self._chat_stream(messages, tools, on_tool_call)
+
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -48,20 +145,27 @@ class LLMClient:
         if tools:
             payload["tools"] = tools
 
-        try:
+        async def send(base_url: str) -> LLMResponse:
             async with self._session.post(
-                f"{self.api_url}/chat/completions",
+                f"{base_url}/chat/completions",
                 headers=headers,
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=120),
             ) as resp:
                 if resp.status != 200:
-                    error_text = await resp.text()
-                    logger.error(f"LLM API Error {resp.status}: {error_text}")
-                    return LLMResponse(error=f"API Error {resp.status}: {error_text}")
-
+                    raise LLMHTTPError(resp.status, await resp.text())
                 raw = await resp.json()
                 return self._parse_response(raw)
+
+        return await self._route(send, hedge=True)
+
+    async def _route(self, send, hedge: bool) -> LLMResponse:
+        """Run send on the backend pool, mapping failures to LLMResponse.error."""
+        try:
+            return await self.router.request(send, hedge=hedge)
+        except LLMHTTPError as e:
+            logger.error(f"LLM API Error {e.status}: {e.body}")
+            return LLMResponse(error=f"API Error {e.status}: {e.body}")
         except asyncio.TimeoutError:
             logger.error("LLM request timed out (120s)")
             return LLMResponse(error="Request timed out")
@@ -69,6 +173,148 @@ class LLMClient:
             logger.error(f"LLM Connection Error: {e}")
             return LLMResponse(error=str(e))
 
+    async def _chat_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        tools: Optional[List[Dict[str, Any]]],
+        on_tool_call: Optional[ToolCallCallback],
+    ) -> LLMResponse:
+        """SSE streaming variant of chat() (``stream: true``)."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream",
+        }
+
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.3,
+            "max_tokens": 1024,
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+
+        if tools:
+            payload["tools"] = tools
+
+        # Tool calls already handed to on_tool_call must not be replayed by a
+        # failover attempt on another backend
+        emitted_any = False
+
+        async def send(base_url: str) -> LLMResponse:
+            nonlocal emitted_any
+            start = time.monotonic()
+            first_token_at: Optional[float] = None
+            chunks = 0
+            usage_tokens: Optional[int] = None
+            prompt_tokens: Optional[int] = None
+            cached_tokens: Optional[int] = None
+            content_parts: List[str] = []
+            calls: Dict[int, _ToolCallAccumulator] = {}
+            finish_reason = "stop"
+
+            def emit(acc: _ToolCallAccumulator, arguments: Optional[Dict[str, Any]] = None):
+                nonlocal emitted_any
+                acc.emitted = True
+                emitted_any = True
+                if on_tool_call is not None:
+                    try:
+                        on_tool_call(acc.to_tool_call(arguments))
+                    except Exception as e:
+                        logger.error(f"on_tool_call error ({acc.name}): {e}")
+
+            try:
+                async with self._session.post(
+                    f"{base_url}/chat/completions",
+                    headers=headers,
+                    json=payload,
+                    timeout=aiohttp.ClientTimeout(total=120),
+                ) as resp:
+                    if resp.status != 200:
+                        raise LLMHTTPError(resp.status, await resp.text())
+
+                    async for line in resp.content:
+                        line = line.strip()
+                        if not line.startswith(b"data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == b"[DONE]":
+                            break
+                        try:
+                            chunk = json.loads(data)
+                        except json.JSONDecodeError:
+                            continue
+                        if "error" in chunk:
+                            return LLMResponse(error=str(chunk["error"]), raw=chunk)
+                        if chunk.get("usage") or chunk.get("timings"):
+                            usage_tokens = (chunk.get("usage") or {}).get("completion_tokens", usage_tokens)
+                            prompt_tokens, cached_tokens = _prompt_usage(chunk)
+
+                        for choice in chunk.get("choices") or []:
+                            delta = choice.get("delta") or {}
+                            text = delta.get("content")
+                            tool_deltas = delta.get("tool_calls") or []
+                            if text or tool_deltas:
+                                chunks += 1
+                                if first_token_at is None:
+                                    first_token_at = time.monotonic()
+                            if text:
+                                content_parts.append(text)
+                            for td in tool_deltas:
+                                index = td.get("index", len(calls))
+                                # A new index means every earlier call is complete
+                                for i, prev in calls.items():
+                                    if i < index and not prev.emitted:
+                                        emit(prev)
+                                acc = calls.setdefault(index, _ToolCallAccumulator())
+                                acc.add(td)
+                                if not acc.emitted:
+                                    arguments = acc.parsed_arguments()
+                                    if arguments is not None:
+                                        emit(acc, arguments)
+                            if choice.get("finish_reason"):
+                                finish_reason = choice["finish_reason"]
+            except Exception as e:
+                if emitted_any and not isinstance(e, LLMHTTPError):
+                    e.retryable = False
+                raise
+
+            for acc in calls.values():
+                if not acc.emitted:
+                    emit(acc)
+            tool_calls = [calls[i].to_tool_call() for i in sorted(calls)]
+            if tool_calls:
+                finish_reason = "tool_calls"
+
+            end = time.monotonic()
+            ttft = (first_token_at - start) if first_token_at is not None else None
+            # usage is exact when the server honours include_usage; otherwise
+            # count streamed deltas (≈ one token each)
+            tokens = usage_tokens if usage_tokens is not None else chunks
+            gen_sec = end - (first_token_at or end)
+            tokens_per_sec = tokens / gen_sec if gen_sec > 0 else None
+            logger.info(
+                f"LLM stream ({base_url}): ttft={ttft * 1000 if ttft is not None else 0:.0f}ms, "
+                f"{tokens} tokens in {end - start:.2f}s"
+                + (f" ({tokens_per_sec:.1f} tok/s)" if tokens_per_sec else "")
+                + (f", {len(tool_calls)} tool call(s)" if tool_calls else "")
+            )
+
+            return LLMResponse(
+                content="".join(content_parts) or None,
+                tool_calls=tool_calls,
+                finish_reason=finish_reason,
+                ttft_sec=ttft,
+                completion_tokens=tokens,
+                tokens_per_sec=tokens_per_sec,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+            )
+
+        # No hedging: a second stream would dispatch the same tool calls twice
+        return await self._route(send, hedge=False)
+
     def _parse_response(self, raw: Dict[str, Any]) -> LLMResponse:
         """Parse OpenAI-compatible response into LLMResponse."""
         if "error" in raw:
@@ -105,11 +351,14 @@ class LLMClient:
         if tool_calls:
             finish_reason = "tool_calls"
 
+        prompt_tokens, cached_tokens = _prompt_usage(raw)
         return LLMResponse(
             content=content,
             tool_calls=tool_calls,
             finish_reason=finish_reason,
             raw=raw,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
         )
 
     async def generate_response(
@@ -139,18 +388,19 @@ class LLMClient:
         if schema:
             payload["guided_json"] = schema
 
-        try:
+        async def send(base_url: str) -> Dict[str, Any]:
             async with self._session.post(
-                f"{self.api_url}/chat/completions",
+                f"{base_url}/chat/completions",
                 headers=headers,
                 json=payload,
                 timeout=aiohttp.ClientTimeout(total=120),
             ) as resp:
                 if resp.status != 200:
-                    error_text = await resp.text()
-                    raise Exception(f"LLM API Error {resp.status}: {error_text}")
-
+                    raise LLMHTTPError(resp.status, await resp.text())
                 return await resp.json()
+
+        try:
+            return await self.router.request(send)
         except Exception as e:
             logger.error(f"LLM Connection Error: {e}")
             return {"error": str(e)}
@@ -5,15 +5,19 @@ import time
 import aiohttp
 from loguru import logger
 from dotenv import load_dotenv
-import paho.mqtt.client as mqtt
 from mcp_bridge import MCPBridge
+from mqtt_async import AsyncMQTTClient
 from llm_client import LLMClient
+from llm_router import LLMRouter
 from sanitizer import Sanitizer
 from world_model import WorldModel
 from task_scheduling import TaskQueueManager
 from task_reminder import TaskReminder
 from dashboard_client import DashboardClient
-from tool_executor import ToolExecutor
+from ingest_queue import IngestQueue
+from decision_cache import NoActionCache, fingerprint
+from rule_engine import RuleEngine
+from tool_executor import ToolExecutor, EARLY_DISPATCH_TOOLS
 from tool_registry import get_tools
 from system_prompt import build_system_message
 
@@ -30,6 +34,41 @@ MIN_CYCLE_INTERVAL = 25   # Minimum interval between cognitive cycles (seconds)
 MAX_SPEAK_PER_CYCLE = 1   # Maximum speak calls per cognitive cycle
 MAX_CONSECUTIVE_ERRORS = 1 # Stop cycle after this many consecutive tool errors
 
+# MQTT ingestion batching (message callback → batched WorldModel updates)
+INGEST_TICK_MS = float(os.getenv("INGEST_TICK_MS", 50))
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", 500))
+INGEST_MAX_QUEUE = int(os.getenv("INGEST_MAX_QUEUE", 5000))
+
+# LLM context: "full" sends every zone each cycle, "diff" only zones whose
+# section changed since the previous cycle (full refresh every N cycles)
+LLM_CONTEXT_MODE = os.getenv("LLM_CONTEXT_MODE", "full")
+LLM_CONTEXT_FULL_EVERY = max(1, int(os.getenv("LLM_CONTEXT_FULL_EVERY", 10)))
+
+# Skip the LLM while the state fingerprint matches a "no action" verdict
+# younger than this (seconds, 0 disables)
+LLM_SKIP_TTL_SEC = float(os.getenv("LLM_SKIP_TTL_SEC", 300))
+
+# Handle well-known alerts (CO2, temp spike, sedentary, tamper) with
+# templated tool calls instead of an LLM cycle
+RULE_ENGINE_ENABLED = os.getenv("RULE_ENGINE_ENABLED", "1").lower() in ("1", "true", "yes")
+
+# Event log: retained events per zone, per-zone overrides ("zone=N,zone=N"),
+# and an optional JSON Lines file receiving evicted events
+EVENT_LOG_CAPACITY = int(os.getenv("EVENT_LOG_CAPACITY", 50))
+EVENT_LOG_ZONE_CAPACITY = os.getenv("EVENT_LOG_ZONE_CAPACITY", "")
+EVENT_SPILL_PATH = os.getenv("EVENT_SPILL_PATH") or None
+EVENT_SPILL_MAX_MB = float(os.getenv("EVENT_SPILL_MAX_MB", 50))
+
+
+def _parse_zone_capacity(spec: str) -> dict[str, int]:
+    """Parse "zone_a=100,zone_b=200" into {zone: capacity}."""
+    capacities = {}
+    for item in spec.split(","):
+        zone, sep, value = item.partition("=")
+        if sep and zone.strip() and value.strip().isdigit():
+            capacities[zone.strip()] = int(value)
+    return capacities
+
 
 def _summarize_action(tool_name: str, args: dict) -> str:
     """Create a short summary of a tool call for action history."""
@@ -42,14 +81,116 @@ def _summarize_action(tool_name: str, args: dict) -> str:
     return str(args)[:50]
 
 
+def _build_user_content(
+    active_tasks: list[dict],
+    recent_actions: list[dict],
+    llm_context: str,
+    recent_events: list[str],
+    actionable_reports: list[str],
+    now: float,
+) -> str:
+    """
+    User message for a cognitive cycle.
+
+    Sections run from slowest- to fastest-changing (tasks → action history
+    → office state → events → current time), with absolute times only, so
+    consecutive cycles share the longest possible byte-identical prefix for
+    the LLM server's prefix cache.
+    """
+    # Inject active tasks so LLM knows what already exists
+    if active_tasks:
+        user_content = "## 現在のアクティブタスク（重複作成禁止）\n"
+        for t in active_tasks[:10]:
+            title = t.get("title", "")
+            zone = t.get("zone", "")
+            task_type = t.get("task_type", [])
+            zone_str = f" [{zone}]" if zone else ""
+            type_str = f" ({','.join(task_type)})" if task_type else ""
+            user_content += f"- {title}{zone_str}{type_str}\n"
+        user_content += "上記タスクと同じ目的のタスクを新規作成しないでください。"
+    else:
+        user_content = "## 現在のアクティブタスク\nなし"
+
+    # Layer 5: Inject action history to prevent repetitive actions
+    if recent_actions:
+        user_content += "\n\n## 直近のBrainアクション履歴（重複注意）\n"
+        for a in recent_actions[-8:]:
+            at = time.strftime("%H:%M", time.localtime(a["time"]))
+            status = "✓" if a.get("success", True) else "✗失敗"
+            user_content += f"- {at}: {a['tool']}({a.get('summary', '')}) [{status}]\n"
+        failed = [a for a in recent_actions if not a.get("success", True)]
+        if failed:
+            user_content += "失敗したアクションと同じ操作を再試行しないでください。\n"
+        user_content += "上記と同じアクションを短期間で繰り返さないでください。特にspeakは同じ内容を30分以内に再送しないこと。\n"
+
+    user_content += f"\n\n## 現在のオフィス状態\n{llm_context}"
+    if recent_events:
+        user_content += f"\n\n## 直近のイベント\n" + "\n".join(recent_events)
+    if actionable_reports:
+        user_content += "\n\n## ⚠ 対応が必要なタスク報告\n" + "\n".join(actionable_reports)
+        user_content += "\n上記のタスク報告にはフォローアップが必要です。内容を確認し適切に対応してください。"
+    # The clock changes every minute: keep it after every cacheable section
+    user_content += f"\n\n## 現在時刻\n{time.strftime('%H:%M', time.localtime(now))}"
+    return user_content
+
+
+
+class _PrefillTally:
+    """
+    Per-cycle prefill accounting.
+
+    prompt/cached tokens are as reported by the LLM server (prefix-cache
+    hits); tokens saved by diff context are estimated from the omitted
+    characters at this prompt's own tokens-per-character ratio.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.diff_saved_tokens = 0
+        self.reported = False
+
+    def add(self, response, messages: list, tools: list, omitted_chars: int):
+        self.calls += 1
+        if response.prompt_tokens is None:
+            return
+        self.reported = True
+        self.prompt_tokens += response.prompt_tokens
+        self.cached_tokens += response.cached_tokens or 0
+        if omitted_chars:
+            prompt_chars = len(json.dumps(messages, ensure_ascii=False)) + len(json.dumps(tools, ensure_ascii=False))
+            self.diff_saved_tokens += int(omitted_chars * response.prompt_tokens / max(prompt_chars, 1))
+
+    def log(self, totals: dict):
+        if not self.calls:
+            return
+        totals["cycles"] += 1
+        if not self.reported:
+            return
+        totals["prompt_tokens"] += self.prompt_tokens
+        totals["cached_tokens"] += self.cached_tokens
+        totals["diff_saved_tokens"] += self.diff_saved_tokens
+        saved = self.cached_tokens + self.diff_saved_tokens
+        logger.info(
+            f"Prefill: {self.prompt_tokens} prompt tokens over {self.calls} call(s), "
+            f"{self.cached_tokens} from prefix cache, ~{self.diff_saved_tokens} omitted by diff context "
+            f"→ ~{saved} tokens saved this cycle"
+        )
+
+
 class Brain:
     def __init__(self):
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-        self.client.on_connect = self.on_connect
-        self.client.on_message = self.on_message
-        self.mcp = MCPBridge(self.client)
+        # Single loop-driven MQTT connection shared by all components
+        self.mqtt = AsyncMQTTClient.get_instance(MQTT_BROKER, MQTT_PORT)
+        self.mcp = MCPBridge(self.mqtt)
         self.sanitizer = Sanitizer()
-        self.world_model = WorldModel()
+        self.world_model = WorldModel(
+            event_capacity=EVENT_LOG_CAPACITY,
+            zone_event_capacity=_parse_zone_capacity(EVENT_LOG_ZONE_CAPACITY),
+            event_spill_path=EVENT_SPILL_PATH,
+            event_spill_max_bytes=int(EVENT_SPILL_MAX_MB * 1024 * 1024),
+        )
 
         # Initialized in run() with shared session
         self.llm = None
@@ -57,120 +198,145 @@ class Brain:
         self.task_queue = None
         self.task_reminder = None
         self.tool_executor = None
+        self.rules = None
+        self._rule_tasks: set[asyncio.Task] = set()
+
+        # Raw MQTT messages batched before WorldModel updates
+        self.ingest = IngestQueue(
+            max_queue=INGEST_MAX_QUEUE,
+            max_batch=INGEST_MAX_BATCH,
+            tick_sec=INGEST_TICK_MS / 1000,
+            on_high_water=self.mqtt.pause_reading,
+            on_low_water=self.mqtt.resume_reading,
+        )
+        self.mqtt.add_handler("office/#", self.ingest.put)
 
         # Event-driven trigger
         self._cycle_triggered = asyncio.Event()
-        self._last_event_count: dict[str, int] = {}
-        self._loop: asyncio.AbstractEventLoop | None = None
 
         # Action history for LLM context (Layer 5)
         self._action_history: list[dict] = []
 
-    def on_connect(self, client, userdata, flags, rc, properties=None):
-        logger.info(f"Connected to MQTT Broker with result code {rc}")
-        client.subscribe("mcp/+/response/#")
-        client.subscribe("office/#")
-
-    def on_message(self, client, userdata, msg):
-        try:
-            payload = json.loads(msg.payload.decode())
-        except (json.JSONDecodeError, UnicodeDecodeError):
-            return
-
-        if "mcp" in msg.topic and "response" in msg.topic:
-            self.mcp.handle_response(msg.topic, payload)
-            return
-
-        # Dispatch to asyncio thread for thread-safe world_model access
-        if self._loop:
-            self._loop.call_soon_threadsafe(
-                self._process_mqtt_message, msg.topic, payload
-            )
+        # Diff context mode: zone sections last sent to the LLM
+        self._sent_sections: dict[str, str] = {}
+        self._context_cycle = 0
+        # Skip the LLM for states it already judged as "no action"
+        self.no_action_cache = NoActionCache(ttl_sec=LLM_SKIP_TTL_SEC)
+        # Cumulative prefill accounting (see _PrefillTally)
+        self.prefill_stats = {"cycles": 0, "prompt_tokens": 0, "cached_tokens": 0, "diff_saved_tokens": 0}
 
     def _process_mqtt_message(self, topic: str, payload: dict):
-        """Process MQTT message on the asyncio thread (thread-safe)."""
+        """Apply an office/# message to the WorldModel (batched via IngestQueue)."""
         self.world_model.update_from_mqtt(topic, payload)
 
-        # Check if new events were generated -> trigger cycle
-        current_event_counts = {
-            zid: len(z.events) for zid, z in self.world_model.zones.items()
-        }
-        if current_event_counts != self._last_event_count:
-            self._last_event_count = current_event_counts
+    async def _watch_events(self):
+        """
+        Trigger a cognitive cycle whenever the WorldModel emits an event,
+        unless the rule engine handles it.
+        """
+        async for seq, zone_id, event in self.world_model.subscribe():
+            logger.debug(f"Event #{seq} [{zone_id}] {event.event_type}")
+            if self.rules is not None and self.rules.handles(event.event_type):
+                task = asyncio.create_task(self._apply_rules(zone_id, event))
+                self._rule_tasks.add(task)
+                task.add_done_callback(self._rule_tasks.discard)
+                continue
             self._cycle_triggered.set()
 
+    async def _apply_rules(self, zone_id: str, event):
+        """Rule fast path; falls back to a cognitive cycle when deferred."""
+        try:
+            outcomes = await self.rules.handle(zone_id, event)
+        except Exception as e:
+            logger.error(f"Rule engine error ({event.event_type}): {e}")
+            outcomes = None
+        if outcomes is None:
+            self._cycle_triggered.set()
+            return
+        for tool_name, arguments, result in outcomes:
+            # Layer 5: visible to the LLM like its own actions
+            self._action_history.append({
+                "time": time.time(),
+                "tool": tool_name,
+                "summary": _summarize_action(tool_name, arguments),
+                "success": result.get("success", True),
+            })
+
+    @staticmethod
+    def _cancel_early(early: dict[str, asyncio.Task]):
+        for task in early.values():
+            task.cancel()
+        if early:
+            logger.info(f"Cancelled {len(early)} early-dispatched tool call(s)")
+        early.clear()
+
     async def cognitive_cycle(self):
         """ReAct cognitive cycle: Think → Act → Observe → repeat."""
         # Process task queue
         if self.task_queue:
             await self.task_queue.process_queue()
 
-        # Build context
-        llm_context = self.world_model.get_llm_context()
-        if not llm_context:
+        zone_state = self.world_model.state_fingerprint()
+        if not zone_state:
             return
 
         # Collect recent events (last 5 minutes)
         now = time.time()
         recent_events = []
+        recent_event_seqs = []
         actionable_reports = []  # task_reports needing follow-up
-        for zone_id, zone in self.world_model.zones.items():
-            for event in zone.events:
-                if now - event.timestamp < 300:
-                    recent_events.append(f"[{zone_id}] {event.description}")
-                    # Highlight task reports that need action
-                    if event.event_type == "task_report":
-                        status = event.data.get("report_status", "")
-                        if status in ("needs_followup", "cannot_resolve"):
-                            actionable_reports.append(
-                                f"[{zone_id}] {event.description} (要対応)"
-                            )
+        for zone_id, event in self.world_model.recent_events(300):
+            recent_events.append(f"[{zone_id}] {event.description}")
+            recent_event_seqs.append(event.seq)
+            # Highlight task reports that need action
+            if event.event_type == "task_report":
+                status = event.data.get("report_status", "")
+                if status in ("needs_followup", "cannot_resolve"):
+                    actionable_reports.append(
+                        f"[{zone_id}] {event.description} (要対応)"
+                    )
 
         # Fetch active tasks to prevent duplicates
         active_tasks = await self.dashboard.get_active_tasks()
 
-        # Build messages
-        system_msg = build_system_message()
-        user_content = f"## 現在のオフィス状態\n{llm_context}"
-        if recent_events:
-            user_content += f"\n\n## 直近のイベント\n" + "\n".join(recent_events)
-        if actionable_reports:
-            user_content += "\n\n## ⚠ 対応が必要なタスク報告\n" + "\n".join(actionable_reports)
-            user_content += "\n上記のタスク報告にはフォローアップが必要です。内容を確認し適切に対応してください。"
-
-        # Inject active tasks so LLM knows what already exists
-        if active_tasks:
-            user_content += "\n\n## 現在のアクティブタスク（重複作成禁止）\n"
-            for t in active_tasks[:10]:
-                title = t.get("title", "")
-                zone = t.get("zone", "")
-                task_type = t.get("task_type", [])
-                zone_str = f" [{zone}]" if zone else ""
-                type_str = f" ({','.join(task_type)})" if task_type else ""
-                user_content += f"- {title}{zone_str}{type_str}\n"
-            user_content += "上記タスクと同じ目的のタスクを新規作成しないでください。"
-        else:
-            user_content += "\n\n## 現在のアクティブタスク\nなし"
-
-        # Layer 5: Inject action history to prevent repetitive actions
         cutoff = now - 1800  # last 30 minutes
         recent_actions = [a for a in self._action_history if a["time"] > cutoff]
-        if recent_actions:
-            user_content += "\n\n## 直近のBrainアクション履歴（重複注意）\n"
-            for a in recent_actions[-8:]:
-                mins_ago = int((now - a["time"]) / 60)
-                status = "✓" if a.get("success", True) else "✗失敗"
-                user_content += f"- {mins_ago}分前: {a['tool']}({a.get('summary', '')}) [{status}]\n"
-            failed = [a for a in recent_actions if not a.get("success", True)]
-            if failed:
-                user_content += "失敗したアクションと同じ操作を再試行しないでください。\n"
-            user_content += "上記と同じアクションを短期間で繰り返さないでください。特にspeakは同じ内容を30分以内に再送しないこと。\n"
 
+        # Skip the LLM if it already judged this exact state as "no action"
+        state_fp = fingerprint(
+            zone_state,
+            tuple(recent_event_seqs),
+            tuple(sorted(str(t.get("id", t.get("title", ""))) for t in active_tasks)),
+            tuple((a["tool"], a.get("summary", ""), a.get("success", True)) for a in recent_actions[-8:]),
+        )
+        if self.no_action_cache.check(state_fp, now):
+            return
+
+        # Build context (diff mode: only zones whose section changed since
+        # the last cycle, with a full refresh every LLM_CONTEXT_FULL_EVERY)
+        sent_sections = None
+        if LLM_CONTEXT_MODE == "diff":
+            if self._context_cycle % LLM_CONTEXT_FULL_EVERY == 0:
+                self._sent_sections = {}
+            self._context_cycle += 1
+            sent_sections = self._sent_sections
+        llm_context = self.world_model.get_llm_context(sent_sections)
+        omitted_chars = self.world_model.last_context_omitted_chars if sent_sections is not None else 0
+
+        # Build messages. The system message and tool schema are constant
+        # (see _build_user_content for the user message layout).
+        system_msg = build_system_message()
+
+        user_content = _build_user_content(
+            active_tasks, recent_actions, llm_context, recent_events, actionable_reports, now
+        )
         user_msg = {"role": "user", "content": user_content}
 
         messages = [system_msg, user_msg]
         tools = get_tools()
 
+        prefill = _PrefillTally()
+
         # Layer 3: ReAct loop guards
         tool_call_history = []  # (tool_name, args_hash) for duplicate detection
         speak_count = 0
@@ -180,16 +346,48 @@ class Brain:
         for iteration in range(1, REACT_MAX_ITERATIONS + 1):
             logger.info(f"ReAct iteration {iteration}/{REACT_MAX_ITERATIONS}")
 
-            response = await self.llm.chat(messages, tools)
+            # Streaming mode: read-only tool calls start as soon as the LLM
+            # finishes emitting them (keyed by tool_call id); tools with side
+            # effects wait for the complete turn so every call that runs is
+            # recorded in the action history and the conversation
+            early: dict[str, asyncio.Task] = {}
+            early_keys: set = set()
+
+            def dispatch_early(tc: dict):
+                name = tc["function"]["name"]
+                args = tc["function"].get("arguments", {})
+                call_key = (name, json.dumps(args, sort_keys=True))
+                if (
+                    name not in EARLY_DISPATCH_TOOLS
+                    or not tc["id"]
+                    or call_key in tool_call_history
+                    or call_key in early_keys
+                ):
+                    return
+                early_keys.add(call_key)
+                logger.info(f"Dispatching tool early: {name} with {args}")
+                early[tc["id"]] = asyncio.create_task(self.tool_executor.execute(name, args))
+
+            llm_start = time.monotonic()
+            response = await self.llm.chat(messages, tools, on_tool_call=dispatch_early)
+            llm_sec = time.monotonic() - llm_start
 
             if response.error:
                 logger.error(f"LLM error: {response.error}")
+                self._cancel_early(early)
+                if iteration == 1:
+                    # The diff context never reached the LLM: resend in full
+                    self._context_cycle = 0
                 break
 
+            prefill.add(response, messages, tools, omitted_chars if iteration == 1 else 0)
+
             # No tool calls -> LLM decided no action needed
             if not response.tool_calls:
                 if response.content:
                     logger.info(f"LLM (no action): {response.content[:200]}")
+                if iteration == 1:
+                    self.no_action_cache.record(state_fp, llm_sec, now)
                 break
 
             # Layer 3: Filter tool calls (duplicates, speak limit)
@@ -233,46 +431,60 @@ class Brain:
             ]
             messages.append(assistant_msg)
 
-            # Execute each tool call
+            # Execute tool calls: independent ones concurrently, results in order
             cycle_aborted = False
-            for tc in filtered_tool_calls:
-                tool_name = tc["function"]["name"]
-                arguments = tc["function"]["arguments"]
-                tool_call_id = tc["id"]
-
-                logger.info(f"Executing tool: {tool_name} with {arguments}")
-
-                result = await self.tool_executor.execute(tool_name, arguments)
-
-                if result["success"]:
-                    logger.info(f"Tool result: {result['result'][:200]}")
-                    consecutive_errors = 0
-                else:
-                    logger.warning(f"Tool failed: {result['error']}")
-                    consecutive_errors += 1
-
-                # Layer 5: Record action in history
-                self._action_history.append({
-                    "time": time.time(),
-                    "tool": tool_name,
-                    "summary": _summarize_action(tool_name, arguments),
-                    "success": result.get("success", True),
-                })
-
-                # Add tool result to conversation
-                result_content = result.get("result") or result.get("error", "")
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call_id,
-                    "content": str(result_content),
-                })
-
-                # Guard 3: Stop on consecutive errors
-                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                    logger.warning(f"Stopping cycle: {consecutive_errors} consecutive error(s)")
-                    cycle_aborted = True
+            names = [tc["function"]["name"] for tc in filtered_tool_calls]
+            for group in ToolExecutor.group_calls(names):
+                calls = [
+                    (filtered_tool_calls[i]["function"]["name"], filtered_tool_calls[i]["function"]["arguments"])
+                    for i in group
+                ]
+                for tool_name, arguments in calls:
+                    logger.info(f"Executing tool: {tool_name} with {arguments}")
+                if len(calls) > 1:
+                    logger.info(f"Running {len(calls)} tool calls concurrently")
+
+                started = [early.pop(filtered_tool_calls[i]["id"], None) for i in group]
+                results = await self.tool_executor.execute_batch(calls, started)
+
+                for i, (tool_name, arguments), result in zip(group, calls, results):
+                    tool_call_id = filtered_tool_calls[i]["id"]
+
+                    if result["success"]:
+                        logger.info(f"Tool result: {result['result'][:200]}")
+                        consecutive_errors = 0
+                    else:
+                        logger.warning(f"Tool failed: {result['error']}")
+                        consecutive_errors += 1
+
+                    # Layer 5: Record action in history
+                    self._action_history.append({
+                        "time": time.time(),
+                        "tool": tool_name,
+                        "summary": _summarize_action(tool_name, arguments),
+                        "success": result.get("success", True),
+                    })
+
+                    # Add tool result to conversation
+                    result_content = result.get("result") or result.get("error", "")
+                    messages.append({
+                        "role": "tool",
+                        "tool_call_id": tool_call_id,
+                        "content": str(result_content),
+                    })
+
+                    # Guard 3: Stop on consecutive errors (calls of the same
+                    # group already ran, so their results are still recorded)
+                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS and not cycle_aborted:
+                        logger.warning(f"Stopping cycle: {consecutive_errors} consecutive error(s)")
+                        cycle_aborted = True
+
+                if cycle_aborted:
                     break
 
+            # Early-dispatched calls of groups skipped by Guard 3
+            self._cancel_early(early)
+
             if cycle_aborted:
                 break
 
@@ -282,18 +494,20 @@ class Brain:
         cutoff_2h = time.time() - 7200
         self._action_history = [a for a in self._action_history if a["time"] > cutoff_2h]
 
+        prefill.log(self.prefill_stats)
+        if self.no_action_cache.enabled:
+            logger.info(f"No-action cache: {self.no_action_cache.stats()}")
+        if self.rules is not None:
+            logger.info(f"Rule engine: {self.rules.stats()}")
+        if len(self.llm.router.backends) > 1:
+            logger.info(f"LLM backends: {self.llm.router.summary()}")
         logger.info("Cycle complete.")
 
     async def run(self):
-        self._loop = asyncio.get_running_loop()
+        asyncio.create_task(self.ingest.run(self._process_mqtt_message))
         logger.info(f"Connecting to {MQTT_BROKER}:{MQTT_PORT}...")
-        mqtt_user = os.getenv("MQTT_USER")
-        mqtt_pass = os.getenv("MQTT_PASS")
-        if mqtt_user:
-            self.client.username_pw_set(mqtt_user, mqtt_pass)
         try:
-            self.client.connect(MQTT_BROKER, MQTT_PORT, 60)
-            self.client.loop_start()
+            await self.mqtt.connect()
         except Exception as e:
             logger.error(f"Failed to connect to MQTT: {e}")
             return
@@ -301,7 +515,11 @@ class Brain:
         # Shared HTTP session for all components (Layer 2)
         async with aiohttp.ClientSession() as session:
             # Initialize components with shared session
-            self.llm = LLMClient(api_url=LLM_API_URL, session=session)
+            self.llm = LLMClient(
+                api_url=LLM_API_URL,
+                session=session,
+                router=LLMRouter.from_env(LLM_API_URL),
+            )
             self.dashboard = DashboardClient(session=session)
             self.task_reminder = TaskReminder(session=session)
             self.task_queue = TaskQueueManager(self.world_model, self.dashboard)
@@ -313,8 +531,13 @@ class Brain:
                 task_queue=self.task_queue,
                 session=session,
             )
+            if RULE_ENGINE_ENABLED:
+                self.rules = RuleEngine(self.tool_executor, self.dashboard, self.world_model)
             logger.info("All components initialized with shared HTTP session")
 
+            # Event-driven cycle trigger
+            asyncio.create_task(self._watch_events())
+
             # Start reminder service
             asyncio.create_task(self.task_reminder.run_periodic_check())
             logger.info("TaskReminder service started")
@@ -353,3 +576,5 @@ if __name__ == "__main__":
         asyncio.run(brain.run())
     except KeyboardInterrupt:
         pass
+    finally:
+        brain.world_model.close()
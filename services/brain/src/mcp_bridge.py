@@ -1,17 +1,21 @@
-
 import asyncio
 import json
 import uuid
 from typing import Dict, Any, Callable, Awaitable
 
+from mqtt_async import AsyncMQTTClient
+
+
 class MCPBridge:
-    def __init__(self, mqtt_client):
+    def __init__(self, mqtt_client: AsyncMQTTClient):
         self.mqtt_client = mqtt_client
         self.pending_requests: Dict[str, asyncio.Future] = {}
         self.tools: Dict[str, Dict[str, Any]] = {}
-        self._loop: asyncio.AbstractEventLoop | None = None
+        # Responses are dispatched on the event loop (no thread handoff)
+        self.mqtt_client.add_handler("mcp/+/response/#", self._on_response)
 
-    async def call_tool(self, agent_id: str, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    async def call_tool(self, agent_id: str, tool_name: str, arguments: Dict[str, Any],
+                        timeout: float = 10.0) -> Dict[str, Any]:
         request_id = str(uuid.uuid4())
         topic = f"mcp/{agent_id}/request/call_tool"
 
@@ -26,20 +30,29 @@ class MCPBridge:
         }
 
         # Create a Future to await response
-        self._loop = asyncio.get_running_loop()
-        future = self._loop.create_future()
+        future = asyncio.get_running_loop().create_future()
         self.pending_requests[request_id] = future
         
-        # Publish request
-        self.mqtt_client.publish(topic, json.dumps(payload))
-        
         try:
+            # Publish request (fail fast instead of waiting out the timeout)
+            if not await self.mqtt_client.publish(topic, json.dumps(payload)):
+                raise ConnectionError(f"Failed to publish tool request: {tool_name} on {agent_id}")
+
             # Wait for response with timeout
-            response = await asyncio.wait_for(future, timeout=10.0)
+            response = await asyncio.wait_for(future, timeout=timeout)
             return response
         except asyncio.TimeoutError:
-            del self.pending_requests[request_id]
             raise TimeoutError(f"Tool execution timed out: {tool_name} on {agent_id}")
+        finally:
+            # Also runs on cancellation (batch cancelled / outer timeout)
+            self.pending_requests.pop(request_id, None)
+
+    def _on_response(self, topic: str, raw: bytes):
+        try:
+            payload = json.loads(raw)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+        self.handle_response(topic, payload)
 
     def handle_response(self, topic: str, payload: Dict[str, Any]):
         # Expected topic: mcp/{agent_id}/response/{request_id}
@@ -50,14 +63,9 @@ class MCPBridge:
         # JSON-RPC payload id is authoritative; topic is fallback
         request_id = payload.get("id", parts[3])
             
-        if request_id in self.pending_requests:
-            future = self.pending_requests.pop(request_id)
-            if not future.done() and self._loop:
-                if "error" in payload:
-                    self._loop.call_soon_threadsafe(
-                        future.set_exception, Exception(payload["error"])
-                    )
-                else:
-                    self._loop.call_soon_threadsafe(
-                        future.set_result, payload.get("result")
-                    )
+        future = self.pending_requests.pop(request_id, None)
+        if future is not None and not future.done():
+            if "error" in payload:
+                future.set_exception(Exception(payload["error"]))
+            else:
+                future.set_result(payload.get("result"))
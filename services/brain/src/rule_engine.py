@@ -0,0 +1,241 @@
+"""
+Rule Engine: deterministic fast path for well-known WorldModel events.
+
+For alerts whose response is predictable (CO2 over threshold, temperature
+spike, sedentary posture, sensor tampering) a Rule maps the event to
+templated tool calls that run through ToolExecutor, so Sanitizer rate
+limits and cooldowns still apply (ToolExecutor serializes create_task/speak
+with the ReAct cycle's own calls).  A rule returns None when the situation
+is ambiguous; the event then triggers a regular ReAct cycle instead.
+
+Rules are pluggable: subclass Rule, set ``event_types`` and implement
+``evaluate()``, then RuleEngine.register() it.
+"""
+import asyncio
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from world_model import Event, ZoneState
+
+# Other warnings in the same zone within this window make a situation
+# "compound" and leave it to the LLM
+COMPOUND_WINDOW_SEC = 300
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+
+@dataclass
+class RuleContext:
+    zone_id: str
+    event: Event
+    zone: Optional[ZoneState]
+    active_tasks: List[dict]
+    # Same-zone events of the last COMPOUND_WINDOW_SEC, excluding ``event``
+    recent_events: List[Event] = field(default_factory=list)
+
+    def has_active_task(self, title: str) -> bool:
+        return any(
+            t.get("title") == title and t.get("zone") in (None, "", self.zone_id)
+            for t in self.active_tasks
+        )
+
+
+@dataclass
+class RuleDecision:
+    # Empty: handled, nothing to do (e.g. task already exists)
+    actions: List[ToolCall]
+    reason: str
+
+
+class Rule:
+    event_types: Tuple[str, ...] = ()
+
+    def evaluate(self, ctx: RuleContext) -> Optional[RuleDecision]:
+        """Tool calls for this event, or None to defer to the LLM."""
+        raise NotImplementedError
+
+
+class Co2Rule(Rule):
+    event_types = ("co2_threshold_exceeded",)
+
+    def evaluate(self, ctx: RuleContext) -> Optional[RuleDecision]:
+        co2 = ctx.event.data.get("value", 0)
+        title = f"{ctx.zone_id}の換気"
+        if ctx.has_active_task(title):
+            return RuleDecision([], "ventilation task already active")
+        urgency = 3 if co2 >= 1500 else 2
+        return RuleDecision([("create_task", {
+            "title": title,
+            "description": (
+                f"{ctx.zone_id}のCO2濃度が{co2}ppmに達しています（基準: 1000ppm以下）。"
+                "窓やドアを開けて5〜10分ほど換気してください。"
+            ),
+            "bounty": 800 if urgency == 2 else 1200,
+            "urgency": urgency,
+            "zone": ctx.zone_id,
+            "task_types": "environment",
+        })], f"co2 {co2}ppm")
+
+
+class TempSpikeRule(Rule):
+    event_types = ("temp_spike",)
+
+    def evaluate(self, ctx: RuleContext) -> Optional[RuleDecision]:
+        temp = ctx.event.data.get("value")
+        if temp is None or 18 <= temp <= 26:
+            # Spike within the comfort range: needs judgement
+            return None
+        kind = "高温" if temp > 26 else "低温"
+        title = f"{ctx.zone_id}の空調確認（{kind}）"
+        if ctx.has_active_task(title):
+            return RuleDecision([], "hvac task already active")
+        return RuleDecision([("create_task", {
+            "title": title,
+            "description": (
+                f"{ctx.zone_id}の気温が急変し{temp:.1f}℃になっています（快適範囲: 18-26℃）。"
+                "エアコンの設定や窓の開閉状態を確認してください。"
+            ),
+            "bounty": 1000,
+            "urgency": 3 if temp > 30 or temp < 15 else 2,
+            "zone": ctx.zone_id,
+            "task_types": "environment",
+        })], f"temp {temp:.1f}℃")
+
+
+class SedentaryRule(Rule):
+    event_types = ("sedentary_alert",)
+
+    MESSAGES = (
+        "{minutes}分ほど同じ姿勢が続いていますね。少し立ち上がって伸びをしてみませんか？",
+        "集中お疲れさまです。{minutes}分座りっぱなしなので、軽くストレッチしましょう。",
+        "そろそろ休憩はいかがですか？お水を一杯飲みに行くのもおすすめですよ。",
+    )
+
+    def __init__(self):
+        self._messages = itertools.cycle(self.MESSAGES)
+
+    def evaluate(self, ctx: RuleContext) -> Optional[RuleDecision]:
+        minutes = int(ctx.event.data.get("duration_sec", 0) / 60)
+        return RuleDecision([("speak", {
+            "message": next(self._messages).format(minutes=minutes),
+            "zone": ctx.zone_id,
+            "tone": "caring",
+        })], f"static {minutes}min")
+
+
+class SensorTamperRule(Rule):
+    event_types = ("sensor_tamper",)
+
+    MESSAGES = {
+        "temperature": (
+            "おや、温度センサーが急に慌てています。ドライヤーでも当てましたか？",
+            "温度センサーくんがびっくりしています。そっとしておいてあげてくださいね。",
+        ),
+        "humidity": (
+            "湿度センサーに息を吹きかけたのは誰ですか？センサーが汗をかいていますよ。",
+            "湿度が一瞬で急変しました。センサーで遊ばないでくださいね。",
+        ),
+    }
+
+    def __init__(self):
+        self._messages = {ch: itertools.cycle(msgs) for ch, msgs in self.MESSAGES.items()}
+
+    def evaluate(self, ctx: RuleContext) -> Optional[RuleDecision]:
+        channel = ctx.event.data.get("channel")
+        messages = self._messages.get(channel)
+        if messages is None:
+            return None
+        if ctx.zone is not None and ctx.zone.occupancy.person_count == 0:
+            # Nobody there to have done it: possibly a real fault
+            return None
+        return RuleDecision([("speak", {
+            "message": next(messages),
+            "zone": ctx.zone_id,
+            "tone": "humorous",
+        })], f"{channel} tamper")
+
+
+class RuleEngine:
+    def __init__(self, tool_executor, dashboard_client, world_model, rules: Optional[List[Rule]] = None):
+        self.tool_executor = tool_executor
+        self.dashboard = dashboard_client
+        self.world_model = world_model
+        self._rules: Dict[str, Rule] = {}
+        # One event at a time, so a rule sees the tasks earlier rules created
+        self._lock = asyncio.Lock()
+        for rule in (rules if rules is not None else default_rules()):
+            self.register(rule)
+
+        # Metrics
+        self.handled = 0
+        self.deferred = 0
+        self.actions = 0
+
+    def register(self, rule: Rule):
+        """Handle rule.event_types with rule (replaces earlier registrations)."""
+        for event_type in rule.event_types:
+            self._rules[event_type] = rule
+
+    def handles(self, event_type: str) -> bool:
+        return event_type in self._rules
+
+    async def handle(self, zone_id: str, event: Event) -> Optional[List[Tuple[str, Dict[str, Any], Dict[str, Any]]]]:
+        """
+        Apply the rule for event.
+
+        Returns:
+            [(tool_name, arguments, result), ...] for executed tool calls
+            (empty if nothing needed doing), or None if deferred to the LLM.
+        """
+        rule = self._rules.get(event.event_type)
+        if rule is None:
+            return None
+        async with self._lock:
+            return await self._handle(rule, zone_id, event)
+
+    async def _handle(self, rule: Rule, zone_id: str, event: Event):
+        recent = [
+            e for e in self.world_model.recent_events_for(zone_id, COMPOUND_WINDOW_SEC)
+            if e.seq != event.seq
+        ]
+        if any(e.severity != "info" and e.event_type != event.event_type for e in recent):
+            logger.info(f"Rule deferred to LLM: {event.event_type} [{zone_id}] (compound situation)")
+            self.deferred += 1
+            return None
+
+        ctx = RuleContext(
+            zone_id=zone_id,
+            event=event,
+            zone=self.world_model.get_zone(zone_id),
+            active_tasks=await self.dashboard.get_active_tasks(),
+            recent_events=recent,
+        )
+        decision = rule.evaluate(ctx)
+        if decision is None:
+            logger.info(f"Rule deferred to LLM: {event.event_type} [{zone_id}]")
+            self.deferred += 1
+            return None
+
+        self.handled += 1
+        logger.info(
+            f"Rule {type(rule).__name__} handling {event.event_type} [{zone_id}]: "
+            f"{decision.reason} -> {[name for name, _ in decision.actions] or 'no action'}"
+        )
+        outcomes = []
+        for tool_name, arguments in decision.actions:
+            result = await self.tool_executor.execute(tool_name, arguments)
+            if not result["success"]:
+                logger.warning(f"Rule action {tool_name} failed: {result['error']}")
+            self.actions += 1
+            outcomes.append((tool_name, arguments, result))
+        return outcomes
+
+    def stats(self) -> dict:
+        return {"handled": self.handled, "deferred": self.deferred, "actions": self.actions}
+
+
+def default_rules() -> List[Rule]:
+    return [Co2Rule(), TempSpikeRule(), SedentaryRule(), SensorTamperRule()]
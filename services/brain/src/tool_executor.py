@@ -1,12 +1,46 @@
 """
 Tool Executor: Routes tool calls through Sanitizer validation to handlers.
 """
+import asyncio
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple, Awaitable
 import aiohttp
 from loguru import logger
 
+# Per-tool execution timeout (seconds); speak covers the 60s voice synthesis
+TOOL_TIMEOUTS = {
+    "create_task": 15.0,
+    "send_device_command": 10.0,
+    "speak": 75.0,
+    "get_zone_status": 2.0,
+    "get_active_tasks": 10.0,
+}
+DEFAULT_TOOL_TIMEOUT = 10.0
+# The MCP reply wait ends this much before send_device_command's outer
+# timeout, so a silent device surfaces MCPBridge's timeout (and drops its
+# pending request) instead of being cancelled by the outer timeout
+DEVICE_REPLY_MARGIN_SEC = 1.0
+
+# Tools with no cross-call side effects on Sanitizer rate limits / cooldowns,
+# safe to run concurrently within one LLM turn. create_task and speak are
+# validated against counters they update afterwards, so they run alone:
+# ToolExecutor serializes them across every caller (ReAct cycle and rules).
+CONCURRENT_TOOLS = frozenset({
+    "send_device_command",
+    "get_zone_status",
+    "get_active_tasks",
+})
+
+# Read-only tools that may start while the LLM response is still streaming.
+# An early call is cancelled if the stream fails or the cycle aborts, which
+# is only safe for tools that change nothing: send_device_command may have
+# reached the device by then, so it waits for the complete turn.
+EARLY_DISPATCH_TOOLS = frozenset({
+    "get_zone_status",
+    "get_active_tasks",
+})
+
 
 class ToolExecutor:
     def __init__(self, sanitizer, mcp_bridge, dashboard_client, world_model, task_queue, session: aiohttp.ClientSession = None):
@@ -18,6 +52,8 @@ class ToolExecutor:
         self._session = session
         self.voice_url = os.getenv("VOICE_SERVICE_URL", "http://voice-service:8000")
         self.dashboard_api_url = os.getenv("DASHBOARD_API_URL", "http://backend:8000")
+        # Held from validation until the handler has recorded its effect
+        self._serial_lock = asyncio.Lock()
 
     async def execute(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -26,29 +62,92 @@ class ToolExecutor:
         Returns:
             {"success": True, "result": "..."} or {"success": False, "error": "..."}
         """
+        if tool_name in CONCURRENT_TOOLS:
+            return await self._execute(tool_name, arguments)
+        # Sanitizer checks create_task/speak against counters the handler
+        # updates when it finishes: validate and run them one at a time
+        async with self._serial_lock:
+            return await self._execute(tool_name, arguments)
+
+    async def _execute(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         # Validate through Sanitizer
         is_safe, reason = self.sanitizer.validate_tool_call(tool_name, arguments)
         if not is_safe:
             logger.warning(f"Tool call REJECTED: {tool_name} - {reason}")
             return {"success": False, "error": reason}
 
+        if tool_name == "create_task":
+            handler = self._handle_create_task(arguments)
+        elif tool_name == "send_device_command":
+            handler = self._handle_device_command(arguments)
+        elif tool_name == "speak":
+            handler = self._handle_speak(arguments)
+        elif tool_name == "get_zone_status":
+            handler = self._handle_get_zone_status(arguments)
+        elif tool_name == "get_active_tasks":
+            handler = self._handle_get_active_tasks()
+        else:
+            return {"success": False, "error": f"Unknown tool: {tool_name}"}
+
+        timeout = TOOL_TIMEOUTS.get(tool_name, DEFAULT_TOOL_TIMEOUT)
         try:
-            if tool_name == "create_task":
-                return await self._handle_create_task(arguments)
-            elif tool_name == "send_device_command":
-                return await self._handle_device_command(arguments)
-            elif tool_name == "speak":
-                return await self._handle_speak(arguments)
-            elif tool_name == "get_zone_status":
-                return await self._handle_get_zone_status(arguments)
-            elif tool_name == "get_active_tasks":
-                return await self._handle_get_active_tasks()
-            else:
-                return {"success": False, "error": f"Unknown tool: {tool_name}"}
+            async with asyncio.timeout(timeout) as deadline:
+                return await handler
+        except TimeoutError as e:
+            # A handler's own timeout (MCP reply, HTTP client) is the same
+            # class; only report the per-tool timeout if ours fired
+            if deadline.expired():
+                logger.error(f"Tool execution timed out ({tool_name}, {timeout}s)")
+                return {"success": False, "error": f"Tool execution timed out after {timeout:g}s: {tool_name}"}
+            error = str(e) or f"Timeout inside {tool_name}"
+            logger.error(f"Tool execution error ({tool_name}): {error}")
+            return {"success": False, "error": error}
         except Exception as e:
             logger.error(f"Tool execution error ({tool_name}): {e}")
             return {"success": False, "error": str(e)}
 
+    async def execute_batch(
+        self,
+        calls: List[Tuple[str, Dict[str, Any]]],
+        started: Optional[List[Optional[Awaitable[Dict[str, Any]]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Execute independent tool calls concurrently.
+
+        Each call keeps its own timeout; results are returned in call order.
+        ``started`` may hold, per call, an already running execute() task
+        (dispatched early while the LLM response was streaming) to await
+        instead of starting the call again.  Cancelling the batch cancels
+        every call still in flight (MCPBridge drops their pending requests).
+        """
+        aws = [
+            (started[i] if started and started[i] is not None else self.execute(tool_name, arguments))
+            for i, (tool_name, arguments) in enumerate(calls)
+        ]
+        if len(aws) == 1:
+            return [await aws[0]]
+        return list(await asyncio.gather(*aws))
+
+    @staticmethod
+    def group_calls(tool_names: List[str]) -> List[List[int]]:
+        """
+        Split one turn's tool calls into execution groups (indices, in order).
+
+        Consecutive CONCURRENT_TOOLS calls share a group; any other tool
+        gets a group of its own so its side effects stay ordered.
+        """
+        groups: List[List[int]] = []
+        for i, name in enumerate(tool_names):
+            if (
+                name in CONCURRENT_TOOLS
+                and groups
+                and tool_names[groups[-1][-1]] in CONCURRENT_TOOLS
+            ):
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+        return groups
+
     async def _handle_create_task(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Create a task via DashboardClient and register with TaskQueueManager."""
         title = args.get("title", "")
@@ -150,7 +249,10 @@ class ToolExecutor:
             except (json.JSONDecodeError, TypeError):
                 inner_args = {}
 
-        result = await self.mcp.call_tool(agent_id, tool_name, inner_args)
+        result = await self.mcp.call_tool(
+            agent_id, tool_name, inner_args,
+            timeout=TOOL_TIMEOUTS["send_device_command"] - DEVICE_REPLY_MARGIN_SEC,
+        )
         return {
             "success": True,
             "result": f"デバイスコマンド実行完了: {agent_id}/{tool_name} -> {json.dumps(result, ensure_ascii=False)}",
@@ -181,6 +283,10 @@ class ToolExecutor:
             lines.append(f"CO2: {env.co2}ppm{'（換気必要）' if env.is_stuffy else ''}")
         if env.illuminance is not None:
             lines.append(f"照度: {env.illuminance:.0f}lux")
+        if env.sound_level is not None:
+            lines.append(f"騒音レベル: {env.sound_level:.0f}dB")
+        if env.water_level is not None:
+            lines.append(f"水位: {env.water_level:.0f}%")
 
         if zone.devices:
             for dev_id, dev in zone.devices.items():
@@ -6,6 +6,7 @@ from .data_classes import (
     Event,
     ZoneState
 )
+from .event_log import EventSubscription
 
 __all__ = [
     "WorldModel",
@@ -13,5 +14,6 @@ __all__ = [
     "OccupancyData",
     "DeviceState",
     "Event",
-    "ZoneState"
+    "ZoneState",
+    "EventSubscription",
 ]
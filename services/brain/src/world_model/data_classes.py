@@ -15,6 +15,8 @@ class EnvironmentData(BaseModel):
     illuminance: Optional[float] = None  # lux
     pressure: Optional[float] = None  # hPa
     gas_resistance: Optional[int] = None  # Ohms (BME680 VOC indicator)
+    sound_level: Optional[float] = None  # dB (swarm sound_level channel)
+    water_level: Optional[float] = None  # Percentage (swarm water_level channel)
     
     # Timestamps for each measurement
     timestamps: Dict[str, float] = Field(default_factory=dict)
@@ -104,6 +106,7 @@ class Event(BaseModel):
     event_type: str  # "person_entered", "temp_spike", "co2_threshold_exceeded", etc.
     severity: str  # "info" | "warning" | "critical"
     data: Dict[str, Any] = Field(default_factory=dict)
+    seq: int = 0  # WorldModel-wide monotonic sequence number (assigned on emit)
     
     @property
     def description(self) -> str:
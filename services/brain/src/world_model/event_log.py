@@ -0,0 +1,201 @@
+"""
+Per-zone event store and event subscriptions.
+
+Events are appended in time order to a bounded deque, so range queries
+("events of the last N minutes") walk back from the newest entry and stop
+at the first older one.  A per-type "last fired" index answers cooldown
+checks in O(1) and survives eviction from the deque.  Evicted events can
+optionally be appended to an on-disk JSON Lines log for later analysis
+(EventSpill: a writer thread, so eviction never does file I/O on the loop).
+
+EventSubscription delivers newly emitted events to an async consumer
+(``async for seq, zone_id, event in world_model.subscribe()``).
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .data_classes import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventSpill:
+    """
+    Appends records to a JSON Lines file without blocking the caller.
+
+    write() only enqueues.  A daemon thread keeps the file open, writes
+    whatever has queued up as one batch and flushes once per batch.  Past
+    ``max_bytes`` the file is rotated to ``<path>.1`` (one backup kept;
+    0 = never rotate).  Share one instance per path between EventLogs so
+    their lines never interleave.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.written = 0
+        self.rotations = 0
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        if self._thread is None:
+            self._start()
+        self._queue.put_nowait(record)
+
+    def flush(self):
+        """Block until every record written so far is on disk."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self, timeout: float = 5.0):
+        """Write out pending records and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._queue.put_nowait(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="event-spill", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        f = None
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [r for r in batch if r is not None]
+            stop = len(records) < len(batch)
+            try:
+                if records:
+                    if f is None:
+                        f = open(self.path, "a", encoding="utf-8")
+                    f.write("".join(
+                        json.dumps(r, ensure_ascii=False) + "\n" for r in records
+                    ))
+                    f.flush()
+                    self.written += len(records)
+                    if self.max_bytes and f.tell() >= self.max_bytes:
+                        f.close()
+                        f = None
+                        os.replace(self.path, self.path + ".1")
+                        self.rotations += 1
+            except OSError as e:
+                logger.warning(f"Event spill to {self.path} failed ({len(records)} dropped): {e}")
+                if f is not None:
+                    f.close()
+                    f = None
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        if f is not None:
+            f.close()
+
+
+class EventLog:
+    def __init__(self, zone_id: str, capacity: int = 50, spill: Optional[EventSpill] = None):
+        self.zone_id = zone_id
+        self.capacity = capacity
+        self.spill = spill
+        self._events: Deque[Event] = deque()
+        self._last_fired: Dict[str, float] = {}
+        # Events ever appended (monotonic, unlike len() once at capacity)
+        self.total = 0
+
+    def append(self, event: Event):
+        if len(self._events) >= self.capacity:
+            self._spill(self._events.popleft())
+        self._events.append(event)
+        self._last_fired[event.event_type] = event.timestamp
+        self.total += 1
+
+    def last_fired(self, event_type: str) -> Optional[float]:
+        """Timestamp of the newest event of this type (None if never fired)."""
+        return self._last_fired.get(event_type)
+
+    def fired_within(self, event_type: str, window_sec: float, now: float) -> bool:
+        """True if an event of this type fired less than window_sec ago."""
+        ts = self._last_fired.get(event_type)
+        return ts is not None and now - ts < window_sec
+
+    def since(self, cutoff: float) -> List[Event]:
+        """Events with timestamp > cutoff, oldest first."""
+        recent = []
+        for event in reversed(self._events):
+            if event.timestamp <= cutoff:
+                break
+            recent.append(event)
+        recent.reverse()
+        return recent
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self._events)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _spill(self, event: Event):
+        if self.spill is not None:
+            self.spill.write({"zone": self.zone_id, **event.model_dump()})
+
+
+class EventSubscription:
+    """
+    Async iterator over newly emitted events as (seq, zone_id, event).
+
+    Bounded: when the consumer falls behind by ``maxsize`` events the oldest
+    undelivered one is dropped (the seq gap shows it).  Must be fed from the
+    event loop thread.
+    """
+
+    def __init__(self, maxsize: int, on_close: Callable[["EventSubscription"], None]):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._on_close = on_close
+        self.dropped = 0
+        self.closed = False
+
+    def deliver(self, item: Tuple[int, str, Event]):
+        if self.closed:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._on_close(self)
+        # Wake a consumer blocked in __anext__ (only possible when empty;
+        # a full queue keeps its undelivered events)
+        if not self._queue.full():
+            self._queue.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[int, str, Event]:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
@@ -1,9 +1,89 @@
 """
 Sensor fusion logic for combining multiple sensor readings.
+
+Streaming readings are kept in a fixed-size ring buffer per
+(zone, channel, device).  Each ring maintains its exponentially-decayed
+weighted sums incrementally, referenced to the time of its newest reading:
+
+    vsum = Σ reliability·value·exp(-(ref - t)/half_life)
+    wsum = Σ reliability·exp(-(ref - t)/half_life)
+
+A new reading decays both sums to its own timestamp and adds itself; a
+reading leaving the ring (capacity or max-age window) subtracts its decayed
+contribution.  Fusing a channel is then O(devices) instead of
+O(retained readings).  The sums are recomputed from the ring every
+``capacity`` updates so floating-point drift from the subtractions cannot
+accumulate.
 """
 import math
 import time
-from typing import List, Tuple, Dict, Optional
+from collections import deque
+from typing import Deque, List, Tuple, Dict, Optional
+
+
+class SensorRing:
+    """Ring buffer + running decayed sums for one (zone, channel, device)."""
+
+    __slots__ = ("half_life", "capacity", "readings", "ref_time", "vsum", "wsum", "_updates")
+
+    def __init__(self, half_life: float, capacity: int):
+        self.half_life = half_life
+        self.capacity = capacity
+        # (value, timestamp, reliability)
+        self.readings: Deque[Tuple[float, float, float]] = deque()
+        self.ref_time = 0.0
+        self.vsum = 0.0
+        self.wsum = 0.0
+        self._updates = 0
+
+    def add(self, value: float, timestamp: float, reliability: float):
+        if len(self.readings) >= self.capacity:
+            self._remove(*self.readings.popleft())
+
+        if timestamp >= self.ref_time:
+            decay = math.exp(-(timestamp - self.ref_time) / self.half_life)
+            self.vsum *= decay
+            self.wsum *= decay
+            self.ref_time = timestamp
+            weight = reliability
+        else:
+            # Out-of-order reading: decay it to the current reference instead
+            weight = reliability * math.exp(-(self.ref_time - timestamp) / self.half_life)
+        self.vsum += value * weight
+        self.wsum += weight
+        self.readings.append((value, timestamp, reliability))
+
+        self._updates += 1
+        if self._updates >= self.capacity:
+            self._rebase()
+
+    def evict_before(self, cutoff: float):
+        """Drop readings with timestamp <= cutoff (oldest first)."""
+        readings = self.readings
+        while readings and readings[0][1] <= cutoff:
+            self._remove(*readings.popleft())
+        if not readings:
+            self.vsum = self.wsum = 0.0
+
+    def totals(self, now: float) -> Tuple[float, float]:
+        """(vsum, wsum) decayed to ``now``."""
+        decay = math.exp(-(now - self.ref_time) / self.half_life)
+        return self.vsum * decay, self.wsum * decay
+
+    def _remove(self, value: float, timestamp: float, reliability: float):
+        weight = reliability * math.exp(-(self.ref_time - timestamp) / self.half_life)
+        self.vsum -= value * weight
+        self.wsum -= weight
+
+    def _rebase(self):
+        """Recompute the sums exactly from the retained readings."""
+        vsum = wsum = 0.0
+        for value, timestamp, reliability in self.readings:
+            weight = reliability * math.exp(-(self.ref_time - timestamp) / self.half_life)
+            vsum += value * weight
+            wsum += weight
+        self.vsum, self.wsum = vsum, wsum
+        self._updates = 0
 
 
 class SensorFusion:
@@ -16,11 +96,17 @@ class SensorFusion:
         "illuminance": 120,
         "occupancy": 30,
         "pir": 10,
+        "sound_level": 30,
+        "water_level": 300,
         "default": 120
     }
 
-    def __init__(self):
+    def __init__(self, ring_capacity: int = 128, max_age_sec: float = 600):
         self.sensor_reliability: Dict[str, float] = {"default": 0.5}
+        self.ring_capacity = ring_capacity
+        self.max_age_sec = max_age_sec
+        # (zone_id, channel) -> device_id -> ring
+        self._rings: Dict[Tuple[str, str], Dict[str, SensorRing]] = {}
 
     def set_reliability(self, sensor_id: str, score: float):
         """Set reliability score for a specific sensor."""
@@ -55,6 +141,46 @@ class SensorFusion:
         """Generic sensor fusion with sensor-type specific half-life."""
         return self.fuse_temperature(readings, sensor_type)
 
+    def add_reading(self, zone_id: str, channel: str, device_id: Optional[str],
+                    value: float, timestamp: Optional[float] = None) -> Optional[float]:
+        """
+        Record a streaming reading and return the fused value for the channel.
+
+        Equivalent to fuse_generic() over the readings of the last
+        ``max_age_sec`` (bounded to ``ring_capacity`` per device), in O(devices).
+        """
+        now = timestamp if timestamp is not None else time.time()
+        devices = self._rings.get((zone_id, channel))
+        if devices is None:
+            devices = self._rings[(zone_id, channel)] = {}
+        ring = devices.get(device_id)
+        if ring is None:
+            ring = devices[device_id] = SensorRing(self._get_half_life(channel), self.ring_capacity)
+
+        reliability = self.sensor_reliability.get(device_id, self.sensor_reliability["default"])
+        ring.add(float(value), now, reliability)
+        return self.fused_value(zone_id, channel, now)
+
+    def fused_value(self, zone_id: str, channel: str, now: Optional[float] = None) -> Optional[float]:
+        """Current fused value of a (zone, channel) across its devices."""
+        devices = self._rings.get((zone_id, channel))
+        if not devices:
+            return None
+        now = now if now is not None else time.time()
+        cutoff = now - self.max_age_sec
+        weighted_sum = 0.0
+        total_weight = 0.0
+        for ring in devices.values():
+            ring.evict_before(cutoff)
+            if not ring.readings:
+                continue
+            vsum, wsum = ring.totals(now)
+            weighted_sum += vsum
+            total_weight += wsum
+        if total_weight <= 0:
+            return None
+        return weighted_sum / total_weight
+
     def integrate_occupancy(self, vision_count: int, pir_active: bool, zone_size: float = 20.0) -> int:
         """Integrate occupancy from YOLO vision and PIR sensor."""
         estimated_count = vision_count
@@ -0,0 +1,61 @@
+"""
+Topic router for WorldModel.update_from_mqtt.
+
+Topics follow ``office/{zone}/{device_type}/{device_id}/{channel}``.  A
+deployment publishes on a small, stable set of topic strings, so each one is
+split and resolved to its handler once and the result is kept in a bounded
+LRU cache keyed by the topic string.  Handlers are registered per
+device_type; registering (or replacing) a handler clears the cache.
+"""
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+
+class TopicRoute(NamedTuple):
+    zone: str
+    device_type: str
+    device_id: Optional[str]
+    channel: Optional[str]
+
+
+# handler(zone_record, route, payload)
+RouteHandler = Callable[..., None]
+
+
+class TopicRouter:
+    def __init__(self, cache_size: int = 4096):
+        self._handlers: Dict[str, RouteHandler] = {}
+        self._resolve = lru_cache(maxsize=cache_size)(self._resolve_uncached)
+
+    def register(self, device_types, handler: RouteHandler):
+        """Route one or more device_type strings to handler."""
+        if isinstance(device_types, str):
+            device_types = (device_types,)
+        for device_type in device_types:
+            self._handlers[device_type] = handler
+        self._resolve.cache_clear()
+
+    def route(self, topic: str) -> Optional[Tuple[TopicRoute, Optional[RouteHandler]]]:
+        """
+        Resolve a topic.
+
+        Returns:
+            (route, handler) — handler is None for device types without one —
+            or None for non-office topics.
+        """
+        return self._resolve(topic)
+
+    def cache_info(self):
+        return self._resolve.cache_info()
+
+    def _resolve_uncached(self, topic: str) -> Optional[Tuple[TopicRoute, Optional[RouteHandler]]]:
+        parts = topic.split('/')
+        if len(parts) < 3 or parts[0] != "office":
+            return None
+        route = TopicRoute(
+            zone=parts[1],
+            device_type=parts[2],
+            device_id=parts[3] if len(parts) > 3 else None,
+            channel=parts[4] if len(parts) > 4 else None,
+        )
+        return route, self._handlers.get(route.device_type)
@@ -1,15 +1,49 @@
 """
 World Model: Centralized state management for office environment.
+
+Zone state lives in slotted records (zone_store) on the ingestion path;
+pydantic ZoneState views are materialised only for readers.
 """
 import json
 import logging
 import time
-from typing import Dict, Optional, List
-from .data_classes import ZoneState, EnvironmentData, OccupancyData, DeviceState, Event
+from typing import Callable, Dict, Optional, List, Tuple
+from .data_classes import ZoneState, Event
 from .sensor_fusion import SensorFusion
+from .zone_store import ENV_CHANNELS, DeviceRecord, ZoneRecord
+from .event_log import EventLog, EventSpill, EventSubscription
+from .topic_router import TopicRoute, TopicRouter
 
 logger = logging.getLogger(__name__)
 
+# Minimum change of a numeric value that re-renders a zone's LLM context
+# section (roughly the displayed precision; alert band crossings always do)
+CONTEXT_CHANGE_THRESHOLDS = {
+    "temperature": 0.1,
+    "humidity": 1.0,
+    "co2": 10,
+    "pressure": 0.1,
+    "illuminance": 5.0,
+    "sound_level": 1.0,
+    "water_level": 1.0,
+    "avg_motion_level": 0.01,
+    "posture_duration_sec": 60.0,
+}
+
+# Bucket sizes for state_fingerprint(): coarser than the context thresholds
+# so sensor noise does not make an otherwise idle office look new
+FINGERPRINT_QUANTA = {
+    "temperature": 0.5,
+    "humidity": 2.0,
+    "co2": 50,
+    "pressure": 1.0,
+    "illuminance": 50.0,
+    "sound_level": 3.0,
+    "water_level": 2.0,
+    "avg_motion_level": 0.05,
+    "posture_duration_sec": 300.0,
+}
+
 
 class WorldModel:
     """
@@ -17,16 +51,44 @@ class WorldModel:
     Integrates sensor data, occupancy information, and device states.
     """
     
-    def __init__(self):
-        self.zones: Dict[str, ZoneState] = {}
+    def __init__(
+        self,
+        event_capacity: int = 50,
+        zone_event_capacity: Optional[Dict[str, int]] = None,
+        event_spill_path: Optional[str] = None,
+        event_spill_max_bytes: int = 0,
+    ):
+        """
+        Args:
+            event_capacity: events retained per zone
+            zone_event_capacity: per-zone overrides of event_capacity
+            event_spill_path: JSON Lines file receiving evicted events (None = drop)
+            event_spill_max_bytes: rotate the spill file past this size (0 = never)
+        """
+        self._zones: Dict[str, ZoneRecord] = {}
+        self.event_capacity = event_capacity
+        self.zone_event_capacity = zone_event_capacity or {}
+        self.event_spill_path = event_spill_path
+        # One writer for every zone (written off the event loop)
+        self._event_spill = (
+            EventSpill(event_spill_path, event_spill_max_bytes) if event_spill_path else None
+        )
+
+        # Monotonic sequence over all emitted events + async subscribers
+        self.event_seq = 0
+        self._subscribers: List[EventSubscription] = []
+
+        # Topic string → (route, handler), LRU-cached
+        self._router = TopicRouter()
+        self._register_routes()
         self.sensor_fusion = SensorFusion()
         
-        # Cache for LLM context (optimization)
-        self._llm_context_cache: Optional[str] = None
-        self._cache_timestamp: float = 0
-        
-        # Sensor readings buffer for fusion
-        self._sensor_readings: Dict[str, List] = {}
+        # LLM context: per-zone rendered fragments (ZoneRecord.context_*)
+        self.context_cache_hits = 0
+        self.context_cache_misses = 0
+        # Characters of zone sections left out by the last diff-mode context
+        self.last_context_omitted_chars = 0
+
     
     def update_from_mqtt(self, topic: str, payload: dict):
         """
@@ -36,131 +98,100 @@ class WorldModel:
             topic: MQTT topic (e.g., "office/kitchen/sensor/temp_01/temperature")
             payload: Message payload (JSON dict)
         """
-        parsed = self._parse_topic(topic)
-        if not parsed:
+        resolved = self._router.route(topic)
+        if resolved is None:
             logger.debug(f"Ignoring non-office topic: {topic}")
             return
-        
-        zone_id = parsed["zone"]
-        device_type = parsed["device_type"]
-        device_id = parsed.get("device_id")
-        channel = parsed.get("channel")
+        route, handler = resolved
+        zone_id = route.zone
         
         # Create zone if it doesn't exist
-        if zone_id not in self.zones:
-            self.zones[zone_id] = ZoneState(zone_id=zone_id)
+        zone = self._zones.get(zone_id)
+        if zone is None:
+            events = EventLog(
+                zone_id,
+                capacity=self.zone_event_capacity.get(zone_id, self.event_capacity),
+                spill=self._event_spill,
+            )
+            zone = self._zones[zone_id] = ZoneRecord(zone_id, time.time(), events)
             logger.info(f"Created new zone: {zone_id}")
         
-        zone = self.zones[zone_id]
-        
-        # Route to appropriate handler
-        if device_type == "sensor":
-            self._update_environment(zone, channel, payload, device_id)
-        elif device_type in ("camera", "occupancy"):
-            self._update_occupancy(zone, payload)
-        elif device_type == "activity":
-            self._update_activity(zone, payload)
-        elif device_type == "task_report":
-            self._handle_task_report(zone, payload, device_id)
-        elif device_type in ["hvac", "light", "coffee_machine"]:
-            self._update_device(zone, device_type, device_id, payload)
+        # Route to appropriate handler (table lookup, cached per topic)
+        if handler is not None:
+            handler(zone, route, payload)
         
         zone.last_update = time.time()
         
         # Detect events based on state changes
         self._detect_events(zone)
-        
-        # Invalidate LLM context cache
-        self._llm_context_cache = None
+        zone.version += 1
     
-    def _parse_topic(self, topic: str) -> Optional[Dict[str, str]]:
-        """
-        Parse MQTT topic into components.
-        
-        Format: office/{zone}/{device_type}/{device_id}/{channel}
-        Example: office/meeting_room_a/sensor/env_01/temperature
-        
-        Returns:
-            Dict with zone, device_type, device_id, channel or None
-        """
-        parts = topic.split('/')
-        if len(parts) < 3 or parts[0] != "office":
-            return None
-        
-        return {
-            "zone": parts[1],
-            "device_type": parts[2],
-            "device_id": parts[3] if len(parts) > 3 else None,
-            "channel": parts[4] if len(parts) > 4 else None
+    def _register_routes(self):
+        """device_type → handler(zone, route, payload); channel → handler for sensors."""
+        self._router.register("sensor", self._update_environment)
+        self._router.register(("camera", "occupancy"), self._update_occupancy)
+        self._router.register("activity", self._update_activity)
+        self._router.register("task_report", self._handle_task_report)
+        self._router.register(("hvac", "light", "coffee_machine"), self._update_device)
+
+        # Sensor channels beyond the plain ENV_CHANNELS values
+        self._channel_handlers: Dict[str, Callable[[ZoneRecord, float, Optional[str], float], None]] = {
+            "motion": self._apply_motion,
+            "door": self._apply_door,
         }
     
-    def _update_environment(self, zone: ZoneState, channel: str, payload: dict, device_id: str):
+    def _update_environment(self, zone: ZoneRecord, route: TopicRoute, payload: dict):
         """Update environmental data for a zone."""
         current_time = time.time()
+        channel = route.channel
+        device_id = route.device_id
         
         # Extract value from payload
         value = payload.get(channel) or payload.get("value")
         if value is None:
             return
         
-        # Store reading for sensor fusion
-        reading_key = f"{zone.zone_id}:{channel}"
-        if reading_key not in self._sensor_readings:
-            self._sensor_readings[reading_key] = []
-        
-        self._sensor_readings[reading_key].append((device_id, value, current_time))
-        
-        # Keep only recent readings (last 10 minutes)
-        self._sensor_readings[reading_key] = [
-            r for r in self._sensor_readings[reading_key]
-            if current_time - r[2] < 600
-        ]
-        
-        # Fuse multiple sensor readings with appropriate sensor type
-        fused_value = self.sensor_fusion.fuse_generic(
-            self._sensor_readings[reading_key], 
-            sensor_type=channel  # Pass sensor type for half-life selection
+        # Record reading in the per-device ring and fuse (half-life by channel)
+        fused_value = self.sensor_fusion.add_reading(
+            zone.zone_id, channel, device_id, value, current_time
         )
         
         if fused_value is None:
             return
         
         # Update zone environment
-        if channel == "temperature":
-            zone.environment.temperature = fused_value
-        elif channel == "humidity":
-            zone.environment.humidity = fused_value
-        elif channel == "co2":
-            zone.environment.co2 = int(fused_value)
-        elif channel == "illuminance":
-            zone.environment.illuminance = fused_value
-        elif channel == "pressure":
-            zone.environment.pressure = fused_value
-        elif channel == "gas_resistance":
-            zone.environment.gas_resistance = int(fused_value)
-        elif channel == "motion":
-            zone.occupancy.pir_detected = bool(fused_value)
-            zone.occupancy.person_count = self.sensor_fusion.integrate_occupancy(
-                vision_count=zone.occupancy.vision_count,
-                pir_active=zone.occupancy.pir_detected
-            )
-        elif channel == "door":
-            prev_door = getattr(zone, '_prev_door_state', None)
-            door_open = bool(fused_value)
-            if prev_door is not None and door_open != prev_door:
-                event = Event(
-                    timestamp=current_time,
-                    event_type="door_opened" if door_open else "door_closed",
-                    severity="info",
-                    data={"device_id": device_id, "state": "open" if door_open else "closed"}
-                )
-                zone.events.append(event)
-            zone._prev_door_state = door_open
+        cast = ENV_CHANNELS.get(channel)
+        if cast is not None:
+            setattr(zone.environment, channel, cast(fused_value))
+        else:
+            apply = self._channel_handlers.get(channel)
+            if apply is not None:
+                apply(zone, fused_value, device_id, current_time)
 
         # Update timestamp
         zone.environment.timestamps[channel] = current_time
+
+    def _apply_motion(self, zone: ZoneRecord, fused_value: float, device_id: Optional[str], current_time: float):
+        zone.occupancy.pir_detected = bool(fused_value)
+        zone.occupancy.person_count = self.sensor_fusion.integrate_occupancy(
+            vision_count=zone.occupancy.vision_count,
+            pir_active=zone.occupancy.pir_detected
+        )
+
+    def _apply_door(self, zone: ZoneRecord, fused_value: float, device_id: Optional[str], current_time: float):
+        prev_door = zone._prev_door_state
+        door_open = bool(fused_value)
+        if prev_door is not None and door_open != prev_door:
+            event = Event(
+                timestamp=current_time,
+                event_type="door_opened" if door_open else "door_closed",
+                severity="info",
+                data={"device_id": device_id, "state": "open" if door_open else "closed"}
+            )
+            self._emit(zone, event)
+        zone._prev_door_state = door_open
     
-    def _update_occupancy(self, zone: ZoneState, payload: dict):
+    def _update_occupancy(self, zone: ZoneRecord, route: TopicRoute, payload: dict):
         """Update occupancy data from camera/vision system."""
         # Handle different payload formats
         if "person_count" in payload:
@@ -183,7 +214,7 @@ class WorldModel:
             pir_active=zone.occupancy.pir_detected
         )
     
-    def _update_activity(self, zone: ZoneState, payload: dict):
+    def _update_activity(self, zone: ZoneRecord, route: TopicRoute, payload: dict):
         """Update activity data from Perception ActivityMonitor."""
         if "person_count" in payload:
             zone.occupancy.vision_count = payload["person_count"]
@@ -200,13 +231,12 @@ class WorldModel:
         if "posture_status" in payload:
             zone.occupancy.posture_status = payload["posture_status"]
 
-    def _update_device(self, zone: ZoneState, device_type: str, device_id: str, payload: dict):
+    def _update_device(self, zone: ZoneRecord, route: TopicRoute, payload: dict):
         """Update device state."""
+        device_type = route.device_type
+        device_id = route.device_id
         if device_id not in zone.devices:
-            zone.devices[device_id] = DeviceState(
-                device_id=device_id,
-                device_type=device_type
-            )
+            zone.devices[device_id] = DeviceRecord(device_id, device_type)
         
         device = zone.devices[device_id]
         
@@ -220,8 +250,9 @@ class WorldModel:
         if "mode" in payload or "target_temp" in payload:
             device.specific_state.update(payload)
     
-    def _handle_task_report(self, zone: ZoneState, payload: dict, device_id: str):
+    def _handle_task_report(self, zone: ZoneRecord, route: TopicRoute, payload: dict):
         """Handle task completion report from dashboard."""
+        device_id = route.device_id
         event = Event(
             timestamp=time.time(),
             event_type="task_report",
@@ -233,11 +264,11 @@ class WorldModel:
                 "completion_note": payload.get("completion_note", ""),
             }
         )
-        zone.events.append(event)
+        self._emit(zone, event)
         logger.info("Task report received: task_id=%s status=%s",
                      payload.get("task_id"), payload.get("report_status"))
 
-    def _detect_events(self, zone: ZoneState):
+    def _detect_events(self, zone: ZoneRecord):
         """Detect events based on state changes."""
         current_time = time.time()
 
@@ -254,7 +285,7 @@ class WorldModel:
                     severity="info",
                     data={"count": zone.occupancy.person_count}
                 )
-                zone.events.append(event)
+                self._emit(zone, event)
                 zone.occupancy.last_entry_time = current_time
             elif zone.occupancy.person_count < zone._prev_occupancy:
                 event = Event(
@@ -263,7 +294,7 @@ class WorldModel:
                     severity="info",
                     data={"count": zone.occupancy.person_count}
                 )
-                zone.events.append(event)
+                self._emit(zone, event)
                 if zone.occupancy.person_count == 0:
                     zone.occupancy.last_exit_time = current_time
             
@@ -272,19 +303,14 @@ class WorldModel:
         # CO2 threshold exceeded
         if zone.environment.co2 and zone.environment.co2 > 1000:
             # Avoid duplicate events (don't create if one exists in last 10 minutes)
-            recent_co2_events = [
-                e for e in zone.events
-                if e.event_type == "co2_threshold_exceeded"
-                and current_time - e.timestamp < 600
-            ]
-            if not recent_co2_events:
+            if not zone.events.fired_within("co2_threshold_exceeded", 600, current_time):
                 event = Event(
                     timestamp=current_time,
                     event_type="co2_threshold_exceeded",
                     severity="warning",
                     data={"value": zone.environment.co2}
                 )
-                zone.events.append(event)
+                self._emit(zone, event)
         
         # Temperature spike
         if zone.environment.temperature and zone._prev_temperature:
@@ -296,7 +322,7 @@ class WorldModel:
                     severity="warning",
                     data={"value": zone.environment.temperature, "change": temp_change}
                 )
-                zone.events.append(event)
+                self._emit(zone, event)
         
         zone._prev_temperature = zone.environment.temperature
 
@@ -304,12 +330,8 @@ class WorldModel:
         if (zone.occupancy.person_count > 0
                 and zone.occupancy.posture_status == "static"
                 and zone.occupancy.posture_duration_sec >= 1800):
-            recent_sedentary = [
-                e for e in zone.events
-                if e.event_type == "sedentary_alert"
-                and current_time - e.timestamp < 3600  # 1 hour cooldown
-            ]
-            if not recent_sedentary:
+            # 1 hour cooldown
+            if not zone.events.fired_within("sedentary_alert", 3600, current_time):
                 event = Event(
                     timestamp=current_time,
                     event_type="sedentary_alert",
@@ -319,7 +341,7 @@ class WorldModel:
                         "person_count": zone.occupancy.person_count,
                     }
                 )
-                zone.events.append(event)
+                self._emit(zone, event)
 
         # Sensor tamper: rapid environment change (use saved previous values)
         for channel, prev_val, threshold in [
@@ -337,12 +359,8 @@ class WorldModel:
                 if 0 < dt <= 30:
                     change = abs(current_val - prev_val)
                     if change >= threshold:
-                        recent_tamper = [
-                            e for e in zone.events
-                            if e.event_type == "sensor_tamper"
-                            and current_time - e.timestamp < 300  # 5 min cooldown
-                        ]
-                        if not recent_tamper:
+                        # 5 min cooldown
+                        if not zone.events.fired_within("sensor_tamper", 300, current_time):
                             event = Event(
                                 timestamp=current_time,
                                 event_type="sensor_tamper",
@@ -354,115 +372,271 @@ class WorldModel:
                                     "value": current_val,
                                 }
                             )
-                            zone.events.append(event)
+                            self._emit(zone, event)
 
             if current_val is not None:
                 if channel == "humidity":
                     zone._prev_humidity = current_val
             if current_ts is not None:
                 zone._prev_env_timestamps[ts_key] = current_ts
-
-        # Limit event history size (keep last 50 events per zone)
-        if len(zone.events) > 50:
-            zone.events = zone.events[-50:]
     
     def get_zone(self, zone_id: str) -> Optional[ZoneState]:
-        """Get state of a specific zone."""
-        return self.zones.get(zone_id)
+        """Get state of a specific zone (read-only snapshot)."""
+        zone = self._zones.get(zone_id)
+        return zone.view() if zone is not None else None
     
     def get_all_zones(self) -> Dict[str, ZoneState]:
-        """Get all zones."""
-        return self.zones
+        """Get all zones (read-only snapshots)."""
+        return {zone_id: zone.view() for zone_id, zone in self._zones.items()}
+
+    @property
+    def zones(self) -> Dict[str, ZoneState]:
+        return self.get_all_zones()
+
+    def recent_events(self, window_sec: float) -> List[Tuple[str, Event]]:
+        """(zone_id, event) pairs from the last window_sec, oldest first per zone."""
+        cutoff = time.time() - window_sec
+        return [
+            (zone_id, event)
+            for zone_id, zone in self._zones.items()
+            for event in zone.events.since(cutoff)
+        ]
+
+    def recent_events_for(self, zone_id: str, window_sec: float) -> List[Event]:
+        """Events of one zone from the last window_sec, oldest first."""
+        zone = self._zones.get(zone_id)
+        if zone is None:
+            return []
+        return zone.events.since(time.time() - window_sec)
+
+    def subscribe(self, maxsize: int = 256) -> EventSubscription:
+        """
+        Subscribe to events emitted from now on.
+
+        Usage:
+            async for seq, zone_id, event in world_model.subscribe(): ...
+        """
+        subscription = EventSubscription(maxsize, self._subscribers.remove)
+        self._subscribers.append(subscription)
+        return subscription
+
+    def close(self):
+        """Write out spilled events still queued for disk."""
+        if self._event_spill is not None:
+            self._event_spill.close()
+
+    def _emit(self, zone: ZoneRecord, event: Event):
+        """Sequence, store and publish a new event."""
+        self.event_seq += 1
+        event.seq = self.event_seq
+        zone.events.append(event)
+        for subscription in self._subscribers:
+            subscription.deliver((event.seq, zone.zone_id, event))
     
-    def get_llm_context(self) -> str:
+    def get_llm_context(self, sent_sections: Optional[Dict[str, str]] = None) -> str:
         """
         Generate optimized context string for LLM.
-        Cached for 5 seconds to avoid redundant generation.
+
+        Each zone's section (and its alert lines) is rendered once and reused
+        until the zone changes materially (see CONTEXT_CHANGE_THRESHOLDS) or
+        one of its displayed events ages out of the 10-minute window.
+        Zones are always emitted in sorted order so that unchanged state
+        renders byte-identically across cycles.
+
+        Args:
+            sent_sections: Diff mode. zone_id -> section sent last time;
+                zones whose section is unchanged are omitted (listed by name
+                only) and the dict is updated with what was sent.  Alerts
+                are always included for every zone.
         """
         current_time = time.time()
-        
-        # Return cached context if fresh
-        if self._llm_context_cache and (current_time - self._cache_timestamp < 5):
-            return self._llm_context_cache
-        
-        context_parts = []
 
-        # Collect alerts for abnormal values across all zones
         alerts = []
-        for zone_id, zone in sorted(self.zones.items()):
-            env = zone.environment
-            if env.temperature is not None:
-                if env.temperature > 26:
-                    alerts.append(f"⚠️ [{zone_id}] 高温: {env.temperature:.1f}℃（基準: 18-26℃）")
-                elif env.temperature < 18:
-                    alerts.append(f"⚠️ [{zone_id}] 低温: {env.temperature:.1f}℃（基準: 18-26℃）")
-            if env.co2 is not None and env.co2 > 1000:
-                alerts.append(f"⚠️ [{zone_id}] CO2高濃度: {env.co2}ppm（基準: 1000ppm以下）")
-            if env.humidity is not None:
-                if env.humidity > 60:
-                    alerts.append(f"⚠️ [{zone_id}] 高湿度: {env.humidity:.0f}%（基準: 30-60%）")
-                elif env.humidity < 30:
-                    alerts.append(f"⚠️ [{zone_id}] 低湿度: {env.humidity:.0f}%（基準: 30-60%）")
+        sections = []
+        unchanged = []
+        self.last_context_omitted_chars = 0
+        for zone_id in sorted(self._zones):
+            zone = self._zones[zone_id]
+            snapshot = self._context_snapshot(zone)
+            if (zone.context_fragment is None
+                    or current_time >= zone.context_expires
+                    or self._context_changed(zone.context_snapshot, snapshot)):
+                zone.context_fragment, zone.context_expires = self._render_zone_context(
+                    zone, current_time
+                )
+                zone.context_snapshot = snapshot
+                self.context_cache_misses += 1
+            else:
+                self.context_cache_hits += 1
+            zone_alerts, summary = zone.context_fragment
+            alerts.extend(zone_alerts)
+            if sent_sections is not None:
+                if sent_sections.get(zone_id) == summary:
+                    unchanged.append(zone_id)
+                    self.last_context_omitted_chars += len(summary)
+                    continue
+                sent_sections[zone_id] = summary
+            sections.append(summary)
 
+        context_parts = []
         if alerts:
             context_parts.append("### アラート（要対応）\n" + "\n".join(alerts))
+        context_parts.extend(sections)
+        if unchanged:
+            context_parts.append("### 前回から変化なし\n" + ", ".join(unchanged))
+        return "\n".join(context_parts)
 
-        for zone_id, zone in sorted(self.zones.items()):
-            summary = f"### {zone_id}\n"
-            
-            # Occupancy and activity
-            if zone.occupancy.person_count > 0:
-                summary += f"- 状態: {zone.occupancy.activity_summary}\n"
-                if zone.occupancy.avg_motion_level > 0:
-                    summary += f"- 活動レベル: {zone.occupancy.avg_motion_level:.2f}\n"
-                if zone.occupancy.posture_status != "unknown":
-                    minutes = int(zone.occupancy.posture_duration_sec / 60)
-                    summary += f"- 姿勢状態: {zone.occupancy.posture_status} ({minutes}分間)\n"
+    def invalidate_context_cache(self):
+        """Drop every zone's rendered fragment; the next get_llm_context() re-renders all."""
+        for zone in self._zones.values():
+            zone.context_fragment = None
+
+    def context_cache_stats(self) -> Dict[str, int]:
+        """Per-zone context fragment cache hit/miss counters."""
+        return {"hits": self.context_cache_hits, "misses": self.context_cache_misses}
+
+    def state_fingerprint(self) -> tuple:
+        """
+        Hashable summary of all zones: numeric values bucketed by
+        FINGERPRINT_QUANTA, alert bands, occupancy, activity and devices.
+        Equal fingerprints mean the office looks the same to the LLM up to
+        sensor noise (events are not included; callers add their own window).
+        """
+        zones = []
+        for zone_id in sorted(self._zones):
+            snapshot = self._context_snapshot(self._zones[zone_id])
+            del snapshot["events"]
+            for key, quantum in FINGERPRINT_QUANTA.items():
+                value = snapshot[key]
+                if value is not None:
+                    snapshot[key] = int(value // quantum)
+            zones.append((zone_id, tuple(snapshot.values())))
+        return tuple(zones)
+
+    @staticmethod
+    def _context_snapshot(zone: ZoneRecord) -> dict:
+        """Values the zone's context section is rendered from."""
+        env = zone.environment
+        occ = zone.occupancy
+        return {
+            # Numeric (compared against CONTEXT_CHANGE_THRESHOLDS)
+            "temperature": env.temperature,
+            "humidity": env.humidity,
+            "co2": env.co2,
+            "pressure": env.pressure,
+            "illuminance": env.illuminance,
+            "sound_level": env.sound_level,
+            "water_level": env.water_level,
+            "avg_motion_level": occ.avg_motion_level,
+            "posture_duration_sec": occ.posture_duration_sec,
+            # Discrete (any change re-renders), incl. alert band crossings
+            "bands": (
+                env.temperature is not None and (env.temperature > 26, env.temperature < 18),
+                env.humidity is not None and (env.humidity > 60, env.humidity < 30),
+                env.co2 is not None and env.co2 > 1000,
+            ),
+            "person_count": occ.person_count,
+            "activity": tuple(sorted(occ.activity_distribution.items())),
+            "posture_status": occ.posture_status,
+            "devices": tuple(
+                (d, dev.device_type, dev.power_state) for d, dev in sorted(zone.devices.items())
+            ),
+            "events": zone.events.total,
+        }
+
+    @staticmethod
+    def _context_changed(old: Optional[dict], new: dict) -> bool:
+        if old is None:
+            return True
+        for key, value in new.items():
+            prev = old[key]
+            threshold = CONTEXT_CHANGE_THRESHOLDS.get(key)
+            if threshold is None or value is None or prev is None:
+                if value != prev:
+                    return True
+            elif abs(value - prev) >= threshold:
+                return True
+        return False
+
+    def _render_zone_context(self, record: ZoneRecord, current_time: float) -> Tuple[Tuple[List[str], str], float]:
+        """
+        Render one zone's alert lines and section.
+
+        Returns:
+            ((alert_lines, section), expires_at) — expires when the oldest
+            displayed event leaves the 10-minute window.
+        """
+        zone_id = record.zone_id
+        zone = record.view()
+
+        alerts = []
+        env = zone.environment
+        if env.temperature is not None:
+            if env.temperature > 26:
+                alerts.append(f"⚠️ [{zone_id}] 高温: {env.temperature:.1f}℃（基準: 18-26℃）")
+            elif env.temperature < 18:
+                alerts.append(f"⚠️ [{zone_id}] 低温: {env.temperature:.1f}℃（基準: 18-26℃）")
+        if env.co2 is not None and env.co2 > 1000:
+            alerts.append(f"⚠️ [{zone_id}] CO2高濃度: {env.co2}ppm（基準: 1000ppm以下）")
+        if env.humidity is not None:
+            if env.humidity > 60:
+                alerts.append(f"⚠️ [{zone_id}] 高湿度: {env.humidity:.0f}%（基準: 30-60%）")
+            elif env.humidity < 30:
+                alerts.append(f"⚠️ [{zone_id}] 低湿度: {env.humidity:.0f}%（基準: 30-60%）")
+
+        summary = f"### {zone_id}\n"
+
+        # Occupancy and activity
+        if zone.occupancy.person_count > 0:
+            summary += f"- 状態: {zone.occupancy.activity_summary}\n"
+            if zone.occupancy.avg_motion_level > 0:
+                summary += f"- 活動レベル: {zone.occupancy.avg_motion_level:.2f}\n"
+            if zone.occupancy.posture_status != "unknown":
+                minutes = int(zone.occupancy.posture_duration_sec / 60)
+                summary += f"- 姿勢状態: {zone.occupancy.posture_status} ({minutes}分間)\n"
+        else:
+            summary += "- 状態: 無人\n"
+
+        # Environment
+        if zone.environment.temperature is not None:
+            summary += f"- 気温: {zone.environment.temperature:.1f}℃ ({zone.environment.thermal_comfort})\n"
+
+        if zone.environment.humidity is not None:
+            summary += f"- 湿度: {zone.environment.humidity:.0f}%\n"
+
+        if zone.environment.co2 is not None:
+            summary += f"- CO2: {zone.environment.co2}ppm"
+            if zone.environment.is_stuffy:
+                summary += " ⚠️換気必要\n"
             else:
-                summary += "- 状態: 無人\n"
-            
-            # Environment
-            if zone.environment.temperature is not None:
-                summary += f"- 気温: {zone.environment.temperature:.1f}℃ ({zone.environment.thermal_comfort})\n"
-            
-            if zone.environment.humidity is not None:
-                summary += f"- 湿度: {zone.environment.humidity:.0f}%\n"
-            
-            if zone.environment.co2 is not None:
-                summary += f"- CO2: {zone.environment.co2}ppm"
-                if zone.environment.is_stuffy:
-                    summary += " ⚠️換気必要\n"
-                else:
-                    summary += "\n"
-            
-            if zone.environment.pressure is not None:
-                summary += f"- 気圧: {zone.environment.pressure:.1f}hPa\n"
+                summary += "\n"
 
-            if zone.environment.illuminance is not None:
-                summary += f"- 照度: {zone.environment.illuminance:.0f}lux\n"
-            
-            # Devices
-            if zone.devices:
-                summary += "- デバイス:\n"
-                for device_id, device in zone.devices.items():
-                    summary += f"  - {device.device_type} ({device_id}): {device.power_state}\n"
-            
-            # Recent events (last 10 minutes)
-            recent_events = [
-                e for e in zone.events
-                if current_time - e.timestamp < 600
-            ]
-            if recent_events:
-                summary += "- 最近のイベント:\n"
-                for event in recent_events[-3:]:  # Last 3 events
-                    summary += f"  - {event.description}\n"
-            
-            context_parts.append(summary)
-        
-        context = "\n".join(context_parts)
-        
-        # Update cache
-        self._llm_context_cache = context
-        self._cache_timestamp = current_time
-        
-        return context
+        if zone.environment.pressure is not None:
+            summary += f"- 気圧: {zone.environment.pressure:.1f}hPa\n"
+
+        if zone.environment.illuminance is not None:
+            summary += f"- 照度: {zone.environment.illuminance:.0f}lux\n"
+
+        if zone.environment.sound_level is not None:
+            summary += f"- 騒音レベル: {zone.environment.sound_level:.0f}dB\n"
+
+        if zone.environment.water_level is not None:
+            summary += f"- 水位: {zone.environment.water_level:.0f}%\n"
+
+        # Devices
+        if zone.devices:
+            summary += "- デバイス:\n"
+            for device_id, device in sorted(zone.devices.items()):
+                summary += f"  - {device.device_type} ({device_id}): {device.power_state}\n"
+
+        # Recent events (last 10 minutes)
+        expires = float("inf")
+        recent_events = record.events.since(current_time - 600)
+        if recent_events:
+            summary += "- 最近のイベント:\n"
+            shown = recent_events[-3:]  # Last 3 events
+            for event in shown:
+                summary += f"  - {event.description}\n"
+            expires = shown[0].timestamp + 600
+
+        return (alerts, summary), expires
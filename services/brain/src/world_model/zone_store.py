@@ -0,0 +1,171 @@
+"""
+Compact mutable zone records for the WorldModel ingestion hot path.
+
+Every MQTT message mutates zone state; doing that through pydantic models
+(validated attribute assignment, getattr-based channel dispatch) dominated
+ingestion cost.  The WorldModel keeps these ``__slots__`` records instead and
+materialises the pydantic ``ZoneState`` only when a reader asks for it
+(get_zone / get_all_zones / get_llm_context).  Views are cached per zone
+until the record's ``version`` changes, and are read-only snapshots:
+mutating a view does not write back to the store.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from .data_classes import DeviceState, EnvironmentData, OccupancyData, ZoneState
+from .event_log import EventLog
+
+# Environment channels stored directly on EnvironmentRecord: channel -> cast
+ENV_CHANNELS = {
+    "temperature": float,
+    "humidity": float,
+    "co2": int,
+    "illuminance": float,
+    "pressure": float,
+    "gas_resistance": int,
+    "sound_level": float,
+    "water_level": float,
+}
+
+
+class EnvironmentRecord:
+    __slots__ = (
+        "temperature", "humidity", "co2", "illuminance", "pressure",
+        "gas_resistance", "sound_level", "water_level", "timestamps",
+    )
+
+    def __init__(self):
+        self.temperature: Optional[float] = None
+        self.humidity: Optional[float] = None
+        self.co2: Optional[int] = None
+        self.illuminance: Optional[float] = None
+        self.pressure: Optional[float] = None
+        self.gas_resistance: Optional[int] = None
+        self.sound_level: Optional[float] = None
+        self.water_level: Optional[float] = None
+        self.timestamps: Dict[str, float] = {}
+
+    def to_model(self) -> EnvironmentData:
+        return EnvironmentData.model_construct(
+            temperature=self.temperature,
+            humidity=self.humidity,
+            co2=self.co2,
+            illuminance=self.illuminance,
+            pressure=self.pressure,
+            gas_resistance=self.gas_resistance,
+            sound_level=self.sound_level,
+            water_level=self.water_level,
+            timestamps=dict(self.timestamps),
+        )
+
+
+class OccupancyRecord:
+    __slots__ = (
+        "person_count", "vision_count", "pir_detected",
+        "activity_distribution", "avg_motion_level",
+        "activity_level", "activity_class", "posture_duration_sec", "posture_status",
+        "last_entry_time", "last_exit_time",
+    )
+
+    def __init__(self):
+        self.person_count = 0
+        self.vision_count = 0
+        self.pir_detected = False
+        self.activity_distribution: Dict[str, int] = {}
+        self.avg_motion_level = 0.0
+        self.activity_level = 0.0
+        self.activity_class = "unknown"
+        self.posture_duration_sec = 0.0
+        self.posture_status = "unknown"
+        self.last_entry_time: Optional[float] = None
+        self.last_exit_time: Optional[float] = None
+
+    def to_model(self) -> OccupancyData:
+        return OccupancyData.model_construct(
+            person_count=self.person_count,
+            vision_count=self.vision_count,
+            pir_detected=self.pir_detected,
+            activity_distribution=dict(self.activity_distribution),
+            avg_motion_level=self.avg_motion_level,
+            activity_level=self.activity_level,
+            activity_class=self.activity_class,
+            posture_duration_sec=self.posture_duration_sec,
+            posture_status=self.posture_status,
+            last_entry_time=self.last_entry_time,
+            last_exit_time=self.last_exit_time,
+        )
+
+
+class DeviceRecord:
+    __slots__ = (
+        "device_id", "device_type", "is_online", "power_state",
+        "specific_state", "last_command", "last_command_time",
+    )
+
+    def __init__(self, device_id: str, device_type: str):
+        self.device_id = device_id
+        self.device_type = device_type
+        self.is_online = True
+        self.power_state = "off"
+        self.specific_state: Dict[str, Any] = {}
+        self.last_command: Optional[str] = None
+        self.last_command_time: Optional[float] = None
+
+    def to_model(self) -> DeviceState:
+        return DeviceState.model_construct(
+            device_id=self.device_id,
+            device_type=self.device_type,
+            is_online=self.is_online,
+            power_state=self.power_state,
+            specific_state=dict(self.specific_state),
+            last_command=self.last_command,
+            last_command_time=self.last_command_time,
+        )
+
+
+class ZoneRecord:
+    __slots__ = (
+        "zone_id", "environment", "occupancy", "devices", "events", "last_update",
+        # change detection
+        "_prev_occupancy", "_prev_temperature", "_prev_humidity",
+        "_prev_door_state", "_prev_env_timestamps",
+        # view cache
+        "version", "_view", "_view_version",
+        # LLM context fragment cache (WorldModel.get_llm_context)
+        "context_snapshot", "context_fragment", "context_expires",
+    )
+
+    def __init__(self, zone_id: str, now: float, events: EventLog):
+        self.zone_id = zone_id
+        self.environment = EnvironmentRecord()
+        self.occupancy = OccupancyRecord()
+        self.devices: Dict[str, DeviceRecord] = {}
+        self.events = events
+        self.last_update = now
+
+        self._prev_occupancy = 0
+        self._prev_temperature: Optional[float] = None
+        self._prev_humidity: Optional[float] = None
+        self._prev_door_state: Optional[bool] = None
+        self._prev_env_timestamps: Dict[str, float] = {}
+
+        self.version = 0
+        self._view: Optional[ZoneState] = None
+        self._view_version = -1
+
+        self.context_snapshot: Optional[dict] = None
+        self.context_fragment: Optional[Tuple[List[str], str]] = None
+        self.context_expires = float("inf")
+
+    def view(self) -> ZoneState:
+        """Pydantic snapshot of this zone (cached until the next update)."""
+        if self._view is None or self._view_version != self.version:
+            self._view = ZoneState.model_construct(
+                zone_id=self.zone_id,
+                environment=self.environment.to_model(),
+                occupancy=self.occupancy.to_model(),
+                devices={d: dev.to_model() for d, dev in self.devices.items()},
+                events=list(self.events),
+                last_update=self.last_update,
+            )
+            self._view_version = self.version
+        return self._view
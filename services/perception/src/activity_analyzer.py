@@ -1,25 +1,33 @@
 """
-ActivityAnalyzer — tiered pose buffer with posture-stasis detection.
-
-Buffer architecture (time-decaying resolution):
-  Tier 0 (raw):   last 60s,  every frame          (~20 entries @3s)
-  Tier 1 (10s):   last 10m,  1 summary / 10s      (~60 entries)
-  Tier 2 (1min):  last 1h,   1 summary / 60s      (~60 entries)
-  Tier 3 (5min):  last 4h,   1 summary / 300s     (~48 entries)
-
-Total: ~188 entries max, covering up to 4 hours of history.
-
-Each summary stores a normalised posture signature (hip-centred,
-shoulder-width = 1.0) so posture comparisons are position/scale invariant.
+ActivityAnalyzer — raw pose ring buffer with posture-stasis detection.
+
+  Raw frames:     last 60s, every frame (fixed-capacity ring buffer)
+  Posture runs:   per person, "same posture since" for up to 4 hours
+
+Posture signatures are normalised (hip-centred, shoulder-width = 1.0) so
+posture comparisons are position/scale invariant.
+
+The raw buffer is a fixed-capacity NumPy ring buffer of shape (T, P, 17, 3)
+(x, y, conf per keypoint, up to P persons per frame).  Frame-to-frame
+displacement and the posture signature are computed once on push and cached
+alongside, so short-term activity is plain array work.  Long-term stasis
+needs no history at all: a PostureStasisTracker per person keeps the
+running reference posture and the start of the current run.
+
+Persons are given stable track IDs by a PersonTracker (IoU / centroid
+matching on their boxes).  Displacement pairs keypoints by track ID rather
+than list index, and posture stasis is tracked per person; the published
+posture duration is the longest one among the persons currently visible.
+Memory per analyser is fixed at construction (~100 KB at the defaults).
 """
 import logging
 import time
-from collections import deque
-from dataclasses import dataclass, field
-from typing import Deque, Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import numpy as np
 
+from person_tracker import PersonTracker, bbox_from_keypoints
+
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
@@ -30,6 +38,7 @@ _KPT_CONF_THRESH = 0.3
 # COCO keypoint indices
 _L_SHOULDER, _R_SHOULDER = 5, 6
 _L_HIP, _R_HIP = 11, 12
+_ANCHORS = [_L_SHOULDER, _R_SHOULDER, _L_HIP, _R_HIP]
 
 # Activity classification thresholds (normalised displacement / sec)
 _ACTIVITY_THRESHOLDS = {"idle": 0.002, "low": 0.01, "moderate": 0.04}
@@ -41,33 +50,19 @@ _POSTURE_SAME_THRESH = 0.05
 _POSTURE_STATIC_SEC = 1200    # 20 min → "static"
 _POSTURE_MOSTLY_SEC = 600     # 10 min → "mostly_static"
 
-# Tier definitions: (name, max_age_sec, bucket_resolution_sec)
-_TIER_DEFS = [
-    ("raw",  60,    0),       # Tier 0: keep every frame
-    ("10s",  600,   10),      # Tier 1
-    ("1min", 3600,  60),      # Tier 2
-    ("5min", 14400, 300),     # Tier 3
-]
-
+# Raw ring buffer capacity: frames (60s @1s min interval) × persons/frame
+_RAW_CAPACITY = 64
+_MAX_PERSONS = 8
 
-# ---------------------------------------------------------------------------
-# Data classes
-# ---------------------------------------------------------------------------
-@dataclass
-class PoseSnapshot:
-    """Raw single-frame capture."""
-    timestamp: float
-    persons: List[Tuple[np.ndarray, np.ndarray]] = field(default_factory=list)
-    # persons: list of (keypoints (17,2), keypoint_conf (17,))
+# Raw frames are kept this long (short-term activity window)
+_RAW_MAX_AGE_SEC = 60
 
+# Posture durations are capped here (4 h)
+_POSTURE_MAX_SEC = 14400
 
-@dataclass
-class PoseSummary:
-    """Consolidated entry for higher tiers."""
-    timestamp: float                      # bucket midpoint
-    person_count: int
-    posture_sig: Optional[np.ndarray]     # (17, 2) normalised, or None
-    displacement: float                   # mean displacement in bucket
+# A posture run survives frames without a signature (anchors occluded) for
+# this long before it is reset
+_POSTURE_MISS_GRACE_SEC = 60
 
 
 # ---------------------------------------------------------------------------
@@ -89,8 +84,7 @@ def normalise_posture(
     visible = confidences > _KPT_CONF_THRESH
 
     # Need at least hips + shoulders for normalisation
-    anchors = [_L_SHOULDER, _R_SHOULDER, _L_HIP, _R_HIP]
-    if not all(visible[i] for i in anchors):
+    if not visible[_ANCHORS].all():
         return None
 
     hip_mid = (keypoints[_L_HIP] + keypoints[_R_HIP]) / 2.0
@@ -100,12 +94,9 @@ def normalise_posture(
     if shoulder_width < 1e-6:
         return None
 
+    # Low-confidence keypoints stay (0, 0)
     normed = np.zeros_like(keypoints)
-    for i in range(17):
-        if visible[i]:
-            normed[i] = (keypoints[i] - hip_mid) / shoulder_width
-        # else stays (0, 0)
-
+    normed[visible] = (keypoints[visible] - hip_mid) / shoulder_width
     return normed
 
 
@@ -123,25 +114,209 @@ def posture_distance(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.mean(np.sum(diff ** 2, axis=1)))
 
 
+# ---------------------------------------------------------------------------
+# Raw ring buffer
+# ---------------------------------------------------------------------------
+class PoseRingBuffer:
+    """
+    Fixed-capacity ring of raw pose frames with per-frame cached features.
+
+    Per slot:
+      kpts       (P, 17, 3)  x, y, conf (persons beyond P are dropped)
+      track_ids  (P,)        stable person IDs (-1 = empty slot)
+      count      persons in the frame
+      timestamp
+      disp_px    mean keypoint displacement vs. the previous frame (NaN if
+                 no comparable keypoints); only meaningful when the previous
+                 frame is still in the buffer
+      dt         seconds since the previous frame
+      sig        (17, 2) normalised posture of person 0 (the longest-tracked
+                 person in the frame), valid if sig_ok
+    """
+
+    def __init__(self, capacity: int = _RAW_CAPACITY, max_persons: int = _MAX_PERSONS):
+        self.capacity = capacity
+        self.max_persons = max_persons
+        self.kpts = np.zeros((capacity, max_persons, 17, 3), dtype=np.float32)
+        self.track_ids = np.full((capacity, max_persons), -1, dtype=np.int32)
+        self.count = np.zeros(capacity, dtype=np.int16)
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.disp_px = np.full(capacity, np.nan, dtype=np.float64)
+        self.dt = np.zeros(capacity, dtype=np.float64)
+        self.sig = np.zeros((capacity, 17, 2), dtype=np.float32)
+        self.sig_ok = np.zeros(capacity, dtype=bool)
+        self._head = 0   # index of oldest entry
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def clear(self):
+        self._head = 0
+        self._len = 0
+
+    def push(
+        self,
+        persons: list,
+        ts: float,
+        track_ids: List[int],
+        sig: Optional[np.ndarray],
+    ):
+        """
+        Append a frame, overwriting the oldest slot when full.
+
+        ``sig`` is the precomputed posture signature of persons[0].
+        """
+        if self._len == self.capacity:
+            self._head = (self._head + 1) % self.capacity
+            self._len -= 1
+        slot = (self._head + self._len) % self.capacity
+        prev = (slot - 1) % self.capacity if self._len else None
+
+        n = min(len(persons), self.max_persons)
+        frame = self.kpts[slot]
+        frame[:] = 0.0
+        ids = self.track_ids[slot]
+        ids[:] = -1
+        for i in range(n):
+            frame[i, :, :2] = persons[i]["keypoints"]
+            frame[i, :, 2] = persons[i]["keypoint_conf"]
+            ids[i] = track_ids[i]
+        self.count[slot] = n
+        self.timestamp[slot] = ts
+
+        if prev is not None:
+            self.disp_px[slot] = _frame_displacement(
+                self.kpts[prev], self.track_ids[prev], frame, ids
+            )
+            self.dt[slot] = ts - self.timestamp[prev]
+        else:
+            self.disp_px[slot] = np.nan
+            self.dt[slot] = 0.0
+
+        self.sig_ok[slot] = sig is not None
+        if sig is not None:
+            self.sig[slot] = sig
+
+        self._len += 1
+
+    def evict_before(self, cutoff: float):
+        while self._len and self.timestamp[self._head] < cutoff:
+            self._head = (self._head + 1) % self.capacity
+            self._len -= 1
+
+    def indices(self) -> np.ndarray:
+        """Slot indices oldest → newest."""
+        return (self._head + np.arange(self._len)) % self.capacity
+
+    def newest(self) -> Optional[int]:
+        if not self._len:
+            return None
+        return (self._head + self._len - 1) % self.capacity
+
+
+def _frame_displacement(
+    prev: np.ndarray, prev_ids: np.ndarray, curr: np.ndarray, curr_ids: np.ndarray
+) -> float:
+    """
+    Mean keypoint displacement (px) between two (P, 17, 3) frames, pairing
+    persons by track ID.
+    """
+    match = (curr_ids[:, None] == prev_ids[None, :]) & (curr_ids[:, None] >= 0)
+    ci, pi = np.nonzero(match)
+    if len(ci) == 0:
+        return np.nan
+    a, b = prev[pi], curr[ci]
+    visible = (a[..., 2] > _KPT_CONF_THRESH) & (b[..., 2] > _KPT_CONF_THRESH)
+    total = int(visible.sum())
+    if total == 0:
+        return np.nan
+    dists = np.linalg.norm(b[..., :2] - a[..., :2], axis=-1)
+    return float(dists[visible].sum()) / total
+
+
+# ---------------------------------------------------------------------------
+# Incremental posture stasis
+# ---------------------------------------------------------------------------
+class PostureStasisTracker:
+    """
+    Maintains the "same posture since" timestamp as frames arrive.
+
+    A posture run continues while each new signature stays within
+    _POSTURE_SAME_THRESH of the run's reference — the per-keypoint running
+    mean of every signature in the run (keypoints only averaged where
+    visible).  A mismatch starts a new run.  Frames without a signature
+    (shoulders/hips occluded) hold the run; it is reset only once no
+    signature has been seen for _POSTURE_MISS_GRACE_SEC.  Each update is
+    O(17) and reading the duration is O(1).
+    """
+
+    def __init__(self):
+        self._sum = np.zeros((17, 2), dtype=np.float64)
+        self._n = np.zeros(17, dtype=np.int32)
+        self.since: Optional[float] = None
+        self.last_ts: Optional[float] = None
+
+    def reset(self):
+        self._sum[:] = 0.0
+        self._n[:] = 0
+        self.since = None
+        self.last_ts = None
+
+    def update(self, sig: Optional[np.ndarray], ts: float):
+        if sig is None:
+            if self.last_ts is not None and ts - self.last_ts > _POSTURE_MISS_GRACE_SEC:
+                self.reset()
+            return
+
+        if self.since is None or posture_distance(sig, self.reference()) >= _POSTURE_SAME_THRESH:
+            self._sum[:] = 0.0
+            self._n[:] = 0
+            self.since = ts
+
+        visible = np.any(sig != 0, axis=1)
+        self._sum[visible] += sig[visible]
+        self._n[visible] += 1
+        self.last_ts = ts
+
+    def reference(self) -> np.ndarray:
+        ref = np.zeros((17, 2), dtype=np.float64)
+        seen = self._n > 0
+        ref[seen] = self._sum[seen] / self._n[seen, None]
+        return ref
+
+    def duration(self) -> float:
+        if self.since is None or self.last_ts is None:
+            return 0.0
+        return min(self.last_ts - self.since, float(_POSTURE_MAX_SEC))
+
+
 # ---------------------------------------------------------------------------
 # Main analyser
 # ---------------------------------------------------------------------------
 class ActivityAnalyzer:
     """
-    Tiered pose buffer with short-term activity and long-term stasis analysis.
+    Raw pose buffer with short-term activity and per-person stasis analysis.
     """
 
-    def __init__(self, frame_size: Tuple[int, int] = (800, 600)):
+    def __init__(
+        self,
+        frame_size: Tuple[int, int] = (800, 600),
+        raw_capacity: int = _RAW_CAPACITY,
+        max_persons: int = _MAX_PERSONS,
+    ):
         self._diag = float(np.hypot(*frame_size))
 
-        # Tier 0: raw snapshots
-        self._raw: Deque[PoseSnapshot] = deque()
+        # Raw frames (preallocated ring buffer)
+        self._raw = PoseRingBuffer(raw_capacity, max_persons)
 
-        # Tiers 1–3: consolidated summaries
-        self._tiers: List[Deque[PoseSummary]] = [deque() for _ in range(3)]
+        # Stable person IDs + per-person posture stasis
+        self._tracker = PersonTracker()
+        self._stasis: Dict[int, PostureStasisTracker] = {}
+        self._current_ids: List[int] = []
 
-        # Track last consolidation timestamps
-        self._last_consolidate = [0.0, 0.0, 0.0]
+        # Incrementally maintained results (refreshed on every push)
+        self._activity = {"level": 0.0, "class": "idle"}
 
     # ------------------------------------------------------------------
     # Public API
@@ -153,28 +328,43 @@ class ActivityAnalyzer:
 
         Args:
             persons: list of dicts with 'keypoints' (17,2), 'keypoint_conf' (17,)
+                     and optionally 'bbox' [x1, y1, x2, y2]
         """
         ts = timestamp or time.time()
-        snap = PoseSnapshot(
-            timestamp=ts,
-            persons=[(p["keypoints"], p["keypoint_conf"]) for p in persons],
-        )
-        self._raw.append(snap)
-        self._maybe_consolidate(ts)
-        self._evict(ts)
+
+        # Assign stable IDs, then order persons oldest track first
+        bboxes = [
+            p.get("bbox") if p.get("bbox") is not None
+            else bbox_from_keypoints(p["keypoints"], p["keypoint_conf"], _KPT_CONF_THRESH)
+            for p in persons
+        ]
+        ids = self._tracker.assign(bboxes, ts)
+        order = sorted(range(len(persons)), key=lambda i: ids[i])[: self._raw.max_persons]
+        persons = [persons[i] for i in order]
+        ids = [ids[i] for i in order]
+
+        sigs = [normalise_posture(p["keypoints"], p["keypoint_conf"]) for p in persons]
+        self._raw.push(persons, ts, ids, sigs[0] if sigs else None)
+        self._update_stasis(ids, sigs, ts)
+
+        self._raw.evict_before(ts - _RAW_MAX_AGE_SEC)
+        self._activity = self._compute_short_term_activity()
 
     def analyze(self) -> dict:
         """
-        Full analysis across all tiers.
+        Full analysis.  O(1): activity and posture stasis are maintained
+        incrementally by push().
 
         Returns:
             activity_level:       float 0-1 (short-term movement)
             activity_class:       "idle" | "low" | "moderate" | "high"
-            posture_duration_sec: how long current posture has been held
+            posture_duration_sec: longest posture hold among visible persons
             posture_status:       "changing" | "mostly_static" | "static"
-            buffer_depth:         {raw, tier1, tier2, tier3} entry counts
+            tracks:               per-person [{track_id, posture_duration_sec,
+                                  posture_status}] for the latest frame
+            buffer_depth:         {raw, capacity} raw frames held / ring size
         """
-        activity = self._compute_short_term_activity()
+        activity = self._activity
         posture = self._compute_posture_stasis()
 
         return {
@@ -182,232 +372,93 @@ class ActivityAnalyzer:
             "activity_class": activity["class"],
             "posture_duration_sec": posture["duration_sec"],
             "posture_status": posture["status"],
+            "tracks": posture["tracks"],
             "buffer_depth": {
                 "raw": len(self._raw),
-                "tier1": len(self._tiers[0]),
-                "tier2": len(self._tiers[1]),
-                "tier3": len(self._tiers[2]),
+                "capacity": self._raw.capacity,
             },
         }
 
     def clear(self):
         self._raw.clear()
-        for t in self._tiers:
-            t.clear()
+        self._tracker.reset()
+        self._stasis.clear()
+        self._current_ids = []
+        self._activity = {"level": 0.0, "class": "idle"}
 
     # ------------------------------------------------------------------
-    # Short-term activity (from Tier 0 raw buffer)
+    # Short-term activity (from the raw buffer)
     # ------------------------------------------------------------------
 
     def _compute_short_term_activity(self) -> dict:
         if len(self._raw) < 2:
             return {"level": 0.0, "class": "idle"}
 
-        displacements = []
-        items = list(self._raw)
-        for i in range(1, len(items)):
-            dt = items[i].timestamp - items[i - 1].timestamp
-            if dt <= 0:
-                continue
-            disp = self._snapshot_displacement(items[i - 1], items[i])
-            if disp is not None:
-                displacements.append((disp / self._diag) / dt)
+        # Skip the oldest entry: its displacement refers to an evicted frame
+        idx = self._raw.indices()[1:]
+        disp = self._raw.disp_px[idx]
+        dt = self._raw.dt[idx]
+        valid = ~np.isnan(disp) & (dt > 0)
 
-        level = min(float(np.mean(displacements)), 1.0) if displacements else 0.0
+        if np.any(valid):
+            rates = (disp[valid] / self._diag) / dt[valid]
+            level = min(float(rates.mean()), 1.0)
+        else:
+            level = 0.0
         return {"level": round(level, 4), "class": self._classify_activity(level)}
 
     # ------------------------------------------------------------------
-    # Long-term posture stasis (across ALL tiers)
+    # Long-term posture stasis
     # ------------------------------------------------------------------
 
-    def _compute_posture_stasis(self) -> dict:
-        """Walk backwards through all tiers to find how long the same posture
-        has been held."""
-        current_sig = self._current_posture_sig()
-        if current_sig is None:
-            return {"duration_sec": 0.0, "status": "changing"}
-
-        now = self._raw[-1].timestamp if self._raw else time.time()
-        earliest_same = now
-
-        # Walk tiers from finest to coarsest
-        all_entries = self._all_entries_reverse()
-
-        for entry_ts, entry_sig in all_entries:
-            if entry_sig is None:
-                break
-            dist = posture_distance(current_sig, entry_sig)
-            if dist < _POSTURE_SAME_THRESH:
-                earliest_same = entry_ts
-            else:
-                break
-
-        duration = now - earliest_same
-        if duration >= _POSTURE_STATIC_SEC:
-            status = "static"
-        elif duration >= _POSTURE_MOSTLY_SEC:
-            status = "mostly_static"
-        else:
-            status = "changing"
-
-        return {"duration_sec": round(duration, 1), "status": status}
-
-    def _current_posture_sig(self) -> Optional[np.ndarray]:
-        """Get normalised posture signature from the latest raw snapshot."""
-        if not self._raw:
-            return None
-        snap = self._raw[-1]
-        if not snap.persons:
-            return None
-        kp, conf = snap.persons[0]
-        return normalise_posture(kp, conf)
-
-    def _all_entries_reverse(self):
-        """
-        Yield (timestamp, posture_sig) from all tiers, newest first.
-        Raw snapshots are converted to signatures on the fly.
-        """
-        # Tier 0 (raw) — newest first
-        for snap in reversed(self._raw):
-            if snap.persons:
-                kp, conf = snap.persons[0]
-                sig = normalise_posture(kp, conf)
-                yield snap.timestamp, sig
-            else:
-                yield snap.timestamp, None
-
-        # Tiers 1-3 — newest first
-        for tier in self._tiers:
-            for entry in reversed(tier):
-                yield entry.timestamp, entry.posture_sig
+    def _update_stasis(self, ids: List[int], sigs: List[Optional[np.ndarray]], ts: float):
+        """Feed each tracked person's signature to its stasis tracker."""
+        for tid, sig in zip(ids, sigs):
+            tracker = self._stasis.get(tid)
+            if tracker is None:
+                tracker = self._stasis[tid] = PostureStasisTracker()
+            tracker.update(sig, ts)
+        self._current_ids = ids
 
-    # ------------------------------------------------------------------
-    # Tier consolidation
-    # ------------------------------------------------------------------
+        # Drop trackers of persons the PersonTracker has forgotten
+        for tid in [t for t in self._stasis if t not in self._tracker.tracks and t not in ids]:
+            del self._stasis[tid]
 
-    def _maybe_consolidate(self, now: float):
-        """Consolidate raw → tier1, tier1 → tier2, tier2 → tier3 as needed."""
-        # tier_idx 0: raw → tier1  (every 10s)
-        # tier_idx 1: tier1 → tier2 (every 60s)
-        # tier_idx 2: tier2 → tier3 (every 300s)
-        resolutions = [
-            _TIER_DEFS[1][2],  # 10s
-            _TIER_DEFS[2][2],  # 60s
-            _TIER_DEFS[3][2],  # 300s
-        ]
-
-        for tier_idx, resolution in enumerate(resolutions):
-            if now - self._last_consolidate[tier_idx] < resolution:
+    def _compute_posture_stasis(self) -> dict:
+        """Per-person posture hold durations; aggregate = longest."""
+        tracks = []
+        for tid in self._current_ids:
+            tracker = self._stasis.get(tid)
+            if tracker is None or tracker.since is None:
                 continue
-            self._last_consolidate[tier_idx] = now
+            duration = tracker.duration()
+            tracks.append({
+                "track_id": tid,
+                "posture_duration_sec": round(duration, 1),
+                "posture_status": self._classify_posture(duration),
+            })
 
-            if tier_idx == 0:
-                summary = self._summarise_raw(now, resolution)
-            else:
-                summary = self._summarise_tier(tier_idx - 1, now, resolution)
+        if not tracks or self._raw.newest() is None:
+            return {"duration_sec": 0.0, "status": "changing", "tracks": tracks}
 
-            if summary is not None:
-                self._tiers[tier_idx].append(summary)
-
-    def _summarise_raw(self, now: float, window: float) -> Optional[PoseSummary]:
-        """Summarise recent raw snapshots into a single PoseSummary."""
-        cutoff = now - window
-        entries = [s for s in self._raw if s.timestamp >= cutoff]
-        if not entries:
-            return None
-
-        # Average posture signature
-        sigs = []
-        for snap in entries:
-            if snap.persons:
-                kp, conf = snap.persons[0]
-                sig = normalise_posture(kp, conf)
-                if sig is not None:
-                    sigs.append(sig)
-
-        avg_sig = np.mean(sigs, axis=0) if sigs else None
-
-        # Average displacement
-        disps = []
-        for i in range(1, len(entries)):
-            d = self._snapshot_displacement(entries[i - 1], entries[i])
-            if d is not None:
-                disps.append(d / self._diag)
-
-        person_counts = [len(s.persons) for s in entries if s.persons]
-        avg_persons = int(round(np.mean(person_counts))) if person_counts else 0
-
-        return PoseSummary(
-            timestamp=entries[len(entries) // 2].timestamp,
-            person_count=avg_persons,
-            posture_sig=avg_sig,
-            displacement=float(np.mean(disps)) if disps else 0.0,
-        )
-
-    def _summarise_tier(
-        self, source_idx: int, now: float, window: float
-    ) -> Optional[PoseSummary]:
-        """Summarise entries from a lower tier into the next tier."""
-        cutoff = now - window
-        source = self._tiers[source_idx]
-        entries = [e for e in source if e.timestamp >= cutoff]
-        if not entries:
-            return None
-
-        sigs = [e.posture_sig for e in entries if e.posture_sig is not None]
-        avg_sig = np.mean(sigs, axis=0) if sigs else None
-
-        return PoseSummary(
-            timestamp=entries[len(entries) // 2].timestamp,
-            person_count=int(round(np.mean([e.person_count for e in entries]))),
-            posture_sig=avg_sig,
-            displacement=float(np.mean([e.displacement for e in entries])),
-        )
-
-    # ------------------------------------------------------------------
-    # Eviction
-    # ------------------------------------------------------------------
-
-    def _evict(self, now: float):
-        """Remove entries older than each tier's max age."""
-        max_ages = [td[1] for td in _TIER_DEFS]
-
-        # Tier 0 (raw)
-        cutoff = now - max_ages[0]
-        while self._raw and self._raw[0].timestamp < cutoff:
-            self._raw.popleft()
-
-        # Tiers 1-3
-        for i, tier in enumerate(self._tiers):
-            cutoff = now - max_ages[i + 1]
-            while tier and tier[0].timestamp < cutoff:
-                tier.popleft()
+        duration = max(t["posture_duration_sec"] for t in tracks)
+        return {
+            "duration_sec": duration,
+            "status": self._classify_posture(duration),
+            "tracks": tracks,
+        }
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _snapshot_displacement(prev: PoseSnapshot, curr: PoseSnapshot) -> Optional[float]:
-        """Mean keypoint displacement between two raw snapshots."""
-        n = min(len(prev.persons), len(curr.persons))
-        if n == 0:
-            return None
-
-        total_disp = 0.0
-        total_kpts = 0
-        for pi in range(n):
-            kp_prev, conf_prev = prev.persons[pi]
-            kp_curr, conf_curr = curr.persons[pi]
-            visible = (conf_prev > _KPT_CONF_THRESH) & (conf_curr > _KPT_CONF_THRESH)
-            if not np.any(visible):
-                continue
-            diff = kp_curr[visible] - kp_prev[visible]
-            dists = np.linalg.norm(diff, axis=1)
-            total_disp += float(np.sum(dists))
-            total_kpts += int(np.sum(visible))
-
-        return total_disp / total_kpts if total_kpts > 0 else None
+    def _classify_posture(duration: float) -> str:
+        if duration >= _POSTURE_STATIC_SEC:
+            return "static"
+        if duration >= _POSTURE_MOSTLY_SEC:
+            return "mostly_static"
+        return "changing"
 
     @staticmethod
     def _classify_activity(level: float) -> str:
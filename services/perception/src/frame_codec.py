@@ -0,0 +1,64 @@
+"""
+Frame Codec — binary capture response format for the MQTT camera path.
+
+Legacy cameras answer ``mcp/{camera_id}/response/{request_id}`` with JSON
+carrying a base64 JPEG (~33% larger on the wire, plus a json.loads and a
+b64decode copy per frame).  Cameras that support the binary transport
+answer ``mcp/{camera_id}/frame/{request_id}`` instead, with:
+
+    offset  size  field
+    0       4     magic        b"SOMF"
+    4       1     version      1
+    5       1     flags        reserved (0)
+    6       2     header_len   bytes before the JPEG payload (>= 12)
+    8       2     width        pixels
+    10      2     height       pixels
+    header_len..  JPEG bytes
+
+All integers are big-endian.  ``header_len`` lets later versions append
+fields without breaking older readers.
+
+Negotiation is per request: the requester adds ``"transport": "binary"``
+to the capture request and a camera that understands it replies on the
+frame topic; older cameras ignore the field and keep replying in JSON.
+"""
+import struct
+from typing import Tuple
+
+FRAME_MAGIC = b"SOMF"
+FRAME_VERSION = 1
+_JPEG_SOI = b"\xff\xd8"
+_HEADER = struct.Struct(">4sBBHHH")
+HEADER_SIZE = _HEADER.size
+
+
+def encode_frame(jpeg: bytes, width: int, height: int) -> bytes:
+    """Build a binary capture response (header + JPEG bytes)."""
+    return _HEADER.pack(FRAME_MAGIC, FRAME_VERSION, 0, HEADER_SIZE, width, height) + jpeg
+
+
+def decode_header(payload: bytes) -> Tuple[int, int, int]:
+    """
+    Parse the frame header.
+
+    Returns:
+        (width, height, jpeg_offset)
+
+    Raises:
+        ValueError: payload is not a binary frame, or header_len does not
+            point at the start of a JPEG
+    """
+    if len(payload) < HEADER_SIZE:
+        raise ValueError(f"Frame too short ({len(payload)} bytes)")
+    magic, version, _flags, header_len, width, height = _HEADER.unpack_from(payload)
+    if magic != FRAME_MAGIC:
+        raise ValueError(f"Bad frame magic: {magic!r}")
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version: {version}")
+    if header_len < HEADER_SIZE or header_len > len(payload):
+        raise ValueError(f"Bad frame header length: {header_len}")
+    if header_len == len(payload):
+        raise ValueError("Frame has no JPEG payload")
+    if payload[header_len:header_len + 2] != _JPEG_SOI:
+        raise ValueError(f"No JPEG at frame offset {header_len}")
+    return width, height, header_len
@@ -1,125 +1,218 @@
 """
 Image Requester - MQTT経由でカメラに画像をリクエスト
+
+MQTT接続はプロセス共有の AsyncMQTTClient (イベントループ駆動) を使い、
+レスポンスのハンドラはイベントループ上で生のペイロードをFutureに紐付けるだけにする。
+JSON解析・Base64デコード・JPEGデコードはデコード専用ワーカープールで実行する。
+1枚の重いデコードが他カメラのレスポンス配信を止めないようにするため。
 """
 import asyncio
 import uuid
 import json
 import base64
 import logging
-import os
-from typing import Dict, Optional
-import paho.mqtt.client as mqtt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 import numpy as np
 import cv2
 
+from frame_codec import decode_header
+from mqtt_async import AsyncMQTTClient
+
 logger = logging.getLogger(__name__)
 
+# JPEG縮小デコード: (縮小率, imreadフラグ) — 大きい縮小率から試す
+_REDUCED_DECODE_FLAGS = [
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+]
+
+# 要求解像度 → 幅 (edge/test-edge/camera-node の parseResolution と同じ)
+# 幅を含まないJSON応答では要求した幅で縮小デコードを判断する
+_RESOLUTION_WIDTHS = {
+    "QVGA": 320,
+    "VGA": 640,
+    "SVGA": 800,
+    "XGA": 1024,
+    "UXGA": 1600,
+}
+
+
+def _select_decode_flag(width: int, target_width: Optional[int]) -> int:
+    """
+    要求元モニターの目標幅を下回らない範囲で最大の縮小デコードを選ぶ
+
+    Args:
+        width: JPEGの実際の幅 (不明なら0)
+        target_width: モニターが必要とする幅 (Noneなら等倍)
+    """
+    if not target_width or width <= 0:
+        return cv2.IMREAD_COLOR
+    for factor, flag in _REDUCED_DECODE_FLAGS:
+        if width // factor >= target_width:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
 class ImageRequester:
     _instance = None
-    
+
     @classmethod
-    def get_instance(cls, broker: str = "localhost", port: int = 1883):
+    def get_instance(
+        cls,
+        broker: str = "localhost",
+        port: int = 1883,
+        binary: bool = True,
+        decode_workers: int = 2,
+    ):
         if cls._instance is None:
-            cls._instance = cls(broker, port)
+            cls._instance = cls(broker, port, binary, decode_workers)
         return cls._instance
-    
-    def __init__(self, broker: str = "localhost", port: int = 1883):
+
+    def __init__(
+        self,
+        broker: str = "localhost",
+        port: int = 1883,
+        binary: bool = True,
+        decode_workers: int = 2,
+    ):
         self.broker = broker
         self.port = port
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-        mqtt_user = os.getenv("MQTT_USER")
-        mqtt_pass = os.getenv("MQTT_PASS")
-        if mqtt_user:
-            self.client.username_pw_set(mqtt_user, mqtt_pass)
+        # バイナリフレーム転送を要求するか (非対応カメラはフィールドを無視してJSONで応答)
+        self.binary = binary
+        self.client = AsyncMQTTClient.get_instance(broker, port)
         self.pending_requests: Dict[str, asyncio.Future] = {}
-        self._loop: asyncio.AbstractEventLoop | None = None
-        self.client.on_message = self._on_message
-        self.client.connect(broker, port)
-        self.client.subscribe("mcp/+/response/#")
-        self.client.loop_start()
-        logger.info(f"ImageRequester connected to {broker}:{port}")
-        
-    def _on_message(self, client, userdata, msg):
-        """レスポンス受信時のコールバック (MQTT thread)"""
-        try:
-            # トピックからrequest_idを抽出
-            # mcp/camera_node_01/response/req-abc123
-            parts = msg.topic.split('/')
-            request_id = parts[-1]
+        # request_id -> (要求した幅, 要求元モニターの目標幅) (縮小デコード用)
+        self._decode_widths: Dict[str, Tuple[int, Optional[int]]] = {}
+        self._decoder = ThreadPoolExecutor(
+            max_workers=decode_workers, thread_name_prefix="jpeg-decode"
+        )
+        # 接続は main() で AsyncMQTTClient.connect() する (再接続時も再購読される)
+        self.client.add_handler("mcp/+/response/#", self._dispatch_response)
+        self.client.add_handler("mcp/+/frame/#", self._dispatch_response)
+        logger.info(f"ImageRequester using MQTT {broker}:{port}")
 
-            future = self.pending_requests.pop(request_id, None)
-            if future is None:
-                logger.warning(f"Unknown request_id: {request_id}")
-                return
+    def _dispatch_response(self, topic: str, payload: bytes):
+        """レスポンスを対応するFutureに紐付けてデコードを投入 (event loop)"""
+        # トピックからrequest_idを抽出
+        # mcp/camera_node_01/response/req-abc123  (JSON + base64)
+        # mcp/camera_node_01/frame/req-abc123     (binary header + JPEG)
+        parts = topic.split('/')
+        if len(parts) < 4:
+            return
+        kind, request_id = parts[2], parts[-1]
 
-            if not self._loop or future.done():
-                return
+        future = self.pending_requests.pop(request_id, None)
+        requested_width, target_width = self._decode_widths.pop(request_id, (0, None))
+        if future is None:
+            logger.warning(f"Unknown request_id: {request_id}")
+            return
+        if future.done():
+            return
 
-            payload = json.loads(msg.payload)
+        decode = asyncio.get_running_loop().run_in_executor(
+            self._decoder, self._decode_sync, kind, payload, target_width, requested_width
+        )
+        decode.add_done_callback(
+            lambda d: self._complete(request_id, future, d)
+        )
 
-            # Base64デコード
-            image_b64 = payload["image"]
-            image_bytes = base64.b64decode(image_b64)
+    @staticmethod
+    def _complete(request_id: str, future: asyncio.Future, decode: asyncio.Future):
+        if future.done():
+            return
+        exc = decode.exception()
+        if exc is not None:
+            logger.error(f"Error processing response {request_id}: {exc}")
+            future.set_exception(exc)
+            return
+        image = decode.result()
+        # Futureを完了
+        future.set_result(image)
+        logger.debug(f"Image received: {request_id}, shape={image.shape}")
+
+    @staticmethod
+    def _decode_sync(
+        kind: str,
+        payload: bytes,
+        target_width: Optional[int],
+        requested_width: int = 0,
+    ) -> np.ndarray:
+        """
+        ペイロード → BGR画像 (decode worker thread)
+
+        Args:
+            requested_width: 要求解像度の幅。JSON応答に幅がない場合に使う (不明なら0)
+        """
+        if kind == "frame":
+            # ヘッダ解析 → JPEG部分をコピーせずにデコード
+            width, _, offset = decode_header(payload)
+            nparr = np.frombuffer(payload, np.uint8, offset=offset)
+        else:
+            response = json.loads(payload)
+            width = int(response.get("width") or requested_width)
 
-            # OpenCV形式に変換
+            # Base64デコード
+            image_bytes = base64.b64decode(response["image"])
             nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-            if image is None:
-                logger.error(f"Failed to decode image for {request_id}")
-                self._loop.call_soon_threadsafe(
-                    future.set_exception, ValueError("Image decode failed")
-                )
-                return
-
-            # Futureを完了
-            self._loop.call_soon_threadsafe(future.set_result, image)
-            logger.debug(f"Image received: {request_id}, shape={image.shape}")
-
-        except Exception as e:
-            logger.error(f"Error processing response: {e}", exc_info=True)
-    
+
+        # OpenCV形式に変換 (目標幅に応じて縮小デコード)
+        image = cv2.imdecode(nparr, _select_decode_flag(width, target_width))
+        if image is None:
+            raise ValueError("Image decode failed")
+        return image
+
     async def request(
-        self, 
-        camera_id: str, 
-        resolution: str = "VGA", 
+        self,
+        camera_id: str,
+        resolution: str = "VGA",
         quality: int = 10,
-        timeout: float = 10.0
+        timeout: float = 10.0,
+        target_width: Optional[int] = None,
     ) -> Optional[np.ndarray]:
         """
         画像リクエスト（非同期）
-        
+
         Args:
             camera_id: カメラID (例: "camera_node_01")
             resolution: 解像度 ("QVGA", "VGA", "SVGA", "XGA", "UXGA")
             quality: JPEG品質 (1-63, 低いほど高品質)
             timeout: タイムアウト秒数
-        
+            target_width: 解析に必要な幅。指定時は下回らない範囲で縮小デコードする
+
         Returns:
             np.ndarray: OpenCV画像 (BGR), タイムアウト時はNone
         """
         request_id = f"req-{uuid.uuid4().hex[:8]}"
 
         # Futureを作成
-        self._loop = asyncio.get_running_loop()
-        future = self._loop.create_future()
+        future = asyncio.get_running_loop().create_future()
         self.pending_requests[request_id] = future
-        
+        self._decode_widths[request_id] = (_RESOLUTION_WIDTHS.get(resolution, 0), target_width)
+
         # リクエスト送信
         request = {
             "id": request_id,
             "resolution": resolution,
             "quality": quality
         }
+        if self.binary:
+            request["transport"] = "binary"
         topic = f"mcp/{camera_id}/request/capture"
-        self.client.publish(topic, json.dumps(request))
+        if not await self.client.publish(topic, request):
+            self.pending_requests.pop(request_id, None)
+            self._decode_widths.pop(request_id, None)
+            logger.error(f"Image request publish failed: {camera_id}")
+            return None
         logger.debug(f"Image requested: {camera_id}, {resolution}, q={quality}")
-        
+
         # タイムアウト付きで待機
         try:
             image = await asyncio.wait_for(future, timeout=timeout)
             return image
         except asyncio.TimeoutError:
             self.pending_requests.pop(request_id, None)
+            self._decode_widths.pop(request_id, None)
             logger.error(f"Image request timeout: {camera_id}")
             return None
@@ -23,6 +23,8 @@ class ImageSource(ABC):
 
     def __init__(self, camera_info: CameraInfo):
         self.camera_info = camera_info
+        # Age of the last captured frame (seconds since it was decoded)
+        self.frame_age_sec: Optional[float] = None
 
     @abstractmethod
     async def capture(self) -> Optional[np.ndarray]:
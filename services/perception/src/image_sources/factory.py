@@ -5,6 +5,7 @@ import logging
 from typing import Dict, Type
 
 from image_sources.base import CameraInfo, ImageSource
+from image_sources.frame_grabber import GrabberSource
 from image_sources.http_stream import HttpStreamSource
 from image_sources.mqtt_source import MqttImageSource
 from image_sources.rtsp_source import RtspSource
@@ -28,12 +29,19 @@ class ImageSourceFactory:
         logger.info(f"Registered image source protocol: {protocol}")
 
     @classmethod
-    def create(cls, camera_info: CameraInfo) -> ImageSource:
-        """Create an ImageSource for the given CameraInfo."""
+    def create(cls, camera_info: CameraInfo, decode: str = "latest") -> ImageSource:
+        """
+        Create an ImageSource for the given CameraInfo.
+
+        ``decode`` ("latest" / "on_demand") is passed to stream sources backed
+        by a FrameGrabber and ignored for the others (e.g. mqtt).
+        """
         source_cls = cls._registry.get(camera_info.protocol)
         if source_cls is None:
             raise ValueError(
                 f"Unknown protocol '{camera_info.protocol}'. "
                 f"Registered: {list(cls._registry.keys())}"
             )
+        if issubclass(source_cls, GrabberSource):
+            return source_cls(camera_info, decode=decode)
         return source_cls(camera_info)
@@ -0,0 +1,200 @@
+"""
+FrameGrabber — background thread that keeps only the newest frame of a stream.
+
+cv2.VideoCapture buffers frames internally, so an on-demand ``cap.read()``
+every few seconds returns a frame that is already stale and pays the decode
+cost on the request path.  A FrameGrabber owns the VideoCapture on a daemon
+thread and drains the stream continuously:
+
+  decode="latest"     grab + decode every frame, keep the newest ndarray.
+                      ``latest()`` is an O(1) copy-free read.
+  decode="on_demand"  only ``grab()`` (demux) every frame so the buffer never
+                      backs up; the newest packet is decoded the next time a
+                      consumer asks.  Saves CPU on high-fps streams that are
+                      sampled rarely, at the cost of up to one frame period of
+                      latency per request.
+
+Open/read failures release the capture and retry with exponential backoff
+(1s → 30s), reset on the first successful frame.
+
+GrabberSource is the shared ImageSource for cv2-readable streams
+(HttpStreamSource, RtspSource): it owns one FrameGrabber and serves
+``capture()`` from it.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from image_sources.base import CameraInfo, ImageSource
+
+logger = logging.getLogger(__name__)
+
+_BACKOFF_MIN_SEC = 1.0
+_BACKOFF_MAX_SEC = 30.0
+DECODE_MODES = ("latest", "on_demand")
+
+# Max wait for the first frame after (re)connecting / for an on-demand decode
+_FRAME_WAIT_SEC = 5.0
+# Frames older than this mean the stream has stalled
+_MAX_FRAME_AGE_SEC = 5.0
+
+
+class FrameGrabber:
+    def __init__(self, address: str, name: str, decode: str = "latest"):
+        if decode not in DECODE_MODES:
+            raise ValueError(f"decode must be one of {DECODE_MODES}, got '{decode}'")
+        self.address = address
+        self.name = name
+        self.decode = decode
+
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_ts = 0.0
+        self._frame_event = threading.Event()
+        self._decode_requested = threading.Event()
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._backoff = _BACKOFF_MIN_SEC
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"grabber-{self.name}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop.set()
+        self._decode_requested.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self, wait_sec: float = 0.0) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Return (frame, age_sec) for the newest decoded frame.
+
+        In on_demand mode a decode of the newest packet is requested and the
+        call blocks up to ``wait_sec`` for it.  Returns (None, inf) if no
+        frame is available.
+        """
+        if self.decode == "on_demand":
+            self._frame_event.clear()
+            self._decode_requested.set()
+            self._frame_event.wait(wait_sec)
+        elif self._frame is None and wait_sec > 0:
+            self._frame_event.wait(wait_sec)
+
+        with self._lock:
+            frame, ts = self._frame, self._frame_ts
+        if frame is None:
+            return None, float("inf")
+        return frame, time.time() - ts
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # ------------------------------------------------------------------
+    # Grabber thread
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        cap: Optional[cv2.VideoCapture] = None
+        while not self._stop.is_set():
+            if cap is None:
+                cap = cv2.VideoCapture(self.address)
+                if not cap.isOpened():
+                    logger.warning(f"[{self.name}] Failed to open {self.address}")
+                    cap.release()
+                    cap = None
+                    self._sleep_backoff()
+                    continue
+                logger.info(f"[{self.name}] Stream opened")
+
+            if not cap.grab():
+                logger.warning(f"[{self.name}] Stream read failed, reconnecting")
+                cap.release()
+                cap = None
+                self._sleep_backoff()
+                continue
+
+            if self.decode == "on_demand" and not self._decode_requested.is_set():
+                continue
+
+            ret, frame = cap.retrieve()
+            if not ret or frame is None:
+                continue
+
+            self._decode_requested.clear()
+            self._backoff = _BACKOFF_MIN_SEC
+            with self._lock:
+                self._frame = frame
+                self._frame_ts = time.time()
+            self._frame_event.set()
+
+        if cap is not None:
+            cap.release()
+
+    def _sleep_backoff(self):
+        self._stop.wait(self._backoff)
+        self._backoff = min(self._backoff * 2, _BACKOFF_MAX_SEC)
+
+
+class GrabberSource(ImageSource):
+    """ImageSource backed by a FrameGrabber (any URL cv2.VideoCapture opens)."""
+
+    # Log / thread-name prefix, set by subclasses
+    label = "Stream"
+
+    def __init__(self, camera_info: CameraInfo, decode: str = "latest"):
+        super().__init__(camera_info)
+        self._grabber = FrameGrabber(
+            camera_info.address,
+            name=f"{self.label}:{camera_info.camera_id}",
+            decode=decode,
+        )
+
+    async def capture(self) -> Optional[np.ndarray]:
+        self._grabber.start()
+        frame, age = None, float("inf")
+        if self._grabber.decode == "latest":
+            frame, age = self._grabber.latest()
+        if frame is None:
+            # Still connecting, or on-demand decode — wait off the loop
+            loop = asyncio.get_running_loop()
+            frame, age = await loop.run_in_executor(
+                None, self._grabber.latest, _FRAME_WAIT_SEC
+            )
+
+        self.frame_age_sec = age
+        if frame is None:
+            return None
+        if age > _MAX_FRAME_AGE_SEC:
+            logger.warning(
+                f"[{self.label}] Stale frame for {self.camera_info.camera_id} "
+                f"({age:.1f}s old)"
+            )
+            return None
+        self.camera_info.last_seen = time.time() - age
+        return frame
+
+    async def health_check(self) -> bool:
+        frame = await self.capture()
+        return frame is not None
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._grabber.stop)
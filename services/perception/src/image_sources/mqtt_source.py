@@ -19,10 +19,12 @@ class MqttImageSource(ImageSource):
         camera_info: CameraInfo,
         resolution: str = "VGA",
         quality: int = 10,
+        target_width: Optional[int] = None,
     ):
         super().__init__(camera_info)
         self.resolution = resolution
         self.quality = quality
+        self.target_width = target_width
 
     async def capture(self) -> Optional[np.ndarray]:
         from image_requester import ImageRequester
@@ -32,6 +34,7 @@ class MqttImageSource(ImageSource):
             self.camera_info.camera_id,
             self.resolution,
             self.quality,
+            target_width=self.target_width,
         )
 
     async def health_check(self) -> bool:
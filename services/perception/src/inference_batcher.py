@@ -0,0 +1,178 @@
+"""
+InferenceBatcher — collects frames from many monitors into one forward pass.
+
+Every monitor awaits ``submit(image, conf)``.  A single collector task takes
+the first waiting frame, keeps gathering until either ``max_batch_size``
+frames are queued or ``max_wait_sec`` has elapsed since the first one, then
+hands the whole batch to ``run_batch`` and routes each per-image result back
+to the caller's future.
+
+Callers may ask for different confidence thresholds (Occupancy uses 0.5,
+Activity pose uses 0.4).  The batch runs (including NMS) at the lowest
+requested threshold and each caller's result is then filtered up to its own
+threshold.  Greedy NMS only lets a box suppress lower-scoring ones and keeps
+boxes in score order, so this keeps exactly the boxes NMS at the caller's
+threshold would keep; the ``max_det`` cap truncates that score-ordered list,
+so a capped frame still yields the caller's own top ``max_det``.  Results
+are still not bit-identical to a single-frame call: a batched forward pass
+letterboxes every frame to one shape and may use different kernels, so
+scores and boxes can differ slightly and detections near a threshold can
+flip.
+
+Per-batch latency and occupancy (batch size / max_batch_size) are kept in a
+rolling window and logged every ``_STATS_LOG_EVERY`` batches.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_STATS_WINDOW = 200
+_STATS_LOG_EVERY = 100
+
+BatchRunner = Callable[[List[np.ndarray], float], Awaitable[List[List[Dict]]]]
+
+
+class InferenceBatcher:
+    """Deadline-window batch collector for one model type."""
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: BatchRunner,
+        max_batch_size: int = 4,
+        max_wait_sec: float = 0.02,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be >= 1, got {max_batch_size}")
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_sec
+        self._run_batch = run_batch
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+
+        # Rolling stats: (batch_size, latency_sec)
+        self._history: Deque[Tuple[int, float]] = deque(maxlen=_STATS_WINDOW)
+        self._total_batches = 0
+        self._total_frames = 0
+
+    async def submit(self, image: np.ndarray, conf_threshold: float) -> List[Dict]:
+        """Queue one frame and wait for its results."""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, conf_threshold, future))
+        return await future
+
+    def stats(self) -> dict:
+        """Rolling batch statistics over the last ``_STATS_WINDOW`` batches."""
+        if not self._history:
+            return {
+                "batches": self._total_batches,
+                "frames": self._total_frames,
+                "mean_batch_size": 0.0,
+                "occupancy": 0.0,
+                "latency_ms_mean": 0.0,
+                "latency_ms_p95": 0.0,
+            }
+        sizes = np.array([h[0] for h in self._history], dtype=np.float64)
+        latencies = np.array([h[1] for h in self._history], dtype=np.float64) * 1000.0
+        return {
+            "batches": self._total_batches,
+            "frames": self._total_frames,
+            "mean_batch_size": round(float(sizes.mean()), 2),
+            "occupancy": round(float(sizes.mean()) / self.max_batch_size, 3),
+            "latency_ms_mean": round(float(latencies.mean()), 1),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 1),
+        }
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect_loop())
+
+    async def _collect_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait_sec
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                # asyncio.wait, not wait_for: on 3.11 wait_for swallows a
+                # close() cancel that races a completed get(), and the
+                # collector then blocks on the next get() forever.
+                getter = asyncio.ensure_future(self._queue.get())
+                try:
+                    done, _ = await asyncio.wait({getter}, timeout=remaining)
+                finally:
+                    if not getter.done():
+                        getter.cancel()
+                if not done:
+                    break
+                batch.append(getter.result())
+
+            # Dispatch without blocking collection of the next batch;
+            # the pool's frame slots bound how many frames (and so
+            # batches) are queued or in flight.
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: list):
+        images = [item[0] for item in batch]
+        min_conf = min(item[1] for item in batch)
+
+        start = time.perf_counter()
+        try:
+            results = await self._run_batch(images, min_conf)
+        except Exception as e:
+            logger.error(f"[{self.name}] Batch of {len(batch)} failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        latency = time.perf_counter() - start
+
+        for (_, conf, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if conf > min_conf:
+                result = [r for r in result if r["confidence"] >= conf]
+            future.set_result(result)
+
+        self._record(len(batch), latency)
+
+    def _record(self, size: int, latency: float):
+        self._history.append((size, latency))
+        self._total_batches += 1
+        self._total_frames += size
+        if self._total_batches % _STATS_LOG_EVERY == 0:
+            s = self.stats()
+            logger.info(
+                f"[{self.name}] batches={s['batches']} "
+                f"mean_size={s['mean_batch_size']} occupancy={s['occupancy']:.0%} "
+                f"latency mean={s['latency_ms_mean']}ms p95={s['latency_ms_p95']}ms"
+            )
@@ -0,0 +1,201 @@
+"""
+InferencePool — runs YOLO / YOLO-Pose off the asyncio event loop.
+
+Monitors submit frames and await the result; the actual forward passes run
+on a fixed set of worker threads.  Each worker owns its own model instances
+(loaded once in the thread initializer), so workers never share a model
+object and torch can run them concurrently with the GIL released.
+
+The number of frames in flight is bounded: once ``max_queue`` frames are
+queued or running, further callers wait for a slot.  This gives the
+monitor loops natural backpressure instead of an unbounded backlog of stale
+frames.
+
+With ``batch_size > 1`` frames from all monitors are first gathered by an
+InferenceBatcher (one per model) and each batch runs as a single forward
+pass on a worker.  A frame takes its slot before it enters the batcher and
+keeps it until its batch returns, so ``max_queue`` still counts frames
+(waiting for a batch, or in one) and the batcher queues never grow past it.
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from inference_batcher import InferenceBatcher
+from yolo_inference import YOLOInference
+from pose_estimator import PoseEstimator
+
+logger = logging.getLogger(__name__)
+
+
+class InferencePool:
+    """Singleton thread pool with per-worker YOLO and pose model instances."""
+
+    _instance = None
+
+    @classmethod
+    def get_instance(
+        cls,
+        model_path: str = "yolo11s.pt",
+        pose_model_path: str = "yolo11s-pose.pt",
+        workers: int = 2,
+        max_queue: int = 8,
+        batch_size: int = 1,
+        max_wait_ms: float = 20.0,
+    ):
+        if cls._instance is None:
+            cls._instance = cls(
+                model_path, pose_model_path, workers, max_queue,
+                batch_size, max_wait_ms,
+            )
+        return cls._instance
+
+    def __init__(
+        self,
+        model_path: str = "yolo11s.pt",
+        pose_model_path: str = "yolo11s-pose.pt",
+        workers: int = 2,
+        max_queue: int = 8,
+        batch_size: int = 1,
+        max_wait_ms: float = 20.0,
+    ):
+        if workers < 1:
+            raise ValueError(f"workers must be >= 1, got {workers}")
+        if max_queue < 1:
+            raise ValueError(f"max_queue must be >= 1, got {max_queue}")
+
+        self.model_path = model_path
+        self.pose_model_path = pose_model_path
+        self.workers = workers
+        self.max_queue = max_queue
+
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="inference",
+            initializer=self._init_worker,
+        )
+        # Created lazily so the semaphore binds to the running loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+        self.batch_size = batch_size
+        self._detect_batcher: Optional[InferenceBatcher] = None
+        self._pose_batcher: Optional[InferenceBatcher] = None
+        if batch_size > 1:
+            self._detect_batcher = InferenceBatcher(
+                "DetectBatch",
+                lambda images, conf: self._run(self._infer_batch_sync, images, conf),
+                max_batch_size=batch_size,
+                max_wait_sec=max_wait_ms / 1000.0,
+            )
+            self._pose_batcher = InferenceBatcher(
+                "PoseBatch",
+                lambda images, conf: self._run(self._estimate_batch_sync, images, conf),
+                max_batch_size=batch_size,
+                max_wait_sec=max_wait_ms / 1000.0,
+            )
+
+        logger.info(
+            f"InferencePool ready (workers={workers}, max_queue={max_queue}, "
+            f"batch_size={batch_size}, max_wait_ms={max_wait_ms})"
+        )
+
+    # ------------------------------------------------------------------
+    # Worker side (runs in pool threads)
+    # ------------------------------------------------------------------
+
+    def _init_worker(self):
+        """Load one model instance per worker thread."""
+        name = threading.current_thread().name
+        logger.info(f"[{name}] Loading inference models")
+        self._local.yolo = YOLOInference(self.model_path)
+        self._local.pose = PoseEstimator(self.pose_model_path)
+
+    def _infer_sync(self, image: np.ndarray, conf_threshold: float) -> List[Dict]:
+        return self._local.yolo.infer(image, conf_threshold=conf_threshold)
+
+    def _estimate_sync(self, image: np.ndarray, conf_threshold: float) -> List[Dict]:
+        return self._local.pose.estimate(image, conf_threshold=conf_threshold)
+
+    def _infer_batch_sync(
+        self, images: List[np.ndarray], conf_threshold: float
+    ) -> List[List[Dict]]:
+        return self._local.yolo.infer_batch(images, conf_threshold=conf_threshold)
+
+    def _estimate_batch_sync(
+        self, images: List[np.ndarray], conf_threshold: float
+    ) -> List[List[Dict]]:
+        return self._local.pose.estimate_batch(images, conf_threshold=conf_threshold)
+
+    # ------------------------------------------------------------------
+    # Public API (awaitable from monitors)
+    # ------------------------------------------------------------------
+
+    async def infer(self, image: np.ndarray, conf_threshold: float = 0.5) -> List[Dict]:
+        """YOLO object detection — same result format as YOLOInference.infer()."""
+        if self._detect_batcher is not None:
+            async with self._frame_slot():
+                return await self._detect_batcher.submit(image, conf_threshold)
+        return await self._submit(self._infer_sync, image, conf_threshold)
+
+    async def estimate(self, image: np.ndarray, conf_threshold: float = 0.5) -> List[Dict]:
+        """Pose estimation — same result format as PoseEstimator.estimate()."""
+        if self._pose_batcher is not None:
+            async with self._frame_slot():
+                return await self._pose_batcher.submit(image, conf_threshold)
+        return await self._submit(self._estimate_sync, image, conf_threshold)
+
+    @staticmethod
+    def filter_by_class(detections: List[Dict], class_name: str) -> List[Dict]:
+        """特定のクラスでフィルタリング"""
+        return [det for det in detections if det["class"] == class_name]
+
+    @property
+    def pending(self) -> int:
+        """Number of frames queued or running (holding a slot)."""
+        return self._pending
+
+    def batch_stats(self) -> Dict[str, dict]:
+        """Per-model batch latency / occupancy stats (empty when batching is off)."""
+        stats = {}
+        if self._detect_batcher is not None:
+            stats["detect"] = self._detect_batcher.stats()
+        if self._pose_batcher is not None:
+            stats["pose"] = self._pose_batcher.stats()
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    @asynccontextmanager
+    async def _frame_slot(self):
+        """Hold one of the ``max_queue`` frame slots."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_queue)
+
+        async with self._slots:
+            self._pending += 1
+            try:
+                yield
+            finally:
+                self._pending -= 1
+
+    async def _submit(self, fn, *args):
+        """Run one unbatched frame on a worker."""
+        async with self._frame_slot():
+            return await self._run(fn, *args)
+
+    async def _run(self, fn, *args):
+        # Batches call this directly: their frames already hold slots
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
@@ -19,15 +19,44 @@ logger = logging.getLogger(__name__)
 
 # Import components
 from scheduler import TaskScheduler
-from monitors import OccupancyMonitor, WhiteboardMonitor, ActivityMonitor
+from monitors import (
+    OccupancyMonitor, WhiteboardMonitor, ActivityMonitor,
+    FrameChangeGate, AdaptiveInterval,
+)
 from image_requester import ImageRequester
+from mqtt_async import AsyncMQTTClient
 from yolo_inference import YOLOInference
-from pose_estimator import PoseEstimator
+from inference_pool import InferencePool
 from state_publisher import StatePublisher
 from camera_discovery import CameraDiscovery
 from image_sources import ImageSourceFactory
 
 
+def build_change_gate(gate_config: dict) -> FrameChangeGate:
+    """monitors.yaml の change_gate セクションから FrameChangeGate を生成"""
+    return FrameChangeGate(
+        enabled=gate_config.get("enabled", True),
+        threshold=gate_config.get("threshold", 0.01),
+        pixel_delta=gate_config.get("pixel_delta", 12),
+        force_refresh_every=gate_config.get("force_refresh_every", 10),
+    )
+
+
+def apply_adaptive_interval(monitor, interval_config: dict):
+    """monitors.yaml の adaptive_interval セクションを対応モニターに適用"""
+    if not monitor.supports_adaptive_interval:
+        return
+    if not interval_config.get("enabled", False):
+        monitor.adaptive_interval = None
+        return
+    monitor.adaptive_interval = AdaptiveInterval(
+        base_sec=monitor.interval_sec,
+        min_sec=interval_config.get("min_sec", 1.0),
+        max_sec=interval_config.get("max_sec", 30.0),
+        backoff=interval_config.get("backoff", 1.5),
+    )
+
+
 async def main():
     logger.info("=== Vision Service Starting ===")
 
@@ -43,19 +72,43 @@ async def main():
 
     logger.info(f"MQTT Broker: {broker}:{port}")
 
-    # Initialize singletons
-    ImageRequester.get_instance(broker, port)
+    # Initialize singletons (one MQTT connection shared by requester/publisher)
+    mqtt_client = AsyncMQTTClient.get_instance(broker, port)
+    ImageRequester.get_instance(
+        broker,
+        port,
+        binary=mqtt_config.get("binary_frames", True),
+        decode_workers=mqtt_config.get("decode_workers", 2),
+    )
     publisher = StatePublisher.get_instance(broker, port)
+    await mqtt_client.connect()
 
     # Load YOLO models
     yolo_config = config.get("yolo", {})
     model_path = yolo_config.get("model", "yolo11s.pt")
     pose_model_path = yolo_config.get("pose_model", "yolo11s-pose.pt")
-    YOLOInference.get_instance(model_path)
-    PoseEstimator.get_instance(pose_model_path)
-
-    # Create scheduler
-    scheduler = TaskScheduler()
+    YOLOInference.get_instance(model_path)  # used by discovery verification
+
+    # Inference worker pool (monitors await results off the event loop)
+    inference_config = config.get("inference", {})
+    InferencePool.get_instance(
+        model_path,
+        pose_model_path,
+        workers=inference_config.get("workers", 2),
+        max_queue=inference_config.get("max_queue", 8),
+        batch_size=inference_config.get("batch_size", 1),
+        max_wait_ms=inference_config.get("max_wait_ms", 20.0),
+    )
+
+    # Create scheduler (global inference budget across all monitors)
+    scheduler_config = config.get("scheduler", {})
+    scheduler = TaskScheduler(
+        inferences_per_sec=scheduler_config.get("inferences_per_sec", 0.0),
+    )
+
+    # Frame change gate defaults (per-monitor overrides merge on top)
+    gate_defaults = config.get("change_gate", {})
+    interval_defaults = config.get("adaptive_interval", {})
 
     # Collect static camera IDs to avoid duplicates from discovery
     static_camera_ids = set()
@@ -80,6 +133,17 @@ async def main():
             logger.warning(f"Unknown monitor type: {monitor_type}")
             continue
 
+        if "priority" in monitor_config:
+            monitor.priority = monitor_config["priority"]
+        if "inference_cost" in monitor_config:
+            monitor.inference_cost = monitor_config["inference_cost"]
+        monitor.change_gate = build_change_gate(
+            {**gate_defaults, **monitor_config.get("change_gate", {})}
+        )
+        apply_adaptive_interval(
+            monitor,
+            {**interval_defaults, **monitor_config.get("adaptive_interval", {})},
+        )
         scheduler.register_monitor(monitor_config["name"], monitor)
         static_camera_ids.add(camera_id)
 
@@ -97,6 +161,8 @@ async def main():
 
         cameras = await discovery.discover()
         default_interval = discovery_config.get("default_interval_sec", 10.0)
+        default_decode = discovery_config.get("decode", "latest")
+        decode_map = discovery_config.get("decode_map", {})
 
         discovery_results = []
         for cam in cameras:
@@ -105,13 +171,17 @@ async def main():
                 logger.info(f"[Discovery] Skipping {cam.camera_id} (static config exists)")
                 continue
 
-            source = ImageSourceFactory.create(cam)
+            source = ImageSourceFactory.create(
+                cam, decode=decode_map.get(cam.camera_id, default_decode)
+            )
             monitor = ActivityMonitor(
                 camera_id=cam.camera_id,
                 zone_name=cam.zone_name or cam.camera_id,
                 image_source=source,
             )
             monitor.interval_sec = default_interval
+            monitor.change_gate = build_change_gate(gate_defaults)
+            apply_adaptive_interval(monitor, interval_defaults)
             monitor_name = f"discovery_{cam.camera_id}"
             scheduler.register_monitor(monitor_name, monitor)
 
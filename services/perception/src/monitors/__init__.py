@@ -2,12 +2,16 @@
 __init__.py for monitors package
 """
 from monitors.base import MonitorBase
+from monitors.change_gate import FrameChangeGate
+from monitors.adaptive_interval import AdaptiveInterval
 from monitors.occupancy import OccupancyMonitor
 from monitors.whiteboard import WhiteboardMonitor
 from monitors.activity import ActivityMonitor
 
 __all__ = [
     "MonitorBase",
+    "FrameChangeGate",
+    "AdaptiveInterval",
     "OccupancyMonitor",
     "WhiteboardMonitor",
     "ActivityMonitor",
@@ -12,8 +12,7 @@ import logging
 import numpy as np
 
 from monitors.base import MonitorBase
-from yolo_inference import YOLOInference
-from pose_estimator import PoseEstimator
+from inference_pool import InferencePool
 from activity_analyzer import ActivityAnalyzer
 from state_publisher import StatePublisher
 
@@ -21,6 +20,9 @@ logger = logging.getLogger(__name__)
 
 
 class ActivityMonitor(MonitorBase):
+    supports_adaptive_interval = True
+    inference_cost = 2  # detect + pose
+
     def __init__(
         self,
         camera_id: str,
@@ -34,24 +36,27 @@ class ActivityMonitor(MonitorBase):
             resolution="VGA",
             quality=15,
             image_source=image_source,
+            priority=2,
+            target_width=640,
         )
         self.zone_name = zone_name
-        self.yolo = YOLOInference.get_instance()
-        self.pose = PoseEstimator.get_instance()
+        self.inference = InferencePool.get_instance()
         self.publisher = StatePublisher.get_instance()
         self.analyzer = ActivityAnalyzer(frame_size=(800, 600))
+        self._last_person_count = 0
 
     async def analyze(self, image: np.ndarray):
         """Two-tier: detect → pose (only if persons found)."""
         # Tier 1: cheap person detection
-        detections = self.yolo.infer(image, conf_threshold=0.5)
-        persons_det = self.yolo.filter_by_class(detections, "person")
+        detections = await self.inference.infer(image, conf_threshold=0.5)
+        persons_det = self.inference.filter_by_class(detections, "person")
 
         if not persons_det:
+            self.last_cycle_inferences = 1  # pose skipped
             return {"person_count": 0, "persons_pose": [], "image_shape": image.shape}
 
         # Tier 2: pose estimation (only runs when we have persons)
-        persons_pose = self.pose.estimate(image, conf_threshold=0.4)
+        persons_pose = await self.inference.estimate(image, conf_threshold=0.4)
 
         return {
             "person_count": len(persons_det),
@@ -71,6 +76,12 @@ class ActivityMonitor(MonitorBase):
 
         result = self.analyzer.analyze()
 
+        self.report_activity(
+            result["activity_class"] in ("moderate", "high")
+            or person_count != self._last_person_count
+        )
+        self._last_person_count = person_count
+
         payload = {
             "zone": self.zone_name,
             "person_count": person_count,
@@ -78,7 +89,9 @@ class ActivityMonitor(MonitorBase):
             "activity_class": result["activity_class"],
             "posture_duration_sec": result["posture_duration_sec"],
             "posture_status": result["posture_status"],
+            "tracks": result["tracks"],
             "buffer_depth": result["buffer_depth"],
+            "interval_sec": round(self.effective_interval_sec, 2),
             "timestamp": time.time(),
         }
 
@@ -90,5 +103,7 @@ class ActivityMonitor(MonitorBase):
             f"activity={result['activity_level']:.3f} ({result['activity_class']}) "
             f"posture={result['posture_status']} "
             f"({result['posture_duration_sec']:.0f}s) "
-            f"buf={result['buffer_depth']}"
+            f"tracks={len(result['tracks'])} "
+            f"buf={result['buffer_depth']} "
+            f"interval={self.effective_interval_sec:.1f}s"
         )
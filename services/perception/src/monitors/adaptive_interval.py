@@ -0,0 +1,37 @@
+"""
+AdaptiveInterval — per-monitor capture interval driven by scene activity.
+
+A monitor reports after every cycle whether the scene was "active"
+(e.g. moderate/high activity or a change in person count).  Activity snaps
+the interval down to ``min_sec`` so motion is sampled densely; every idle
+cycle multiplies the interval by ``backoff`` until it reaches ``max_sec``.
+"""
+
+
+class AdaptiveInterval:
+    def __init__(
+        self,
+        base_sec: float,
+        min_sec: float = 1.0,
+        max_sec: float = 30.0,
+        backoff: float = 1.5,
+    ):
+        if min_sec <= 0 or max_sec < min_sec:
+            raise ValueError(f"Invalid interval bounds: min={min_sec}, max={max_sec}")
+        if backoff < 1.0:
+            raise ValueError(f"backoff must be >= 1.0, got {backoff}")
+        self.min_sec = min_sec
+        self.max_sec = max_sec
+        self.backoff = backoff
+        self.current_sec = self._clamp(base_sec)
+
+    def on_activity(self):
+        """Scene is active — sample at the fastest allowed rate."""
+        self.current_sec = self.min_sec
+
+    def on_idle(self):
+        """Scene is idle — back off exponentially towards the ceiling."""
+        self.current_sec = self._clamp(self.current_sec * self.backoff)
+
+    def _clamp(self, value: float) -> float:
+        return max(self.min_sec, min(self.max_sec, value))
@@ -5,9 +5,12 @@ from abc import ABC, abstractmethod
 import asyncio
 import logging
 import time
-from typing import Optional
+from typing import Any, Optional
 import numpy as np
 
+from monitors.adaptive_interval import AdaptiveInterval
+from monitors.change_gate import FrameChangeGate
+
 logger = logging.getLogger(__name__)
 
 # Health monitoring constants
@@ -16,6 +19,12 @@ _BACKOFF_SEC = 30.0
 
 
 class MonitorBase(ABC):
+    # サブクラスが report_activity() を呼ぶ場合のみ適応インターバルを有効化できる
+    supports_adaptive_interval = False
+    # 1サイクルで実行しうる推論 (YOLO detect/pose) の最大回数。スケジューラは
+    # この分の予算を確保し、実際に使った分 (last_cycle_inferences) を差し引いて返却する
+    inference_cost = 1
+
     def __init__(
         self,
         name: str,
@@ -24,54 +33,112 @@ class MonitorBase(ABC):
         resolution: str,
         quality: int = 10,
         image_source=None,
+        priority: int = 1,
+        target_width: Optional[int] = None,
     ):
         self.name = name
         self.camera_id = camera_id
         self.interval_sec = interval_sec
         self.resolution = resolution
         self.quality = quality
+        # 解析に必要な画像幅 (MQTTカメラでは下回らない範囲で縮小デコード)
+        self.target_width = target_width
         self.enabled = True
+        # スケジューラの優先度 (大きいほど優先、負荷超過時は小さい順に間引く)
+        self.priority = priority
+        self.last_cycle_analyzed = False
+        self.last_cycle_inferences = 0
+        # monitors.yaml の inference_cost で上書き可能
+        self.inference_cost = type(self).inference_cost
         self._image_source = image_source
         self._consecutive_failures = 0
+        # 変化ゲート: 前回解析時からほぼ変化がなければ解析をスキップ
+        self.change_gate = FrameChangeGate()
+        self._last_analysis: Any = None
+        # 適応インターバル (None なら interval_sec 固定)
+        self.adaptive_interval: Optional[AdaptiveInterval] = None
 
     async def run(self):
-        """メインループ"""
+        """メインループ (スケジューラを使わない単独実行用)"""
         logger.info(f"[{self.name}] Started (interval={self.interval_sec}s, res={self.resolution})")
 
         while self.enabled:
-            try:
-                start_time = time.time()
+            start_time = time.time()
+            delay = await self.run_once()
+            # インターバル調整
+            elapsed = time.time() - start_time
+            await asyncio.sleep(max(0, delay - elapsed))
 
-                # 画像リクエスト
-                image = await self.request_image()
+    async def run_once(self) -> float:
+        """
+        1サイクル実行 (画像取得 → 変化ゲート → 解析 → 結果処理)
 
-                if image is not None:
-                    self._consecutive_failures = 0
-                    # 推論実行
-                    detections = await self.analyze(image)
-                    # 結果処理
-                    await self.process_results(detections)
+        Returns:
+            float: 今回のサイクル開始から次回開始までの推奨秒数
+        """
+        self.last_cycle_analyzed = False
+        self.last_cycle_inferences = 0
+        try:
+            # 画像リクエスト
+            image = await self.request_image()
+
+            if image is not None:
+                self._consecutive_failures = 0
+                if (
+                    self.change_gate.should_skip(image)
+                    and self._last_analysis is not None
+                ):
+                    # シーン変化なし → 前回の解析結果を再利用
+                    detections = self.reuse_analysis(self._last_analysis)
+                    logger.debug(
+                        f"[{self.name}] Frame unchanged "
+                        f"(score={self.change_gate.last_score:.4f}), reusing analysis"
+                    )
                 else:
-                    self._consecutive_failures += 1
-                    if self._consecutive_failures >= _MAX_CONSECUTIVE_FAILURES:
-                        logger.warning(
-                            f"[{self.name}] Camera offline "
-                            f"({self._consecutive_failures} consecutive failures), "
-                            f"backing off {_BACKOFF_SEC}s"
-                        )
-                        await asyncio.sleep(_BACKOFF_SEC)
-                        continue
-                    else:
-                        logger.warning(f"[{self.name}] Image request failed")
-
-                # インターバル調整
-                elapsed = time.time() - start_time
-                sleep_time = max(0, self.interval_sec - elapsed)
-                await asyncio.sleep(sleep_time)
-
-            except Exception as e:
-                logger.error(f"[{self.name}] Error: {e}", exc_info=True)
-                await asyncio.sleep(self.interval_sec)
+                    # 推論実行 (推論を省略したサブクラスは analyze() 内で減らす)
+                    self.last_cycle_inferences = self.inference_cost
+                    detections = await self.analyze(image)
+                    self._last_analysis = detections
+                    self.last_cycle_analyzed = True
+                # 結果処理
+                await self.process_results(detections)
+            else:
+                self._consecutive_failures += 1
+                if self._consecutive_failures >= _MAX_CONSECUTIVE_FAILURES:
+                    logger.warning(
+                        f"[{self.name}] Camera offline "
+                        f"({self._consecutive_failures} consecutive failures), "
+                        f"backing off {_BACKOFF_SEC}s"
+                    )
+                    return _BACKOFF_SEC
+                logger.warning(f"[{self.name}] Image request failed")
+
+        except Exception as e:
+            logger.error(f"[{self.name}] Error: {e}", exc_info=True)
+            self.change_gate.reset()
+
+        return self.effective_interval_sec
+
+    @property
+    def effective_interval_sec(self) -> float:
+        """現在のキャプチャ間隔 (適応インターバル有効時はその値)"""
+        if self.adaptive_interval is not None:
+            return self.adaptive_interval.current_sec
+        return self.interval_sec
+
+    def report_activity(self, active: bool):
+        """
+        シーンの活動状態を通知し、次回のキャプチャ間隔を調整する
+
+        Args:
+            active: True なら最短間隔へ、False なら指数バックオフ
+        """
+        if self.adaptive_interval is None:
+            return
+        if active:
+            self.adaptive_interval.on_activity()
+        else:
+            self.adaptive_interval.on_idle()
 
     async def request_image(self) -> Optional[np.ndarray]:
         """画像リクエスト (image_source優先、なければMQTTフォールバック)"""
@@ -83,7 +150,8 @@ class MonitorBase(ABC):
         return await requester.request(
             self.camera_id,
             self.resolution,
-            self.quality
+            self.quality,
+            target_width=self.target_width,
         )
 
     @abstractmethod
@@ -99,6 +167,15 @@ class MonitorBase(ABC):
         """
         pass
 
+    def reuse_analysis(self, previous: Any) -> Any:
+        """
+        変化ゲートでスキップしたフレームに使う解析結果
+
+        デフォルトは前回の結果をそのまま返す。「変化あり」等の
+        一度きりのフラグを持つモニターはオーバーライドすること。
+        """
+        return previous
+
     @abstractmethod
     async def process_results(self, detections):
         """
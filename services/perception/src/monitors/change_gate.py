@@ -0,0 +1,94 @@
+"""
+FrameChangeGate — cheap scene-change test run before a monitor's analyze().
+
+Each frame is reduced to a small grayscale thumbnail (64x48, INTER_AREA so
+sensor noise averages out).  The thumbnail is compared against the reference
+thumbnail of the last frame that was actually analysed; the change score is
+the fraction of thumbnail pixels whose brightness moved by more than
+``pixel_delta``.  Comparing against the last *analysed* frame (rather than
+the previous frame) means slow drift still accumulates and eventually
+triggers a refresh.
+
+Below ``threshold`` the monitor reuses its previous analysis result instead
+of running detection.  Every ``force_refresh_every`` consecutive skips a
+full analysis is forced regardless, so a static-but-wrong result cannot
+persist forever.
+"""
+import logging
+from typing import Optional
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_THUMB_SIZE = (64, 48)  # (w, h)
+
+
+class FrameChangeGate:
+    def __init__(
+        self,
+        enabled: bool = True,
+        threshold: float = 0.01,
+        pixel_delta: int = 12,
+        force_refresh_every: int = 10,
+    ):
+        self.enabled = enabled
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.force_refresh_every = force_refresh_every
+
+        self._reference: Optional[np.ndarray] = None
+        self._skips_since_refresh = 0
+        self.last_score = 1.0
+        self.total_frames = 0
+        self.skipped_frames = 0
+
+    def should_skip(self, image: np.ndarray) -> bool:
+        """
+        Return True if ``image`` is close enough to the last analysed frame
+        that the previous result can be reused.
+
+        When this returns False the caller is expected to analyse the frame;
+        the frame becomes the new reference.
+        """
+        self.total_frames += 1
+        if not self.enabled:
+            return False
+
+        thumb = self._thumbnail(image)
+        ref = self._reference
+
+        if ref is None or ref.shape != thumb.shape:
+            self.last_score = 1.0
+        else:
+            diff = cv2.absdiff(thumb, ref)
+            self.last_score = float(np.count_nonzero(diff > self.pixel_delta)) / diff.size
+
+        if (
+            ref is not None
+            and self.last_score < self.threshold
+            and self._skips_since_refresh < self.force_refresh_every
+        ):
+            self._skips_since_refresh += 1
+            self.skipped_frames += 1
+            return True
+
+        self._reference = thumb
+        self._skips_since_refresh = 0
+        return False
+
+    def reset(self):
+        """Forget the reference frame so the next frame is always analysed."""
+        self._reference = None
+        self._skips_since_refresh = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped_frames / self.total_frames if self.total_frames else 0.0
+
+    @staticmethod
+    def _thumbnail(image: np.ndarray) -> np.ndarray:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(image, _THUMB_SIZE, interpolation=cv2.INTER_AREA)
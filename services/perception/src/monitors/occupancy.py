@@ -6,12 +6,14 @@ import time
 import logging
 import numpy as np
 from monitors.base import MonitorBase
-from yolo_inference import YOLOInference
+from inference_pool import InferencePool
 from state_publisher import StatePublisher
 
 logger = logging.getLogger(__name__)
 
 class OccupancyMonitor(MonitorBase):
+    supports_adaptive_interval = True
+
     def __init__(self, camera_id: str, zone_name: str = "meeting_room_a", image_source=None):
         super().__init__(
             name=f"OccupancyMonitor_{zone_name}",
@@ -20,26 +22,34 @@ class OccupancyMonitor(MonitorBase):
             resolution="QVGA",      # 320x240
             quality=15,             # 低品質でOK
             image_source=image_source,
+            priority=1,
+            target_width=320,
         )
         self.zone_name = zone_name
-        self.yolo = YOLOInference.get_instance()
+        self.inference = InferencePool.get_instance()
         self.publisher = StatePublisher.get_instance()
+        self._last_count = 0
         
     async def analyze(self, image: np.ndarray):
         """人物検出のみ"""
-        results = self.yolo.infer(image, conf_threshold=0.5)
-        persons = self.yolo.filter_by_class(results, "person")
+        results = await self.inference.infer(image, conf_threshold=0.5)
+        persons = self.inference.filter_by_class(results, "person")
         return persons
     
     async def process_results(self, detections):
         """占有状態を送信"""
         count = len(detections)
         occupied = count > 0
+
+        # 人数変化 → 高頻度化、変化なし → バックオフ
+        self.report_activity(count != self._last_count)
+        self._last_count = count
         
         payload = {
             "zone": self.zone_name,
             "occupied": occupied,
             "person_count": count,
+            "interval_sec": round(self.effective_interval_sec, 2),
             "timestamp": time.time()
         }
         
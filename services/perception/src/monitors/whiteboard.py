@@ -12,6 +12,8 @@ from state_publisher import StatePublisher
 logger = logging.getLogger(__name__)
 
 class WhiteboardMonitor(MonitorBase):
+    inference_cost = 0  # Canny のみ (推論なし)
+
     def __init__(self, camera_id: str, zone_name: str = "meeting_room_a", image_source=None):
         super().__init__(
             name=f"WhiteboardMonitor_{zone_name}",
@@ -20,6 +22,8 @@ class WhiteboardMonitor(MonitorBase):
             resolution="VGA",       # 640x480 (汚れ検知には十分)
             quality=10,             # 中品質
             image_source=image_source,
+            priority=0,             # 負荷超過時に最初に間引く
+            target_width=640,
         )
         self.zone_name = zone_name
         self.publisher = StatePublisher.get_instance()
@@ -52,6 +56,10 @@ class WhiteboardMonitor(MonitorBase):
             "changed": changed
         }
     
+    def reuse_analysis(self, previous):
+        """変化なしフレーム: 汚れ状態は維持、changedは立てない (タスク重複防止)"""
+        return {**previous, "changed": False}
+
     async def process_results(self, analysis):
         """汚れている場合にアラート送信"""
         payload = {
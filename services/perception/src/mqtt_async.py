@@ -0,0 +1,341 @@
+"""
+Async MQTT: one paho connection per process, driven by the asyncio event loop.
+
+paho's external-loop hooks (on_socket_open / on_socket_register_write ...)
+register the client socket with loop.add_reader / add_writer, so every paho
+callback runs on the event loop thread.  No network thread, no
+call_soon_threadsafe handoffs and no locks between MQTT and the rest of the
+process.
+
+- publish(): awaitable; QoS 0 returns once queued, QoS 1/2 once acknowledged
+- add_handler(): synchronous on-loop callback per topic filter (hot paths)
+- subscribe(): async iterator of (topic, payload) per topic filter
+- reconnect with exponential backoff (1s → 30s) and resubscription of
+  every registered filter
+- pause_reading() / resume_reading() for consumer backpressure
+
+The blocking part of (re)connecting (DNS lookup + TCP connect inside paho's
+connect()/reconnect()) runs in the default executor; socket hooks fired from
+that thread are handed to the loop with call_soon_threadsafe.
+
+Each service image copies only its own src/, so this module lives in both
+services/brain/src and services/perception/src.  Keep the two copies
+identical apart from the logger import (infra/scripts/test_mqtt_async.py
+checks this).
+"""
+import asyncio
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import paho.mqtt.client as mqtt
+
+logger = logging.getLogger(__name__)
+
+_BACKOFF_MIN_SEC = 1.0
+_BACKOFF_MAX_SEC = 30.0
+_MISC_INTERVAL_SEC = 1.0
+
+MessageHandler = Callable[[str, bytes], None]
+
+
+class MQTTSubscription:
+    """Async iterator over (topic, payload) for one topic filter (bounded, drops oldest)."""
+
+    def __init__(self, topic_filter: str, maxsize: int, on_close: Callable[["MQTTSubscription"], None]):
+        self.topic_filter = topic_filter
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._on_close = on_close
+        self.dropped = 0
+        self.closed = False
+
+    def deliver(self, topic: str, payload: bytes):
+        if self.closed:
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait((topic, payload))
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        self._on_close(self)
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Tuple[str, bytes]:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is None:
+            raise StopAsyncIteration
+        return item
+
+
+class AsyncMQTTClient:
+    _instance = None
+
+    @classmethod
+    def get_instance(cls, broker: str = "localhost", port: int = 1883):
+        if cls._instance is None:
+            cls._instance = cls(broker, port)
+        return cls._instance
+
+    def __init__(self, broker: str = "localhost", port: int = 1883, keepalive: int = 60):
+        self.broker = broker
+        self.port = port
+        self.keepalive = keepalive
+
+        self._client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+        mqtt_user = os.getenv("MQTT_USER")
+        mqtt_pass = os.getenv("MQTT_PASS")
+        if mqtt_user:
+            self._client.username_pw_set(mqtt_user, mqtt_pass)
+        self._client.on_connect = self._on_connect
+        self._client.on_disconnect = self._on_disconnect
+        self._client.on_message = self._on_message
+        self._client.on_publish = self._on_publish
+        self._client.on_socket_open = self._on_socket_open
+        self._client.on_socket_close = self._on_socket_close
+        self._client.on_socket_register_write = self._on_socket_register_write
+        self._client.on_socket_unregister_write = self._on_socket_unregister_write
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._connected = asyncio.Event()
+        self._closing = False
+        self._sock_fd: Optional[int] = None
+        self._reading_paused = False
+        self._misc_task: Optional[asyncio.Task] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+        # topic filter -> qos (resubscribed on every connect)
+        self._subscriptions: Dict[str, int] = {}
+        self._handlers: List[Tuple[str, MessageHandler]] = []
+        self._streams: List[MQTTSubscription] = []
+        self._match = lru_cache(maxsize=4096)(self._match_uncached)
+
+        # mid -> future resolved by on_publish
+        self._pending_pubs: Dict[int, asyncio.Future] = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    async def connect(self, timeout: float = 10.0):
+        """Connect and wait for CONNACK (raises OSError / asyncio.TimeoutError)."""
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        await self._loop.run_in_executor(
+            None, self._client.connect, self.broker, self.port, self.keepalive
+        )
+        await asyncio.wait_for(self._connected.wait(), timeout)
+        logger.info(f"MQTT connected to {self.broker}:{self.port}")
+
+    async def disconnect(self):
+        self._closing = True
+        for task in (self._reconnect_task, self._misc_task):
+            if task is not None:
+                task.cancel()
+        self._client.disconnect()
+        self._connected.clear()
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    async def publish(self, topic: str, payload: Any, qos: int = 0,
+                      retain: bool = False, timeout: float = 10.0) -> bool:
+        """
+        Publish a message (dict/list payloads are JSON-encoded).
+
+        Returns:
+            QoS 0: True if queued on a live connection.
+            QoS 1/2: True once acknowledged (queued across reconnects),
+            False on timeout.
+        """
+        if isinstance(payload, (dict, list)):
+            payload = json.dumps(payload)
+        info = self._client.publish(topic, payload, qos=qos, retain=retain)
+        if qos == 0:
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                logger.warning(f"MQTT publish to {topic} failed: {mqtt.error_string(info.rc)}")
+                return False
+            return True
+        if info.rc not in (mqtt.MQTT_ERR_SUCCESS, mqtt.MQTT_ERR_NO_CONN):
+            logger.warning(f"MQTT publish to {topic} failed: {mqtt.error_string(info.rc)}")
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending_pubs[info.mid] = future
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"MQTT publish to {topic} not acknowledged within {timeout}s")
+            return False
+        finally:
+            self._pending_pubs.pop(info.mid, None)
+
+    def add_handler(self, topic_filter: str, handler: MessageHandler, qos: int = 0):
+        """Call handler(topic, payload) on the loop thread for matching messages."""
+        self._handlers.append((topic_filter, handler))
+        self._match.cache_clear()
+        self._ensure_subscribed(topic_filter, qos)
+
+    def subscribe(self, topic_filter: str, qos: int = 0, maxsize: int = 1000) -> MQTTSubscription:
+        """
+        Async iterator over matching messages.
+
+        Usage:
+            async for topic, payload in mqtt.subscribe("office/#"): ...
+        """
+        stream = MQTTSubscription(topic_filter, maxsize, self._remove_stream)
+        self._streams.append(stream)
+        self._match.cache_clear()
+        self._ensure_subscribed(topic_filter, qos)
+        return stream
+
+    def pause_reading(self):
+        """Stop reading from the socket (the broker buffers) until resume_reading()."""
+        if not self._reading_paused and self._sock_fd is not None:
+            self._loop.remove_reader(self._sock_fd)
+        self._reading_paused = True
+
+    def resume_reading(self):
+        if self._reading_paused and self._sock_fd is not None:
+            self._loop.add_reader(self._sock_fd, self._client.loop_read)
+        self._reading_paused = False
+
+    # ------------------------------------------------------------------
+    # Subscriptions / dispatch
+    # ------------------------------------------------------------------
+
+    def _ensure_subscribed(self, topic_filter: str, qos: int):
+        if self._subscriptions.get(topic_filter, -1) >= qos:
+            return
+        self._subscriptions[topic_filter] = qos
+        if self.connected:
+            self._client.subscribe(topic_filter, qos)
+
+    def _remove_stream(self, stream: MQTTSubscription):
+        self._streams.remove(stream)
+        self._match.cache_clear()
+
+    def _match_uncached(self, topic: str) -> Tuple[tuple, tuple]:
+        handlers = tuple(h for f, h in self._handlers if mqtt.topic_matches_sub(f, topic))
+        streams = tuple(s for s in self._streams if mqtt.topic_matches_sub(s.topic_filter, topic))
+        return handlers, streams
+
+    def _on_message(self, client, userdata, msg):
+        topic = msg.topic
+        payload = msg.payload
+        handlers, streams = self._match(topic)
+        for handler in handlers:
+            try:
+                handler(topic, payload)
+            except Exception as e:
+                logger.error(f"MQTT handler error ({topic}): {e}")
+        for stream in streams:
+            stream.deliver(topic, payload)
+
+    def _on_publish(self, client, userdata, mid, reason_code, properties):
+        future = self._pending_pubs.get(mid)
+        if future is not None and not future.done():
+            future.set_result(not reason_code.is_failure)
+
+    # ------------------------------------------------------------------
+    # Connection state
+    # ------------------------------------------------------------------
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        if reason_code.is_failure:
+            logger.error(f"MQTT connection refused: {reason_code}")
+            return
+        logger.info(f"Connected to MQTT Broker with result code {reason_code}")
+        for topic_filter, qos in self._subscriptions.items():
+            client.subscribe(topic_filter, qos)
+        self._connected.set()
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
+        self._connected.clear()
+        if self._closing:
+            return
+        logger.warning(f"MQTT disconnected ({reason_code}), reconnecting")
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = self._loop.create_task(self._reconnect_loop())
+
+    async def _reconnect_loop(self):
+        delay = _BACKOFF_MIN_SEC
+        while not self._closing and not self.connected:
+            await asyncio.sleep(delay)
+            try:
+                await self._loop.run_in_executor(None, self._client.reconnect)
+                await asyncio.wait_for(self._connected.wait(), 10.0)
+            except (OSError, asyncio.TimeoutError) as e:
+                logger.warning(f"MQTT reconnect failed: {e!r} (retry in {delay:.0f}s)")
+                delay = min(delay * 2, _BACKOFF_MAX_SEC)
+
+    async def _misc_loop(self):
+        """Keepalive pings and retry timers (paho loop_misc)."""
+        while not self._closing:
+            self._client.loop_misc()
+            await asyncio.sleep(_MISC_INTERVAL_SEC)
+
+    # ------------------------------------------------------------------
+    # paho external event loop hooks
+    # ------------------------------------------------------------------
+
+    # Registered by fd number: paho may already have closed the socket
+    # object by the time on_socket_close runs.  connect()/reconnect() fire
+    # these from the executor thread; _on_loop() keeps them in order on the
+    # loop thread.
+
+    def _on_loop(self, fn: Callable, *args):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            fn(*args)
+        else:
+            self._loop.call_soon_threadsafe(fn, *args)
+
+    def _on_socket_open(self, client, userdata, sock):
+        self._on_loop(self._register_socket, client, sock.fileno())
+
+    def _on_socket_close(self, client, userdata, sock):
+        self._on_loop(self._unregister_socket)
+
+    def _on_socket_register_write(self, client, userdata, sock):
+        self._on_loop(self._set_writer, client, True)
+
+    def _on_socket_unregister_write(self, client, userdata, sock):
+        self._on_loop(self._set_writer, client, False)
+
+    def _register_socket(self, client, fd: int):
+        self._sock_fd = fd
+        if not self._reading_paused:
+            self._loop.add_reader(fd, client.loop_read)
+        if self._misc_task is None or self._misc_task.done():
+            self._misc_task = self._loop.create_task(self._misc_loop())
+
+    def _unregister_socket(self):
+        if self._sock_fd is not None:
+            self._loop.remove_reader(self._sock_fd)
+            self._loop.remove_writer(self._sock_fd)
+        self._sock_fd = None
+
+    def _set_writer(self, client, want_write: bool):
+        if self._sock_fd is None:
+            return
+        if want_write:
+            self._loop.add_writer(self._sock_fd, client.loop_write)
+        else:
+            self._loop.remove_writer(self._sock_fd)
@@ -0,0 +1,134 @@
+"""
+PersonTracker — lightweight stable-ID assignment for pose detections.
+
+YOLO returns persons in no particular order, so pairing frames by list
+index mixes people up in a busy room.  The tracker matches each frame's
+bounding boxes to the live tracks greedily by IoU (highest first), with a
+centroid-distance fallback for people who moved further than their box
+overlap allows between samples.  Unmatched detections open new tracks;
+tracks unseen for ``max_missed_sec`` are dropped (long enough to survive
+the slowest adaptive capture interval).
+
+With at most a handful of people per camera the (N, M) IoU matrix is tiny,
+so a greedy pass is as good as Hungarian matching here and costs
+microseconds per frame.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Centroid fallback: max centre distance, relative to the track's box diagonal
+_CENTROID_MAX_REL = 0.75
+
+
+@dataclass
+class Track:
+    track_id: int
+    bbox: np.ndarray      # [x1, y1, x2, y2]
+    first_seen: float
+    last_seen: float
+
+
+def bbox_from_keypoints(keypoints: np.ndarray, confidences: np.ndarray,
+                        conf_thresh: float = 0.3) -> Optional[np.ndarray]:
+    """Bounding box of the visible keypoints (fallback when no bbox given)."""
+    visible = confidences > conf_thresh
+    if not np.any(visible):
+        return None
+    pts = keypoints[visible]
+    return np.array([*pts.min(axis=0), *pts.max(axis=0)], dtype=np.float64)
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes → (N, M)."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class PersonTracker:
+    def __init__(self, iou_thresh: float = 0.3, max_missed_sec: float = 90.0):
+        self.iou_thresh = iou_thresh
+        self.max_missed_sec = max_missed_sec
+        self.tracks: Dict[int, Track] = {}
+        self._ids = itertools.count(1)
+
+    def assign(self, bboxes: List[Optional[np.ndarray]], ts: float) -> List[int]:
+        """
+        Match this frame's boxes to tracks.
+
+        Args:
+            bboxes: one xyxy box per detection (None → always a new track)
+
+        Returns:
+            Track ID per detection, in input order.
+        """
+        self._expire(ts)
+        ids = [-1] * len(bboxes)
+
+        det_idx = [i for i, b in enumerate(bboxes) if b is not None]
+        track_ids = list(self.tracks)
+        if det_idx and track_ids:
+            dets = np.array([bboxes[i] for i in det_idx], dtype=np.float64)
+            trks = np.array([self.tracks[t].bbox for t in track_ids], dtype=np.float64)
+            ious = iou_matrix(dets, trks)
+
+            used_d, used_t = set(), set()
+            # Greedy by IoU, highest first
+            for flat in np.argsort(-ious, axis=None):
+                d, t = divmod(int(flat), len(track_ids))
+                if ious[d, t] < self.iou_thresh:
+                    break
+                if d in used_d or t in used_t:
+                    continue
+                used_d.add(d)
+                used_t.add(t)
+                ids[det_idx[d]] = track_ids[t]
+
+            # Centroid fallback for the rest
+            for d in range(len(det_idx)):
+                if d in used_d:
+                    continue
+                c = (dets[d, :2] + dets[d, 2:]) / 2
+                best, best_dist = None, None
+                for t in range(len(track_ids)):
+                    if t in used_t:
+                        continue
+                    tb = trks[t]
+                    dist = np.linalg.norm(c - (tb[:2] + tb[2:]) / 2)
+                    limit = _CENTROID_MAX_REL * np.hypot(tb[2] - tb[0], tb[3] - tb[1])
+                    if dist <= limit and (best_dist is None or dist < best_dist):
+                        best, best_dist = t, dist
+                if best is not None:
+                    used_t.add(best)
+                    ids[det_idx[d]] = track_ids[best]
+
+        for i, bbox in enumerate(bboxes):
+            if ids[i] != -1:
+                track = self.tracks[ids[i]]
+                track.bbox = np.asarray(bbox, dtype=np.float64)
+                track.last_seen = ts
+                continue
+            ids[i] = next(self._ids)
+            # A detection without a box gets a one-off ID (nothing to match later)
+            if bbox is not None:
+                self.tracks[ids[i]] = Track(
+                    ids[i], np.asarray(bbox, dtype=np.float64), first_seen=ts, last_seen=ts
+                )
+        return ids
+
+    def reset(self):
+        self.tracks.clear()
+
+    def _expire(self, ts: float):
+        stale = [t for t, tr in self.tracks.items() if ts - tr.last_seen > self.max_missed_sec]
+        for t in stale:
+            del self.tracks[t]
@@ -56,20 +56,40 @@ class PoseEstimator:
 
         persons = []
         for r in results:
-            if r.keypoints is None:
-                continue
-            # r.keypoints.data: (N, 17, 3) — x, y, conf
-            kpts_data = r.keypoints.data.cpu().numpy()
-            boxes = r.boxes
-
-            for i in range(kpts_data.shape[0]):
-                xy = kpts_data[i, :, :2]       # (17, 2)
-                conf = kpts_data[i, :, 2]       # (17,)
-                persons.append({
-                    "bbox": boxes.xyxy[i].tolist(),
-                    "confidence": float(boxes.conf[i]),
-                    "keypoints": xy,
-                    "keypoint_conf": conf,
-                })
+            persons.extend(self._to_persons(r))
 
         return persons
+
+    def estimate_batch(
+        self, images: List[np.ndarray], conf_threshold: float = 0.5
+    ) -> List[List[Dict]]:
+        """
+        Run pose estimation on several images in a single forward pass.
+
+        Returns:
+            One person list per input image (same format as estimate()).
+        """
+        if not images:
+            return []
+        results = self.model(list(images), verbose=False, conf=conf_threshold)
+        return [self._to_persons(r) for r in results]
+
+    @staticmethod
+    def _to_persons(r) -> List[Dict]:
+        if r.keypoints is None:
+            return []
+        # r.keypoints.data: (N, 17, 3) — x, y, conf
+        kpts_data = r.keypoints.data.cpu().numpy()
+        boxes = r.boxes
+
+        persons = []
+        for i in range(kpts_data.shape[0]):
+            xy = kpts_data[i, :, :2]       # (17, 2)
+            conf = kpts_data[i, :, 2]       # (17,)
+            persons.append({
+                "bbox": boxes.xyxy[i].tolist(),
+                "confidence": float(boxes.conf[i]),
+                "keypoints": xy,
+                "keypoint_conf": conf,
+            })
+        return persons
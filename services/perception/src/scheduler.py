@@ -1,37 +1,257 @@
 """
-Task Scheduler - 複数の監視タスクを並行実行
+Task Scheduler - 複数の監視タスクを推論予算内でスケジューリング
+
+各モニターは自前のsleepループを持たず、スケジューラが「次回実行時刻」を
+管理して 1 サイクル (MonitorBase.run_once) ずつ起動する。
+
+- 推論予算: inferences_per_sec のトークンバケット (0 なら無制限)。
+  起動時にモニターの inference_cost 分を確保し、終了後に実際の推論回数
+  (last_cycle_inferences) との差を返却する。推論しないモニター
+  (inference_cost = 0) は予算を消費しない
+- スロット割当: 実行時刻を過ぎたモニターのうち priority が高い順、
+  同優先度なら期限 (next_due) が早い順
+- 位相分散: 起動時に各モニターの初回実行を interval 内で均等にずらし、
+  カメラが同時に発火しないようにする
+- 負荷制御: 要求レート (Σ inference_cost/interval) が予算を超える場合、
+  inference_cost > 0 のモニターのうち priority の低いもの (通常は occupancy)
+  から実行間隔を引き延ばす。推論しないモニター (whiteboard) は予算を
+  消費しないため対象外
 """
 import asyncio
 import logging
-from typing import Dict
+import time
+from collections import defaultdict
+from typing import Dict, Set
 from monitors.base import MonitorBase
 
 logger = logging.getLogger(__name__)
 
+# 負荷制御で1つの優先度レベルを引き延ばす最大倍率
+_MAX_STRETCH = 8.0
+# 実行中モニターが無く全員待機中のときの最大スリープ
+_IDLE_POLL_SEC = 1.0
+
+
 class TaskScheduler:
-    def __init__(self):
+    def __init__(self, inferences_per_sec: float = 0.0):
         self.monitors: Dict[str, MonitorBase] = {}
-        
+        self.inferences_per_sec = inferences_per_sec
+
+        self._next_due: Dict[str, float] = {}
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._wake: asyncio.Event | None = None
+
+        # トークンバケット (容量 = 1秒分の予算、最低でも最大の inference_cost)
+        self._tokens = 0.0
+        self._tokens_at = 0.0
+
+        # 優先度ごとの間隔倍率 (負荷制御)
+        self._stretch: Dict[int, float] = {}
+
     def register_monitor(self, name: str, monitor: MonitorBase):
         """監視タスクを登録"""
         self.monitors[name] = monitor
-        logger.info(f"Registered monitor: {name}")
-        
+        logger.info(f"Registered monitor: {name} (priority={monitor.priority})")
+
     async def run(self):
-        """全ての監視タスクを並行実行"""
-        logger.info(f"Starting {len(self.monitors)} monitors")
-        
-        tasks = [
-            asyncio.create_task(self._run_monitor(name, monitor))
-            for name, monitor in self.monitors.items()
-        ]
-        
-        await asyncio.gather(*tasks, return_exceptions=True)
-    
+        """予算内で全ての監視タスクをスケジューリング"""
+        logger.info(
+            f"Starting {len(self.monitors)} monitors "
+            f"(budget={self.inferences_per_sec or 'unlimited'} inf/s)"
+        )
+        self._wake = asyncio.Event()
+        self._spread_phases()
+        self._tokens = self._capacity
+        self._tokens_at = time.monotonic()
+
+        while any(m.enabled for m in self.monitors.values()):
+            self._update_stretch()
+            now = time.monotonic()
+
+            name = self._pick_due(now)
+            if name is None:
+                await self._sleep_until_next(now)
+                continue
+
+            cost = self.monitors[name].inference_cost
+            if not self._take_tokens(cost):
+                # 予算待ちの間も推論しないモニターは実行できる
+                free = self._pick_due(now, free_only=True)
+                if free is not None:
+                    self._launch(free)
+                    continue
+                await self._wait(min(self._token_wait_sec(cost), self._free_wait_sec(now)))
+                continue
+
+            self._launch(name)
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """要求レート・予算・優先度別倍率"""
+        return {
+            "budget_per_sec": self.inferences_per_sec,
+            "demand_per_sec": round(self._demand(), 3),
+            "stretch": dict(self._stretch),
+            "running": len(self._running),
+        }
+
+    # ------------------------------------------------------------------
+    # Slot assignment
+    # ------------------------------------------------------------------
+
+    def _spread_phases(self):
+        """初回実行時刻を interval 内で均等にずらす"""
+        now = time.monotonic()
+        n = len(self.monitors)
+        for i, (name, monitor) in enumerate(self.monitors.items()):
+            offset = (i / n) * monitor.effective_interval_sec if n else 0.0
+            self._next_due[name] = now + offset
+
+    def _pick_due(self, now: float, free_only: bool = False) -> str | None:
+        """
+        実行時刻を過ぎたモニターから priority 降順 → 期限昇順で1つ選ぶ
+        (free_only: inference_cost = 0 のモニターのみ)
+        """
+        best = None
+        best_key = None
+        for name, monitor in self.monitors.items():
+            if not monitor.enabled or name in self._running:
+                continue
+            if free_only and monitor.inference_cost > 0:
+                continue
+            due = self._next_due[name]
+            if due > now:
+                continue
+            key = (-monitor.priority, due)
+            if best_key is None or key < best_key:
+                best, best_key = name, key
+        return best
+
+    def _launch(self, name: str):
+        monitor = self.monitors[name]
+        self._running.add(name)
+        task = asyncio.create_task(self._run_monitor(name, monitor))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
     async def _run_monitor(self, name: str, monitor: MonitorBase):
-        """個別の監視タスク実行（エラーハンドリング付き）"""
+        """個別の監視タスクを1サイクル実行（エラーハンドリング付き）"""
+        start = time.monotonic()
+        delay = monitor.effective_interval_sec
+        reserved = monitor.inference_cost
         try:
-            await monitor.run()
+            delay = await monitor.run_once()
         except Exception as e:
             logger.error(f"Monitor {name} crashed: {e}", exc_info=True)
-            # 再起動ロジックを追加可能
+        finally:
+            # 変化ゲートや人物なしで使わなかった推論分を返却
+            self._refund_tokens(reserved - min(reserved, monitor.last_cycle_inferences))
+            stretch = self._stretch.get(monitor.priority, 1.0)
+            self._next_due[name] = start + delay * stretch
+            self._running.discard(name)
+            self._wake.set()
+
+    # ------------------------------------------------------------------
+    # Load shedding
+    # ------------------------------------------------------------------
+
+    def _demand(self) -> float:
+        return sum(
+            m.inference_cost / m.effective_interval_sec
+            for m in self.monitors.values()
+            if m.enabled and m.effective_interval_sec > 0
+        )
+
+    def _update_stretch(self):
+        """予算超過分を priority の低いレベルから順に間隔を延ばして吸収"""
+        stretch: Dict[int, float] = {}
+        if self.inferences_per_sec > 0:
+            by_priority: Dict[int, float] = defaultdict(float)
+            for m in self.monitors.values():
+                if m.enabled and m.inference_cost > 0 and m.effective_interval_sec > 0:
+                    by_priority[m.priority] += m.inference_cost / m.effective_interval_sec
+
+            excess = sum(by_priority.values()) - self.inferences_per_sec
+            for priority in sorted(by_priority):
+                if excess <= 0:
+                    break
+                demand = by_priority[priority]
+                shed = min(excess, demand * (1.0 - 1.0 / _MAX_STRETCH))
+                stretch[priority] = demand / (demand - shed)
+                excess -= shed
+
+        if stretch != self._stretch:
+            if stretch:
+                logger.info(
+                    "Inference budget exceeded, stretching intervals: "
+                    + ", ".join(f"p{p}×{s:.2f}" for p, s in sorted(stretch.items()))
+                )
+            else:
+                logger.info("Inference demand within budget")
+        self._stretch = stretch
+
+    # ------------------------------------------------------------------
+    # Token bucket
+    # ------------------------------------------------------------------
+
+    @property
+    def _capacity(self) -> float:
+        max_cost = max((m.inference_cost for m in self.monitors.values()), default=1)
+        return float(max(1, max_cost, self.inferences_per_sec))
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity,
+            self._tokens + (now - self._tokens_at) * self.inferences_per_sec,
+        )
+        self._tokens_at = now
+
+    def _take_tokens(self, cost: int) -> bool:
+        if self.inferences_per_sec <= 0 or cost <= 0:
+            return True
+        self._refill()
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return True
+        return False
+
+    def _refund_tokens(self, count: int):
+        if self.inferences_per_sec > 0 and count > 0:
+            self._tokens = min(self._capacity, self._tokens + count)
+
+    def _token_wait_sec(self, cost: int) -> float:
+        return max(0.0, (cost - self._tokens) / self.inferences_per_sec)
+
+    # ------------------------------------------------------------------
+    # Waiting
+    # ------------------------------------------------------------------
+
+    async def _sleep_until_next(self, now: float):
+        pending = [
+            self._next_due[name]
+            for name, m in self.monitors.items()
+            if m.enabled and name not in self._running
+        ]
+        timeout = min(pending) - now if pending else _IDLE_POLL_SEC
+        await self._wait(max(0.0, min(timeout, _IDLE_POLL_SEC)))
+
+    def _free_wait_sec(self, now: float) -> float:
+        """次に実行時刻を迎える inference_cost = 0 のモニターまでの秒数"""
+        pending = [
+            self._next_due[name]
+            for name, m in self.monitors.items()
+            if m.enabled and m.inference_cost <= 0 and name not in self._running
+        ]
+        return max(0.0, min(pending) - now) if pending else _IDLE_POLL_SEC
+
+    async def _wait(self, timeout: float):
+        """timeout 経過またはモニター完了通知まで待機"""
+        self._wake.clear()
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
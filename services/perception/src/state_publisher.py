@@ -1,12 +1,11 @@
 """
 State Publisher - MQTT経由で解析結果を送信
 """
-import json
 import logging
-import os
-import paho.mqtt.client as mqtt
 from typing import Any, Dict
 
+from mqtt_async import AsyncMQTTClient
+
 logger = logging.getLogger(__name__)
 
 class StatePublisher:
@@ -19,14 +18,9 @@ class StatePublisher:
         return cls._instance
 
     def __init__(self, broker: str = "localhost", port: int = 1883):
-        self.client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
-        mqtt_user = os.getenv("MQTT_USER")
-        mqtt_pass = os.getenv("MQTT_PASS")
-        if mqtt_user:
-            self.client.username_pw_set(mqtt_user, mqtt_pass)
-        self.client.connect(broker, port)
-        self.client.loop_start()
-        logger.info(f"StatePublisher connected to {broker}:{port}")
+        # ImageRequester と同じ接続を共有 (接続は main() で行う)
+        self.client = AsyncMQTTClient.get_instance(broker, port)
+        logger.info(f"StatePublisher using MQTT {broker}:{port}")
     
     async def publish(self, topic: str, payload: Dict[str, Any]):
         """
@@ -36,10 +30,7 @@ class StatePublisher:
             topic: MQTTトピック
             payload: 送信データ（JSON化される）
         """
-        message = json.dumps(payload)
-        result = self.client.publish(topic, message)
-        
-        if result.rc == mqtt.MQTT_ERR_SUCCESS:
+        if await self.client.publish(topic, payload):
             logger.debug(f"Published to {topic}: {payload}")
         else:
             logger.error(f"Failed to publish to {topic}")
@@ -37,18 +37,35 @@ class YOLOInference:
         
         detections = []
         for r in results:
-            for box in r.boxes:
-                cls_id = int(box.cls[0])
-                detections.append({
-                    "class": self.model.names[cls_id],
-                    "confidence": float(box.conf[0]),
-                    "bbox": box.xyxy[0].tolist(),  # [x1, y1, x2, y2]
-                    "center": box.xywh[0][:2].tolist(),  # [cx, cy]
-                    "width": float(box.xywh[0][2]),
-                    "height": float(box.xywh[0][3])
-                })
+            detections.extend(self._to_detections(r))
         
         return detections
+
+    def infer_batch(self, images: List[np.ndarray], conf_threshold: float = 0.5) -> List[List[Dict]]:
+        """
+        複数画像を1回のforwardでまとめて推論
+
+        Returns:
+            List[List[Dict]]: 入力画像ごとの検出結果 (infer()と同じ形式)
+        """
+        if not images:
+            return []
+        results = self.model(list(images), verbose=False, conf=conf_threshold)
+        return [self._to_detections(r) for r in results]
+
+    def _to_detections(self, r) -> List[Dict]:
+        detections = []
+        for box in r.boxes:
+            cls_id = int(box.cls[0])
+            detections.append({
+                "class": self.model.names[cls_id],
+                "confidence": float(box.conf[0]),
+                "bbox": box.xyxy[0].tolist(),  # [x1, y1, x2, y2]
+                "center": box.xywh[0][:2].tolist(),  # [cx, cy]
+                "width": float(box.xywh[0][2]),
+                "height": float(box.xywh[0][3])
+            })
+        return detections
     
     def filter_by_class(self, detections: List[Dict], class_name: str) -> List[Dict]:
         """特定のクラスでフィルタリング"""
@@ -120,7 +120,7 @@ async def main():
                     f"  {ip}{zone}: {len(persons)} person(s) | "
                     f"activity={result['activity_level']:.4f} ({result['activity_class']}) | "
                     f"posture={result['posture_status']} ({result['posture_duration_sec']:.0f}s) | "
-                    f"buf=[raw:{depth['raw']} t1:{depth['tier1']} t2:{depth['tier2']} t3:{depth['tier3']}]"
+                    f"buf=[raw:{depth['raw']}/{depth['capacity']}]"
                 )
             else:
                 logger.info(f"  {ip}{zone}: pose found 0 persons")
@@ -144,7 +144,7 @@ async def main():
             f"    activity_level:       {result['activity_level']:.4f} ({result['activity_class']})\n"
             f"    posture_duration_sec: {result['posture_duration_sec']:.1f}\n"
             f"    posture_status:       {result['posture_status']}\n"
-            f"    buffer_depth:         raw={depth['raw']} t1={depth['tier1']} t2={depth['tier2']} t3={depth['tier3']}"
+            f"    buffer_depth:         raw={depth['raw']}/{depth['capacity']}"
         )
 
     for _, source in sources.values():
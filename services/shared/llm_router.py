@@ -0,0 +1,356 @@
+"""
+LLM Router: a pool of OpenAI-compatible LLM backends.
+
+Shared by Brain and Voice (services/shared, on PYTHONPATH as /shared in
+both images).
+
+- Routing: least outstanding requests; ties go to the backend with the
+  lowest recent latency (EWMA).  The outstanding count is per process:
+  Brain and Voice each run their own router and cannot see each other's
+  in-flight requests, so two services can pick the same idle backend at
+  once.  Only the latency EWMA reflects load from other services, and only
+  after their requests slow a backend down.
+- Hedging (optional): if the first attempt is still running after the
+  backend's latency percentile ``hedge_percentile``, a second attempt starts
+  on another backend; the first success wins and the other is cancelled.
+- Failover: a failed attempt is retried once on another backend.
+- Circuit breakers: ``failure_threshold`` consecutive failures open a
+  backend for ``open_sec`` (doubling while it keeps failing); afterwards a
+  single half-open probe decides whether it closes again.  While every
+  backend is open, requests fail fast with LLMUnavailableError.
+- Metrics: per-backend request/error/hedge counters and latency histograms.
+
+Backends are configured with LLM_API_URLS (comma-separated), falling back to
+the single LLM_API_URL.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from loguru import logger
+
+T = TypeVar("T")
+
+# Histogram bucket upper bounds (seconds)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, float("inf"))
+_RECENT_SAMPLES = 256
+_EWMA_ALPHA = 0.2
+
+
+class LLMHTTPError(Exception):
+    """Non-200 response from an LLM backend."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"LLM API Error {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class LLMUnavailableError(Exception):
+    """Every backend's circuit breaker is open."""
+
+
+def _is_backend_failure(exc: BaseException) -> bool:
+    """4xx means the request was bad, not the backend; everything else counts."""
+    return not (isinstance(exc, LLMHTTPError) and 400 <= exc.status < 500)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.total = 0
+        self.sum_sec = 0.0
+        self._recent: Deque[float] = deque(maxlen=_RECENT_SAMPLES)
+
+    def observe(self, sec: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if sec <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum_sec += sec
+        self._recent.append(sec)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """q-quantile (0..1) of the recent samples, None if there are none."""
+        if not self._recent:
+            return None
+        samples = sorted(self._recent)
+        return samples[min(len(samples) - 1, int(len(samples) * q))]
+
+    @property
+    def samples(self) -> int:
+        return len(self._recent)
+
+    def buckets(self) -> Dict[str, int]:
+        return {
+            ("+Inf" if bound == float("inf") else f"{bound:g}"): count
+            for bound, count in zip(LATENCY_BUCKETS, self.counts)
+        }
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, open_sec: float = 15.0, max_open_sec: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_open_sec = open_sec
+        self.max_open_sec = max_open_sec
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_sec = open_sec
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allows(self, now: float) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now - self.opened_at >= self.open_sec:
+            self.state = self.HALF_OPEN
+            self._probing = False
+        # Half-open: exactly one probe at a time
+        return self.state == self.HALF_OPEN and not self._probing
+
+    def on_attempt(self):
+        if self.state == self.HALF_OPEN:
+            self._probing = True
+
+    def on_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_sec = self.base_open_sec
+        self._probing = False
+
+    def on_failure(self, now: float) -> bool:
+        """Record a failure; True if this opened the breaker."""
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            # Probe failed: back off further
+            self.open_sec = min(self.open_sec * 2, self.max_open_sec)
+        elif self.failures < self.failure_threshold:
+            return False
+        self.state = self.OPEN
+        self.opened_at = now
+        self._probing = False
+        return True
+
+    def on_abandon(self):
+        """Attempt cancelled (lost a hedge race): neither success nor failure."""
+        self._probing = False
+
+    def reopens_in(self, now: float) -> float:
+        return max(0.0, self.opened_at + self.open_sec - now) if self.state == self.OPEN else 0.0
+
+
+class Backend:
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url
+        self.breaker = breaker
+        self.latency = LatencyHistogram()
+        self.ewma_sec: Optional[float] = None
+        self.outstanding = 0
+        self.requests = 0
+        self.errors = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def observe(self, sec: float):
+        self.latency.observe(sec)
+        self.ewma_sec = sec if self.ewma_sec is None else (
+            _EWMA_ALPHA * sec + (1 - _EWMA_ALPHA) * self.ewma_sec
+        )
+
+    def stats(self) -> dict:
+        p50 = self.latency.percentile(0.5)
+        p95 = self.latency.percentile(0.95)
+        return {
+            "url": self.url,
+            "state": self.breaker.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "latency_p50_ms": round(p50 * 1000) if p50 is not None else None,
+            "latency_p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "latency_buckets": self.latency.buckets(),
+        }
+
+
+class LLMRouter:
+    def __init__(
+        self,
+        urls: List[str],
+        hedge_percentile: float = 0.0,
+        hedge_min_samples: int = 20,
+        failure_threshold: int = 3,
+        open_sec: float = 15.0,
+    ):
+        if not urls:
+            raise ValueError("LLMRouter needs at least one backend URL")
+        self.backends = [
+            Backend(url.rstrip("/"), CircuitBreaker(failure_threshold, open_sec)) for url in urls
+        ]
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self._rr = 0
+
+    @classmethod
+    def from_env(cls, default_url: str) -> "LLMRouter":
+        urls = [u.strip() for u in os.getenv("LLM_API_URLS", "").split(",") if u.strip()]
+        router = cls(
+            urls or [default_url],
+            hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", 0)),
+            hedge_min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20)),
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 3)),
+            open_sec=float(os.getenv("LLM_BREAKER_OPEN_SEC", 15)),
+        )
+        if len(router.backends) > 1:
+            logger.info(
+                f"LLM router: {len(router.backends)} backends "
+                f"({', '.join(b.url for b in router.backends)}), hedge p{router.hedge_percentile * 100:g}"
+            )
+        return router
+
+    # ------------------------------------------------------------------
+
+    def pick(self, exclude: tuple = ()) -> Optional[Backend]:
+        """
+        Healthy backend ordered by (outstanding, EWMA latency, round-robin),
+        None if every candidate is excluded or open.
+        """
+        now = time.monotonic()
+        healthy = [b for b in self.backends if b not in exclude and b.breaker.allows(now)]
+        if not healthy:
+            return None
+        self._rr += 1
+        n = len(self.backends)
+        return min(
+            healthy,
+            key=lambda b: (
+                b.outstanding,
+                b.ewma_sec if b.ewma_sec is not None else 0.0,
+                (self.backends.index(b) - self._rr) % n,
+            ),
+        )
+
+    def _hedge_delay(self, backend: Backend) -> Optional[float]:
+        if self.hedge_percentile <= 0 or len(self.backends) < 2:
+            return None
+        if backend.latency.samples < self.hedge_min_samples:
+            return None
+        return backend.latency.percentile(self.hedge_percentile)
+
+    def _launch(self, backend: Backend, send: Callable[[str], Awaitable[T]]) -> asyncio.Task:
+        # Count the attempt before it is scheduled so concurrent pick()s see it
+        backend.breaker.on_attempt()
+        backend.outstanding += 1
+        backend.requests += 1
+        return asyncio.ensure_future(self._attempt(backend, send))
+
+    async def _attempt(self, backend: Backend, send: Callable[[str], Awaitable[T]]) -> T:
+        start = time.monotonic()
+        try:
+            result = await send(backend.url)
+        except asyncio.CancelledError:
+            backend.breaker.on_abandon()
+            raise
+        except Exception as e:
+            backend.errors += 1
+            if _is_backend_failure(e):
+                if backend.breaker.on_failure(time.monotonic()):
+                    logger.warning(f"LLM backend {backend.url} circuit opened for {backend.breaker.open_sec:.0f}s: {e}")
+            else:
+                backend.breaker.on_abandon()
+            raise
+        else:
+            backend.observe(time.monotonic() - start)
+            backend.breaker.on_success()
+            return result
+        finally:
+            backend.outstanding -= 1
+
+    async def request(self, send: Callable[[str], Awaitable[T]], hedge: bool = True) -> T:
+        """
+        Run send(base_url) on the pool and return the first successful result.
+
+        send must raise on failure (LLMHTTPError for HTTP errors); an
+        exception with ``retryable = False`` is not failed over.  Raises
+        LLMUnavailableError without calling send if every backend is open.  Pass
+        hedge=False for requests with side effects beyond the response (e.g.
+        streamed tool calls dispatched while receiving).
+        """
+        primary = self.pick()
+        if primary is None:
+            now = time.monotonic()
+            retry_in = min(b.breaker.reopens_in(now) for b in self.backends)
+            raise LLMUnavailableError(
+                f"All {len(self.backends)} LLM backend(s) unavailable (circuit open, retry in {retry_in:.0f}s)"
+            )
+        tasks: Dict[asyncio.Task, Backend] = {self._launch(primary, send): primary}
+        tried = [primary]
+        hedged = False
+        hedge_delay = self._hedge_delay(primary) if hedge else None
+        failovers_left = 1
+        last_error: Optional[BaseException] = None
+
+        try:
+            while tasks:
+                timeout = hedge_delay if hedge_delay is not None and len(tried) == 1 else None
+                done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Hedge: the first attempt is slower than its usual tail
+                    backup = self.pick(exclude=tuple(tried))
+                    hedge_delay = None
+                    if backup is not None:
+                        logger.info(f"LLM hedge: {primary.url} slower than {timeout:.2f}s, also trying {backup.url}")
+                        primary.hedges += 1
+                        hedged = True
+                        tasks[self._launch(backup, send)] = backup
+                        tried.append(backup)
+                    continue
+
+                for task in done:
+                    backend = tasks.pop(task)
+                    if task.exception() is None:
+                        if hedged and backend is not primary:
+                            backend.hedge_wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    logger.warning(f"LLM backend {backend.url} failed: {last_error}")
+
+                if (
+                    not tasks
+                    and failovers_left
+                    and _is_backend_failure(last_error)
+                    and getattr(last_error, "retryable", True)
+                ):
+                    failovers_left -= 1
+                    backup = self.pick(exclude=tuple(tried))
+                    if backup is not None:
+                        logger.info(f"LLM failover to {backup.url}")
+                        tasks[self._launch(backup, send)] = backup
+                        tried.append(backup)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        raise last_error
+
+    def stats(self) -> List[dict]:
+        return [b.stats() for b in self.backends]
+
+    def summary(self) -> str:
+        """One-line per-backend state for logs."""
+        parts = []
+        for b in self.backends:
+            p50 = b.latency.percentile(0.5)
+            p95 = b.latency.percentile(0.95)
+            latency = f"p50={p50:.2f}s p95={p95:.2f}s" if p50 is not None else "no samples"
+            parts.append(f"{b.url} [{b.breaker.state}, out={b.outstanding}, {latency}, err={b.errors}/{b.requests}]")
+        return "; ".join(parts)
@@ -3,6 +3,7 @@ import os
 import random
 from loguru import logger
 from models import Task
+from llm_router import LLMHTTPError, LLMRouter
 
 class SpeechGenerator:
     """Generate natural speech text from task data using LLM."""
@@ -48,6 +49,8 @@ class SpeechGenerator:
     def __init__(self, llm_api_url: str = None):
         self.llm_api_url = llm_api_url or os.getenv("LLM_API_URL", "http://brain:8000/llm")
         self.model = os.getenv("LLM_MODEL", "qwen2.5:14b")
+        # Backend pool shared with the Brain's inference boxes (LLM_API_URLS)
+        self.router = LLMRouter.from_env(self.llm_api_url)
         logger.info(f"SpeechGenerator initialized with LLM URL: {self.llm_api_url}, model: {self.model}")
     
     async def generate_speech_text(self, task: Task) -> str:
@@ -239,29 +242,32 @@ class SpeechGenerator:
                 "temperature": 0.8
             }
             
-            # Ensure URL ends with /chat/completions if not already
-            api_endpoint = self.llm_api_url
-            if not api_endpoint.endswith("/chat/completions"):
-                api_endpoint = f"{api_endpoint.rstrip('/')}/chat/completions"
-
             timeout = aiohttp.ClientTimeout(total=30)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(
-                    api_endpoint,
-                    headers=headers,
-                    json=payload
-                ) as resp:
-                    if resp.status != 200:
-                        error_text = await resp.text()
-                        raise Exception(f"LLM API error {resp.status}: {error_text}")
-                    
-                    result = await resp.json()
-                    # Parse OpenAI format response
-                    if "choices" in result and len(result["choices"]) > 0:
-                        return result["choices"][0]["message"]["content"].strip()
-                    else:
-                        raise Exception(f"Unexpected LLM response format: {result}")
-                    
+
+            async def send(base_url: str) -> str:
+                # Ensure URL ends with /chat/completions if not already
+                api_endpoint = base_url
+                if not api_endpoint.endswith("/chat/completions"):
+                    api_endpoint = f"{api_endpoint.rstrip('/')}/chat/completions"
+
+                async with aiohttp.ClientSession(timeout=timeout) as session:
+                    async with session.post(
+                        api_endpoint,
+                        headers=headers,
+                        json=payload
+                    ) as resp:
+                        if resp.status != 200:
+                            raise LLMHTTPError(resp.status, await resp.text())
+
+                        result = await resp.json()
+                        # Parse OpenAI format response
+                        if "choices" in result and len(result["choices"]) > 0:
+                            return result["choices"][0]["message"]["content"].strip()
+                        else:
+                            raise Exception(f"Unexpected LLM response format: {result}")
+
+            return await self.router.request(send)
+
         except Exception as e:
             logger.error(f"LLM API call failed: {e}")
             raise